@@ -0,0 +1,126 @@
+"""
+Benchmark: X402Client vs AsyncX402Client against a local stub facilitator.
+
+Runs the same number of `verify_payment` calls through
+  * the sync client, one call after another,
+  * the sync client fanned out over a thread pool,
+  * the async client with a bounded number of in-flight calls,
+and prints throughput plus p50/p99 latency for each.
+
+Usage:
+    python benchmarks/bench_async_client.py --requests 2000 --concurrency 64 --delay 0.005
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from chaoschain_x402_client import X402Client, AsyncX402Client  # noqa: E402
+from stub_facilitator import spawn_stub  # noqa: E402
+
+HEADER = "eyJ4NDAyVmVyc2lvbiI6MX0="
+REQUIREMENTS = {
+    "scheme": "exact",
+    "network": "base-sepolia",
+    "maxAmountRequired": "1000000",
+    "payTo": "0x209693Bc6afc0C5328bA36FaF03C514EF312287C",
+    "asset": "0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+    "resource": "/api/weather",
+}
+
+
+def report(name: str, latencies: list, elapsed: float):
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(
+        f"{name:<28} {len(latencies) / elapsed:>9.0f} req/s   "
+        f"p50 {p50:>7.2f} ms   p99 {p99:>7.2f} ms   "
+        f"mean {statistics.mean(latencies) * 1000:>7.2f} ms"
+    )
+
+
+def timed_sync(client: X402Client) -> float:
+    start = time.perf_counter()
+    client.verify_payment(HEADER, REQUIREMENTS)
+    return time.perf_counter() - start
+
+
+def bench_sync_serial(url: str, n: int):
+    with X402Client(facilitator_url=url) as client:
+        start = time.perf_counter()
+        latencies = [timed_sync(client) for _ in range(n)]
+        report("sync (serial)", latencies, time.perf_counter() - start)
+
+
+def bench_sync_threads(url: str, n: int, concurrency: int):
+    with X402Client(facilitator_url=url) as client:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            start = time.perf_counter()
+            latencies = list(pool.map(lambda _: timed_sync(client), range(n)))
+            report(
+                f"sync (threads={concurrency})", latencies, time.perf_counter() - start
+            )
+
+
+async def bench_async(url: str, n: int, concurrency: int, http2: bool):
+    async with AsyncX402Client(
+        facilitator_url=url,
+        max_connections=concurrency,
+        max_keepalive_connections=concurrency,
+        http2=http2,
+    ) as client:
+        limit = asyncio.Semaphore(concurrency)
+
+        async def one() -> float:
+            async with limit:
+                start = time.perf_counter()
+                await client.verify_payment(HEADER, REQUIREMENTS)
+                return time.perf_counter() - start
+
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(one() for _ in range(n)))
+        report(
+            f"async (in-flight={concurrency})",
+            list(latencies),
+            time.perf_counter() - start,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument(
+        "--delay", type=float, default=0.005, help="stub server delay per call (s)"
+    )
+    parser.add_argument(
+        "--url", help="benchmark an existing facilitator instead of the stub"
+    )
+    parser.add_argument(
+        "--http2", action="store_true", help="enable HTTP/2 on the async client"
+    )
+    args = parser.parse_args()
+
+    stub, url = None, args.url
+    if url is None:
+        stub, url = spawn_stub(delay=args.delay)
+
+    try:
+        print(f"{args.requests} verify calls against {url}\n")
+        bench_sync_serial(url, args.requests)
+        bench_sync_threads(url, args.requests, args.concurrency)
+        asyncio.run(bench_async(url, args.requests, args.concurrency, args.http2))
+    finally:
+        if stub is not None:
+            stub.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Microbenchmark: per-call encode/decode overhead of the client hot path.
+
+Compares, without any network I/O,
+  * legacy: build PaymentRequirements(**dict), model_dump(), json.dumps the
+    request, json.loads the response and build VerifyResponse(**data)
+  * fast:   reuse a pre-validated PaymentRequirements, serialize with
+    codec.dumps (orjson if installed) and decode the response bytes with
+    a TypeAdapter's validate_json
+  * template: splice the header into a PaymentRequirementsTemplate's
+    pre-encoded body, decode as in `fast`
+
+Usage:
+    python benchmarks/bench_codec.py --number 20000
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from chaoschain_x402_client import (  # noqa: E402
+    PaymentRequirements,
+    PaymentRequirementsTemplate,
+    VerifyResponse,
+    codec,
+)
+from chaoschain_x402_client.templates import prepare_request  # noqa: E402
+
+HEADER = "eyJ4NDAyVmVyc2lvbiI6MX0="
+REQUIREMENTS = {
+    "scheme": "exact",
+    "network": "base-sepolia",
+    "maxAmountRequired": "1000000",
+    "payTo": "0x209693Bc6afc0C5328bA36FaF03C514EF312287C",
+    "asset": "0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+    "resource": "/api/weather",
+    "description": "Weather data",
+}
+RESPONSE = json.dumps(
+    {
+        "isValid": True,
+        "invalidReason": None,
+        "consensusProof": "0x" + "ab" * 32,
+        "reportId": "req_1760000000000_abc1234",
+        "timestamp": 1760000000000,
+        "amount": {"human": "1", "base": "1000000", "symbol": "USDC", "decimals": 6},
+        "fee": {"human": "0.01", "base": "10000", "bps": 100},
+        "net": {"human": "0.99", "base": "990000"},
+    }
+).encode()
+
+PREBUILT = PaymentRequirements(**REQUIREMENTS)
+TEMPLATE = PaymentRequirementsTemplate(REQUIREMENTS)
+
+
+def legacy():
+    requirements = PaymentRequirements(**REQUIREMENTS)
+    json.dumps(
+        {
+            "x402Version": 1,
+            "paymentHeader": HEADER,
+            "paymentRequirements": requirements.model_dump(),
+        }
+    ).encode()
+    VerifyResponse(**json.loads(RESPONSE))
+
+
+def fast():
+    requirements = codec.as_requirements(PREBUILT)
+    codec.dumps(
+        {
+            "x402Version": 1,
+            "paymentHeader": HEADER,
+            "paymentRequirements": codec.requirements_payload(requirements),
+        }
+    )
+    codec.VERIFY_RESPONSE_ADAPTER.validate_json(RESPONSE)
+
+
+def template():
+    prepare_request(HEADER, TEMPLATE, 1)
+    codec.VERIFY_RESPONSE_ADAPTER.validate_json(RESPONSE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--number", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"orjson: {'yes' if codec.orjson is not None else 'no (stdlib json)'}\n")
+    results = {}
+    for name, fn in (("legacy", legacy), ("fast", fast), ("template", template)):
+        best = min(timeit.repeat(fn, number=args.number, repeat=args.repeat))
+        results[name] = best / args.number * 1e6
+        speedup = results["legacy"] / results[name]
+        print(f"{name:<10} {results[name]:>8.2f} µs/call   {speedup:>5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Benchmark: compact msgspec types against the pydantic models.
+
+For VerifyResponse, SettleResponse, PaymentRequirements and
+SupportedSchemesResponse, decodes `--objects` distinct response bodies
+(fresh hashes and amounts, the same recipient, asset and network, as in
+a real verify cache or audit buffer) with the pydantic TypeAdapters and
+with the compact decoders, and reports decode time per object, memory
+retained per object (tracemalloc), and the time of a full gc.collect()
+while they are all held.
+
+Usage:
+    python benchmarks/bench_compact_types.py --objects 100000
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from chaoschain_x402_client import codec  # noqa: E402
+from chaoschain_x402_client.fees import compute_fee_breakdown  # noqa: E402
+
+PAY_TO = "0x9c2B3a7F5D2e1E6b4a8C0d3F7e1B2A4c6D8e0F1a"
+ASSET = "0x036CbD53842c5426634e7929541eC2318f3dCF7e"
+
+
+def bodies(kind: str, count: int, seed: int) -> List[bytes]:
+    """`count` JSON bodies of one type, differing where real responses differ."""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(count):
+        amount = str(rng.randrange(1, 10**9))
+        breakdown = compute_fee_breakdown(amount)
+        if kind == "VerifyResponse":
+            obj = {
+                "isValid": True,
+                "consensusProof": "0x%064x" % rng.getrandbits(256),
+                "reportId": "rep_%016x" % rng.getrandbits(64),
+                "timestamp": 1735689600000 + rng.randrange(10**6),
+                **breakdown,
+            }
+        elif kind == "SettleResponse":
+            obj = {
+                "success": True,
+                "txHash": "0x%064x" % rng.getrandbits(256),
+                "txHashFee": "0x%064x" % rng.getrandbits(256),
+                "networkId": "base-sepolia",
+                "consensusProof": "0x%064x" % rng.getrandbits(256),
+                "timestamp": 1735689600000 + rng.randrange(10**6),
+                "status": "pending",
+                **breakdown,
+            }
+        elif kind == "PaymentRequirements":
+            obj = {
+                "scheme": "exact",
+                "network": "base-sepolia",
+                "maxAmountRequired": amount,
+                "resource": "/api/weather",
+                "payTo": PAY_TO,
+                "asset": ASSET,
+                "description": "Weather report",
+                "mimeType": "application/json",
+                "maxTimeoutSeconds": 60,
+            }
+        else:
+            obj = {
+                "kinds": [
+                    {"scheme": "exact", "network": network}
+                    for network in (
+                        "base-sepolia",
+                        "ethereum-sepolia",
+                        "base",
+                        "ethereum",
+                        "0g-testnet",
+                        "0g",
+                    )
+                ]
+            }
+        out.append(codec.dumps(obj))
+    return out
+
+
+def measure(
+    decode: Callable[[bytes], object], payloads: List[bytes]
+) -> Tuple[float, float, float]:
+    """(µs per decode, bytes retained per object, gc.collect() ms while held)."""
+    start = time.perf_counter()
+    for payload in payloads:
+        decode(payload)
+    per_decode = (time.perf_counter() - start) / len(payloads) * 1e6
+
+    gc.collect()
+    tracemalloc.start()
+    held = [decode(payload) for payload in payloads]
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    gc.collect()
+    collect_ms = (time.perf_counter() - start) * 1e3
+    del held
+    return per_decode, retained / len(payloads), collect_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--objects", type=int, default=100_000, help="objects decoded and held per type"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    try:
+        from chaoschain_x402_client import compact
+    except ImportError as e:
+        sys.exit(str(e))
+
+    decoders: Dict[str, Tuple[Callable, Callable]] = {
+        "VerifyResponse": (
+            codec.VERIFY_RESPONSE_ADAPTER.validate_json,
+            compact.VERIFY_RESPONSE_DECODER.decode,
+        ),
+        "SettleResponse": (
+            codec.SETTLE_RESPONSE_ADAPTER.validate_json,
+            compact.SETTLE_RESPONSE_DECODER.decode,
+        ),
+        "PaymentRequirements": (
+            codec.PAYMENT_REQUIREMENTS_ADAPTER.validate_json,
+            compact.PAYMENT_REQUIREMENTS_DECODER.decode,
+        ),
+        "SupportedSchemesResponse": (
+            codec.SUPPORTED_SCHEMES_ADAPTER.validate_json,
+            compact.SUPPORTED_SCHEMES_DECODER.decode,
+        ),
+    }
+
+    print(f"{args.objects} objects per type\n")
+    print(f"{'type':<26} {'':<9} {'decode':>10} {'memory':>12} {'gc.collect':>12}")
+    for kind, (model_decode, compact_decode) in decoders.items():
+        payloads = bodies(kind, args.objects, args.seed)
+        model = measure(model_decode, payloads)
+        small = measure(compact_decode, payloads)
+        for name, (per_decode, per_object, collect_ms) in (
+            ("pydantic", model),
+            ("compact", small),
+        ):
+            print(
+                f"{kind if name == 'pydantic' else '':<26} {name:<9} {per_decode:>7.2f} us "
+                f"{per_object:>8.0f} B/obj {collect_ms:>9.1f} ms"
+            )
+        print(
+            f"{'':<26} {'ratio':<9} {model[0] / small[0]:>8.1f}x {model[1] / small[1]:>10.1f}x "
+            f"{model[2] / max(small[2], 1e-3):>10.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
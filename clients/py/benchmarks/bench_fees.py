@@ -0,0 +1,310 @@
+"""
+Benchmark: local fee/amount breakdowns, checked against the bridge's TypeScript.
+
+First a differential check: `--vectors` random and edge-case inputs
+(amount strings, FEE_BPS_DEFAULT settings, decimals) go through a Node
+port of `calculateFee` / `computeFeeBreakdown` using BigInt, parseInt and
+viem's `formatUnits` (from http-bridge/node_modules when installed, else a
+verbatim copy), and through `compute_fee_breakdown` and
+`fee_breakdown_columns`. Any difference is printed and the script exits
+non-zero. The bridge hard-codes 6 decimals; other values exercise
+`formatUnits`.
+
+Then throughput: single-payment breakdowns per second, and rows per
+second of the NumPy column functions over `--rows` amounts.
+
+Usage:
+    python benchmarks/bench_fees.py --vectors 20000 --rows 1000000
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from chaoschain_x402_client.fees import (  # noqa: E402
+    amount_column,
+    compute_fee_breakdown,
+    fee_breakdown_columns,
+    parse_base_units,
+    parse_fee_bps,
+)
+
+BRIDGE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "http-bridge"
+)
+
+NODE_SCRIPT = r"""
+const { createRequire } = require('module');
+let formatUnits;
+let source = 'viem';
+try {
+  ({ formatUnits } = createRequire(process.argv[1] + '/package.json')('viem'));
+} catch (e) {
+  source = 'copy of viem formatUnits';
+  // viem/src/utils/unit/formatUnits.ts
+  formatUnits = (value, decimals) => {
+    let display = value.toString();
+    const negative = display.startsWith('-');
+    if (negative) display = display.slice(1);
+    display = display.padStart(decimals, '0');
+    let [integer, fraction] = [
+      display.slice(0, display.length - decimals),
+      display.slice(display.length - decimals),
+    ];
+    fraction = fraction.replace(/(0+)$/, '');
+    return `${negative ? '-' : ''}${integer || '0'}${fraction ? `.${fraction}` : ''}`;
+  };
+}
+
+// managed/fees.ts, with FEE_BPS_DEFAULT passed in
+function calculateFee(amount, feeBpsDefault) {
+  const feeBps = parseInt(feeBpsDefault || '100');
+  const feeAmount = (amount * BigInt(feeBps)) / BigInt(10000);
+  const netAmount = amount - feeAmount;
+  return { feeAmount, netAmount, feeBps };
+}
+
+// managed/amounts.ts, with decimals passed in
+function computeFeeBreakdown(maxAmountRequired, feeBpsDefault, decimals) {
+  const baseAmount = BigInt(maxAmountRequired);
+  const { feeAmount, netAmount, feeBps } = calculateFee(baseAmount, feeBpsDefault);
+  return {
+    amount: { human: formatUnits(baseAmount, decimals), base: baseAmount.toString(), symbol: 'USDC', decimals },
+    fee: { human: formatUnits(feeAmount, decimals), base: feeAmount.toString(), bps: feeBps },
+    net: { human: formatUnits(netAmount, decimals), base: netAmount.toString() },
+  };
+}
+
+const vectors = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+const results = vectors.map(([amount, feeBpsDefault, decimals]) => {
+  try {
+    return computeFeeBreakdown(amount, feeBpsDefault, decimals);
+  } catch (e) {
+    return { error: e.name };
+  }
+});
+process.stdout.write(JSON.stringify({ source, results }));
+"""
+
+EDGE_AMOUNTS = [
+    "0",
+    "1",
+    "9999",
+    "10000",
+    "10001",
+    "-1",
+    "-9999",
+    "-10001",
+    "+5",
+    "007",
+    "",
+    "   ",
+    " 123\n",
+    " 42 ",
+    "\ufeff7",
+    "0x1f",
+    "0X1F",
+    "0o17",
+    "0b101",
+    "-0x10",
+    "0x",
+    "1.5",
+    "1e6",
+    "1_000",
+    "12a",
+    "\u0663",
+    "NaN",
+    "Infinity",
+    str(2**53 + 1),
+    str(2**63 - 1),
+    str(2**63),
+    str(-(2**63) + 1),
+    str(-(2**63)),
+    str(2**64 - 1),
+    str(2**64),
+    "9" * 40,
+    "-" + "9" * 40,
+]
+EDGE_BPS = [
+    "",
+    "100",
+    "0",
+    "1",
+    "30",
+    "250",
+    "9999",
+    "10000",
+    "25000",
+    " 50",
+    "\t75\n",
+    "100abc",
+    "1.5",
+    "-25",
+    "+40",
+    "0x10",
+    "-0x10",
+    "0x",
+    "0xg",
+    "abc",
+    "  ",
+    "1e3",
+    "99999999999999999999",
+]
+DECIMALS = [6, 6, 6, 6, 0, 2, 8, 18, 24]
+
+
+def make_vectors(count: int, seed: int) -> List[Tuple[str, str, int]]:
+    rng = random.Random(seed)
+    vectors = [(amount, bps, 6) for amount in EDGE_AMOUNTS for bps in ("", "30", "abc")]
+    vectors += [("1000000", bps, 6) for bps in EDGE_BPS]
+    while len(vectors) < count:
+        digits = rng.choice((1, 3, 6, 7, 9, 12, 15, 18, 19, 20, 25, 40))
+        amount = str(rng.randrange(10**digits))
+        if rng.random() < 0.1:
+            amount = "-" + amount
+        if rng.random() < 0.05:
+            amount = rng.choice(EDGE_AMOUNTS)
+        bps = (
+            rng.choice(EDGE_BPS)
+            if rng.random() < 0.2
+            else str(rng.choice((0, 1, 30, 100, 250, 10000)))
+        )
+        vectors.append((amount, bps, rng.choice(DECIMALS)))
+    return vectors
+
+
+def python_breakdown(amount: str, bps: str, decimals: int) -> Dict:
+    # Same order of failures as the bridge: BigInt(amount), then BigInt(parseInt(bps))
+    try:
+        parse_base_units(amount)
+    except ValueError:
+        return {"error": "SyntaxError"}
+    try:
+        fee_bps = parse_fee_bps(bps)
+    except ValueError:
+        return {"error": "RangeError"}
+    return compute_fee_breakdown(amount, fee_bps, decimals)
+
+
+def differential(vectors: List[Tuple[str, str, int]]) -> int:
+    node = shutil.which("node")
+    if node is None:
+        print("differential check skipped: node not found\n")
+        return 0
+    result = subprocess.run(
+        [node, "-e", NODE_SCRIPT, BRIDGE],
+        input=json.dumps(vectors),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    output = json.loads(result.stdout)
+    expected = output["results"]
+
+    mismatches = 0
+    for vector, want in zip(vectors, expected):
+        got = python_breakdown(*vector)
+        if got != want:
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"MISMATCH {vector!r}\n  node:   {want}\n  python: {got}")
+
+    columns = 0
+    try:
+        groups: Dict[Tuple[int, int], List[int]] = {}
+        for index, (vector, want) in enumerate(zip(vectors, expected)):
+            if "error" not in want:
+                groups.setdefault((want["fee"]["bps"], vector[2]), []).append(index)
+        for (fee_bps, decimals), indices in groups.items():
+            table = fee_breakdown_columns(
+                [vectors[i][0] for i in indices], fee_bps, decimals
+            )
+            for row, index in enumerate(indices):
+                want = expected[index]
+                for name in ("amount", "fee", "net"):
+                    got = (
+                        str(table[f"{name}_base"][row]),
+                        str(table[f"{name}_human"][row]),
+                    )
+                    if got != (want[name]["base"], want[name]["human"]):
+                        mismatches += 1
+                        if mismatches <= 10:
+                            print(
+                                f"COLUMN MISMATCH {vectors[index]!r} {name}: node {want[name]} python {got}"
+                            )
+            columns += len(indices)
+    except ImportError as e:
+        print(f"column check skipped: {e}")
+
+    errors = sum("error" in want for want in expected)
+    print(
+        f"differential check against Node ({output['source']}): {len(vectors)} vectors "
+        f"({errors} rejected), {columns} column rows, {mismatches} mismatches\n"
+    )
+    return mismatches
+
+
+def rate(fn, count: int) -> float:
+    start = time.perf_counter()
+    fn()
+    return count / (time.perf_counter() - start)
+
+
+def throughput(rows: int, seed: int) -> None:
+    rng = random.Random(seed)
+    amounts = [str(rng.randrange(1, 10**9)) for _ in range(min(rows, 200_000))]
+    single = rate(lambda: [compute_fee_breakdown(a) for a in amounts], len(amounts))
+    print(f"compute_fee_breakdown, one payment per call   {single:>12,.0f} payments/s")
+
+    try:
+        import numpy as np
+    except ImportError:
+        print("column benchmarks skipped: numpy not installed")
+        return
+    column = np.array([rng.randrange(1, 10**9) for _ in range(rows)], dtype=np.int64)
+    parsed = rate(lambda: amount_column(amounts), len(amounts))
+    base = rate(lambda: fee_breakdown_columns(column, human=False), rows)
+    human = rate(lambda: fee_breakdown_columns(column), rows)
+    print(f"amount_column, parsing base-unit strings        {parsed:>12,.0f} rows/s")
+    print(f"fee_breakdown_columns, int64, base units only   {base:>12,.0f} rows/s")
+    print(f"fee_breakdown_columns, int64, with human        {human:>12,.0f} rows/s")
+
+    # 18-decimal tokens overflow int64 and take the exact Python-integer path
+    wide = np.array(
+        [rng.randrange(10**19, 10**24) for _ in range(min(rows, 200_000))], dtype=object
+    )
+    exact = rate(lambda: fee_breakdown_columns(wide, decimals=18), len(wide))
+    print(f"fee_breakdown_columns, > int64 (object)         {exact:>12,.0f} rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--vectors", type=int, default=20_000, help="differential test vectors"
+    )
+    parser.add_argument(
+        "--rows", type=int, default=1_000_000, help="amounts per column benchmark"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-differential", action="store_true")
+    args = parser.parse_args()
+
+    mismatches = (
+        0
+        if args.skip_differential
+        else differential(make_vectors(args.vectors, args.seed))
+    )
+    throughput(args.rows, args.seed)
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
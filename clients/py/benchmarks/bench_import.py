@@ -0,0 +1,118 @@
+"""
+Benchmark: cold import time of the package and its entry points.
+
+Each target is imported `--runs` times in a fresh interpreter under
+`python -X importtime`; the median cumulative time of the package's own
+import line and the third-party modules it pulled in are reported.
+
+The bare `import chaoschain_x402_client` must not load any third-party
+package. The script exits non-zero if it does, or if the bare import
+takes longer than `--budget-ms`, so it can run as a CI check.
+
+Usage:
+    python benchmarks/bench_import.py --runs 7 --budget-ms 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Set, Tuple
+
+PACKAGE = "chaoschain_x402_client"
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+TARGETS = (
+    ("import chaoschain_x402_client", f"import {PACKAGE}"),
+    ("decode_payment_header", f"from {PACKAGE} import decode_payment_header"),
+    (
+        "PaymentRequirementsTemplate",
+        f"from {PACKAGE} import PaymentRequirementsTemplate",
+    ),
+    ("X402Client", f"from {PACKAGE} import X402Client"),
+    ("AsyncX402Client", f"from {PACKAGE} import AsyncX402Client"),
+    ("ASGIPaymentGate", f"from {PACKAGE} import ASGIPaymentGate"),
+)
+
+# Third-party packages worth naming when an entry point loads them
+WATCHED = (
+    "pydantic",
+    "requests",
+    "urllib3",
+    "httpx",
+    "orjson",
+    "eth_keys",
+    "eth_hash",
+    "opentelemetry",
+)
+
+
+def import_once(statement: str) -> Tuple[float, Set[str]]:
+    """Import in a fresh interpreter; returns (ms, watched packages loaded)."""
+    env = dict(
+        os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", "")
+    )
+    report = (
+        f"; import sys; print(' '.join(m for m in {WATCHED!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement + report],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    # "import time: self [us] | cumulative | name", children indented and
+    # listed before their parent. Interpreter startup comes first; from
+    # the package's own line on, every top-level entry is ours.
+    total = 0
+    ours = False
+    for line in result.stderr.splitlines():
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit() or name.startswith("  "):
+            continue
+        ours = ours or name.strip().startswith(PACKAGE)
+        if ours:
+            total += int(cumulative)
+    return total / 1000, set(result.stdout.split())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=5.0,
+        help="fail if the bare package import is slower",
+    )
+    args = parser.parse_args()
+
+    failures: List[str] = []
+    results: Dict[str, float] = {}
+    for name, statement in TARGETS:
+        times, loaded = [], set()
+        for _ in range(args.runs):
+            ms, modules = import_once(statement)
+            times.append(ms)
+            loaded |= modules
+        results[name] = statistics.median(times)
+        print(
+            f"{name:<32} {results[name]:>8.1f} ms   loads: {', '.join(sorted(loaded)) or '-'}"
+        )
+        if name == TARGETS[0][0]:
+            if loaded:
+                failures.append(f"bare import loads {', '.join(sorted(loaded))}")
+            if results[name] > args.budget_ms:
+                failures.append(
+                    f"bare import took {results[name]:.1f} ms (budget {args.budget_ms} ms)"
+                )
+
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
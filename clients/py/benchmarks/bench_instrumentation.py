@@ -0,0 +1,92 @@
+"""
+Benchmark: client CPU per verify call without instrumentation, with the
+no-op `Instrumentation` base class and with `InProcessMetrics`.
+
+Calls are sequential against the stand-in facilitator in its own process,
+so the client's CPU time per call is the overhead being compared. Each
+variant runs `--rounds` times, interleaved, and the best round is kept.
+
+Usage:
+    python benchmarks/bench_instrumentation.py --requests 5000 --rounds 5
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from chaoschain_x402_client import (
+    AsyncX402Client,
+    InProcessMetrics,
+    Instrumentation,
+    X402Client,
+)  # noqa: E402
+from loadgen import PayloadMix, spawn_facilitator  # noqa: E402
+
+VARIANTS = (
+    ("none", lambda: None),
+    ("no-op Instrumentation", Instrumentation),
+    ("InProcessMetrics", InProcessMetrics),
+)
+
+
+def bench_sync(url: str, payments: list, instrumentation) -> float:
+    with X402Client(facilitator_url=url, instrumentation=instrumentation) as client:
+        for _, header, requirements in payments[:200]:
+            client.verify_payment(header, requirements)
+        start = time.process_time()
+        for _, header, requirements in payments:
+            client.verify_payment(header, requirements)
+        return (time.process_time() - start) / len(payments)
+
+
+def bench_async(url: str, payments: list, instrumentation) -> float:
+    async def main() -> float:
+        async with AsyncX402Client(
+            facilitator_url=url, instrumentation=instrumentation
+        ) as client:
+            for _, header, requirements in payments[:200]:
+                await client.verify_payment(header, requirements)
+            start = time.process_time()
+            for _, header, requirements in payments:
+                await client.verify_payment(header, requirements)
+            return (time.process_time() - start) / len(payments)
+
+    return asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument(
+        "--url", help="benchmark an already running facilitator instead"
+    )
+    args = parser.parse_args()
+
+    process, url = (None, args.url) if args.url else spawn_facilitator("standin")
+    payments = PayloadMix({"valid": 1}).build(args.requests)
+
+    try:
+        print(f"{args.requests} sequential verify calls against {url}\n")
+        for name, bench in (("sync", bench_sync), ("async", bench_async)):
+            best = {variant: float("inf") for variant, _ in VARIANTS}
+            for _ in range(args.rounds):
+                for variant, factory in VARIANTS:
+                    best[variant] = min(best[variant], bench(url, payments, factory()))
+            baseline = best[VARIANTS[0][0]]
+            for variant, per_call in best.items():
+                print(
+                    f"{name + ' ' + variant:<30} {per_call * 1e6:>8.1f} us CPU/call   "
+                    f"{(per_call - baseline) * 1e6:>+7.1f} us"
+                )
+    finally:
+        if process is not None:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    main()
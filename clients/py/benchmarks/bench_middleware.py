@@ -0,0 +1,162 @@
+"""
+Benchmark: latency the payment-gate middleware adds per request.
+
+Calls a trivial ASGI and WSGI app in-process, bare and behind
+ASGIPaymentGate / WSGIPaymentGate, with payments verified against the
+stand-in facilitator. Also times bare `verify_payment` calls, so the
+gate's own overhead (route lookup, admission, 402 handling, settlement
+hand-off) is reported separately from the facilitator round-trip.
+
+Usage:
+    python benchmarks/bench_middleware.py --requests 2000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from chaoschain_x402_client import (  # noqa: E402
+    ASGIPaymentGate,
+    AsyncX402Client,
+    GatePolicy,
+    WSGIPaymentGate,
+    X402Client,
+)
+from loadgen import REQUIREMENTS, PayloadMix, spawn_facilitator  # noqa: E402
+
+ROUTES = {"GET /api/weather": REQUIREMENTS}
+BODY = b'{"temperature": 21}'
+
+
+async def asgi_app(scope, receive, send):
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json")],
+        }
+    )
+    await send({"type": "http.response.body", "body": BODY})
+
+
+def wsgi_app(environ, start_response):
+    start_response("200 OK", [("Content-Type", "application/json")])
+    return [BODY]
+
+
+def report(name: str, latencies: List[float], baseline: float = 0.0) -> float:
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    mean = statistics.mean(latencies)
+    added = f"   overhead {(mean - baseline) * 1e6:>7.1f} us" if baseline else ""
+    print(
+        f"{name:<34} p50 {p50 * 1000:>7.3f} ms   p99 {p99 * 1000:>7.3f} ms   mean {mean * 1000:>7.3f} ms{added}"
+    )
+    return mean
+
+
+async def bench_asgi(url: str, payments: list) -> None:
+    async with AsyncX402Client(facilitator_url=url) as client:
+        gate = ASGIPaymentGate(
+            asgi_app, client=client, routes=ROUTES, policy=GatePolicy(settle=False)
+        )
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            pass
+
+        async def call(app, header) -> float:
+            scope = {
+                "type": "http",
+                "method": "GET",
+                "path": "/api/weather",
+                "headers": [(b"x-payment", header.encode())] if header else [],
+            }
+            start = time.perf_counter()
+            await app(scope, receive, send)
+            return time.perf_counter() - start
+
+        bare = report("asgi app", [await call(asgi_app, h) for _, h, _ in payments])
+        challenge = [await call(gate, None) for _ in payments]
+        report("asgi gate, 402 (no header)", challenge, bare)
+        verify = []
+        for _, header, requirements in payments:
+            start = time.perf_counter()
+            await client.verify_payment(header, gate.gate.routes[0].template)
+            verify.append(time.perf_counter() - start)
+        verify_mean = report("verify_payment alone", verify)
+        report(
+            "asgi gate, paid",
+            [await call(gate, h) for _, h, _ in payments],
+            bare + verify_mean,
+        )
+        print(f"  {gate.gate.stats()}\n")
+
+
+def bench_wsgi(url: str, payments: list) -> None:
+    with X402Client(facilitator_url=url) as client:
+        gate = WSGIPaymentGate(
+            wsgi_app, client=client, routes=ROUTES, policy=GatePolicy(settle=False)
+        )
+
+        def start_response(status, headers, exc_info=None):
+            pass
+
+        def call(app, header) -> float:
+            environ = {"REQUEST_METHOD": "GET", "PATH_INFO": "/api/weather"}
+            if header:
+                environ["HTTP_X_PAYMENT"] = header
+            start = time.perf_counter()
+            result = app(environ, start_response)
+            b"".join(result)
+            if hasattr(result, "close"):
+                result.close()
+            return time.perf_counter() - start
+
+        bare = report("wsgi app", [call(wsgi_app, h) for _, h, _ in payments])
+        report("wsgi gate, 402 (no header)", [call(gate, None) for _ in payments], bare)
+        verify = []
+        for _, header, requirements in payments:
+            start = time.perf_counter()
+            client.verify_payment(header, gate.gate.routes[0].template)
+            verify.append(time.perf_counter() - start)
+        verify_mean = report("verify_payment alone", verify)
+        report(
+            "wsgi gate, paid",
+            [call(gate, h) for _, h, _ in payments],
+            bare + verify_mean,
+        )
+        print(f"  {gate.gate.stats()}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument(
+        "--url", help="benchmark an already running facilitator instead"
+    )
+    args = parser.parse_args()
+
+    process, url = (None, args.url) if args.url else spawn_facilitator("standin")
+    payments = PayloadMix({"valid": 1}).build(args.requests)
+
+    try:
+        print(f"{args.requests} sequential requests, facilitator {url}\n")
+        asyncio.run(bench_asgi(url, payments))
+        bench_wsgi(url, payments)
+    finally:
+        if process is not None:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    main()
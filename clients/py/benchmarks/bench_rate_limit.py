@@ -0,0 +1,203 @@
+"""
+Benchmark: RateLimiter against plain retries when the facilitator throttles.
+
+Starts the stand-in with the bridge's fixed-window per-IP limit scaled to
+`--limit` requests per `--window` seconds and drives it from `--threads`
+threads for `--seconds`, one in ten calls a /settle. Once with a
+RetryPolicy that also retries 429 (what a client without a limiter does),
+once with a RateLimiter whose ceiling is `--headroom` times the server's
+limit, so it has to find the limit from 429s. Reports completed calls per
+second (mean and worst second after the first window), 429s received,
+failures and p50/p99 latency per route.
+
+Usage:
+    python benchmarks/bench_rate_limit.py --limit 500 --window 5 --threads 32 --seconds 20
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from chaoschain_x402_client import (  # noqa: E402
+    Instrumentation,
+    RateLimiter,
+    RateLimitPolicy,
+    RetryPolicy,
+    X402Client,
+)
+from loadgen import LatencyHistogram, PayloadMix, spawn_facilitator  # noqa: E402
+
+
+class ThrottleCounter(Instrumentation):
+    """Counts 429 responses, including the ones a retry hides."""
+
+    def __init__(self):
+        self.throttled = 0
+
+    def request_finished(self, timing) -> None:
+        if timing.status == 429:
+            self.throttled += 1
+
+
+def drive(client: X402Client, payments: list, threads: int, seconds: float) -> dict:
+    latencies: Dict[str, LatencyHistogram] = {
+        "/verify": LatencyHistogram(),
+        "/settle": LatencyHistogram(),
+    }
+    completions: List[float] = []
+    failures: Counter = Counter()
+    lock = threading.Lock()
+    cursor = iter(range(len(payments)))
+    start = time.perf_counter()
+    deadline = start + seconds
+
+    def work() -> None:
+        while time.perf_counter() < deadline:
+            with lock:
+                index = next(cursor, None)
+            if index is None:
+                return
+            _, header, requirements = payments[index]
+            route = "/settle" if index % 10 == 0 else "/verify"
+            began = time.perf_counter()
+            try:
+                if route == "/settle":
+                    client.settle_payment(header, requirements)
+                else:
+                    client.verify_payment(header, requirements)
+            except (RuntimeError, TimeoutError) as e:
+                with lock:
+                    failures[type(e).__name__] += 1
+                continue
+            finished = time.perf_counter()
+            with lock:
+                latencies[route].record(finished - began)
+                completions.append(finished - start)
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    per_second = Counter(int(t) for t in completions)
+    return {
+        "elapsed": elapsed,
+        "completed": len(completions),
+        "per_second": [per_second.get(s, 0) for s in range(int(elapsed))],
+        "failures": failures,
+        "latencies": {
+            route: histogram.summary() for route, histogram in latencies.items()
+        },
+    }
+
+
+def report(name: str, result: dict, throttled: int, window: float) -> None:
+    """Print throughput and latency; the first window is warm-up for the limiter."""
+    steady = result["per_second"][int(window) :] or result["per_second"]
+    print(
+        f"{name:<12} {result['completed'] / result['elapsed']:>7.1f} calls/s   "
+        f"steady mean {sum(steady) / max(len(steady), 1):>6.1f}  worst second {min(steady, default=0):>4}   "
+        f"429s {throttled:>6}   failures {sum(result['failures'].values()):>5}"
+    )
+    for route, summary in result["latencies"].items():
+        if summary:
+            print(
+                f"{'':<12} {route:<8} p50 {summary['p50']:>8.1f} ms   p99 {summary['p99']:>8.1f} ms"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--limit", type=int, default=500, help="requests per window allowed per IP"
+    )
+    parser.add_argument(
+        "--window", type=float, default=5.0, help="rate-limit window (s)"
+    )
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument(
+        "--headroom",
+        type=float,
+        default=1.5,
+        help="limiter ceiling as a multiple of the server's limit",
+    )
+    parser.add_argument(
+        "--url", help="benchmark an already running facilitator instead"
+    )
+    args = parser.parse_args()
+
+    process, url = (
+        (None, args.url)
+        if args.url
+        else spawn_facilitator(
+            "standin", rate_limit=args.limit, rate_window=args.window
+        )
+    )
+    server_rpm = args.limit * 60 / args.window
+    # More payments than either run can use; fresh nonces per run
+    count = int(server_rpm / 60 * args.seconds * 3) + 1000
+
+    try:
+        print(
+            f"server limit {args.limit}/{args.window:g}s ({server_rpm:.0f}/min), "
+            f"{args.threads} threads, {args.seconds:g}s per run, facilitator {url}\n"
+        )
+        counter = ThrottleCounter()
+        retrying = X402Client(
+            facilitator_url=url,
+            pool_maxsize=args.threads,
+            retry_policy=RetryPolicy(
+                max_attempts=4, retry_on_status=(429, 502, 503, 504)
+            ),
+            instrumentation=counter,
+        )
+        with retrying:
+            result = drive(
+                retrying,
+                PayloadMix({"valid": 1}, seed=1).build(count),
+                args.threads,
+                args.seconds,
+            )
+        report("retry 429", result, counter.throttled, args.window)
+
+        # Let the server's window roll over so both runs start from a clean count
+        time.sleep(args.window)
+        limiter = RateLimiter(
+            RateLimitPolicy(requests_per_minute=server_rpm * args.headroom)
+        )
+        counter = ThrottleCounter()
+        limited = X402Client(
+            facilitator_url=url,
+            pool_maxsize=args.threads,
+            rate_limiter=limiter,
+            instrumentation=counter,
+        )
+        with limited:
+            result = drive(
+                limited,
+                PayloadMix({"valid": 1}, seed=2).build(count),
+                args.threads,
+                args.seconds,
+            )
+        stats = limiter.stats()
+        report("RateLimiter", result, counter.throttled, args.window)
+        print(
+            f"{'':<12} rate settled at {stats.rate * 60:.0f}/min, "
+            f"concurrency limit {stats.concurrency_limit}, {stats.rejected} calls refused"
+        )
+    finally:
+        if process is not None:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    main()
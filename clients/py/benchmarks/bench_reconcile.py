@@ -0,0 +1,268 @@
+"""
+Benchmark: streaming reconciliation of settlement exports against a ledger.
+
+Generates `--rows` settlements as CSV exports of the `transactions` table
+and an NDJSON ledger of SettleResponse lines, each split into `--shards`
+files, with a known number of injected mismatches of every kind (missing
+on either side, status, amount, fee split, missing fee transfer). Then
+runs `reconcile` once per `--processes` value in a fresh interpreter and
+reports rows per second, peak memory of the coordinating and the worker
+processes, and whether the mismatches found are exactly the injected
+ones. Several `--rows` values show how time and memory grow with input.
+
+Usage:
+    python benchmarks/bench_reconcile.py --rows 200000,1000000 --shards 4 --processes 1,2,4
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+from collections import Counter
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from chaoschain_x402_client import codec  # noqa: E402
+from chaoschain_x402_client.fees import calculate_fee, format_units  # noqa: E402
+
+EXPORT_HEADER = [
+    "id",
+    "request_id",
+    "idempotency_key",
+    "chain",
+    "tx_hash",
+    "tx_hash_fee",
+    "from_address",
+    "to_address",
+    "asset",
+    "amount",
+    "fee_amount",
+    "net_amount",
+    "fee_bps",
+    "status",
+    "block_number",
+    "confirmations",
+    "error_message",
+    "agent_id",
+    "evidence_hash",
+    "proof_of_agency",
+    "created_at",
+    "settled_at",
+    "confirmed_at",
+]
+ASSET = "0x036cbd53842c5426634e7929541ec2318f3dcf7e"
+KINDS = ("missing_local", "missing_export", "status", "amount", "fee_split", "fee_tx")
+
+# Runs in a fresh interpreter so peak RSS belongs to one configuration
+RUNNER = r"""
+import json, resource, sys
+sys.path.insert(0, sys.argv[1])
+from chaoschain_x402_client.reconciliation import ReconcilePolicy, reconcile
+exports, ledger, processes, work_dir = json.loads(sys.argv[2])
+report = reconcile(exports, ledger, processes=processes, policy=ReconcilePolicy(samples=0), work_dir=work_dir)
+print(json.dumps({
+    "report": report.model_dump(),
+    "self_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "workers_kib": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+}))
+"""
+
+
+def generate(
+    directory: str, rows: int, shards: int, rate: float, seed: int
+) -> Tuple[List[str], List[str], Counter]:
+    """Write export and ledger shards; returns their paths and the injected mismatch counts."""
+    rng = random.Random(seed)
+    export_paths = [
+        os.path.join(directory, f"transactions-{i}.csv") for i in range(shards)
+    ]
+    ledger_paths = [
+        os.path.join(directory, f"ledger-{i}.ndjson") for i in range(shards)
+    ]
+    exports = [open(path, "w", newline="") for path in export_paths]
+    ledgers = [open(path, "wb") for path in ledger_paths]
+    writers = [csv.writer(f) for f in exports]
+    for writer in writers:
+        writer.writerow(EXPORT_HEADER)
+    injected: Counter = Counter()
+
+    for i in range(rows):
+        tx_hash = "0x%064x" % rng.getrandbits(256)
+        fee_tx = "0x%064x" % rng.getrandbits(256)
+        nonce = "0x%064x" % rng.getrandbits(256)
+        payer = "0x%040x" % rng.getrandbits(160)
+        amount = rng.randrange(1, 10**9)
+        fee, net = calculate_fee(amount, 100)
+        # The ledger keeps the status /settle returned; the export has moved on
+        export_status, local_status = "confirmed", rng.choice(
+            ("pending", "partial_settlement", "confirmed")
+        )
+        export_amount = local_amount = amount
+        export_bps = 100
+        export_fee_tx = local_fee_tx = fee_tx
+        write_export = write_local = True
+
+        kind = (
+            KINDS[rng.randrange(len(KINDS))]
+            if rng.random() < rate * len(KINDS)
+            else None
+        )
+        if kind is not None:
+            injected[kind] += 1
+        if kind == "missing_local":
+            write_local = False
+        elif kind == "missing_export":
+            write_export = False
+        elif kind == "status":
+            export_status = "failed"
+        elif kind == "amount":
+            local_amount = amount + 1
+        elif kind == "fee_split":
+            export_bps = 30
+        elif kind == "fee_tx":
+            export_fee_tx = local_fee_tx = None
+
+        shard = i % shards
+        if write_export:
+            writers[shard].writerow(
+                [
+                    i,
+                    f"req-{i}",
+                    None,
+                    "base-sepolia",
+                    tx_hash,
+                    export_fee_tx,
+                    payer,
+                    ASSET,
+                    ASSET,
+                    export_amount,
+                    fee,
+                    net,
+                    export_bps,
+                    export_status,
+                    1000 + i,
+                    2,
+                    None,
+                    None,
+                    None,
+                    None,
+                    "2025-01-01T00:00:00Z",
+                    "2025-01-01T00:00:01Z",
+                    "2025-01-01T00:00:05Z",
+                ]
+            )
+        if write_local:
+            ledgers[shard].write(
+                codec.dumps(
+                    {
+                        "success": True,
+                        "txHash": tx_hash,
+                        "txHashFee": local_fee_tx,
+                        "networkId": "base-sepolia",
+                        "status": local_status,
+                        "nonce": nonce,
+                        "amount": {
+                            "human": format_units(local_amount),
+                            "base": str(local_amount),
+                            "symbol": "USDC",
+                        },
+                        "fee": {
+                            "human": format_units(fee),
+                            "base": str(fee),
+                            "bps": 100,
+                        },
+                        "net": {"human": format_units(net), "base": str(net)},
+                    }
+                )
+                + b"\n"
+            )
+
+    for f in exports + ledgers:
+        f.close()
+    return export_paths, ledger_paths, injected
+
+
+def run(
+    export_paths: List[str], ledger_paths: List[str], processes: int, work_dir: str
+) -> Dict:
+    package = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            RUNNER,
+            package,
+            json.dumps([export_paths, ledger_paths, processes, work_dir]),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--rows", default="200000,1000000", help="comma-separated settlement counts"
+    )
+    parser.add_argument("--shards", type=int, default=4, help="files per side")
+    parser.add_argument(
+        "--processes", default="1,2,4", help="comma-separated worker counts"
+    )
+    parser.add_argument(
+        "--mismatch-rate",
+        type=float,
+        default=0.001,
+        help="injected rate per mismatch kind",
+    )
+    parser.add_argument(
+        "--dir", help="directory for generated files (default: a temporary one)"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    directory = args.dir or tempfile.mkdtemp(prefix="bench-reconcile-")
+    failed = False
+    try:
+        print(
+            f"{'rows':>10} {'procs':>5} {'seconds':>8} {'rows/s':>10} {'main MiB':>9} {'worker MiB':>10}  check"
+        )
+        for rows in (int(n) for n in args.rows.split(",")):
+            export_paths, ledger_paths, injected = generate(
+                directory, rows, args.shards, args.mismatch_rate, args.seed
+            )
+            size = sum(os.path.getsize(path) for path in export_paths + ledger_paths)
+            for processes in (int(n) for n in args.processes.split(",")):
+                result = run(export_paths, ledger_paths, processes, directory)
+                report = result["report"]
+                found = Counter(report["mismatches"])
+                ok = found == injected
+                failed |= not ok
+                total = report["export_rows"] + report["ledger_rows"]
+                print(
+                    f"{rows:>10} {processes:>5} {report['elapsed']:>8.2f} {total / report['elapsed']:>10,.0f} "
+                    f"{result['self_kib'] / 1024:>9.0f} {result['workers_kib'] / 1024:>10.0f}  "
+                    + (
+                        "ok"
+                        if ok
+                        else f"MISMATCH injected {dict(injected)} found {dict(found)}"
+                    )
+                )
+            print(
+                f"{'':>10} {size / 2**20:.0f} MiB of input, {sum(injected.values())} injected mismatches"
+            )
+    finally:
+        if args.dir is None:
+            shutil.rmtree(directory, ignore_errors=True)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark: durable SettlementQueue.submit latency and journal group commit.
+
+Submits payments from `--concurrency` threads into a SettlementQueue whose
+journal lives in `--dir`, then reports submit latency, submits per second
+and records per fsync for each `--commit-delay`. The queue drains to the
+stand-in facilitator in the background; the time to drain everything is
+reported separately, next to plain sequential `settle_payment` calls.
+
+Usage:
+    python benchmarks/bench_settlement_queue.py --requests 2000 --concurrency 1,16,64
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from chaoschain_x402_client import (
+    QueuePolicy,
+    SettlementQueue,
+    X402Client,
+)  # noqa: E402
+from loadgen import LatencyHistogram, PayloadMix, spawn_facilitator  # noqa: E402
+
+
+def bench_queue(
+    url: str, directory: str, payments: list, concurrency: int, commit_delay: float
+) -> None:
+    path = os.path.join(directory, f"journal-{concurrency}-{commit_delay}")
+    latencies = LatencyHistogram()
+    lock = threading.Lock()
+
+    with X402Client(facilitator_url=url) as client:
+        queue = SettlementQueue(client, path, QueuePolicy(commit_delay=commit_delay))
+
+        def submit(chunk: List[tuple]) -> None:
+            local = []
+            for _, header, requirements in chunk:
+                start = time.perf_counter()
+                queue.submit(header, requirements)
+                local.append(time.perf_counter() - start)
+            with lock:
+                for latency in local:
+                    latencies.record(latency)
+
+        threads = [
+            threading.Thread(target=submit, args=(payments[i::concurrency],))
+            for i in range(concurrency)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        submitted = time.perf_counter() - start
+        queue.join()
+        drained = time.perf_counter() - start
+        stats = queue.stats()
+        queue.close()
+
+    summary = latencies.summary()
+    print(
+        f"c={concurrency:<3} delay={commit_delay * 1000:>4.1f}ms   "
+        f"submit p50 {summary['p50']:>6.3f} ms  p99 {summary['p99']:>6.3f} ms   "
+        f"{len(payments) / submitted:>8.0f} submits/s   "
+        f"{len(payments) / max(stats.fsyncs, 1):>5.1f} records/fsync   "
+        f"drained in {drained:.2f}s ({stats.settled} settled)"
+    )
+
+
+def bench_direct(url: str, payments: list) -> None:
+    with X402Client(facilitator_url=url) as client:
+        start = time.perf_counter()
+        for _, header, requirements in payments:
+            client.settle_payment(header, requirements)
+        elapsed = time.perf_counter() - start
+    print(
+        f"sequential settle_payment in the request path: {elapsed / len(payments) * 1000:.3f} ms/call\n"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument(
+        "--concurrency",
+        default="1,16,64",
+        help="comma-separated submitter thread counts",
+    )
+    parser.add_argument(
+        "--commit-delay", default="0,0.002", help="comma-separated commit delays (s)"
+    )
+    parser.add_argument(
+        "--dir", help="journal directory (default: a temporary directory)"
+    )
+    parser.add_argument(
+        "--url", help="benchmark an already running facilitator instead"
+    )
+    args = parser.parse_args()
+
+    process, url = (None, args.url) if args.url else spawn_facilitator("standin")
+    directory = args.dir or tempfile.mkdtemp(prefix="x402-journal-")
+
+    try:
+        print(f"{args.requests} payments, journal in {directory}, facilitator {url}\n")
+        bench_direct(url, PayloadMix({"valid": 1}).build(args.requests))
+        seed = 0
+        for concurrency in (int(c) for c in args.concurrency.split(",")):
+            for commit_delay in (float(d) for d in args.commit_delay.split(",")):
+                # Fresh authorizations per run: the facilitator would reject spent nonces
+                seed += 1
+                payments = PayloadMix({"valid": 1}, seed=seed).build(args.requests)
+                bench_queue(url, directory, payments, concurrency, commit_delay)
+    finally:
+        if process is not None:
+            process.terminate()
+        if args.dir is None:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Benchmark: SharedPaymentCache against the in-process VerifyCache.
+
+Times single-threaded get (hit and miss), put and the replay-guard calls,
+then runs `--processes` forked workers doing lookups and reservations on
+one shared table to show read throughput scaling across processes and
+that each authorization is reserved exactly once host-wide.
+
+Usage:
+    python benchmarks/bench_shared_cache.py --entries 20000 --processes 1,4,8
+"""
+
+import argparse
+import hashlib
+import multiprocessing
+import os
+import sys
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from chaoschain_x402_client import (  # noqa: E402
+    SharedPaymentCache,
+    VerifyCache,
+    VerifyResponse,
+    new_reservation,
+)
+
+RESPONSE = VerifyResponse(
+    isValid=True,
+    consensusProof="0x" + "ab" * 32,
+    reportId="report-0001",
+    timestamp=1_700_000_000,
+)
+# Far-future validBefore so entries live for the whole run
+HEADER = (
+    "eyJwYXlsb2FkIjp7ImF1dGhvcml6YXRpb24iOnsidmFsaWRCZWZvcmUiOiI5OTk5OTk5OTk5In19fQ=="
+)
+
+
+def keys(n: int, salt: str) -> List[str]:
+    return [hashlib.sha256(f"{salt}{i}".encode()).hexdigest() for i in range(n)]
+
+
+def per_call(fn: Callable[[str], object], items: List[str]) -> float:
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - start) / len(items)
+
+
+def bench_single(entries: int) -> None:
+    present, absent = keys(entries, "hit"), keys(entries, "miss")
+    local = VerifyCache(max_size=entries * 2)
+    shared = SharedPaymentCache(size_bytes=entries * 4 * 1024)
+
+    for name, cache in (("VerifyCache", local), ("SharedPaymentCache", shared)):
+        put = per_call(lambda k: cache.put(k, HEADER, RESPONSE), present)
+        hit = per_call(cache.get, present)
+        miss = per_call(cache.get, absent)
+        print(
+            f"{name:<20} put {put * 1e6:>6.2f} us   get hit {hit * 1e6:>6.2f} us   "
+            f"get miss {miss * 1e6:>6.2f} us"
+        )
+
+    guard = keys(entries, "guard")
+    reservation = new_reservation()
+    reserve = per_call(lambda k: shared.reserve(k, reservation), guard)
+    check = per_call(lambda k: shared.replay_reason(k, reservation), guard)
+    claim = per_call(shared.claim, guard)
+    settled = per_call(shared.settled, guard)
+    print(
+        f"{'replay guard':<20} reserve {reserve * 1e6:>6.2f} us   replay_reason {check * 1e6:>6.2f} us   "
+        f"claim {claim * 1e6:>6.2f} us   settled {settled * 1e6:>6.2f} us\n"
+    )
+    shared.close()
+
+
+def _reader(
+    shared: SharedPaymentCache, present: List[str], seconds: float, results
+) -> None:
+    lookups = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for key in present[:1000]:
+            shared.get(key)
+        lookups += 1000
+    results.put(lookups)
+
+
+def _reserver(shared: SharedPaymentCache, guard: List[str], results) -> None:
+    reservation = new_reservation()
+    results.put(sum(shared.reserve(key, reservation) is None for key in guard))
+
+
+def bench_processes(entries: int, processes: int, seconds: float) -> None:
+    shared = SharedPaymentCache(size_bytes=entries * 4 * 1024)
+    present = keys(entries, "hit")
+    for key in present:
+        shared.put(key, HEADER, RESPONSE)
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+
+    workers = [
+        context.Process(target=_reader, args=(shared, present, seconds, results))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    lookups = sum(results.get() for _ in workers)
+    for worker in workers:
+        worker.join()
+
+    # Every worker tries to reserve the same authorizations; each must win once
+    guard = keys(entries, "contended")
+    workers = [
+        context.Process(target=_reserver, args=(shared, guard, results))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    won = sum(results.get() for _ in workers)
+    for worker in workers:
+        worker.join()
+
+    print(
+        f"{processes:>2} processes   {lookups / seconds / 1e6:>6.2f} M lookups/s   "
+        f"reservations won {won}/{entries}{'' if won == entries else '  MISMATCH'}"
+    )
+    shared.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=20_000)
+    parser.add_argument(
+        "--processes", default="1,4,8", help="comma-separated worker counts"
+    )
+    parser.add_argument(
+        "--seconds", type=float, default=2.0, help="read phase per process count"
+    )
+    args = parser.parse_args()
+
+    print(f"{args.entries} entries, {os.cpu_count()} CPUs\n")
+    bench_single(args.entries)
+    for processes in (int(p) for p in args.processes.split(",")):
+        bench_processes(args.entries, processes, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
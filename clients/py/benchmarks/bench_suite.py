@@ -0,0 +1,397 @@
+"""
+Benchmark suite: drive the clients against a local facilitator and save
+the results as JSON for release-over-release comparison.
+
+For every client variant and concurrency level it runs the same payload
+mix and reports throughput, latency percentiles (p50/p95/p99/p999) and a
+histogram, outcomes per payload kind, client and facilitator CPU per call,
+GC activity and (with --allocations) tracemalloc figures.
+
+Client variants:
+  sync           X402Client on a pool of `concurrency` threads
+  batched        as `sync`, with verify micro-batching (verify only)
+  many           X402Client.verify_many / settle_many; latency is the time
+                 from the start of the batch to each result
+  async          AsyncX402Client with `concurrency` calls in flight
+  async-batched  as `async`, with verify micro-batching (verify only)
+
+Usage:
+    python benchmarks/bench_suite.py --facilitator standin --requests 5000 \\
+        --clients sync,batched,async --concurrency 1,16,64 \\
+        --mix valid=85,expired=5,replayed=5,oversized=5 --output results.json
+
+    # Flag >10% throughput or p99 regressions against an earlier run
+    python benchmarks/bench_suite.py ... --baseline results-0.1.0.json --tolerance 0.10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import chaoschain_x402_client  # noqa: E402
+from chaoschain_x402_client import (
+    AsyncX402Client,
+    BatchPolicy,
+    X402Client,
+    codec,
+)  # noqa: E402
+from loadgen import (
+    LatencyHistogram,
+    PayloadMix,
+    Payment,
+    ResourceMeter,
+    spawn_facilitator,
+)  # noqa: E402
+
+CLIENTS = ("sync", "batched", "many", "async", "async-batched")
+
+
+def classify(operation: str, response: Any) -> str:
+    ok = response.isValid if operation == "verify" else response.success
+    return "ok" if ok else "rejected"
+
+
+class Tally:
+    """Latency histogram plus outcome counts per payload kind."""
+
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.outcomes: Dict[str, Dict[str, int]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def add(
+        self,
+        kind: str,
+        outcome: str,
+        seconds: float,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        self.histogram.record(seconds)
+        counts = self.outcomes.setdefault(kind, {"ok": 0, "rejected": 0, "error": 0})
+        counts[outcome] += 1
+        if error is not None:
+            name = type(error).__name__
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+
+def run_threads(
+    client: X402Client,
+    operation: str,
+    payments: List[Payment],
+    concurrency: int,
+    tally: Tally,
+):
+    call = client.verify_payment if operation == "verify" else client.settle_payment
+
+    def one(payment: Payment) -> None:
+        kind, header, requirements = payment
+        start = time.perf_counter()
+        try:
+            response = call(header, requirements)
+        except Exception as e:
+            tally.add(kind, "error", time.perf_counter() - start, e)
+        else:
+            tally.add(kind, classify(operation, response), time.perf_counter() - start)
+
+    if concurrency <= 1:
+        for payment in payments:
+            one(payment)
+        return
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, payments))
+
+
+def run_many(
+    client: X402Client,
+    operation: str,
+    payments: List[Payment],
+    concurrency: int,
+    tally: Tally,
+):
+    pairs = [(header, requirements) for _, header, requirements in payments]
+    run = (
+        client.verify_as_completed
+        if operation == "verify"
+        else client.settle_as_completed
+    )
+    start = time.perf_counter()
+    for item in run(pairs, concurrency=concurrency):
+        kind = payments[item.index][0]
+        elapsed = time.perf_counter() - start
+        if item.ok:
+            tally.add(kind, classify(operation, item.result), elapsed)
+        else:
+            tally.add(kind, "error", elapsed, RuntimeError(item.error))
+
+
+async def run_async(
+    client: AsyncX402Client,
+    operation: str,
+    payments: List[Payment],
+    concurrency: int,
+    tally: Tally,
+):
+    call = client.verify_payment if operation == "verify" else client.settle_payment
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(payment: Payment) -> None:
+        kind, header, requirements = payment
+        async with limit:
+            start = time.perf_counter()
+            try:
+                response = await call(header, requirements)
+            except Exception as e:
+                tally.add(kind, "error", time.perf_counter() - start, e)
+            else:
+                tally.add(
+                    kind, classify(operation, response), time.perf_counter() - start
+                )
+
+    await asyncio.gather(*(one(p) for p in payments))
+
+
+def measure(
+    variant: str,
+    url: str,
+    operation: str,
+    payments: List[Payment],
+    warmup: List[Payment],
+    concurrency: int,
+    meter: ResourceMeter,
+) -> Tally:
+    """Run one scenario (after a warm-up) inside `meter` and return its tally."""
+    batching = BatchPolicy() if variant.endswith("batched") else None
+    tally = Tally()
+
+    if variant.startswith("async"):
+
+        async def main() -> None:
+            async with AsyncX402Client(
+                facilitator_url=url,
+                max_connections=max(concurrency, 1),
+                max_keepalive_connections=max(concurrency, 1),
+                verify_batching=batching,
+            ) as client:
+                await run_async(client, operation, warmup, concurrency, Tally())
+                with meter:
+                    await run_async(client, operation, payments, concurrency, tally)
+
+        asyncio.run(main())
+        return tally
+
+    runner: Callable = run_many if variant == "many" else run_threads
+    with X402Client(
+        facilitator_url=url, pool_maxsize=max(concurrency, 1), verify_batching=batching
+    ) as client:
+        runner(client, operation, warmup, concurrency, Tally())
+        with meter:
+            runner(client, operation, payments, concurrency, tally)
+    return tally
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(
+    results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float
+) -> List[str]:
+    """Throughput drops and p99 increases beyond `tolerance`, as messages."""
+    previous = {s["name"]: s for s in baseline.get("scenarios", [])}
+    regressions = []
+    print(
+        f"\nAgainst baseline {baseline.get('meta', {}).get('git_revision') or '(unknown revision)'}:"
+    )
+    for scenario in results["scenarios"]:
+        old = previous.get(scenario["name"])
+        if old is None:
+            continue
+        rps_change = scenario["throughput_rps"] / old["throughput_rps"] - 1
+        p99_change = scenario["latency_ms"]["p99"] / old["latency_ms"]["p99"] - 1
+        flags = []
+        if rps_change < -tolerance:
+            flags.append("THROUGHPUT")
+        if p99_change > tolerance and scenario["latency_basis"] == "call":
+            flags.append("P99")
+        print(
+            f"  {scenario['name']:<34} rps {rps_change:+7.1%}   p99 {p99_change:+7.1%}   {' '.join(flags)}"
+        )
+        regressions.extend(f"{scenario['name']}: {flag}" for flag in flags)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--facilitator", choices=("stub", "standin"), default="standin")
+    parser.add_argument(
+        "--url", help="benchmark an already running facilitator instead"
+    )
+    parser.add_argument(
+        "--delay", type=float, default=0.0, help="facilitator delay per request (s)"
+    )
+    parser.add_argument("--operation", choices=("verify", "settle"), default="verify")
+    parser.add_argument(
+        "--clients",
+        default="sync,batched,async",
+        help=f"comma-separated: {','.join(CLIENTS)}",
+    )
+    parser.add_argument(
+        "--concurrency", default="1,16,64", help="comma-separated concurrency levels"
+    )
+    parser.add_argument(
+        "--requests", type=int, default=2000, help="measured calls per scenario"
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=200, help="unmeasured calls before each scenario"
+    )
+    parser.add_argument("--mix", default="valid=85,expired=5,replayed=5,oversized=5")
+    parser.add_argument("--oversized-bytes", type=int, default=1_200_000)
+    parser.add_argument(
+        "--allocations", action="store_true", help="trace allocations (slows the run)"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="earlier JSON results to compare against")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.10, help="regression threshold (fraction)"
+    )
+    args = parser.parse_args()
+
+    variants = [v.strip() for v in args.clients.split(",") if v.strip()]
+    unknown = set(variants) - set(CLIENTS)
+    if unknown:
+        parser.error(f"unknown clients {sorted(unknown)}; expected {','.join(CLIENTS)}")
+    if args.operation == "settle":
+        variants = [v for v in variants if not v.endswith("batched")]
+    levels = [int(c) for c in args.concurrency.split(",")]
+    mix = PayloadMix.parse(
+        args.mix, oversized_bytes=args.oversized_bytes, seed=args.seed
+    )
+
+    process, url = (
+        (None, args.url)
+        if args.url
+        else spawn_facilitator(args.facilitator, args.delay)
+    )
+    results: Dict[str, Any] = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "package_version": chaoschain_x402_client.__version__,
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "orjson": codec.orjson is not None,
+            "facilitator": args.url or args.facilitator,
+            "args": vars(args),
+        },
+        "scenarios": [],
+    }
+
+    try:
+        # Spend the replay pool once so its replays are rejected during the runs
+        with X402Client(facilitator_url=url) as client:
+            client.settle_many(
+                [(h, r) for _, h, r in mix.replay_payments()], concurrency=8
+            )
+
+        print(
+            f"{args.operation} x {args.requests} per scenario against {url}, mix {mix}\n"
+        )
+        print(
+            f"{'scenario':<34} {'req/s':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'p999':>8} "
+            f"{'cpu/call':>9} {'errors':>7}"
+        )
+        for variant in variants:
+            for concurrency in levels:
+                name = f"{variant}/{args.operation}/c{concurrency}"
+                meter = ResourceMeter(server_pid=process.pid if process else None)
+                tally = measure(
+                    variant,
+                    url,
+                    args.operation,
+                    mix.build(args.requests),
+                    mix.build(args.warmup),
+                    concurrency,
+                    meter,
+                )
+                latency = tally.histogram.summary()
+                resources = meter.report(len(tally.histogram))
+
+                if args.allocations:
+                    traced = ResourceMeter(trace_allocations=True)
+                    measure(
+                        variant,
+                        url,
+                        args.operation,
+                        mix.build(min(args.requests, 500)),
+                        [],
+                        concurrency,
+                        traced,
+                    )
+                    report = traced.report(min(args.requests, 500))
+                    resources["alloc_peak_kib"] = report["alloc_peak_kib"]
+                    resources["alloc_retained_bytes_per_call"] = report[
+                        "alloc_retained_bytes_per_call"
+                    ]
+
+                scenario = {
+                    "name": name,
+                    "client": variant,
+                    "operation": args.operation,
+                    "concurrency": concurrency,
+                    "requests": len(tally.histogram),
+                    "mix": str(mix),
+                    "duration_s": meter.wall,
+                    "throughput_rps": len(tally.histogram) / meter.wall,
+                    "latency_basis": "batch_start" if variant == "many" else "call",
+                    "latency_ms": latency,
+                    "histogram_ms": tally.histogram.buckets(),
+                    "outcomes": tally.outcomes,
+                    "errors": tally.errors,
+                    "resources": resources,
+                }
+                results["scenarios"].append(scenario)
+                print(
+                    f"{name:<34} {scenario['throughput_rps']:>9.0f} {latency['p50']:>8.2f} "
+                    f"{latency['p95']:>8.2f} {latency['p99']:>8.2f} {latency['p999']:>8.2f} "
+                    f"{resources['client_cpu_us_per_call']:>7.0f}us {sum(tally.errors.values()):>7}"
+                )
+    finally:
+        if process is not None:
+            process.terminate()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
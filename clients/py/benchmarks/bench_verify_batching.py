@@ -0,0 +1,129 @@
+"""
+Benchmark: per-call /verify vs micro-batched /verify/batch.
+
+Runs the same number of concurrent `verify_payment` calls with and
+without `verify_batching`, through the sync client on a thread pool and
+through the async client, and prints throughput, p50/p99 latency and the
+mean batch size for each. The stub's `--delay` is paid once per HTTP
+request, standing in for the bridge's per-request overhead.
+
+Usage:
+    python benchmarks/bench_verify_batching.py --requests 4000 --concurrency 64 --delay 0.002 --window 0.002
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from chaoschain_x402_client import (
+    AsyncX402Client,
+    BatchPolicy,
+    X402Client,
+)  # noqa: E402
+from stub_facilitator import spawn_stub  # noqa: E402
+
+HEADER = "eyJ4NDAyVmVyc2lvbiI6MX0="
+REQUIREMENTS = {
+    "scheme": "exact",
+    "network": "base-sepolia",
+    "maxAmountRequired": "1000000",
+    "payTo": "0x209693Bc6afc0C5328bA36FaF03C514EF312287C",
+    "asset": "0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+    "resource": "/api/weather",
+}
+
+
+def report(name: str, latencies: list, elapsed: float, client):
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    batcher = client._verify_batcher
+    per_batch = (
+        f"{batcher.batched / batcher.batches:>6.1f}"
+        if batcher and batcher.batches
+        else "     -"
+    )
+    print(
+        f"{name:<32} {len(latencies) / elapsed:>9.0f} req/s   "
+        f"p50 {p50:>7.2f} ms   p99 {p99:>7.2f} ms   "
+        f"mean {statistics.mean(latencies) * 1000:>7.2f} ms   batch {per_batch}"
+    )
+
+
+def bench_sync(url: str, n: int, concurrency: int, policy):
+    name = f"sync {'batched' if policy else 'per-call'} (threads={concurrency})"
+    with X402Client(
+        facilitator_url=url, pool_maxsize=concurrency, verify_batching=policy
+    ) as client:
+
+        def one(_) -> float:
+            start = time.perf_counter()
+            client.verify_payment(HEADER, REQUIREMENTS)
+            return time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            start = time.perf_counter()
+            latencies = list(pool.map(one, range(n)))
+            report(name, latencies, time.perf_counter() - start, client)
+
+
+async def bench_async(url: str, n: int, concurrency: int, policy):
+    name = f"async {'batched' if policy else 'per-call'} (in-flight={concurrency})"
+    async with AsyncX402Client(
+        facilitator_url=url,
+        max_connections=concurrency,
+        max_keepalive_connections=concurrency,
+        verify_batching=policy,
+    ) as client:
+        limit = asyncio.Semaphore(concurrency)
+
+        async def one() -> float:
+            async with limit:
+                start = time.perf_counter()
+                await client.verify_payment(HEADER, REQUIREMENTS)
+                return time.perf_counter() - start
+
+        start = time.perf_counter()
+        latencies = list(await asyncio.gather(*(one() for _ in range(n))))
+        report(name, latencies, time.perf_counter() - start, client)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument(
+        "--delay", type=float, default=0.002, help="stub delay per HTTP request (s)"
+    )
+    parser.add_argument("--window", type=float, default=0.002, help="batch window (s)")
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument(
+        "--url", help="benchmark an already running facilitator instead of the stub"
+    )
+    args = parser.parse_args()
+
+    process = None
+    url = args.url
+    if url is None:
+        process, url = spawn_stub(args.delay)
+    policy = BatchPolicy(window=args.window, max_batch_size=args.max_batch)
+
+    try:
+        print(f"{args.requests} verify calls against {url}\n")
+        for batching in (None, policy):
+            bench_sync(url, args.requests, args.concurrency, batching)
+        for batching in (None, policy):
+            asyncio.run(bench_async(url, args.requests, args.concurrency, batching))
+    finally:
+        if process is not None:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    main()
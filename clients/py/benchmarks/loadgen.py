@@ -0,0 +1,311 @@
+"""
+Load-generation helpers shared by the benchmark scripts.
+
+  * PayloadMix builds (kind, header, requirements) payments for a weighted
+    mix of valid, expired, replayed and oversized payloads, all generated
+    before the clock starts.
+  * LatencyHistogram keeps raw samples for exact percentiles plus
+    log-spaced buckets for the JSON report.
+  * ResourceMeter reads client CPU time, GC activity and tracemalloc
+    figures around a run, and the facilitator's CPU time from /proc.
+  * spawn_facilitator starts the stub or the stand-in in its own process.
+"""
+
+import base64
+import gc
+import json
+import math
+import multiprocessing
+import os
+import random
+import socket
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from stub_facilitator import spawn_stub  # noqa: E402
+
+NETWORK = "base-sepolia"
+PAY_TO = "0x209693Bc6afc0C5328bA36FaF03C514EF312287C"
+ASSET = "0x036CbD53842c5426634e7929541eC2318f3dCF7e"
+
+REQUIREMENTS = {
+    "scheme": "exact",
+    "network": NETWORK,
+    "maxAmountRequired": "1000000",
+    "payTo": PAY_TO,
+    "asset": ASSET,
+    "resource": "/api/weather",
+}
+
+# (kind, payment_header, payment_requirements)
+Payment = Tuple[str, str, Dict[str, Any]]
+
+
+def make_header(payer: str, nonce: str, valid_before: int) -> str:
+    """Base64 X-PAYMENT header in the ChaosChain SDK format."""
+    payload = {
+        "x402Version": 1,
+        "scheme": "exact",
+        "network": NETWORK,
+        "payload": {
+            "signature": "0x" + "11" * 65,
+            "authorization": {
+                "from": payer,
+                "to": PAY_TO,
+                "value": REQUIREMENTS["maxAmountRequired"],
+                "validAfter": "0",
+                "validBefore": str(valid_before),
+                "nonce": nonce,
+            },
+        },
+    }
+    return base64.b64encode(json.dumps(payload).encode()).decode()
+
+
+class PayloadMix:
+    """
+    Weighted mix of payload kinds.
+
+      valid      fresh authorization, valid for an hour
+      expired    validBefore in the past
+      replayed   authorization settled during setup (`replay_payments`),
+                 so a facilitator that tracks nonces rejects it
+      oversized  valid header whose requirements carry `oversized_bytes`
+                 of padding, past the bridge's 1 MiB body limit
+    """
+
+    KINDS = ("valid", "expired", "replayed", "oversized")
+
+    def __init__(
+        self,
+        weights: Dict[str, float],
+        oversized_bytes: int = 1_200_000,
+        replay_pool: int = 64,
+        seed: int = 0,
+    ):
+        unknown = set(weights) - set(self.KINDS)
+        if unknown:
+            raise ValueError(
+                f"Unknown payload kinds {sorted(unknown)}; expected {self.KINDS}"
+            )
+        if sum(weights.values()) <= 0:
+            raise ValueError("Payload mix weights must add up to more than zero")
+        self.weights = {k: float(weights.get(k, 0)) for k in self.KINDS}
+        self.oversized_bytes = oversized_bytes
+        self.replay_pool = replay_pool
+        self._random = random.Random(seed)
+        self._payer = "0x" + self._random.getrandbits(160).to_bytes(20, "big").hex()
+        self._replayed = [self._header(valid=True) for _ in range(replay_pool)]
+
+    @classmethod
+    def parse(cls, spec: str, **kwargs: Any) -> "PayloadMix":
+        """`valid=80,expired=10,replayed=5,oversized=5` (weights, any scale)."""
+        weights = {}
+        for part in spec.split(","):
+            kind, _, weight = part.partition("=")
+            weights[kind.strip()] = float(weight or 1)
+        return cls(weights, **kwargs)
+
+    def __str__(self) -> str:
+        return ",".join(f"{k}={w:g}" for k, w in self.weights.items() if w)
+
+    def _header(self, valid: bool) -> str:
+        nonce = "0x" + self._random.getrandbits(256).to_bytes(32, "big").hex()
+        valid_before = int(time.time()) + (3600 if valid else -3600)
+        return make_header(self._payer, nonce, valid_before)
+
+    def replay_payments(self) -> List[Payment]:
+        """Payments to settle before the run so their replays are rejected."""
+        return [("replayed", header, REQUIREMENTS) for header in self._replayed]
+
+    def build(self, n: int) -> List[Payment]:
+        kinds = self._random.choices(
+            self.KINDS, weights=[self.weights[k] for k in self.KINDS], k=n
+        )
+        padded = dict(REQUIREMENTS, extra={"padding": "x" * self.oversized_bytes})
+        payments = []
+        for kind in kinds:
+            if kind == "valid":
+                payments.append((kind, self._header(valid=True), REQUIREMENTS))
+            elif kind == "expired":
+                payments.append((kind, self._header(valid=False), REQUIREMENTS))
+            elif kind == "replayed":
+                payments.append(
+                    (kind, self._random.choice(self._replayed), REQUIREMENTS)
+                )
+            else:
+                payments.append((kind, self._header(valid=True), padded))
+        return payments
+
+
+class LatencyHistogram:
+    """Latency samples in seconds; exact percentiles, log-spaced buckets."""
+
+    # Bucket bounds: 8 per power of two from 1 µs to ~68 s
+    BOUNDS = [1e-6 * 2 ** (i / 8) for i in range(8 * 26 + 1)]
+
+    def __init__(self):
+        self.samples: List[float] = []
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    @staticmethod
+    def _rank(ordered: List[float], q: float) -> float:
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+    def percentile(self, q: float) -> float:
+        """Nearest-rank percentile in seconds (q in 0..1)."""
+        return self._rank(sorted(self.samples), q) if self.samples else math.nan
+
+    def summary(self) -> Dict[str, float]:
+        """Latency figures in milliseconds."""
+        if not self.samples:
+            return {}
+        ordered = sorted(self.samples)
+        return {
+            "min": ordered[0] * 1000,
+            "mean": sum(ordered) / len(ordered) * 1000,
+            "p50": self._rank(ordered, 0.50) * 1000,
+            "p95": self._rank(ordered, 0.95) * 1000,
+            "p99": self._rank(ordered, 0.99) * 1000,
+            "p999": self._rank(ordered, 0.999) * 1000,
+            "max": ordered[-1] * 1000,
+        }
+
+    def buckets(self) -> List[List[float]]:
+        """Non-empty [upper bound in ms, count] buckets."""
+        counts: Dict[int, int] = {}
+        for sample in self.samples:
+            index = (
+                0
+                if sample <= 1e-6
+                else min(len(self.BOUNDS) - 1, math.ceil(8 * math.log2(sample / 1e-6)))
+            )
+            counts[index] = counts.get(index, 0) + 1
+        return [[round(self.BOUNDS[i] * 1000, 6), counts[i]] for i in sorted(counts)]
+
+
+def _proc_cpu_seconds(pid: int) -> Optional[float]:
+    """utime + stime of a process from /proc (Linux), else None."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class ResourceMeter:
+    """
+    CPU, GC and allocation figures around a run.
+
+    Python has no cheap count of every allocation, so allocations are
+    reported as tracemalloc's peak and net retained bytes (only when
+    `trace_allocations` is on, since tracing slows every call) plus the
+    number of generation-0 collections, which tracks container churn.
+    """
+
+    def __init__(
+        self, server_pid: Optional[int] = None, trace_allocations: bool = False
+    ):
+        self.server_pid = server_pid
+        self.trace_allocations = trace_allocations
+
+    def __enter__(self) -> "ResourceMeter":
+        gc.collect()
+        self._gc_before = gc.get_stats()[0]["collections"]
+        if self.trace_allocations:
+            tracemalloc.start()
+            self._traced_before = tracemalloc.get_traced_memory()[0]
+        self._server_before = (
+            _proc_cpu_seconds(self.server_pid) if self.server_pid else None
+        )
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.cpu = time.process_time() - self._cpu
+        self.wall = time.perf_counter() - self._wall
+        self.gen0 = gc.get_stats()[0]["collections"] - self._gc_before
+        self.server_cpu = None
+        if self._server_before is not None:
+            after = _proc_cpu_seconds(self.server_pid)
+            self.server_cpu = after - self._server_before if after is not None else None
+        self.peak = self.retained = None
+        if self.trace_allocations:
+            current, self.peak = tracemalloc.get_traced_memory()
+            self.retained = current - self._traced_before
+            tracemalloc.stop()
+
+    def report(self, calls: int) -> Dict[str, Any]:
+        calls = max(calls, 1)
+        report: Dict[str, Any] = {
+            "client_cpu_s": self.cpu,
+            "client_cpu_us_per_call": self.cpu / calls * 1e6,
+            "client_cpu_utilization": self.cpu / self.wall if self.wall else None,
+            "gen0_collections_per_1k_calls": self.gen0 / calls * 1000,
+        }
+        if self.server_cpu is not None:
+            report["server_cpu_us_per_call"] = self.server_cpu / calls * 1e6
+        if self.trace_allocations:
+            report["alloc_peak_kib"] = self.peak / 1024
+            report["alloc_retained_bytes_per_call"] = self.retained / calls
+        return report
+
+
+def _serve_standin(port: int, options: Dict[str, Any]) -> None:
+    from chaoschain_x402_client.standin import serve
+
+    serve(port=port, **options)
+
+
+def spawn_facilitator(
+    kind: str = "stub", delay: float = 0.0, **options: Any
+) -> Tuple[multiprocessing.Process, str]:
+    """
+    Start the benchmark stub or the stand-in in a separate process and
+    return (process, base_url).
+
+    Only the stand-in tracks nonces, so replayed payloads are rejected
+    only there; the stub accepts everything.
+    """
+    if kind == "stub":
+        return spawn_stub(delay)
+    if kind != "standin":
+        raise ValueError(f"Unknown facilitator {kind!r}; expected 'stub' or 'standin'")
+
+    from chaoschain_x402_client.standin import Latency
+
+    if delay:
+        options.setdefault("verify_latency", Latency.constant(delay))
+        options.setdefault("settle_latency", Latency.constant(delay))
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    process = multiprocessing.Process(
+        target=_serve_standin, args=(port, options), daemon=True
+    )
+    process.start()
+
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            break
+        except OSError:
+            if time.monotonic() > deadline:
+                process.terminate()
+                raise RuntimeError("Stand-in facilitator failed to start")
+            time.sleep(0.05)
+
+    return process, f"http://127.0.0.1:{port}"
@@ -0,0 +1,148 @@
+"""
+Local stub facilitator for benchmarks.
+
+Serves `/`, `/supported`, `/verify`, `/verify/batch` and `/settle` with the same response
+shapes as the http-bridge in simulate mode, plus an optional fixed delay
+to stand in for CRE consensus. Keep-alive (HTTP/1.1) is enabled so client
+connection pooling is actually exercised.
+"""
+
+import json
+import multiprocessing
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+SERVICE_INFO = {
+    "service": "ChaosChain x402 Facilitator",
+    "version": "0.1.0",
+    "mode": "stub",
+    "endpoints": {
+        "verify": "POST /verify",
+        "verifyBatch": "POST /verify/batch",
+        "settle": "POST /settle",
+        "supported": "GET /supported",
+    },
+}
+
+SUPPORTED = {
+    "kinds": [
+        {"x402Version": 1, "scheme": "exact", "network": "base-sepolia"},
+        {"x402Version": 1, "scheme": "exact", "network": "ethereum-sepolia"},
+    ]
+}
+
+
+def make_handler(delay: float):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, body: dict, status: int = 200):
+            raw = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def do_GET(self):
+            if self.path == "/":
+                self._send(SERVICE_INFO)
+            elif self.path == "/supported":
+                self._send(SUPPORTED)
+            else:
+                self._send({"error": "Not found", "code": "NOT_FOUND"}, 404)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if delay:
+                time.sleep(delay)
+
+            now = int(time.time() * 1000)
+            verification = {
+                "isValid": True,
+                "invalidReason": None,
+                "consensusProof": "0x" + "ab" * 32,
+                "reportId": f"rep_{now}",
+                "timestamp": now,
+            }
+            if self.path == "/verify":
+                self._send(verification)
+            elif self.path == "/verify/batch":
+                self._send({"results": [verification] * len(request["requests"])})
+            elif self.path == "/settle":
+                self._send(
+                    {
+                        "success": True,
+                        "error": None,
+                        "txHash": "0x" + "cd" * 32,
+                        "networkId": request["paymentRequirements"]["network"],
+                        "consensusProof": "0x" + "ef" * 32,
+                        "timestamp": now,
+                    }
+                )
+            else:
+                self._send({"error": "Not found", "code": "NOT_FOUND"}, 404)
+
+    return StubHandler
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def start_stub(delay: float = 0.0, port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the stub in a daemon thread and return (server, base_url)."""
+    server = StubServer(("127.0.0.1", port), make_handler(delay))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _serve(delay: float, port: int):
+    StubServer(("127.0.0.1", port), make_handler(delay)).serve_forever()
+
+
+def spawn_stub(delay: float = 0.0) -> Tuple[multiprocessing.Process, str]:
+    """
+    Start the stub in a separate process and return (process, base_url).
+
+    Benchmarks should prefer this over `start_stub` so the server does not
+    compete with the client under test for the GIL.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    process = multiprocessing.Process(target=_serve, args=(delay, port), daemon=True)
+    process.start()
+
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            break
+        except OSError:
+            if time.monotonic() > deadline:
+                process.terminate()
+                raise RuntimeError("Stub facilitator failed to start")
+            time.sleep(0.05)
+
+    return process, f"http://127.0.0.1:{port}"
+
+
+if __name__ == "__main__":
+    server, url = start_stub(port=8402)
+    print(f"Stub facilitator listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
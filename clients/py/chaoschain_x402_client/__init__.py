@@ -1,23 +1,165 @@
 """
 ChaosChain x402 Client
 Python client for the decentralized x402 facilitator powered by Chainlink CRE.
+
+Public names are imported on first access (PEP 562), so
+`import chaoschain_x402_client` loads no third-party package: `requests`
+is loaded with X402Client, `httpx` with AsyncX402Client, pydantic with
+the first model, and helpers such as `decode_payment_header` need only
+the standard library.
 """
 
-from .client import X402Client, X402ClientConfig
-from .types import (
-    PaymentRequirements,
-    VerifyResponse,
-    SettleResponse,
-    SupportedSchemesResponse,
-)
+import importlib
+from typing import TYPE_CHECKING, Any, List
 
 __version__ = "0.1.0"
-__all__ = [
-    "X402Client",
-    "X402ClientConfig",
-    "PaymentRequirements",
-    "VerifyResponse",
-    "SettleResponse",
-    "SupportedSchemesResponse",
-]
 
+# Public name -> submodule that defines it
+_EXPORTS = {
+    "X402Client": "client",
+    "X402ClientConfig": "client",
+    "AsyncX402Client": "async_client",
+    "VerifyCache": "cache",
+    "CacheStats": "cache",
+    "SharedPaymentCache": "shared_cache",
+    "PaymentRequirements": "types",
+    "PaymentRequirementsTemplate": "templates",
+    "VerifyResponse": "types",
+    "SettleResponse": "types",
+    "SupportedSchemesResponse": "types",
+    "BatchResult": "types",
+    "CompactPaymentRequirements": "compact",
+    "CompactVerifyResponse": "compact",
+    "CompactSettleResponse": "compact",
+    "CompactSupportedSchemesResponse": "compact",
+    "decode_payment_header": "headers",
+    "new_reservation": "idempotency",
+    "precheck_payment": "precheck",
+    "calculate_fee": "fees",
+    "compute_fee_breakdown": "fees",
+    "format_units": "fees",
+    "fee_breakdown_columns": "fees",
+    "reconcile": "reconciliation",
+    "ReconcilePolicy": "reconciliation",
+    "ReconcileColumns": "reconciliation",
+    "ReconcileReport": "reconciliation",
+    "Mismatch": "reconciliation",
+    "SignatureVerifier": "signatures",
+    "RetryPolicy": "policies",
+    "HedgePolicy": "policies",
+    "CircuitBreaker": "policies",
+    "CircuitOpenError": "policies",
+    "RateLimiter": "ratelimit",
+    "AsyncRateLimiter": "ratelimit",
+    "RateLimitPolicy": "ratelimit",
+    "RateLimitStats": "ratelimit",
+    "RateLimitedError": "ratelimit",
+    "EndpointPool": "endpoints",
+    "EndpointStats": "endpoints",
+    "SettlementHandle": "settlement",
+    "SettlementQueue": "settlement_queue",
+    "SettlementJournal": "settlement_queue",
+    "QueuePolicy": "settlement_queue",
+    "QueueStats": "settlement_queue",
+    "BatchPolicy": "batching",
+    "Instrumentation": "instrumentation",
+    "InProcessMetrics": "instrumentation",
+    "OpenTelemetryInstrumentation": "instrumentation",
+    "RequestTiming": "instrumentation",
+    "MetricsSnapshot": "instrumentation",
+    "ASGIPaymentGate": "middleware",
+    "WSGIPaymentGate": "middleware",
+    "GatePolicy": "middleware",
+    "GateStats": "middleware",
+    "AmountBreakdown": "types",
+    "FeeBreakdown": "types",
+    "NetBreakdown": "types",
+    "TransactionStatus": "types",
+}
+
+# Submodules that need an optional extra just to import. Their names are
+# left out of __all__ so `from chaoschain_x402_client import *` works on a
+# default install; they are still reachable as attributes.
+_OPTIONAL_MODULES = frozenset({"compact"})
+
+__all__ = [name for name, module in _EXPORTS.items() if module not in _OPTIONAL_MODULES]
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_EXPORTS))
+
+
+if TYPE_CHECKING:
+    from .client import X402Client, X402ClientConfig
+    from .async_client import AsyncX402Client
+    from .cache import VerifyCache, CacheStats
+    from .shared_cache import SharedPaymentCache
+    from .templates import PaymentRequirementsTemplate
+    from .compact import (
+        CompactPaymentRequirements,
+        CompactSettleResponse,
+        CompactSupportedSchemesResponse,
+        CompactVerifyResponse,
+    )
+    from .headers import decode_payment_header
+    from .idempotency import new_reservation
+    from .precheck import precheck_payment
+    from .fees import (
+        calculate_fee,
+        compute_fee_breakdown,
+        fee_breakdown_columns,
+        format_units,
+    )
+    from .reconciliation import (
+        Mismatch,
+        ReconcileColumns,
+        ReconcilePolicy,
+        ReconcileReport,
+        reconcile,
+    )
+    from .signatures import SignatureVerifier
+    from .policies import CircuitBreaker, CircuitOpenError, HedgePolicy, RetryPolicy
+    from .ratelimit import (
+        AsyncRateLimiter,
+        RateLimitedError,
+        RateLimiter,
+        RateLimitPolicy,
+        RateLimitStats,
+    )
+    from .endpoints import EndpointPool, EndpointStats
+    from .settlement import SettlementHandle
+    from .settlement_queue import (
+        SettlementQueue,
+        SettlementJournal,
+        QueuePolicy,
+        QueueStats,
+    )
+    from .batching import BatchPolicy
+    from .instrumentation import (
+        Instrumentation,
+        InProcessMetrics,
+        OpenTelemetryInstrumentation,
+        RequestTiming,
+        MetricsSnapshot,
+    )
+    from .middleware import ASGIPaymentGate, WSGIPaymentGate, GatePolicy, GateStats
+    from .types import (
+        PaymentRequirements,
+        VerifyResponse,
+        SettleResponse,
+        SupportedSchemesResponse,
+        BatchResult,
+        AmountBreakdown,
+        FeeBreakdown,
+        NetBreakdown,
+        TransactionStatus,
+    )
@@ -0,0 +1,1271 @@
+"""
+Async X402 Client for Python
+Provides a native asyncio interface to the decentralized x402 facilitator.
+"""
+
+import asyncio
+import time
+from urllib.parse import urlencode
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None  # type: ignore[assignment]
+
+from .types import (
+    PaymentRequirements,
+    VerifyResponse,
+    SettleResponse,
+    SupportedSchemesResponse,
+    ServiceInfo,
+    BatchResult,
+    SettlementStatusResponse,
+    TransactionStatus,
+)
+from . import codec
+from .templates import (
+    Payment,
+    PaymentRequirementsTemplate,
+    PreparedRequest,
+    prepare_request,
+)
+from .precheck import precheck_payment
+from .cache import AsyncRefreshingValue, VerifyCache
+from .policies import CircuitBreaker, HedgePolicy, LatencyTracker, RetryPolicy
+from .ratelimit import AsyncRateLimiter, parse_retry_after
+from .endpoints import Endpoint, EndpointPool, EndpointStats
+from .headers import header_valid_before
+from .idempotency import (
+    AsyncSingleFlight,
+    authorization_key,
+    new_reservation,
+    settlement_key,
+)
+from .settlement import MAX_STATUS_BATCH, AsyncSettlementTracker, SettlementHandle
+from .streaming import STREAM_UNSUPPORTED, SettlementWatch, aiter_sse
+from .batching import (
+    BATCH_UNSUPPORTED,
+    AsyncVerifyBatcher,
+    BatchItem,
+    BatchPolicy,
+    BatchUnsupportedError,
+    parse_batch_results,
+)
+from .instrumentation import Instrumentation, RequestTiming
+
+if TYPE_CHECKING:
+    # Loads eth-keys; only needed once a verifier is passed in
+    from .shared_cache import SharedPaymentCache
+    from .signatures import SignatureVerifier
+
+T = TypeVar("T")
+
+
+class AsyncX402Client:
+    """
+    Asyncio client for the ChaosChain x402 decentralized facilitator.
+
+    Mirrors the surface of `X402Client` but is built on a pooled
+    `httpx.AsyncClient`, so aiohttp/FastAPI resource servers can keep
+    thousands of verifications in flight without a thread pool.
+
+    Requires the optional `httpx` dependency
+    (`pip install "chaoschain-x402-client[async]"`, or `[http2]` for HTTP/2).
+
+    Example:
+        ```python
+        from chaoschain_x402_client import AsyncX402Client
+
+        async with AsyncX402Client(facilitator_url='http://localhost:8402') as client:
+            result = await client.verify_payment(
+                payment_header='base64_encoded_header',
+                payment_requirements={
+                    'scheme': 'exact',
+                    'network': 'base-sepolia',
+                    'maxAmountRequired': '1000000',
+                    'payTo': '0x...',
+                    'asset': '0x...',
+                    'resource': '/api/weather'
+                }
+            )
+
+            if result.isValid:
+                print('✅ Payment verified!')
+        ```
+    """
+
+    def __init__(
+        self,
+        facilitator_url: Union[str, Sequence[str], EndpointPool],
+        x402_version: int = 1,
+        timeout: int = 30,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: Optional[float] = 5.0,
+        http2: bool = False,
+        verify_cache: Optional[VerifyCache] = None,
+        supported_ttl: Optional[float] = 60.0,
+        health_ttl: Optional[float] = None,
+        max_stale: float = 300.0,
+        local_precheck: bool = False,
+        signature_verifier: Optional["SignatureVerifier"] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        hedge_policy: Optional[HedgePolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        rate_limiter: Optional[AsyncRateLimiter] = None,
+        load_balancing: str = EndpointPool.EWMA,
+        settlement_poll_interval: float = 2.0,
+        settlement_timeout: float = 600.0,
+        verify_batching: Optional[BatchPolicy] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        replay_guard: Optional["SharedPaymentCache"] = None,
+        compact_types: bool = False,
+    ):
+        """
+        Initialize the async X402 client.
+
+        Args:
+            facilitator_url: URL of the facilitator service, a list of replica
+                URLs to load-balance across, or a configured EndpointPool
+            x402_version: x402 protocol version (default: 1)
+            timeout: Request timeout in seconds (default: 30)
+            max_connections: Upper bound on open connections in the pool (default: 100)
+            max_keepalive_connections: Idle connections kept for reuse (default: 20)
+            keepalive_expiry: Seconds an idle connection is kept alive (default: 5.0)
+            http2: Multiplex requests over HTTP/2 when the facilitator supports it
+                (requires the `h2` package, default: False)
+            verify_cache: Opt-in cache of verify results (default: None)
+            supported_ttl: Seconds /supported is served from cache; None disables
+                caching (default: 60)
+            health_ttl: Seconds health info is served from cache; None keeps
+                health_check a live probe (default: None)
+            max_stale: Oldest cached /supported or health info served while a
+                background refresh runs (default: 300)
+            local_precheck: Reject undecodable, expired, not-yet-valid,
+                wrong-network, wrong-recipient or underpaid headers locally
+                instead of sending them to the facilitator (default: False)
+            signature_verifier: Recover the EIP-3009 signer locally and reject
+                forged signatures before the facilitator call (default: None)
+            connect_timeout: Seconds to establish a connection (default: `timeout`)
+            read_timeout: Seconds to wait for the response (default: `timeout`)
+            retry_policy: Retry transient failures with jittered backoff; settle
+                retries reuse one Idempotency-Key (default: None, no retries)
+            hedge_policy: Send a second /verify if the first is slower than the
+                hedge delay and take whichever answers first (default: None)
+            circuit_breaker: Fail fast with CircuitOpenError while the
+                facilitator keeps failing (default: None)
+            rate_limiter: Shape requests to stay under the bridge's per-IP
+                limit, adapt concurrency to 429/503 responses and resend a
+                429 after its `retryAfter`; share one across clients on the
+                same event loop (default: None)
+            load_balancing: "ewma" or "least_outstanding" selection when
+                several URLs are given (default: "ewma")
+            settlement_poll_interval: First finality poll for a pending
+                `submit_settlement`; backs off while pending (default: 2)
+            settlement_timeout: Seconds a submitted settlement may stay
+                pending before its handle fails (default: 600)
+            verify_batching: Coalesce concurrent verify calls into one
+                `/verify/batch` request; falls back to `/verify` if the
+                facilitator lacks it (default: None, one request per call)
+            instrumentation: Receives per-request latency with a pool wait /
+                connect / TLS / server / parse breakdown, in-flight counts,
+                retries, cache hits and serialization time, e.g.
+                InProcessMetrics or OpenTelemetryInstrumentation (default: None)
+            replay_guard: SharedPaymentCache through which the workers of a
+                host let only one request accept and settle each (payer,
+                nonce); replays are refused without a round-trip (default: None)
+            compact_types: Return the msgspec Structs of `compact`
+                (CompactVerifyResponse, CompactSettleResponse,
+                CompactSupportedSchemesResponse) decoded straight from the
+                response body instead of pydantic models; a fraction of
+                the memory and decode time per result, for callers that
+                keep many. Requires the `compact` extra (default: False)
+        """
+        if httpx is None:
+            raise ImportError(
+                "AsyncX402Client requires httpx. "
+                'Install it with: pip install "chaoschain-x402-client[async]"'
+            )
+
+        if isinstance(facilitator_url, EndpointPool):
+            self.endpoints = facilitator_url
+        else:
+            self.endpoints = EndpointPool(facilitator_url, strategy=load_balancing)
+        self.facilitator_url = self.endpoints.primary.url
+        self.x402_version = x402_version
+        self.timeout = timeout
+        self.http2 = http2
+        self.retry_policy = retry_policy
+        self.hedge_policy = hedge_policy
+        self.circuit_breaker = circuit_breaker
+        self.rate_limiter = rate_limiter
+        self.verify_latency = LatencyTracker()
+        self.verify_cache = verify_cache
+        self.replay_guard = replay_guard
+        if compact_types:
+            from .compact import COMPACT_TYPES  # needs msgspec
+
+            self._types = COMPACT_TYPES
+        else:
+            self._types = codec.MODEL_TYPES
+        self._verify_batcher = (
+            AsyncVerifyBatcher(self._verify_batch, verify_batching)
+            if verify_batching is not None
+            else None
+        )
+        self._settle_flight = AsyncSingleFlight()
+        self._settle_tasks: set = set()
+        self.settlements = AsyncSettlementTracker(
+            self._fetch_settlement_status,
+            poll_interval=settlement_poll_interval,
+            timeout=settlement_timeout,
+        )
+        self._supported_cache = (
+            AsyncRefreshingValue(
+                self._fetch_supported_schemes, supported_ttl, max_stale
+            )
+            if supported_ttl is not None
+            else None
+        )
+        self._health_cache = (
+            AsyncRefreshingValue(self._fetch_health, health_ttl, max_stale)
+            if health_ttl is not None
+            else None
+        )
+        self._supported_index: Optional[
+            Tuple[SupportedSchemesResponse, FrozenSet[Tuple[str, str]]]
+        ] = None
+        self.local_precheck = local_precheck
+        self.signature_verifier = signature_verifier
+        self.instrumentation = instrumentation
+        self.session = httpx.AsyncClient(
+            base_url=self.facilitator_url,
+            headers={"Content-Type": "application/json"},
+            timeout=httpx.Timeout(
+                timeout,
+                connect=connect_timeout if connect_timeout is not None else timeout,
+                read=read_timeout if read_timeout is not None else timeout,
+            ),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            http2=http2,
+        )
+
+    async def verify_payment(
+        self,
+        payment_header: str,
+        payment_requirements: Union[
+            dict, PaymentRequirements, PaymentRequirementsTemplate
+        ],
+        reservation: Optional[int] = None,
+    ) -> VerifyResponse:
+        """
+        Verify an x402 payment via the decentralized facilitator.
+
+        Args:
+            payment_header: Base64 encoded X-PAYMENT header
+            payment_requirements: Payment requirements from the resource server,
+                as a dict, a pre-validated PaymentRequirements, or a
+                PaymentRequirementsTemplate (only the header is spliced in)
+            reservation: With a `replay_guard`, the token (from
+                `new_reservation()`) a valid payment is reserved under; only
+                a call with the same token may verify it again or release
+                it. Default: a fresh token, so the reservation ends when the
+                payment is settled or the reservation expires
+
+        Returns:
+            VerifyResponse with consensus proof
+
+        Raises:
+            TimeoutError: If the request times out
+            RuntimeError: If the request fails
+        """
+        rejection = self._precheck(payment_header, payment_requirements)
+        if rejection is not None:
+            return rejection
+
+        guard_key = None
+        if self.replay_guard is not None:
+            guard_key = self._authorization_key(payment_header, payment_requirements)
+            if reservation is None:
+                reservation = new_reservation()
+            reason = (
+                self.replay_guard.replay_reason(guard_key, reservation)
+                if guard_key
+                else None
+            )
+            if reason is not None:
+                return self._types.verify(isValid=False, invalidReason=reason)
+
+        # Validate and encode payment requirements (templates are pre-encoded)
+        body, requirements_key = self._encode(
+            "/verify", payment_header, payment_requirements
+        )
+
+        cache_key = None
+        if self.verify_cache is not None:
+            cache_key = self.verify_cache.key(payment_header, requirements_key)
+            cached = self.verify_cache.get(cache_key)
+            if self.instrumentation is not None:
+                self.instrumentation.cache_lookup("verify", cached is not None)
+            if cached is not None:
+                return self._reserve(
+                    guard_key, reservation, self._types.as_verify(cached)
+                )
+
+        try:
+            result = await self._verify(body)
+        except httpx.TimeoutException:
+            raise TimeoutError(f"Verification request timed out after {self.timeout}s")
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"Verification failed: {str(e)}") from e
+
+        if self.verify_cache is not None and cache_key is not None:
+            self.verify_cache.put(cache_key, payment_header, result)
+        return self._reserve(guard_key, reservation, result)
+
+    def _authorization_key(
+        self, payment_header: str, payment_requirements
+    ) -> Optional[str]:
+        """Replay-guard key of the authorization, or None if the header is undecodable."""
+        try:
+            return authorization_key(payment_header, payment_requirements)
+        except ValueError:
+            return None
+
+    def release_payment(
+        self,
+        payment_header: str,
+        payment_requirements: Union[
+            dict, PaymentRequirements, PaymentRequirementsTemplate
+        ],
+        reservation: int,
+    ) -> None:
+        """
+        Drop the host-wide reservation `verify_payment` took under
+        `reservation` for a payment that will not be settled, e.g. because
+        the handler failed, so the payer can retry with the same X-PAYMENT.
+        A no-op without a `replay_guard`, or if another request holds the
+        payment.
+        """
+        if self.replay_guard is None:
+            return
+        guard_key = self._authorization_key(payment_header, payment_requirements)
+        if guard_key is not None:
+            self.replay_guard.unreserve(guard_key, reservation)
+
+    def _reserve(
+        self,
+        guard_key: Optional[str],
+        reservation: Optional[int],
+        result: VerifyResponse,
+    ) -> VerifyResponse:
+        """Reserve a valid payment host-wide, or refuse it if another request holds it."""
+        guard = self.replay_guard
+        if (
+            guard is None
+            or guard_key is None
+            or reservation is None
+            or not result.isValid
+        ):
+            return result
+        reason = guard.reserve(guard_key, reservation)
+        if reason is not None:
+            return self._types.verify(isValid=False, invalidReason=reason)
+        return result
+
+    async def _verify(self, body: bytes) -> VerifyResponse:
+        batcher = self._verify_batcher
+        if (
+            batcher is not None
+            and batcher.enabled
+            and len(body) <= batcher.max_item_bytes
+        ):
+            try:
+                return await batcher.submit(body)
+            except BatchUnsupportedError:
+                pass  # the batcher has disabled itself; send this one alone
+        response = await self._post("/verify", body, hedge=True)
+        response.raise_for_status()
+        return self._decode("/verify", self._types.decode_verify, response.content)
+
+    async def _verify_batch(self, body: bytes) -> List[BatchItem]:
+        """POST a coalesced batch to /verify/batch (called by the batcher)."""
+        response = await self._post("/verify/batch", body)
+        if response.status_code in BATCH_UNSUPPORTED:
+            raise BatchUnsupportedError(
+                f"Facilitator does not support /verify/batch (HTTP {response.status_code})"
+            )
+        response.raise_for_status()
+        return self._decode("/verify/batch", self._parse_batch, response.content)
+
+    def _parse_batch(self, content: bytes) -> List[BatchItem]:
+        return parse_batch_results(content, self._types.verify_from_builtins)
+
+    def _encode(
+        self, route: str, payment_header: str, payment_requirements
+    ) -> PreparedRequest:
+        """`prepare_request`, timed when instrumented."""
+        if self.instrumentation is None:
+            return prepare_request(
+                payment_header, payment_requirements, self.x402_version
+            )
+        start = time.perf_counter()
+        prepared = prepare_request(
+            payment_header, payment_requirements, self.x402_version
+        )
+        self.instrumentation.serialization("encode", route, time.perf_counter() - start)
+        return prepared
+
+    def _decode(self, route: str, parse: Callable[[Any], T], content: bytes) -> T:
+        """Parse a response body, timed when instrumented."""
+        if self.instrumentation is None:
+            return parse(content)
+        start = time.perf_counter()
+        result = parse(content)
+        self.instrumentation.serialization("decode", route, time.perf_counter() - start)
+        return result
+
+    def _begin(self, method: str, route: str) -> Optional[RequestTiming]:
+        """Start timing a request, if instrumented."""
+        if self.instrumentation is None:
+            return None
+        self.instrumentation.request_started(method, route)
+        return RequestTiming(method, route)
+
+    def _end(
+        self,
+        timing: RequestTiming,
+        response: Optional["httpx.Response"] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        timing.finish(response.status_code if response is not None else None, error)
+        if self.instrumentation is not None:
+            self.instrumentation.request_finished(timing)
+
+    async def settle_payment(
+        self,
+        payment_header: str,
+        payment_requirements: Union[
+            dict, PaymentRequirements, PaymentRequirementsTemplate
+        ],
+    ) -> SettleResponse:
+        """
+        Settle an x402 payment via the decentralized facilitator.
+
+        The request carries an `Idempotency-Key` derived from the whole
+        signed authorization and the requirements' recipient and amount
+        (see `settlement_key`), and concurrent calls for the same payment
+        are merged into one request whose SettleResponse every caller
+        receives.
+        With a `replay_guard`, an authorization that another request is
+        settling or has settled is refused with `success=False` instead.
+
+        Args:
+            payment_header: Base64 encoded X-PAYMENT header
+            payment_requirements: Payment requirements from the resource server,
+                as a dict, a pre-validated PaymentRequirements, or a
+                PaymentRequirementsTemplate (only the header is spliced in)
+
+        Returns:
+            SettleResponse with transaction hash and consensus proof
+
+        Raises:
+            TimeoutError: If the request times out
+            RuntimeError: If the request fails
+        """
+        rejection = self._precheck(payment_header, payment_requirements)
+        if rejection is not None:
+            return self._types.settle(
+                success=False,
+                error=rejection.invalidReason,
+                timestamp=rejection.timestamp,
+            )
+
+        # Validate and encode payment requirements (templates are pre-encoded)
+        body, requirements_key = self._encode(
+            "/settle", payment_header, payment_requirements
+        )
+
+        authorization = self._authorization_key(payment_header, payment_requirements)
+        try:
+            key = settlement_key(payment_header, payment_requirements)
+        except ValueError:
+            # An undecodable header will be rejected by the facilitator, but
+            # its key must still be stable across retries
+            key = VerifyCache.key(payment_header, requirements_key)
+
+        guard: Optional["SharedPaymentCache"] = None
+        if self.replay_guard is not None and authorization is not None:
+            reason = self.replay_guard.claim(authorization)
+            if reason is not None:
+                return self._types.settle(success=False, error=reason)
+            guard, claimed = self.replay_guard, authorization
+
+        # Concurrent settles of the same authorization share one request
+        try:
+            result = await self._settle_flight.do(key, lambda: self._settle(key, body))
+        except BaseException:
+            if guard is not None:
+                guard.release(claimed)
+            raise
+        if guard is not None:
+            if result.success:
+                guard.settled(claimed, header_valid_before(payment_header))
+            else:
+                guard.release(claimed)
+
+        if self.verify_cache is not None and result.success:
+            # The nonce is spent, so a cached valid result is now stale
+            self.verify_cache.invalidate(
+                self.verify_cache.key(payment_header, requirements_key)
+            )
+        return result
+
+    def submit_settlement(
+        self,
+        payment_header: str,
+        payment_requirements: Union[
+            dict, PaymentRequirements, PaymentRequirementsTemplate
+        ],
+    ) -> SettlementHandle:
+        """
+        Settle a payment without awaiting it.
+
+        Must be called from the client's event loop. The /settle request
+        runs as a background task; if the bridge reports the settlement as
+        `pending`, the handle is tracked to finality by the client's shared
+        polling task.
+
+        Example:
+            ```python
+            handle = client.submit_settlement(header, requirements)
+            serve_content()
+            final = await handle.confirmed(timeout=120)
+            ```
+        """
+        handle = SettlementHandle()
+
+        def submitted(task: asyncio.Task) -> None:
+            self._settle_tasks.discard(task)
+            if task.cancelled():
+                handle._fail(RuntimeError("Settlement submission was cancelled"))
+                return
+            error = task.exception()
+            if error is not None:
+                handle._fail(error)
+                return
+            response = task.result()
+            if handle._submitted(response):
+                self.settlements.track(handle, response)
+
+        task = asyncio.ensure_future(
+            self.settle_payment(payment_header, payment_requirements)
+        )
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._settle_tasks.add(task)
+        task.add_done_callback(submitted)
+        return handle
+
+    async def _settle(self, key: str, body: bytes) -> SettleResponse:
+        """POST /settle with a deterministic Idempotency-Key."""
+        try:
+            # The same key on every retry (and from every client), so the
+            # bridge's idempotency store answers repeats instead of settling twice
+            response = await self._post("/settle", body, {"Idempotency-Key": key})
+            response.raise_for_status()
+            return self._decode("/settle", self._types.decode_settle, response.content)
+        except httpx.TimeoutException:
+            raise TimeoutError(f"Settlement request timed out after {self.timeout}s")
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"Settlement failed: {str(e)}") from e
+
+    async def _post(
+        self,
+        path: str,
+        body: bytes,
+        headers: Optional[dict] = None,
+        hedge: bool = False,
+    ) -> "httpx.Response":
+        """
+        POST to the facilitator with the configured retry, hedging,
+        circuit-breaker and rate-limit policies. Transport errors propagate
+        as httpx exceptions once retries are exhausted.
+        """
+        attempts = self.retry_policy.max_attempts if self.retry_policy else 1
+        retry_status = self.retry_policy.retry_on_status if self.retry_policy else ()
+        attempt = throttled = 0
+
+        while True:
+            # A half-open trial that ends without an outcome (429, limiter
+            # refusal, cancellation) is released in `finally`
+            trial = (
+                self.circuit_breaker.check()
+                if self.circuit_breaker is not None
+                else False
+            )
+
+            last_attempt = attempt + 1 >= attempts
+            try:
+                if hedge and self.hedge_policy is not None:
+                    response = await self._send_hedged(path, body, headers)
+                else:
+                    response = await self._send(path, body, headers)
+            except httpx.TransportError as e:
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.record_failure()
+                if last_attempt:
+                    raise
+                reason = type(e).__name__
+            else:
+                # A 429 is resent once the limiter's retryAfter pause is
+                # over; it does not use up a retry attempt
+                if self._retry_throttled(path, response, throttled):
+                    throttled += 1
+                    continue
+                transient = (
+                    response.status_code >= 500 or response.status_code in retry_status
+                )
+                if self.circuit_breaker is not None:
+                    if transient:
+                        self.circuit_breaker.record_failure()
+                    else:
+                        self.circuit_breaker.record_success()
+                if last_attempt or response.status_code not in retry_status:
+                    return response
+                reason = str(response.status_code)
+            finally:
+                if trial and self.circuit_breaker is not None:
+                    self.circuit_breaker.release_trial()
+
+            if self.instrumentation is not None:
+                self.instrumentation.retry(path, reason)
+            if self.retry_policy is not None:
+                await asyncio.sleep(self.retry_policy.backoff(attempt))
+            attempt += 1
+
+    def _retry_throttled(
+        self, path: str, response: "httpx.Response", throttled: int
+    ) -> bool:
+        """Whether to resend a request the facilitator answered with 429."""
+        if (
+            response.status_code != 429
+            or self.rate_limiter is None
+            or throttled >= self.rate_limiter.policy.retry_throttled
+        ):
+            return False
+        if self.instrumentation is not None:
+            self.instrumentation.retry(path, "429")
+        return True
+
+    async def _send(
+        self,
+        path: str,
+        body: bytes,
+        headers: Optional[dict] = None,
+        endpoint: Optional[Endpoint] = None,
+        exclude: Optional[Endpoint] = None,
+    ) -> "httpx.Response":
+        """A single POST, recording its latency for hedging and load balancing."""
+        limiter = self.rate_limiter
+        try:
+            permit = await limiter.acquire(path) if limiter is not None else None
+        except BaseException:
+            # No permit (RateLimitedError, cancelled): hand back a pre-acquired endpoint
+            if endpoint is not None:
+                self.endpoints.abandon(endpoint)
+            raise
+        if endpoint is None:
+            endpoint = self.endpoints.acquire(exclude)
+        timing = self._begin("POST", path)
+        start = time.perf_counter()
+        try:
+            response = await self.session.post(
+                f"{endpoint.url}{path}",
+                content=body,
+                headers=headers,
+                extensions={"trace": timing.atrace} if timing is not None else None,
+            )
+        except httpx.TransportError as e:
+            self.endpoints.release(endpoint, None, ok=False)
+            self._release_permit(permit)
+            if timing is not None:
+                self._end(timing, error=e)
+            raise
+        except BaseException as e:
+            # Cancelled (e.g. the losing half of a hedge): not the endpoint's fault
+            self.endpoints.abandon(endpoint)
+            if limiter is not None and permit is not None:
+                limiter.abandon(permit)
+            if timing is not None:
+                self._end(timing, error=e)
+            raise
+        elapsed = time.perf_counter() - start
+        self._release_permit(permit, response)
+        if timing is not None:
+            self._end(timing, response)
+        self.endpoints.release(endpoint, elapsed, ok=response.status_code < 500)
+        if response.is_success and path == "/verify":
+            self.verify_latency.record(elapsed)
+        return response
+
+    async def _send_hedged(
+        self, path: str, body: bytes, headers: Optional[dict] = None
+    ) -> "httpx.Response":
+        """Send a backup request if the first is slower than the hedge delay."""
+        if self.hedge_policy is None:
+            return await self._send(path, body, headers)
+        delay = self.verify_latency.hedge_delay(self.hedge_policy)
+        if delay is None:
+            return await self._send(path, body, headers)
+
+        endpoint = self.endpoints.acquire()
+        first = asyncio.ensure_future(self._send(path, body, headers, endpoint))
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return first.result()
+
+        # Hedge on another replica if there is one. The backup picks its
+        # endpoint inside the task, so cancelling it before it starts is safe.
+        second = asyncio.ensure_future(
+            self._send(path, body, headers, exclude=endpoint)
+        )
+        pending = {first, second}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            # Both failed: re-raise the error of the last one to finish
+            return done.pop().result()
+        finally:
+            # Unlike threads, the losing request can actually be cancelled
+            for task in pending:
+                task.cancel()
+
+    async def verify_many(
+        self,
+        payments: Iterable[Payment],
+        concurrency: int = 100,
+    ) -> List[BatchResult]:
+        """
+        Verify many payments concurrently and return results in input order.
+
+        Args:
+            payments: Iterable of (payment_header, payment_requirements) pairs
+            concurrency: Maximum number of requests in flight (default: 100)
+
+        Returns:
+            One BatchResult per payment, ordered like the input. A payment
+            that raises is reported in `BatchResult.error`; the rest of the
+            batch still runs.
+        """
+        results = [r async for r in self.verify_as_completed(payments, concurrency)]
+        results.sort(key=lambda r: r.index)
+        return results
+
+    def verify_as_completed(
+        self,
+        payments: Iterable[Payment],
+        concurrency: int = 100,
+    ) -> AsyncIterator[BatchResult]:
+        """
+        Verify many payments concurrently, yielding results as they complete.
+
+        Example:
+            ```python
+            async for item in client.verify_as_completed(payments, concurrency=200):
+                if item.ok and item.result.isValid:
+                    serve(item.index)
+            ```
+        """
+        return self._run_many(self.verify_payment, payments, concurrency)
+
+    async def settle_many(
+        self,
+        payments: Iterable[Payment],
+        concurrency: int = 100,
+    ) -> List[BatchResult]:
+        """
+        Settle many payments concurrently and return results in input order.
+
+        Args:
+            payments: Iterable of (payment_header, payment_requirements) pairs
+            concurrency: Maximum number of requests in flight (default: 100)
+
+        Returns:
+            One BatchResult per payment, ordered like the input
+        """
+        results = [r async for r in self.settle_as_completed(payments, concurrency)]
+        results.sort(key=lambda r: r.index)
+        return results
+
+    def settle_as_completed(
+        self,
+        payments: Iterable[Payment],
+        concurrency: int = 100,
+    ) -> AsyncIterator[BatchResult]:
+        """Settle many payments concurrently, yielding results as they complete."""
+        return self._run_many(self.settle_payment, payments, concurrency)
+
+    async def _run_many(
+        self,
+        call: Callable[[str, dict], Awaitable[object]],
+        payments: Iterable[Payment],
+        concurrency: int,
+    ) -> AsyncIterator[BatchResult]:
+        """Run `call` over payments with at most `concurrency` in flight."""
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        async def run(index: int, header: str, requirements: Any) -> BatchResult:
+            # Results are validated already and may be compact Structs
+            try:
+                return BatchResult.model_construct(
+                    index=index, result=await call(header, requirements)
+                )
+            except Exception as e:
+                return BatchResult.model_construct(index=index, error=str(e))
+
+        pending: Set[asyncio.Future] = set()
+        try:
+            # The input is consumed lazily so huge batches never queue up in memory
+            for index, (header, requirements) in enumerate(payments):
+                if len(pending) >= concurrency:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        yield task.result()
+                pending.add(asyncio.ensure_future(run(index, header, requirements)))
+
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    yield task.result()
+        finally:
+            # Consumer stopped iterating early: don't leave orphaned requests
+            for task in pending:
+                task.cancel()
+
+    def requirements_template(
+        self,
+        payment_requirements: Union[dict, PaymentRequirements],
+    ) -> PaymentRequirementsTemplate:
+        """Validate and pre-encode per-endpoint requirements for this client."""
+        return PaymentRequirementsTemplate(payment_requirements, self.x402_version)
+
+    async def get_supported_schemes(
+        self, refresh: bool = False
+    ) -> SupportedSchemesResponse:
+        """
+        Get supported payment schemes and networks from the facilitator.
+
+        Served from cache within `supported_ttl`; a stale entry is returned
+        immediately while it is refreshed in the background.
+
+        Args:
+            refresh: Bypass the cache and fetch from the facilitator
+
+        Returns:
+            SupportedSchemesResponse with list of (scheme, network) pairs
+        """
+        if self._supported_cache is None:
+            return await self._fetch_supported_schemes()
+        return await self._supported_cache.get(refresh)
+
+    async def supports(self, scheme: str, network: str) -> bool:
+        """
+        Check whether the facilitator supports a (scheme, network) pair.
+
+        Lookups are O(1) against an index built from the cached `kinds`
+        list, so once /supported has been fetched this never waits on the
+        network (a stale list is refreshed in the background).
+
+        Example:
+            ```python
+            if not await client.supports('exact', requirements['network']):
+                return reject_early()
+            ```
+        """
+        supported = await self.get_supported_schemes()
+        return (scheme, network) in self._index_supported(supported)
+
+    def _index_supported(
+        self, supported: SupportedSchemesResponse
+    ) -> FrozenSet[Tuple[str, str]]:
+        """(scheme, network) set for a /supported response, rebuilt only on change."""
+        index = self._supported_index
+        if index is None or index[0] is not supported:
+            index = (
+                supported,
+                frozenset((k.scheme, k.network) for k in supported.kinds),
+            )
+            self._supported_index = index
+        return index[1]
+
+    def _precheck(
+        self, payment_header: str, payment_requirements
+    ) -> Optional[VerifyResponse]:
+        """Local rejection for an obviously invalid payment, if enabled."""
+        rejection = None
+        if self.local_precheck:
+            supported = None
+            cached = (
+                self._supported_cache.peek()
+                if self._supported_cache is not None
+                else None
+            )
+            if cached is not None:
+                # Only use /supported if it is already cached; never fetch here
+                supported = self._index_supported(cached)
+            rejection = precheck_payment(
+                payment_header, payment_requirements, supported=supported
+            )
+        if rejection is None and self.signature_verifier is not None:
+            rejection = self.signature_verifier.verify(
+                payment_header, payment_requirements
+            )
+        return self._types.as_verify(rejection) if rejection is not None else None
+
+    async def _get(self, path: str) -> "httpx.Response":
+        """A GET, resent after a 429 if rate limited."""
+        throttled = 0
+        response = await self._get_once(path)
+        while self._retry_throttled(path.split("?", 1)[0], response, throttled):
+            throttled += 1
+            response = await self._get_once(path)
+        return response
+
+    async def _get_once(self, path: str) -> "httpx.Response":
+        """A single GET, recorded against the endpoint it went to."""
+        route = path.split("?", 1)[0]
+        limiter = self.rate_limiter
+        permit = await limiter.acquire(route) if limiter is not None else None
+        endpoint = self.endpoints.acquire()
+        timing = self._begin("GET", route)
+        start = time.perf_counter()
+        try:
+            response = await self.session.get(
+                f"{endpoint.url}{path}",
+                extensions={"trace": timing.atrace} if timing is not None else None,
+            )
+        except httpx.TransportError as e:
+            self.endpoints.release(endpoint, None, ok=False)
+            self._release_permit(permit)
+            if timing is not None:
+                self._end(timing, error=e)
+            raise
+        except BaseException as e:
+            self.endpoints.abandon(endpoint)
+            if limiter is not None and permit is not None:
+                limiter.abandon(permit)
+            if timing is not None:
+                self._end(timing, error=e)
+            raise
+        self._release_permit(permit, response)
+        if timing is not None:
+            self._end(timing, response)
+        self.endpoints.release(
+            endpoint, time.perf_counter() - start, ok=response.status_code < 500
+        )
+        return response
+
+    def _release_permit(
+        self, permit: Optional[int], response: Optional["httpx.Response"] = None
+    ) -> None:
+        """Hand a rate-limit permit back with the outcome of its request."""
+        if permit is None or self.rate_limiter is None:
+            return
+        if response is None:
+            self.rate_limiter.release(permit)
+        elif response.status_code == 429:
+            self.rate_limiter.release(
+                permit, 429, parse_retry_after(response.headers, response.content)
+            )
+        else:
+            self.rate_limiter.release(permit, response.status_code)
+
+    async def _fetch_supported_schemes(self) -> SupportedSchemesResponse:
+        """Fetch /supported from the facilitator, bypassing the cache."""
+        try:
+            response = await self._get("/supported")
+            response.raise_for_status()
+            return self._decode(
+                "/supported", self._types.decode_supported, response.content
+            )
+        except httpx.TimeoutException:
+            raise TimeoutError(f"Request timed out after {self.timeout}s")
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"Failed to get supported schemes: {str(e)}") from e
+
+    async def _fetch_settlement_status(
+        self, network: str, tx_hashes: List[str]
+    ) -> SettlementStatusResponse:
+        """Look up the finality of settlement transactions in one request."""
+        query = urlencode({"network": network, "txHashes": ",".join(tx_hashes)})
+        try:
+            response = await self._get(f"/settlements/status?{query}")
+            response.raise_for_status()
+            return self._decode(
+                "/settlements/status",
+                codec.SETTLEMENT_STATUS_ADAPTER.validate_json,
+                response.content,
+            )
+        except httpx.TimeoutException:
+            raise TimeoutError(f"Request timed out after {self.timeout}s")
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"Failed to get settlement status: {str(e)}") from e
+
+    async def watch_settlements(
+        self,
+        tx_hashes: Iterable[str],
+        network: str,
+        poll_interval: float = 2.0,
+    ) -> AsyncIterator[TransactionStatus]:
+        """
+        Follow settlement transactions until they are all final.
+
+        Subscribes to the facilitator's `/settlements/stream` server-sent
+        events, so up to MAX_STATUS_BATCH (100) transactions share one
+        connection; larger sets open one stream per 100 and merge them. If
+        the facilitator has no stream endpoint or a stream drops or reports
+        an error, it falls back to batched `/settlements/status` polling
+        without repeating transitions already yielded.
+
+        Args:
+            tx_hashes: Transaction hashes to follow (all on `network`)
+            network: Network the transactions were sent on
+            poll_interval: Seconds between polls in fallback mode (default: 2)
+
+        Yields:
+            TransactionStatus on every transition (first status seen, new
+            confirmation count, or final `confirmed` / `failed`)
+
+        Example:
+            ```python
+            async for update in client.watch_settlements([tx_a, tx_b], 'base-sepolia'):
+                print(update.txHash, update.status, update.confirmations)
+            ```
+        """
+        watch = SettlementWatch(tx_hashes)
+        endpoint = self.endpoints.pick()
+        # The bridge takes at most MAX_STATUS_BATCH hashes per stream, like /settlements/status
+        pending = watch.pending
+        chunks = [
+            pending[i : i + MAX_STATUS_BATCH]
+            for i in range(0, len(pending), MAX_STATUS_BATCH)
+        ]
+        if len(chunks) == 1:
+            statuses = self._stream_settlements(endpoint, network, chunks[0])
+        else:
+            statuses = self._merge_settlement_streams(endpoint, network, chunks)
+
+        try:
+            async for status in statuses:
+                if watch.update(status):
+                    yield status
+                if watch.done:
+                    return
+        finally:
+            await statuses.aclose()
+
+        while not watch.done:
+            pending = watch.pending
+            for i in range(0, len(pending), MAX_STATUS_BATCH):
+                result = await self._fetch_settlement_status(
+                    network, pending[i : i + MAX_STATUS_BATCH]
+                )
+                for status in result.settlements:
+                    if watch.update(status):
+                        yield status
+            if not watch.done:
+                await asyncio.sleep(poll_interval)
+
+    async def _stream_settlements(
+        self, endpoint: Endpoint, network: str, tx_hashes: Sequence[str]
+    ) -> AsyncGenerator[TransactionStatus, None]:
+        """
+        Statuses from one `/settlements/stream` subscription until it ends.
+
+        Returns quietly if the facilitator cannot stream, the stream drops
+        or it reports an error, so the caller can fall back to polling.
+        """
+        query = urlencode({"network": network, "txHashes": ",".join(tx_hashes)})
+        try:
+            # The bridge sends a keepalive every 15s; a longer silence means the stream is dead
+            async with self.session.stream(
+                "GET",
+                f"{endpoint.url}/settlements/stream?{query}",
+                timeout=httpx.Timeout(self.timeout, read=max(self.timeout, 30)),
+            ) as response:
+                if response.status_code >= 400 and not (
+                    response.status_code in STREAM_UNSUPPORTED
+                    or response.status_code >= 500
+                ):
+                    await response.aread()
+                    raise RuntimeError(
+                        f"Settlement stream failed: {response.status_code} {response.text}"
+                    )
+                if response.status_code < 400:
+                    async for event, data in aiter_sse(response.aiter_lines()):
+                        if event in ("end", "error"):
+                            break
+                        if event == "status":
+                            yield TransactionStatus.model_validate_json(data)
+        except httpx.TransportError:
+            pass  # polling picks up where the stream left off
+
+    async def _merge_settlement_streams(
+        self, endpoint: Endpoint, network: str, chunks: List[List[str]]
+    ) -> AsyncGenerator[TransactionStatus, None]:
+        """One stream per chunk of hashes, each read by its own task, merged in arrival order."""
+        updates: "asyncio.Queue[Any]" = asyncio.Queue()
+
+        async def pump(chunk: List[str]) -> None:
+            try:
+                async for status in self._stream_settlements(endpoint, network, chunk):
+                    updates.put_nowait(status)
+            except Exception as e:
+                updates.put_nowait(e)
+            else:
+                updates.put_nowait(None)
+
+        tasks = [asyncio.ensure_future(pump(chunk)) for chunk in chunks]
+        try:
+            running = len(tasks)
+            while running:
+                item = await updates.get()
+                if item is None:
+                    running -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def health_check(self, refresh: bool = False) -> ServiceInfo:
+        """
+        Check if the facilitator is responsive.
+
+        With several facilitator URLs every replica is probed concurrently:
+        replicas that fail are ejected from load balancing and ones that
+        answer are put back. The first healthy replica's info is returned.
+
+        When the client was created with `health_ttl`, the result is cached
+        and refreshed in the background like `get_supported_schemes`, which
+        turns it into periodic active probing.
+
+        Args:
+            refresh: Bypass the cache and probe the facilitator
+
+        Returns:
+            ServiceInfo with service details
+
+        Raises:
+            RuntimeError: If no facilitator replica is reachable
+        """
+        if self._health_cache is None:
+            return await self._fetch_health()
+        return await self._health_cache.get(refresh)
+
+    async def _fetch_health(self) -> ServiceInfo:
+        """Probe every facilitator replica, bypassing the cache."""
+        if len(self.endpoints) == 1:
+            return await self._probe(self.endpoints.primary)
+
+        results = await asyncio.gather(
+            *(self._probe(endpoint) for endpoint in self.endpoints.endpoints),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, ServiceInfo):
+                return result
+        errors = [result for result in results if isinstance(result, BaseException)]
+        for error in errors:
+            if isinstance(error, (TimeoutError, RuntimeError)):
+                raise error
+        raise errors[0]
+
+    async def _probe(self, endpoint: Endpoint) -> ServiceInfo:
+        """Health-probe one replica and record the outcome in the pool."""
+        timing = self._begin("GET", "/")
+        start = time.perf_counter()
+        try:
+            response = await self.session.get(
+                f"{endpoint.url}/",
+                extensions={"trace": timing.atrace} if timing is not None else None,
+            )
+            if timing is not None:
+                self._end(timing, response)
+                timing = None
+            response.raise_for_status()
+            info = self._decode(
+                "/", codec.SERVICE_INFO_ADAPTER.validate_json, response.content
+            )
+        except httpx.TimeoutException as e:
+            if timing is not None:
+                self._end(timing, error=e)
+            self.endpoints.mark(endpoint, healthy=False)
+            raise TimeoutError(f"Health check timed out after {self.timeout}s")
+        except httpx.HTTPError as e:
+            if timing is not None:
+                self._end(timing, error=e)
+            self.endpoints.mark(endpoint, healthy=False)
+            raise RuntimeError(f"Health check failed: {str(e)}") from e
+        self.endpoints.mark(endpoint, healthy=True, latency=time.perf_counter() - start)
+        return info
+
+    def endpoint_stats(self) -> List[EndpointStats]:
+        """Per-replica load-balancing statistics, to spot skew between replicas."""
+        return self.endpoints.stats()
+
+    async def close(self):
+        """Close the HTTP connection pool; settlements still pending fail."""
+        for task in list(self._settle_tasks):
+            task.cancel()
+        if self._verify_batcher is not None:
+            self._verify_batcher.close()
+        self.settlements.close()
+        for cache in (self._supported_cache, self._health_cache):
+            if cache is not None:
+                cache.cancel()
+        await self.session.aclose()
+
+    async def __aenter__(self):
+        """Async context manager entry."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self.close()
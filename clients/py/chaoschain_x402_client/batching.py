@@ -0,0 +1,278 @@
+"""
+Micro-batching of verify calls for the ChaosChain x402 client.
+
+Verify calls arriving within a short window are coalesced into one
+`POST /verify/batch` request and each caller gets its own result back.
+The request bodies are already encoded by `prepare_request`, so a batch
+body is a byte-level join of them rather than a re-serialization.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Union
+
+from pydantic import BaseModel, Field
+
+from . import codec
+from .types import VerifyResponse
+
+# Requests per /verify/batch call (the bridge's limit)
+MAX_VERIFY_BATCH = 256
+
+# Fastify's default bodyLimit; a batch body must stay under it
+MAX_BATCH_BYTES = 1024 * 1024
+
+# HTTP statuses meaning the facilitator has no batch endpoint (fall back to /verify)
+BATCH_UNSUPPORTED = frozenset({404, 405, 501})
+
+# One batch item: the VerifyResponse, or the error message the bridge returned for it
+BatchItem = Union[VerifyResponse, str]
+
+
+class BatchUnsupportedError(RuntimeError):
+    """Raised to batched callers when the facilitator has no /verify/batch."""
+
+
+class BatchPolicy(BaseModel):
+    """
+    Micro-batching of `/verify` calls.
+
+    The first call opens a batch and waits up to `window` seconds for
+    others to join; the batch is sent as soon as it is full. A lone call
+    therefore pays at most `window` of extra latency. Bodies larger than
+    `MAX_BATCH_BYTES / max_batch_size` are sent alone, so one oversized
+    request cannot push a whole batch past the bridge's body limit.
+    """
+
+    window: float = Field(
+        default=0.002, ge=0, description="Longest wait for a batch to fill (s)"
+    )
+    max_batch_size: int = Field(
+        default=64,
+        ge=1,
+        le=MAX_VERIFY_BATCH,
+        description="Requests per /verify/batch call",
+    )
+
+
+def batch_body(bodies: Sequence[bytes]) -> bytes:
+    """`{"requests": [...]}` from already-encoded /verify bodies."""
+    return b'{"requests":[' + b",".join(bodies) + b"]}"
+
+
+def parse_batch_results(
+    content: bytes,
+    validate: Callable[[Any], Any] = codec.VERIFY_RESPONSE_ADAPTER.validate_python,
+) -> List[BatchItem]:
+    """
+    Per-item results of a /verify/batch response, in request order.
+
+    `validate` builds the verify result from one decoded item; clients
+    with compact types pass `COMPACT_TYPES.verify_from_builtins`.
+    """
+    results = []
+    for item in codec.loads(content)["results"]:
+        if "isValid" in item:
+            results.append(validate(item))
+        else:
+            results.append(str(item.get("error") or "Invalid batch item"))
+    return results
+
+
+class _Batch:
+    __slots__ = ("bodies", "futures", "sealed", "timer")
+
+    def __init__(self):
+        self.bodies: List[bytes] = []
+        self.futures: List[Any] = []
+        self.sealed = False
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+def _distribute(batch: _Batch, results: Sequence[BatchItem]) -> None:
+    outcomes: Sequence[Union[BatchItem, BaseException]] = results
+    if len(results) != len(batch.futures):
+        error = RuntimeError(
+            f"Verification failed: batch of {len(batch.futures)} returned {len(results)} results"
+        )
+        outcomes = [error] * len(batch.futures)
+    for future, result in zip(batch.futures, outcomes):
+        if future.done():
+            continue  # the caller was cancelled
+        if isinstance(result, BaseException):
+            future.set_exception(result)
+        elif isinstance(result, str):
+            future.set_exception(RuntimeError(f"Verification failed: {result}"))
+        else:
+            future.set_result(result)
+
+
+class VerifyBatcher:
+    """
+    Coalesces concurrent verify calls from many threads.
+
+    There is no flusher thread: the caller that opens a batch waits for
+    the window (or for the batch to fill) and then sends it on behalf of
+    everyone who joined, while the others block on their own future.
+    """
+
+    def __init__(
+        self, send: Callable[[bytes], Sequence[BatchItem]], policy: BatchPolicy
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            send: Posts a `/verify/batch` body and returns its per-item results
+            policy: Batch window and size
+        """
+        self._send = send
+        self.window = policy.window
+        self.max_batch_size = policy.max_batch_size
+        self.max_item_bytes = MAX_BATCH_BYTES // policy.max_batch_size
+        self.enabled = True
+        self.batches = 0
+        self.batched = 0
+        self._cond = threading.Condition()
+        self._open: Optional[_Batch] = None
+
+    def submit(self, body: bytes) -> VerifyResponse:
+        """
+        Verify one encoded /verify body as part of a batch.
+
+        Raises:
+            BatchUnsupportedError: If the facilitator has no batch endpoint;
+                the batcher disables itself and the caller should fall back
+            RuntimeError: If the bridge rejected this item
+        """
+        future: Future = Future()
+        with self._cond:
+            batch = self._open
+            leader = batch is None
+            if batch is None:
+                batch = self._open = _Batch()
+            batch.bodies.append(body)
+            batch.futures.append(future)
+            if len(batch.bodies) >= self.max_batch_size:
+                self._seal(batch)
+
+            if leader:
+                deadline = time.monotonic() + self.window
+                while not batch.sealed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._seal(batch)
+                        break
+                    self._cond.wait(remaining)
+
+        if leader:
+            self._flush(batch)
+        return future.result()
+
+    def _seal(self, batch: _Batch) -> None:
+        batch.sealed = True
+        if self._open is batch:
+            self._open = None
+        self._cond.notify_all()
+
+    def _flush(self, batch: _Batch) -> None:
+        self.batches += 1
+        self.batched += len(batch.bodies)
+        try:
+            results = self._send(batch_body(batch.bodies))
+        except BaseException as e:
+            if isinstance(e, BatchUnsupportedError):
+                self.enabled = False
+            for future in batch.futures:
+                future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+        _distribute(batch, results)
+
+
+class AsyncVerifyBatcher:
+    """
+    Asyncio counterpart of VerifyBatcher.
+
+    A timer on the event loop seals the batch after the window; each
+    sealed batch is sent from its own task so the next one can fill while
+    it is in flight.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[bytes], Awaitable[Sequence[BatchItem]]],
+        policy: BatchPolicy,
+    ):
+        self._send = send
+        self.window = policy.window
+        self.max_batch_size = policy.max_batch_size
+        self.max_item_bytes = MAX_BATCH_BYTES // policy.max_batch_size
+        self.enabled = True
+        self.batches = 0
+        self.batched = 0
+        self._open: Optional[_Batch] = None
+        self._inflight: Dict[asyncio.Task, _Batch] = {}
+
+    async def submit(self, body: bytes) -> VerifyResponse:
+        """Verify one encoded /verify body as part of a batch."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self._open
+        if batch is None:
+            batch = self._open = _Batch()
+            batch.timer = loop.call_later(self.window, self._seal, batch)
+        batch.bodies.append(body)
+        batch.futures.append(future)
+        if len(batch.bodies) >= self.max_batch_size:
+            self._seal(batch)
+        return await future
+
+    def _seal(self, batch: _Batch) -> None:
+        if batch.sealed:
+            return
+        batch.sealed = True
+        if self._open is batch:
+            self._open = None
+        if batch.timer is not None:
+            batch.timer.cancel()
+        task = asyncio.ensure_future(self._flush(batch))
+        self._inflight[task] = batch
+        task.add_done_callback(lambda t: self._inflight.pop(t, None))
+
+    async def _flush(self, batch: _Batch) -> None:
+        self.batches += 1
+        self.batched += len(batch.bodies)
+        try:
+            results = await self._send(batch_body(batch.bodies))
+        except asyncio.CancelledError:
+            for future in batch.futures:
+                future.cancel()
+            raise
+        except Exception as e:
+            if isinstance(e, BatchUnsupportedError):
+                self.enabled = False
+            for future in batch.futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        _distribute(batch, results)
+
+    def close(self) -> None:
+        """Cancel batches that are waiting or in flight."""
+        batch, self._open = self._open, None
+        if batch is not None:
+            if batch.timer is not None:
+                batch.timer.cancel()
+            batches = [batch]
+        else:
+            batches = []
+        for task, inflight in list(self._inflight.items()):
+            task.cancel()
+            batches.append(inflight)
+        for batch in batches:
+            for future in batch.futures:
+                future.cancel()
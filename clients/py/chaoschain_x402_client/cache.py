@@ -0,0 +1,296 @@
+"""
+Client-side caches for the ChaosChain x402 client.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from pydantic import BaseModel, Field
+
+from .headers import header_valid_before
+from .types import VerifyResponse
+
+T = TypeVar("T")
+
+
+class CacheStats(BaseModel):
+    """
+    Counters for tuning a VerifyCache.
+    """
+
+    hits: int = Field(default=0, description="Lookups served from the cache")
+    misses: int = Field(default=0, description="Lookups that went to the facilitator")
+    evictions: int = Field(default=0, description="Entries dropped to respect max_size")
+    expirations: int = Field(
+        default=0, description="Entries dropped because they expired"
+    )
+    size: int = Field(default=0, description="Entries currently cached")
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class VerifyCache:
+    """
+    Thread-safe LRU cache of facilitator verify results.
+
+    Entries are keyed on a SHA-256 digest of the X-PAYMENT header plus the
+    canonical JSON of the PaymentRequirements. A valid result lives for
+    `ttl` seconds but never past the `validBefore` decoded from the header;
+    an invalid result lives for at most `negative_ttl` seconds so a payer
+    who tops up their balance is not locked out.
+
+    Example:
+        ```python
+        from chaoschain_x402_client import X402Client, VerifyCache
+
+        client = X402Client(
+            facilitator_url='http://localhost:8402',
+            verify_cache=VerifyCache(max_size=50_000, ttl=60),
+        )
+        ...
+        print(client.verify_cache.stats().hit_rate)
+        ```
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10_000,
+        ttl: float = 60.0,
+        negative_ttl: float = 2.0,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of entries before LRU eviction (default: 10000)
+            ttl: Lifetime of a valid result in seconds (default: 60)
+            negative_ttl: Lifetime of an invalid result in seconds (default: 2)
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: "OrderedDict[str, Tuple[float, VerifyResponse]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @staticmethod
+    def key(
+        payment_header: str, payment_requirements: Union[Dict[str, Any], bytes]
+    ) -> str:
+        """
+        Stable digest of a header and its (validated) requirements.
+
+        `payment_requirements` may also be the pre-encoded canonical bytes
+        of a PaymentRequirementsTemplate.
+        """
+        if not isinstance(payment_requirements, bytes):
+            payment_requirements = json.dumps(
+                payment_requirements, sort_keys=True, separators=(",", ":")
+            ).encode()
+        digest = hashlib.sha256(payment_header.encode())
+        digest.update(b"\0")
+        digest.update(payment_requirements)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[VerifyResponse]:
+        """Return the cached result for `key`, or None on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, response = entry
+                if now < expires_at:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return response
+                del self._entries[key]
+                self._expirations += 1
+            self._misses += 1
+            return None
+
+    def put(self, key: str, payment_header: str, response: VerifyResponse) -> None:
+        """
+        Cache a verify result, bounded by the header's validBefore.
+
+        Results for headers that have already expired are not stored.
+        """
+        lifetime = self.ttl if response.isValid else self.negative_ttl
+        valid_before = header_valid_before(payment_header)
+        if valid_before is not None:
+            lifetime = min(lifetime, valid_before - time.time())
+        if lifetime <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + lifetime, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, key: str) -> None:
+        """Drop a cached result, e.g. once its payment has been settled."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every cached result (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        """Snapshot of the hit/miss/eviction counters."""
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                size=len(self._entries),
+            )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RefreshingValue(Generic[T]):
+    """
+    A single cached value with TTL and stale-while-revalidate refresh.
+
+    Within `ttl` the cached value is returned as-is. Once it is older than
+    `ttl` but younger than `max_stale`, the stale value is still returned
+    immediately and one background thread reloads it. Only a cold cache,
+    or one older than `max_stale`, makes the caller wait for `loader`.
+    """
+
+    def __init__(self, loader: Callable[[], T], ttl: float, max_stale: float = 300.0):
+        self.loader = loader
+        self.ttl = ttl
+        self.max_stale = max(max_stale, ttl)
+        self.last_error: Optional[BaseException] = None
+        self._value: Optional[T] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def get(self, refresh: bool = False) -> T:
+        """Return the cached value, loading or scheduling a refresh as needed."""
+        age = time.monotonic() - self._loaded_at
+        if self._value is None or refresh or age >= self.max_stale:
+            return self._load()
+        if age >= self.ttl:
+            self._refresh_in_background()
+        return self._value
+
+    def peek(self) -> Optional[T]:
+        """Return whatever is cached without ever touching the network."""
+        return self._value
+
+    def invalidate(self) -> None:
+        """Force the next `get` to reload."""
+        self._value = None
+
+    def _load(self) -> T:
+        value = self.loader()
+        self._value, self._loaded_at = value, time.monotonic()
+        self.last_error = None
+        return value
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def refresh():
+            try:
+                self._load()
+            except Exception as e:
+                # Keep serving the stale value until max_stale forces a reload
+                self.last_error = e
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=refresh, name="x402-cache-refresh", daemon=True).start()
+
+
+class AsyncRefreshingValue(Generic[T]):
+    """
+    Asyncio counterpart of RefreshingValue; refreshes run as event-loop tasks.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Awaitable[T]],
+        ttl: float,
+        max_stale: float = 300.0,
+    ):
+        self.loader = loader
+        self.ttl = ttl
+        self.max_stale = max(max_stale, ttl)
+        self.last_error: Optional[BaseException] = None
+        self._value: Optional[T] = None
+        self._loaded_at = 0.0
+        self._refresh_task: Optional["asyncio.Task"] = None
+
+    async def get(self, refresh: bool = False) -> T:
+        """Return the cached value, loading or scheduling a refresh as needed."""
+        age = time.monotonic() - self._loaded_at
+        if self._value is None or refresh or age >= self.max_stale:
+            return await self._load()
+        if age >= self.ttl and (
+            self._refresh_task is None or self._refresh_task.done()
+        ):
+            self._refresh_task = asyncio.ensure_future(self._refresh())
+        return self._value
+
+    def peek(self) -> Optional[T]:
+        """Return whatever is cached without ever touching the network."""
+        return self._value
+
+    def invalidate(self) -> None:
+        """Force the next `get` to reload."""
+        self._value = None
+
+    async def _load(self) -> T:
+        value = await self.loader()
+        self._value, self._loaded_at = value, time.monotonic()
+        self.last_error = None
+        return value
+
+    async def _refresh(self) -> None:
+        try:
+            await self._load()
+        except Exception as e:
+            # Keep serving the stale value until max_stale forces a reload
+            self.last_error = e
+
+    def cancel(self) -> None:
+        """Cancel an in-flight background refresh."""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
@@ -3,9 +3,37 @@ X402 Client for Python
 Provides interface to the decentralized x402 facilitator.
 """
 
+import queue
+import threading
+import time
+from urllib.parse import urlencode
+
 import requests
-from typing import Optional
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    FrozenSet,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
 from pydantic import BaseModel, Field
+from requests.adapters import HTTPAdapter
 
 from .types import (
     PaymentRequirements,
@@ -13,17 +41,58 @@ from .types import (
     SettleResponse,
     SupportedSchemesResponse,
     ServiceInfo,
+    BatchResult,
+    SettlementStatusResponse,
+    TransactionStatus,
+)
+from . import codec
+from .templates import (
+    Payment,
+    PaymentRequirementsTemplate,
+    PreparedRequest,
+    prepare_request,
 )
+from .precheck import precheck_payment
+from .cache import RefreshingValue, VerifyCache
+from .policies import CircuitBreaker, HedgePolicy, LatencyTracker, RetryPolicy
+from .ratelimit import RateLimiter, parse_retry_after
+from .endpoints import Endpoint, EndpointPool, EndpointStats
+from .headers import header_valid_before
+from .idempotency import (
+    SingleFlight,
+    authorization_key,
+    new_reservation,
+    settlement_key,
+)
+from .settlement import MAX_STATUS_BATCH, SettlementHandle, SettlementTracker
+from .streaming import STREAM_UNSUPPORTED, SettlementWatch, iter_sse
+from .batching import (
+    BATCH_UNSUPPORTED,
+    BatchItem,
+    BatchPolicy,
+    BatchUnsupportedError,
+    VerifyBatcher,
+    parse_batch_results,
+)
+from .instrumentation import Instrumentation, RequestTiming
+from .urllib3_tracing import TracedHTTPAdapter
+
+if TYPE_CHECKING:
+    # Loads eth-keys; only needed once a verifier is passed in
+    from .shared_cache import SharedPaymentCache
+    from .signatures import SignatureVerifier
+
+T = TypeVar("T")
 
 
 class X402ClientConfig(BaseModel):
     """Configuration for the X402 client."""
 
-    facilitator_url: str = Field(..., description="URL of the facilitator service")
-    x402_version: int = Field(default=1, description="x402 protocol version")
-    timeout: int = Field(
-        default=30, description="Request timeout in seconds"
+    facilitator_url: Union[str, List[str]] = Field(
+        ..., description="URL of the facilitator service, or a list of replicas"
     )
+    x402_version: int = Field(default=1, description="x402 protocol version")
+    timeout: int = Field(default=30, description="Request timeout in seconds")
 
 
 class X402Client:
@@ -58,28 +127,159 @@ class X402Client:
 
     def __init__(
         self,
-        facilitator_url: str,
+        facilitator_url: Union[str, Sequence[str], EndpointPool],
         x402_version: int = 1,
         timeout: int = 30,
+        pool_maxsize: int = 10,
+        verify_cache: Optional[VerifyCache] = None,
+        supported_ttl: Optional[float] = 60.0,
+        health_ttl: Optional[float] = None,
+        max_stale: float = 300.0,
+        local_precheck: bool = False,
+        signature_verifier: Optional["SignatureVerifier"] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        hedge_policy: Optional[HedgePolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        load_balancing: str = EndpointPool.EWMA,
+        settlement_poll_interval: float = 2.0,
+        settlement_timeout: float = 600.0,
+        verify_batching: Optional[BatchPolicy] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        replay_guard: Optional["SharedPaymentCache"] = None,
+        compact_types: bool = False,
     ):
         """
         Initialize the X402 client.
 
         Args:
-            facilitator_url: URL of the facilitator service
+            facilitator_url: URL of the facilitator service, a list of replica
+                URLs to load-balance across, or a configured EndpointPool
             x402_version: x402 protocol version (default: 1)
             timeout: Request timeout in seconds (default: 30)
+            pool_maxsize: Keep-alive connections kept per facilitator host;
+                raise this with the batch `concurrency` (default: 10)
+            verify_cache: Opt-in cache of verify results, so retries and
+                verify-then-settle skip the facilitator round-trip (default: None)
+            supported_ttl: Seconds /supported is served from cache; None disables
+                caching (default: 60)
+            health_ttl: Seconds health info is served from cache; None keeps
+                health_check a live probe (default: None)
+            max_stale: Oldest cached /supported or health info served while a
+                background refresh runs (default: 300)
+            local_precheck: Reject undecodable, expired, not-yet-valid,
+                wrong-network, wrong-recipient or underpaid headers locally
+                instead of sending them to the facilitator (default: False)
+            signature_verifier: Recover the EIP-3009 signer locally and reject
+                forged signatures before the facilitator call (default: None)
+            connect_timeout: Seconds to establish a connection (default: `timeout`)
+            read_timeout: Seconds to wait for the response (default: `timeout`)
+            retry_policy: Retry transient failures with jittered backoff; settle
+                retries reuse one Idempotency-Key (default: None, no retries)
+            hedge_policy: Send a second /verify if the first is slower than the
+                hedge delay and take whichever answers first (default: None)
+            circuit_breaker: Fail fast with CircuitOpenError while the
+                facilitator keeps failing (default: None)
+            rate_limiter: Shape requests to stay under the bridge's per-IP
+                limit, adapt concurrency to 429/503 responses and resend a
+                429 after its `retryAfter`; share one across clients
+                (default: None)
+            load_balancing: "ewma" or "least_outstanding" selection when
+                several URLs are given (default: "ewma")
+            settlement_poll_interval: First finality poll for a pending
+                `submit_settlement`; backs off while pending (default: 2)
+            settlement_timeout: Seconds a submitted settlement may stay
+                pending before its handle fails (default: 600)
+            verify_batching: Coalesce concurrent verify calls into one
+                `/verify/batch` request; falls back to `/verify` if the
+                facilitator lacks it (default: None, one request per call)
+            instrumentation: Receives per-request latency with a pool wait /
+                DNS / connect / TLS / server / parse breakdown, in-flight
+                counts, retries, cache hits and serialization time, e.g.
+                InProcessMetrics or OpenTelemetryInstrumentation (default: None)
+            replay_guard: SharedPaymentCache through which the workers of a
+                host let only one request accept and settle each (payer,
+                nonce); replays are refused without a round-trip (default: None)
+            compact_types: Return the msgspec Structs of `compact`
+                (CompactVerifyResponse, CompactSettleResponse,
+                CompactSupportedSchemesResponse) decoded straight from the
+                response body instead of pydantic models; a fraction of
+                the memory and decode time per result, for callers that
+                keep many. Requires the `compact` extra (default: False)
         """
-        self.facilitator_url = facilitator_url.rstrip("/")
+        if isinstance(facilitator_url, EndpointPool):
+            self.endpoints = facilitator_url
+        else:
+            self.endpoints = EndpointPool(facilitator_url, strategy=load_balancing)
+        self.facilitator_url = self.endpoints.primary.url
         self.x402_version = x402_version
         self.timeout = timeout
+        self._timeouts = (
+            connect_timeout if connect_timeout is not None else timeout,
+            read_timeout if read_timeout is not None else timeout,
+        )
+        self.retry_policy = retry_policy
+        self.hedge_policy = hedge_policy
+        self.circuit_breaker = circuit_breaker
+        self.rate_limiter = rate_limiter
+        self.verify_latency = LatencyTracker()
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+        self._hedge_workers = pool_maxsize * 2
+        self.verify_cache = verify_cache
+        self.replay_guard = replay_guard
+        if compact_types:
+            from .compact import COMPACT_TYPES  # needs msgspec
+
+            self._types = COMPACT_TYPES
+        else:
+            self._types = codec.MODEL_TYPES
+        self._verify_batcher = (
+            VerifyBatcher(self._verify_batch, verify_batching)
+            if verify_batching is not None
+            else None
+        )
+        self._settle_flight = SingleFlight()
+        self._settle_pool: Optional[ThreadPoolExecutor] = None
+        self._settle_workers = pool_maxsize
+        self.settlements = SettlementTracker(
+            self._fetch_settlement_status,
+            poll_interval=settlement_poll_interval,
+            timeout=settlement_timeout,
+        )
+        self._supported_cache = (
+            RefreshingValue(self._fetch_supported_schemes, supported_ttl, max_stale)
+            if supported_ttl is not None
+            else None
+        )
+        self._health_cache = (
+            RefreshingValue(self._fetch_health, health_ttl, max_stale)
+            if health_ttl is not None
+            else None
+        )
+        self._supported_index: Optional[
+            Tuple[SupportedSchemesResponse, FrozenSet[Tuple[str, str]]]
+        ] = None
+        self.local_precheck = local_precheck
+        self.signature_verifier = signature_verifier
+        self.instrumentation = instrumentation
         self.session = requests.Session()
         self.session.headers.update({"Content-Type": "application/json"})
+        # The traced adapter times connection setup; only pay for it when instrumented
+        adapter = (TracedHTTPAdapter if instrumentation is not None else HTTPAdapter)(
+            pool_maxsize=pool_maxsize
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
 
     def verify_payment(
         self,
         payment_header: str,
-        payment_requirements: dict,
+        payment_requirements: Union[
+            dict, PaymentRequirements, PaymentRequirementsTemplate
+        ],
+        reservation: Optional[int] = None,
     ) -> VerifyResponse:
         """
         Verify an x402 payment via the decentralized facilitator.
@@ -88,7 +288,14 @@ class X402Client:
 
         Args:
             payment_header: Base64 encoded X-PAYMENT header
-            payment_requirements: Payment requirements from the resource server
+            payment_requirements: Payment requirements from the resource server,
+                as a dict, a pre-validated PaymentRequirements, or a
+                PaymentRequirementsTemplate (only the header is spliced in)
+            reservation: With a `replay_guard`, the token (from
+                `new_reservation()`) a valid payment is reserved under; only
+                a call with the same token may verify it again or release
+                it. Default: a fresh token, so the reservation ends when the
+                payment is settled or the reservation expires
 
         Returns:
             VerifyResponse with consensus proof
@@ -114,33 +321,178 @@ class X402Client:
                 print('Payment verified!', result.consensusProof)
             ```
         """
-        # Validate payment requirements
-        requirements = PaymentRequirements(**payment_requirements)
+        rejection = self._precheck(payment_header, payment_requirements)
+        if rejection is not None:
+            return rejection
+
+        guard_key = None
+        if self.replay_guard is not None:
+            guard_key = self._authorization_key(payment_header, payment_requirements)
+            if reservation is None:
+                reservation = new_reservation()
+            reason = (
+                self.replay_guard.replay_reason(guard_key, reservation)
+                if guard_key
+                else None
+            )
+            if reason is not None:
+                return self._types.verify(isValid=False, invalidReason=reason)
+
+        # Validate and encode payment requirements (templates are pre-encoded)
+        body, requirements_key = self._encode(
+            "/verify", payment_header, payment_requirements
+        )
 
-        payload = {
-            "x402Version": self.x402_version,
-            "paymentHeader": payment_header,
-            "paymentRequirements": requirements.model_dump(),
-        }
+        cache_key = None
+        if self.verify_cache is not None:
+            cache_key = self.verify_cache.key(payment_header, requirements_key)
+            cached = self.verify_cache.get(cache_key)
+            if self.instrumentation is not None:
+                self.instrumentation.cache_lookup("verify", cached is not None)
+            if cached is not None:
+                return self._reserve(
+                    guard_key, reservation, self._types.as_verify(cached)
+                )
 
         try:
-            response = self.session.post(
-                f"{self.facilitator_url}/verify",
-                json=payload,
-                timeout=self.timeout,
-            )
-            response.raise_for_status()
-            data = response.json()
-            return VerifyResponse(**data)
+            result = self._verify(body)
         except requests.exceptions.Timeout:
             raise TimeoutError(f"Verification request timed out after {self.timeout}s")
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"Verification failed: {str(e)}") from e
 
+        if self.verify_cache is not None and cache_key is not None:
+            self.verify_cache.put(cache_key, payment_header, result)
+        return self._reserve(guard_key, reservation, result)
+
+    def _authorization_key(
+        self, payment_header: str, payment_requirements
+    ) -> Optional[str]:
+        """Replay-guard key of the authorization, or None if the header is undecodable."""
+        try:
+            return authorization_key(payment_header, payment_requirements)
+        except ValueError:
+            return None
+
+    def release_payment(
+        self,
+        payment_header: str,
+        payment_requirements: Union[
+            dict, PaymentRequirements, PaymentRequirementsTemplate
+        ],
+        reservation: int,
+    ) -> None:
+        """
+        Drop the host-wide reservation `verify_payment` took under
+        `reservation` for a payment that will not be settled, e.g. because
+        the handler failed, so the payer can retry with the same X-PAYMENT.
+        A no-op without a `replay_guard`, or if another request holds the
+        payment.
+        """
+        if self.replay_guard is None:
+            return
+        guard_key = self._authorization_key(payment_header, payment_requirements)
+        if guard_key is not None:
+            self.replay_guard.unreserve(guard_key, reservation)
+
+    def _reserve(
+        self,
+        guard_key: Optional[str],
+        reservation: Optional[int],
+        result: VerifyResponse,
+    ) -> VerifyResponse:
+        """Reserve a valid payment host-wide, or refuse it if another request holds it."""
+        guard = self.replay_guard
+        if (
+            guard is None
+            or guard_key is None
+            or reservation is None
+            or not result.isValid
+        ):
+            return result
+        reason = guard.reserve(guard_key, reservation)
+        if reason is not None:
+            return self._types.verify(isValid=False, invalidReason=reason)
+        return result
+
+    def _verify(self, body: bytes) -> VerifyResponse:
+        batcher = self._verify_batcher
+        if (
+            batcher is not None
+            and batcher.enabled
+            and len(body) <= batcher.max_item_bytes
+        ):
+            try:
+                return batcher.submit(body)
+            except BatchUnsupportedError:
+                pass  # the batcher has disabled itself; send this one alone
+        response = self._post("/verify", body, hedge=True)
+        response.raise_for_status()
+        return self._decode("/verify", self._types.decode_verify, response.content)
+
+    def _verify_batch(self, body: bytes) -> List[BatchItem]:
+        """POST a coalesced batch to /verify/batch (called by the batcher)."""
+        response = self._post("/verify/batch", body)
+        if response.status_code in BATCH_UNSUPPORTED:
+            raise BatchUnsupportedError(
+                f"Facilitator does not support /verify/batch (HTTP {response.status_code})"
+            )
+        response.raise_for_status()
+        return self._decode("/verify/batch", self._parse_batch, response.content)
+
+    def _parse_batch(self, content: bytes) -> List[BatchItem]:
+        return parse_batch_results(content, self._types.verify_from_builtins)
+
+    def _encode(
+        self, route: str, payment_header: str, payment_requirements
+    ) -> PreparedRequest:
+        """`prepare_request`, timed when instrumented."""
+        if self.instrumentation is None:
+            return prepare_request(
+                payment_header, payment_requirements, self.x402_version
+            )
+        start = time.perf_counter()
+        prepared = prepare_request(
+            payment_header, payment_requirements, self.x402_version
+        )
+        self.instrumentation.serialization("encode", route, time.perf_counter() - start)
+        return prepared
+
+    def _decode(self, route: str, parse: Callable[[Any], T], content: bytes) -> T:
+        """Parse a response body, timed when instrumented."""
+        if self.instrumentation is None:
+            return parse(content)
+        start = time.perf_counter()
+        result = parse(content)
+        self.instrumentation.serialization("decode", route, time.perf_counter() - start)
+        return result
+
+    def _begin(self, method: str, route: str) -> Optional[RequestTiming]:
+        """Start timing a request, if instrumented."""
+        if self.instrumentation is None:
+            return None
+        self.instrumentation.request_started(method, route)
+        timing = RequestTiming(method, route)
+        timing.activate()
+        return timing
+
+    def _end(
+        self,
+        timing: RequestTiming,
+        response: Optional[requests.Response] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        timing.deactivate()
+        timing.finish(response.status_code if response is not None else None, error)
+        if self.instrumentation is not None:
+            self.instrumentation.request_finished(timing)
+
     def settle_payment(
         self,
         payment_header: str,
-        payment_requirements: dict,
+        payment_requirements: Union[
+            dict, PaymentRequirements, PaymentRequirementsTemplate
+        ],
     ) -> SettleResponse:
         """
         Settle an x402 payment via the decentralized facilitator.
@@ -148,9 +500,19 @@ class X402Client:
         The facilitator uses BFT consensus across a CRE DON to execute
         the on-chain settlement transaction.
 
+        The request carries an `Idempotency-Key` derived from the whole
+        signed authorization and the requirements' recipient and amount
+        (see `settlement_key`), and concurrent calls for the same payment
+        are merged into one request whose SettleResponse every caller
+        receives.
+        With a `replay_guard`, an authorization that another request is
+        settling or has settled is refused with `success=False` instead.
+
         Args:
             payment_header: Base64 encoded X-PAYMENT header
-            payment_requirements: Payment requirements from the resource server
+            payment_requirements: Payment requirements from the resource server,
+                as a dict, a pre-validated PaymentRequirements, or a
+                PaymentRequirementsTemplate (only the header is spliced in)
 
         Returns:
             SettleResponse with transaction hash and consensus proof
@@ -176,33 +538,422 @@ class X402Client:
                 print('Payment settled!', result.txHash)
             ```
         """
-        # Validate payment requirements
-        requirements = PaymentRequirements(**payment_requirements)
+        rejection = self._precheck(payment_header, payment_requirements)
+        if rejection is not None:
+            return self._types.settle(
+                success=False,
+                error=rejection.invalidReason,
+                timestamp=rejection.timestamp,
+            )
+
+        # Validate and encode payment requirements (templates are pre-encoded)
+        body, requirements_key = self._encode(
+            "/settle", payment_header, payment_requirements
+        )
+
+        authorization = self._authorization_key(payment_header, payment_requirements)
+        try:
+            key = settlement_key(payment_header, payment_requirements)
+        except ValueError:
+            # An undecodable header will be rejected by the facilitator, but
+            # its key must still be stable across retries
+            key = VerifyCache.key(payment_header, requirements_key)
 
-        payload = {
-            "x402Version": self.x402_version,
-            "paymentHeader": payment_header,
-            "paymentRequirements": requirements.model_dump(),
-        }
+        guard: Optional["SharedPaymentCache"] = None
+        if self.replay_guard is not None and authorization is not None:
+            reason = self.replay_guard.claim(authorization)
+            if reason is not None:
+                return self._types.settle(success=False, error=reason)
+            guard, claimed = self.replay_guard, authorization
 
+        # Concurrent settles of the same authorization share one request
         try:
-            response = self.session.post(
-                f"{self.facilitator_url}/settle",
-                json=payload,
-                timeout=self.timeout,
+            result = self._settle_flight.do(key, lambda: self._settle(key, body))
+        except BaseException:
+            if guard is not None:
+                guard.release(claimed)
+            raise
+        if guard is not None:
+            if result.success:
+                guard.settled(claimed, header_valid_before(payment_header))
+            else:
+                guard.release(claimed)
+
+        if self.verify_cache is not None and result.success:
+            # The nonce is spent, so a cached valid result is now stale
+            self.verify_cache.invalidate(
+                self.verify_cache.key(payment_header, requirements_key)
             )
+        return result
+
+    def submit_settlement(
+        self,
+        payment_header: str,
+        payment_requirements: Union[
+            dict, PaymentRequirements, PaymentRequirementsTemplate
+        ],
+    ) -> SettlementHandle:
+        """
+        Settle a payment without blocking the caller.
+
+        The /settle request runs on a background thread. If the bridge
+        reports the settlement as `pending`, the handle is tracked to
+        finality by the client's shared polling loop, which batches all
+        outstanding settlements into `/settlements/status` requests.
+
+        Args:
+            payment_header: Base64 encoded X-PAYMENT header
+            payment_requirements: Payment requirements from the resource server
+
+        Returns:
+            SettlementHandle that resolves to the final SettleResponse
+
+        Example:
+            ```python
+            result = client.verify_payment(header, requirements)
+            if result.isValid:
+                handle = client.submit_settlement(header, requirements)
+                serve_content()
+                final = handle.wait(timeout=120)
+                print(final.status, final.txHash)
+            ```
+        """
+        if self._settle_pool is None:
+            self._settle_pool = ThreadPoolExecutor(
+                max_workers=self._settle_workers, thread_name_prefix="x402-settle"
+            )
+        handle = SettlementHandle()
+
+        def submitted(future) -> None:
+            try:
+                response = future.result()
+            except Exception as e:
+                handle._fail(e)
+                return
+            if handle._submitted(response):
+                self.settlements.track(handle, response)
+
+        self._settle_pool.submit(
+            self.settle_payment, payment_header, payment_requirements
+        ).add_done_callback(submitted)
+        return handle
+
+    def _settle(self, key: str, body: bytes) -> SettleResponse:
+        """POST /settle with a deterministic Idempotency-Key."""
+        try:
+            # The same key on every retry (and from every client), so the
+            # bridge's idempotency store answers repeats instead of settling twice
+            response = self._post("/settle", body, {"Idempotency-Key": key})
             response.raise_for_status()
-            data = response.json()
-            return SettleResponse(**data)
+            return self._decode("/settle", self._types.decode_settle, response.content)
         except requests.exceptions.Timeout:
             raise TimeoutError(f"Settlement request timed out after {self.timeout}s")
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"Settlement failed: {str(e)}") from e
 
-    def get_supported_schemes(self) -> SupportedSchemesResponse:
+    def _post(
+        self,
+        path: str,
+        body: bytes,
+        headers: Optional[dict] = None,
+        hedge: bool = False,
+    ) -> requests.Response:
+        """
+        POST to the facilitator with the configured retry, hedging,
+        circuit-breaker and rate-limit policies. Transport errors propagate
+        as requests exceptions once retries are exhausted.
+        """
+        attempts = self.retry_policy.max_attempts if self.retry_policy else 1
+        retry_status = self.retry_policy.retry_on_status if self.retry_policy else ()
+        attempt = throttled = 0
+
+        while True:
+            # A half-open trial that ends without an outcome (429, limiter
+            # refusal, cancellation) is released in `finally`
+            trial = (
+                self.circuit_breaker.check()
+                if self.circuit_breaker is not None
+                else False
+            )
+
+            last_attempt = attempt + 1 >= attempts
+            try:
+                if hedge and self.hedge_policy is not None:
+                    response = self._send_hedged(path, body, headers)
+                else:
+                    response = self._send(path, body, headers)
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout,
+            ) as e:
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.record_failure()
+                if last_attempt:
+                    raise
+                reason = type(e).__name__
+            else:
+                # A 429 is resent once the limiter's retryAfter pause is
+                # over; it does not use up a retry attempt
+                if self._retry_throttled(path, response, throttled):
+                    throttled += 1
+                    continue
+                transient = (
+                    response.status_code >= 500 or response.status_code in retry_status
+                )
+                if self.circuit_breaker is not None:
+                    if transient:
+                        self.circuit_breaker.record_failure()
+                    else:
+                        self.circuit_breaker.record_success()
+                if last_attempt or response.status_code not in retry_status:
+                    return response
+                reason = str(response.status_code)
+            finally:
+                if trial and self.circuit_breaker is not None:
+                    self.circuit_breaker.release_trial()
+
+            if self.instrumentation is not None:
+                self.instrumentation.retry(path, reason)
+            if self.retry_policy is not None:
+                time.sleep(self.retry_policy.backoff(attempt))
+            attempt += 1
+
+    def _retry_throttled(
+        self, path: str, response: requests.Response, throttled: int
+    ) -> bool:
+        """Whether to resend a request the facilitator answered with 429."""
+        if (
+            response.status_code != 429
+            or self.rate_limiter is None
+            or throttled >= self.rate_limiter.policy.retry_throttled
+        ):
+            return False
+        if self.instrumentation is not None:
+            self.instrumentation.retry(path, "429")
+        return True
+
+    def _send(
+        self,
+        path: str,
+        body: bytes,
+        headers: Optional[dict] = None,
+        endpoint: Optional[Endpoint] = None,
+        exclude: Optional[Endpoint] = None,
+    ) -> requests.Response:
+        """A single POST, recording its latency for hedging and load balancing."""
+        limiter = self.rate_limiter
+        try:
+            permit = limiter.acquire(path) if limiter is not None else None
+        except BaseException:
+            # No permit (RateLimitedError, cancelled): hand back a pre-acquired endpoint
+            if endpoint is not None:
+                self.endpoints.abandon(endpoint)
+            raise
+        if endpoint is None:
+            endpoint = self.endpoints.acquire(exclude)
+        timing = self._begin("POST", path)
+        start = time.perf_counter()
+        try:
+            response = self.session.post(
+                f"{endpoint.url}{path}",
+                data=body,
+                headers=headers,
+                timeout=self._timeouts,
+            )
+        except requests.exceptions.RequestException as e:
+            self.endpoints.release(endpoint, None, ok=False)
+            self._release_permit(permit)
+            if timing is not None:
+                self._end(timing, error=e)
+            raise
+        except BaseException as e:
+            # Not a transport failure (e.g. KeyboardInterrupt): not the endpoint's fault
+            self.endpoints.abandon(endpoint)
+            if limiter is not None and permit is not None:
+                limiter.abandon(permit)
+            if timing is not None:
+                self._end(timing, error=e)
+            raise
+        elapsed = time.perf_counter() - start
+        self._release_permit(permit, response)
+        if timing is not None:
+            self._end(timing, response)
+        self.endpoints.release(endpoint, elapsed, ok=response.status_code < 500)
+        if response.ok and path == "/verify":
+            self.verify_latency.record(elapsed)
+        return response
+
+    def _send_hedged(
+        self, path: str, body: bytes, headers: Optional[dict] = None
+    ) -> requests.Response:
+        """Send a backup request if the first is slower than the hedge delay."""
+        if self.hedge_policy is None:
+            return self._send(path, body, headers)
+        delay = self.verify_latency.hedge_delay(self.hedge_policy)
+        if delay is None:
+            return self._send(path, body, headers)
+
+        if self._hedge_pool is None:
+            self._hedge_pool = ThreadPoolExecutor(
+                max_workers=self._hedge_workers, thread_name_prefix="x402-hedge"
+            )
+        endpoint = self.endpoints.acquire()
+        first = self._hedge_pool.submit(self._send, path, body, headers, endpoint)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+
+        # Hedge on another replica if there is one. The slower request is
+        # left to finish in the background and ignored.
+        second = self._hedge_pool.submit(
+            self._send, path, body, headers, exclude=endpoint
+        )
+        completed = as_completed([first, second])
+        try:
+            return next(completed).result()
+        except requests.exceptions.RequestException:
+            return next(completed).result()
+
+    def verify_many(
+        self,
+        payments: Iterable[Payment],
+        concurrency: int = 10,
+    ) -> List[BatchResult]:
+        """
+        Verify many payments concurrently and return results in input order.
+
+        Args:
+            payments: Iterable of (payment_header, payment_requirements) pairs
+            concurrency: Maximum number of requests in flight (default: 10)
+
+        Returns:
+            One BatchResult per payment, ordered like the input. A payment
+            that raises is reported in `BatchResult.error`; the rest of the
+            batch still runs.
+
+        Example:
+            ```python
+            results = client.verify_many(
+                [(header_a, requirements), (header_b, requirements)],
+                concurrency=32,
+            )
+            valid = [r.index for r in results if r.ok and r.result.isValid]
+            ```
+        """
+        results = list(self.verify_as_completed(payments, concurrency))
+        results.sort(key=lambda r: r.index)
+        return results
+
+    def verify_as_completed(
+        self,
+        payments: Iterable[Payment],
+        concurrency: int = 10,
+    ) -> Iterator[BatchResult]:
+        """
+        Verify many payments concurrently, yielding results as they complete.
+
+        Args:
+            payments: Iterable of (payment_header, payment_requirements) pairs
+            concurrency: Maximum number of requests in flight (default: 10)
+
+        Yields:
+            BatchResult for each payment in completion order; use
+            `BatchResult.index` to map it back to the input.
+        """
+        return self._run_many(self.verify_payment, payments, concurrency)
+
+    def settle_many(
+        self,
+        payments: Iterable[Payment],
+        concurrency: int = 10,
+    ) -> List[BatchResult]:
+        """
+        Settle many payments concurrently and return results in input order.
+
+        Args:
+            payments: Iterable of (payment_header, payment_requirements) pairs
+            concurrency: Maximum number of requests in flight (default: 10)
+
+        Returns:
+            One BatchResult per payment, ordered like the input
+        """
+        results = list(self.settle_as_completed(payments, concurrency))
+        results.sort(key=lambda r: r.index)
+        return results
+
+    def settle_as_completed(
+        self,
+        payments: Iterable[Payment],
+        concurrency: int = 10,
+    ) -> Iterator[BatchResult]:
+        """
+        Settle many payments concurrently, yielding results as they complete.
+
+        Args:
+            payments: Iterable of (payment_header, payment_requirements) pairs
+            concurrency: Maximum number of requests in flight (default: 10)
+
+        Yields:
+            BatchResult for each payment in completion order
+        """
+        return self._run_many(self.settle_payment, payments, concurrency)
+
+    def _run_many(
+        self,
+        call: Callable[[str, dict], object],
+        payments: Iterable[Payment],
+        concurrency: int,
+    ) -> Iterator[BatchResult]:
+        """Run `call` over payments with at most `concurrency` in flight."""
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        def run(index: int, header: str, requirements: Any) -> BatchResult:
+            # Results are validated already and may be compact Structs
+            try:
+                return BatchResult.model_construct(
+                    index=index, result=call(header, requirements)
+                )
+            except Exception as e:
+                return BatchResult.model_construct(index=index, error=str(e))
+
+        pending: Set[Future] = set()
+        # The input is consumed lazily so huge batches never queue up in memory
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for index, (header, requirements) in enumerate(payments):
+                if len(pending) >= concurrency:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+                pending.add(pool.submit(run, index, header, requirements))
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+    def requirements_template(
+        self,
+        payment_requirements: Union[dict, PaymentRequirements],
+    ) -> PaymentRequirementsTemplate:
+        """
+        Validate and pre-encode per-endpoint requirements for this client.
+
+        Build one template per resource at startup and pass it to
+        verify_payment/settle_payment instead of the requirements dict.
+        """
+        return PaymentRequirementsTemplate(payment_requirements, self.x402_version)
+
+    def get_supported_schemes(self, refresh: bool = False) -> SupportedSchemesResponse:
         """
         Get supported payment schemes and networks from the facilitator.
 
+        Served from cache within `supported_ttl`; a stale entry is returned
+        immediately while it is refreshed in the background.
+
+        Args:
+            refresh: Bypass the cache and fetch from the facilitator
+
         Returns:
             SupportedSchemesResponse with list of (scheme, network) pairs
 
@@ -213,28 +964,321 @@ class X402Client:
                 print(f"Scheme: {kind.scheme}, Network: {kind.network}")
             ```
         """
+        if self._supported_cache is None:
+            return self._fetch_supported_schemes()
+        return self._supported_cache.get(refresh)
+
+    def supports(self, scheme: str, network: str) -> bool:
+        """
+        Check whether the facilitator supports a (scheme, network) pair.
+
+        Lookups are O(1) against an index built from the cached `kinds`
+        list, so once /supported has been fetched this never waits on the
+        network (a stale list is refreshed in the background).
+
+        Example:
+            ```python
+            if not client.supports('exact', requirements['network']):
+                return reject_early()
+            ```
+        """
+        supported = self.get_supported_schemes()
+        return (scheme, network) in self._index_supported(supported)
+
+    def _index_supported(
+        self, supported: SupportedSchemesResponse
+    ) -> FrozenSet[Tuple[str, str]]:
+        """(scheme, network) set for a /supported response, rebuilt only on change."""
+        index = self._supported_index
+        if index is None or index[0] is not supported:
+            index = (
+                supported,
+                frozenset((k.scheme, k.network) for k in supported.kinds),
+            )
+            self._supported_index = index
+        return index[1]
+
+    def _precheck(
+        self, payment_header: str, payment_requirements
+    ) -> Optional[VerifyResponse]:
+        """Local rejection for an obviously invalid payment, if enabled."""
+        rejection = None
+        if self.local_precheck:
+            supported = None
+            cached = (
+                self._supported_cache.peek()
+                if self._supported_cache is not None
+                else None
+            )
+            if cached is not None:
+                # Only use /supported if it is already cached; never fetch here
+                supported = self._index_supported(cached)
+            rejection = precheck_payment(
+                payment_header, payment_requirements, supported=supported
+            )
+        if rejection is None and self.signature_verifier is not None:
+            rejection = self.signature_verifier.verify(
+                payment_header, payment_requirements
+            )
+        return self._types.as_verify(rejection) if rejection is not None else None
+
+    def _get(self, path: str) -> requests.Response:
+        """A GET, resent after a 429 if rate limited."""
+        throttled = 0
+        response = self._get_once(path)
+        while self._retry_throttled(path.split("?", 1)[0], response, throttled):
+            throttled += 1
+            response = self._get_once(path)
+        return response
+
+    def _get_once(self, path: str) -> requests.Response:
+        """A single GET, recorded against the endpoint it went to."""
+        route = path.split("?", 1)[0]
+        permit = (
+            self.rate_limiter.acquire(route) if self.rate_limiter is not None else None
+        )
+        endpoint = self.endpoints.acquire()
+        timing = self._begin("GET", route)
+        start = time.perf_counter()
         try:
-            response = self.session.get(
-                f"{self.facilitator_url}/supported",
-                timeout=self.timeout,
+            response = self.session.get(f"{endpoint.url}{path}", timeout=self._timeouts)
+        except requests.exceptions.RequestException as e:
+            self.endpoints.release(endpoint, None, ok=False)
+            self._release_permit(permit)
+            if timing is not None:
+                self._end(timing, error=e)
+            raise
+        self._release_permit(permit, response)
+        if timing is not None:
+            self._end(timing, response)
+        self.endpoints.release(
+            endpoint, time.perf_counter() - start, ok=response.status_code < 500
+        )
+        return response
+
+    def _release_permit(
+        self, permit: Optional[int], response: Optional[requests.Response] = None
+    ) -> None:
+        """Hand a rate-limit permit back with the outcome of its request."""
+        if permit is None or self.rate_limiter is None:
+            return
+        if response is None:
+            self.rate_limiter.release(permit)
+        elif response.status_code == 429:
+            self.rate_limiter.release(
+                permit, 429, parse_retry_after(response.headers, response.content)
             )
+        else:
+            self.rate_limiter.release(permit, response.status_code)
+
+    def _fetch_supported_schemes(self) -> SupportedSchemesResponse:
+        """Fetch /supported from the facilitator, bypassing the cache."""
+        try:
+            response = self._get("/supported")
             response.raise_for_status()
-            data = response.json()
-            return SupportedSchemesResponse(**data)
+            return self._decode(
+                "/supported", self._types.decode_supported, response.content
+            )
         except requests.exceptions.Timeout:
             raise TimeoutError(f"Request timed out after {self.timeout}s")
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"Failed to get supported schemes: {str(e)}") from e
 
-    def health_check(self) -> ServiceInfo:
+    def _fetch_settlement_status(
+        self, network: str, tx_hashes: List[str]
+    ) -> SettlementStatusResponse:
+        """Look up the finality of settlement transactions in one request."""
+        query = urlencode({"network": network, "txHashes": ",".join(tx_hashes)})
+        try:
+            response = self._get(f"/settlements/status?{query}")
+            response.raise_for_status()
+            return self._decode(
+                "/settlements/status",
+                codec.SETTLEMENT_STATUS_ADAPTER.validate_json,
+                response.content,
+            )
+        except requests.exceptions.Timeout:
+            raise TimeoutError(f"Request timed out after {self.timeout}s")
+        except requests.exceptions.RequestException as e:
+            raise RuntimeError(f"Failed to get settlement status: {str(e)}") from e
+
+    def watch_settlements(
+        self,
+        tx_hashes: Iterable[str],
+        network: str,
+        poll_interval: float = 2.0,
+    ) -> Iterator[TransactionStatus]:
+        """
+        Follow settlement transactions until they are all final.
+
+        Subscribes to the facilitator's `/settlements/stream` server-sent
+        events, so up to MAX_STATUS_BATCH (100) transactions share one
+        connection; larger sets open one stream per 100 and merge them. If
+        the facilitator has no stream endpoint or a stream drops or reports
+        an error, it falls back to batched `/settlements/status` polling
+        without repeating transitions already yielded.
+
+        Args:
+            tx_hashes: Transaction hashes to follow (all on `network`)
+            network: Network the transactions were sent on
+            poll_interval: Seconds between polls in fallback mode (default: 2)
+
+        Yields:
+            TransactionStatus on every transition (first status seen, new
+            confirmation count, or final `confirmed` / `failed`)
+
+        Example:
+            ```python
+            for update in client.watch_settlements([tx_a, tx_b], 'base-sepolia'):
+                print(update.txHash, update.status, update.confirmations)
+            ```
+        """
+        watch = SettlementWatch(tx_hashes)
+        endpoint = self.endpoints.pick()
+        # The bridge takes at most MAX_STATUS_BATCH hashes per stream, like /settlements/status
+        pending = watch.pending
+        chunks = [
+            pending[i : i + MAX_STATUS_BATCH]
+            for i in range(0, len(pending), MAX_STATUS_BATCH)
+        ]
+        if len(chunks) == 1:
+            statuses = self._stream_settlements(endpoint, network, chunks[0])
+        else:
+            statuses = self._merge_settlement_streams(endpoint, network, chunks)
+
+        try:
+            for status in statuses:
+                if watch.update(status):
+                    yield status
+                if watch.done:
+                    return
+        finally:
+            statuses.close()
+
+        while not watch.done:
+            pending = watch.pending
+            for i in range(0, len(pending), MAX_STATUS_BATCH):
+                result = self._fetch_settlement_status(
+                    network, pending[i : i + MAX_STATUS_BATCH]
+                )
+                for status in result.settlements:
+                    if watch.update(status):
+                        yield status
+            if not watch.done:
+                time.sleep(poll_interval)
+
+    def _stream_settlements(
+        self,
+        endpoint: Endpoint,
+        network: str,
+        tx_hashes: Sequence[str],
+        opened: Optional[List[requests.Response]] = None,
+    ) -> Generator[TransactionStatus, None, None]:
+        """
+        Statuses from one `/settlements/stream` subscription until it ends.
+
+        Returns quietly if the facilitator cannot stream, the stream drops
+        or it reports an error, so the caller can fall back to polling.
+        Streaming responses are appended to `opened` for closing from
+        another thread.
+        """
+        query = urlencode({"network": network, "txHashes": ",".join(tx_hashes)})
+        try:
+            # The bridge sends a keepalive every 15s; a longer silence means the stream is dead
+            response = self.session.get(
+                f"{endpoint.url}/settlements/stream?{query}",
+                stream=True,
+                timeout=(self._timeouts[0], max(self._timeouts[1], 30)),
+            )
+            if opened is not None:
+                opened.append(response)
+            with response:
+                if response.status_code >= 400 and not (
+                    response.status_code in STREAM_UNSUPPORTED
+                    or response.status_code >= 500
+                ):
+                    raise RuntimeError(
+                        f"Settlement stream failed: {response.status_code} {response.text}"
+                    )
+                if response.status_code < 400:
+                    response.encoding = "utf-8"
+                    # chunk_size=None hands over each chunk as soon as it arrives
+                    lines = response.iter_lines(chunk_size=None, decode_unicode=True)  # type: ignore[call-overload]
+                    for event, data in iter_sse(lines):
+                        if event in ("end", "error"):
+                            break
+                        if event == "status":
+                            yield TransactionStatus.model_validate_json(data)
+        except (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.ChunkedEncodingError,
+            requests.exceptions.Timeout,
+        ):
+            pass  # polling picks up where the stream left off
+
+    def _merge_settlement_streams(
+        self, endpoint: Endpoint, network: str, chunks: List[List[str]]
+    ) -> Generator[TransactionStatus, None, None]:
+        """One stream per chunk of hashes, each read on its own thread, merged in arrival order."""
+        updates: "queue.Queue[Any]" = queue.Queue()
+        opened: List[requests.Response] = []
+        stopped = threading.Event()
+
+        def pump(chunk: List[str]) -> None:
+            try:
+                for status in self._stream_settlements(
+                    endpoint, network, chunk, opened
+                ):
+                    updates.put(status)
+            except Exception as e:
+                # Reading a response closed by the consumer fails in various ways
+                updates.put(None if stopped.is_set() else e)
+            else:
+                updates.put(None)
+
+        threads = [
+            threading.Thread(
+                target=pump, args=(chunk,), name="x402-settlement-stream", daemon=True
+            )
+            for chunk in chunks
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            running = len(threads)
+            while running:
+                item = updates.get()
+                if item is None:
+                    running -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            stopped.set()
+            for response in list(opened):
+                response.close()
+
+    def health_check(self, refresh: bool = False) -> ServiceInfo:
         """
         Check if the facilitator is responsive.
 
+        With several facilitator URLs every replica is probed: replicas that
+        fail are ejected from load balancing and ones that answer are put
+        back. The first healthy replica's info is returned.
+
+        When the client was created with `health_ttl`, the result is cached
+        and refreshed in the background like `get_supported_schemes`, which
+        turns it into periodic active probing.
+
+        Args:
+            refresh: Bypass the cache and probe the facilitator
+
         Returns:
             ServiceInfo with service details
 
         Raises:
-            RuntimeError: If the facilitator is unreachable
+            RuntimeError: If no facilitator replica is reachable
 
         Example:
             ```python
@@ -245,21 +1289,73 @@ class X402Client:
                 print("Facilitator is down!")
             ```
         """
+        if self._health_cache is None:
+            return self._fetch_health()
+        return self._health_cache.get(refresh)
+
+    def _fetch_health(self) -> ServiceInfo:
+        """Probe every facilitator replica, bypassing the cache."""
+        if len(self.endpoints) == 1:
+            return self._probe(self.endpoints.primary)
+
+        info: Optional[ServiceInfo] = None
+        errors: List[Exception] = []
+        for endpoint in self.endpoints.endpoints:
+            try:
+                result = self._probe(endpoint)
+            except (TimeoutError, RuntimeError) as e:
+                errors.append(e)
+            else:
+                info = info or result
+        if info is None:
+            raise errors[-1]
+        return info
+
+    def _probe(self, endpoint: Endpoint) -> ServiceInfo:
+        """Health-probe one replica and record the outcome in the pool."""
+        timing = self._begin("GET", "/")
+        start = time.perf_counter()
         try:
-            response = self.session.get(
-                f"{self.facilitator_url}/",
-                timeout=self.timeout,
-            )
+            response = self.session.get(f"{endpoint.url}/", timeout=self._timeouts)
+            if timing is not None:
+                self._end(timing, response)
+                timing = None
             response.raise_for_status()
-            data = response.json()
-            return ServiceInfo(**data)
-        except requests.exceptions.Timeout:
+            info = self._decode(
+                "/", codec.SERVICE_INFO_ADAPTER.validate_json, response.content
+            )
+        except requests.exceptions.Timeout as e:
+            if timing is not None:
+                self._end(timing, error=e)
+            self.endpoints.mark(endpoint, healthy=False)
             raise TimeoutError(f"Health check timed out after {self.timeout}s")
         except requests.exceptions.RequestException as e:
+            if timing is not None:
+                self._end(timing, error=e)
+            self.endpoints.mark(endpoint, healthy=False)
             raise RuntimeError(f"Health check failed: {str(e)}") from e
+        self.endpoints.mark(endpoint, healthy=True, latency=time.perf_counter() - start)
+        return info
+
+    def endpoint_stats(self) -> List[EndpointStats]:
+        """
+        Per-replica load-balancing statistics, to spot skew between replicas.
+
+        Example:
+            ```python
+            for stats in client.endpoint_stats():
+                print(stats.url, stats.healthy, stats.ewma_latency_ms, stats.requests)
+            ```
+        """
+        return self.endpoints.stats()
 
     def close(self):
-        """Close the HTTP session."""
+        """Close the HTTP session; settlements still pending fail."""
+        self.settlements.close()
+        if self._settle_pool is not None:
+            self._settle_pool.shutdown(wait=False)
+        if self._hedge_pool is not None:
+            self._hedge_pool.shutdown(wait=False)
         self.session.close()
 
     def __enter__(self):
@@ -269,4 +1365,3 @@ class X402Client:
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit."""
         self.close()
-
@@ -0,0 +1,138 @@
+"""
+Request/response encoding for the ChaosChain x402 client.
+
+Responses are validated straight from the raw body bytes with pydantic
+TypeAdapters, skipping the intermediate `dict` that `response.json()`
+would build. Requests are serialized with orjson when it is installed
+and fall back to the standard library otherwise.
+"""
+
+import json
+from typing import Any, Callable, Dict, Union
+
+from pydantic import TypeAdapter
+
+from .types import (
+    PaymentRequirements,
+    VerifyResponse,
+    SettleResponse,
+    SupportedSchemesResponse,
+    ServiceInfo,
+    SettlementStatusResponse,
+)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore[assignment]
+
+# Built once at import; validate_json parses and validates in a single pass
+PAYMENT_REQUIREMENTS_ADAPTER = TypeAdapter(PaymentRequirements)
+VERIFY_RESPONSE_ADAPTER = TypeAdapter(VerifyResponse)
+SETTLE_RESPONSE_ADAPTER = TypeAdapter(SettleResponse)
+SUPPORTED_SCHEMES_ADAPTER = TypeAdapter(SupportedSchemesResponse)
+SERVICE_INFO_ADAPTER = TypeAdapter(ServiceInfo)
+SETTLEMENT_STATUS_ADAPTER = TypeAdapter(SettlementStatusResponse)
+
+
+class ResponseTypes:
+    """
+    The response types a client returns, and how to decode them.
+
+    `MODEL_TYPES` are the pydantic models of `types`; `compact.COMPACT_TYPES`
+    the msgspec Structs of `compact`.
+    """
+
+    __slots__ = (
+        "verify",
+        "settle",
+        "supported",
+        "decode_verify",
+        "decode_settle",
+        "decode_supported",
+        "verify_from_builtins",
+    )
+
+    def __init__(
+        self,
+        verify: type,
+        settle: type,
+        supported: type,
+        decode_verify: Callable[[bytes], Any],
+        decode_settle: Callable[[bytes], Any],
+        decode_supported: Callable[[bytes], Any],
+        verify_from_builtins: Callable[[Any], Any],
+    ):
+        self.verify = verify
+        self.settle = settle
+        self.supported = supported
+        self.decode_verify = decode_verify
+        self.decode_settle = decode_settle
+        self.decode_supported = decode_supported
+        self.verify_from_builtins = verify_from_builtins
+
+    def as_verify(self, response: Any) -> Any:
+        """
+        `response` as this set's verify type.
+
+        Local rejections and shared-cache hits are built as pydantic
+        VerifyResponses; they are converted for a client with other types.
+        """
+        if isinstance(response, self.verify):
+            return response
+        return self.verify_from_builtins(response.model_dump())
+
+
+MODEL_TYPES = ResponseTypes(
+    verify=VerifyResponse,
+    settle=SettleResponse,
+    supported=SupportedSchemesResponse,
+    decode_verify=VERIFY_RESPONSE_ADAPTER.validate_json,
+    decode_settle=SETTLE_RESPONSE_ADAPTER.validate_json,
+    decode_supported=SUPPORTED_SCHEMES_ADAPTER.validate_json,
+    verify_from_builtins=VERIFY_RESPONSE_ADAPTER.validate_python,
+)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize a JSON request body to compact UTF-8 bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def loads(raw: Union[bytes, str]) -> Any:
+    """Parse a JSON response body that is not validated by a TypeAdapter."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def as_requirements(
+    payment_requirements: Union[PaymentRequirements, Dict[str, Any]],
+) -> PaymentRequirements:
+    """
+    Return a validated PaymentRequirements.
+
+    Instances are passed through untouched, so a resource server can
+    validate its requirements once at startup and reuse them per call.
+    CompactPaymentRequirements are converted.
+    """
+    if isinstance(payment_requirements, PaymentRequirements):
+        return payment_requirements
+    if not isinstance(payment_requirements, dict):
+        # CompactPaymentRequirements
+        return PAYMENT_REQUIREMENTS_ADAPTER.validate_python(
+            payment_requirements.model_dump()
+        )
+    return PAYMENT_REQUIREMENTS_ADAPTER.validate_python(payment_requirements)
+
+
+def requirements_payload(requirements: PaymentRequirements) -> Dict[str, Any]:
+    """
+    JSON-ready dict for a validated PaymentRequirements.
+
+    Unset optional fields are omitted rather than sent as null, which is
+    what the bridge's zod schema expects for `.optional()` fields.
+    """
+    return requirements.model_dump(exclude_none=True)
@@ -0,0 +1,237 @@
+"""
+Compact msgspec-backed counterparts of the response and request types.
+
+The pydantic models in `types` cost a few kilobytes and several
+microseconds each, which adds up in verify caches, settlement audit
+buffers and anything else that holds hundreds of thousands of them. The
+Structs here have the same field names, are decoded straight from the
+response bytes by msgspec, are not tracked by the garbage collector, and
+intern the strings that repeat across objects (scheme, network, payTo,
+asset, status, token symbol) so every copy shares one.
+
+They also offer the parts of the pydantic API the client and typical
+callers use (`model_dump`, `model_dump_json`, `model_copy`), plus
+`to_model()` / `from_model()` to convert to and from the pydantic types.
+
+Select them per client:
+
+    ```python
+    client = X402Client(facilitator_url='http://localhost:8402', compact_types=True)
+    result = client.verify_payment(header, requirements)   # CompactVerifyResponse
+    ```
+
+Requires msgspec: pip install "chaoschain-x402-client[compact]"
+"""
+
+import sys
+from typing import Any, ClassVar, Dict, List, Optional, Type, TypeVar
+
+try:
+    import msgspec
+except ImportError as e:  # pragma: no cover - optional dependency
+    raise ImportError(
+        "Compact types require msgspec. "
+        'Install it with: pip install "chaoschain-x402-client[compact]"'
+    ) from e
+
+from pydantic import BaseModel
+
+from . import codec
+from . import types
+
+C = TypeVar("C", bound="CompactStruct")
+
+_intern = sys.intern
+
+
+def _drop_none(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _drop_none(v) for k, v in value.items() if v is not None}
+    if isinstance(value, list):
+        return [_drop_none(v) for v in value]
+    return value
+
+
+class CompactStruct(msgspec.Struct, kw_only=True, gc=False):
+    """
+    Base of the compact types: the pydantic methods the client relies on.
+
+    Instances hold no reference cycles, so they are left out of garbage
+    collection (`gc=False`) and never cost a collector pass.
+    """
+
+    # The pydantic model this Struct mirrors
+    _model: ClassVar[Type[BaseModel]]
+
+    def model_dump(self, exclude_none: bool = False) -> Dict[str, Any]:
+        """Plain dict of the fields, like BaseModel.model_dump()."""
+        data = msgspec.to_builtins(self)
+        return _drop_none(data) if exclude_none else data
+
+    def model_dump_json(self, exclude_none: bool = False) -> str:
+        """JSON string of the fields, like BaseModel.model_dump_json()."""
+        return msgspec.json.encode(
+            self.model_dump(exclude_none=True) if exclude_none else self
+        ).decode()
+
+    def model_copy(self: C, update: Optional[Dict[str, Any]] = None) -> C:
+        """Shallow copy with `update` applied, like BaseModel.model_copy()."""
+        return msgspec.structs.replace(self, **(update or {}))
+
+    def to_model(self) -> BaseModel:
+        """The equivalent pydantic model (validated)."""
+        return self._model.model_validate(self.model_dump())
+
+    @classmethod
+    def from_model(cls: Type[C], model: BaseModel) -> C:
+        """Convert a pydantic model (or a dict) to this type."""
+        data = model if isinstance(model, dict) else model.model_dump()
+        return msgspec.convert(data, cls, strict=False)
+
+
+class CompactPaymentRequirements(CompactStruct):
+    """Compact PaymentRequirements; accepted wherever requirements are."""
+
+    _model = types.PaymentRequirements
+
+    scheme: str
+    network: str
+    maxAmountRequired: str
+    resource: str
+    payTo: str
+    asset: str
+    description: Optional[str] = None
+    mimeType: Optional[str] = None
+    maxTimeoutSeconds: Optional[int] = None
+    extra: Optional[Dict[str, Any]] = None
+
+    def __post_init__(self):
+        # The same few endpoints and recipients repeat across every payment
+        self.scheme = _intern(self.scheme)
+        self.network = _intern(self.network)
+        self.resource = _intern(self.resource)
+        self.payTo = _intern(self.payTo)
+        self.asset = _intern(self.asset)
+        if self.mimeType is not None:
+            self.mimeType = _intern(self.mimeType)
+
+
+class CompactAmountBreakdown(CompactStruct):
+    """Compact AmountBreakdown."""
+
+    _model = types.AmountBreakdown
+
+    human: str
+    base: str
+    symbol: str
+    decimals: Optional[int] = None
+
+    def __post_init__(self):
+        self.symbol = _intern(self.symbol)
+
+
+class CompactFeeBreakdown(CompactStruct):
+    """Compact FeeBreakdown."""
+
+    _model = types.FeeBreakdown
+
+    human: str
+    base: str
+    bps: int
+
+
+class CompactNetBreakdown(CompactStruct):
+    """Compact NetBreakdown."""
+
+    _model = types.NetBreakdown
+
+    human: str
+    base: str
+
+
+class CompactVerifyResponse(CompactStruct):
+    """Compact VerifyResponse."""
+
+    _model = types.VerifyResponse
+
+    isValid: bool
+    invalidReason: Optional[str] = None
+    consensusProof: Optional[str] = None
+    reportId: Optional[str] = None
+    timestamp: Optional[int] = None
+    amount: Optional[CompactAmountBreakdown] = None
+    fee: Optional[CompactFeeBreakdown] = None
+    net: Optional[CompactNetBreakdown] = None
+
+
+class CompactSettleResponse(CompactStruct):
+    """Compact SettleResponse."""
+
+    _model = types.SettleResponse
+
+    success: bool
+    error: Optional[str] = None
+    txHash: Optional[str] = None
+    txHashFee: Optional[str] = None
+    networkId: Optional[str] = None
+    consensusProof: Optional[str] = None
+    timestamp: Optional[int] = None
+    status: Optional[str] = None
+    evidenceHash: Optional[str] = None
+    proofOfAgency: Optional[str] = None
+    amount: Optional[CompactAmountBreakdown] = None
+    fee: Optional[CompactFeeBreakdown] = None
+    net: Optional[CompactNetBreakdown] = None
+
+    def __post_init__(self):
+        if self.networkId is not None:
+            self.networkId = _intern(self.networkId)
+        if self.status is not None:
+            self.status = _intern(self.status)
+
+
+class CompactSchemeNetworkPair(CompactStruct):
+    """Compact SchemeNetworkPair."""
+
+    _model = types.SchemeNetworkPair
+
+    scheme: str
+    network: str
+
+    def __post_init__(self):
+        self.scheme = _intern(self.scheme)
+        self.network = _intern(self.network)
+
+
+class CompactSupportedSchemesResponse(CompactStruct):
+    """Compact SupportedSchemesResponse."""
+
+    _model = types.SupportedSchemesResponse
+
+    kinds: List[CompactSchemeNetworkPair]
+
+
+# Built once at import; strict=False coerces like pydantic's lax mode (e.g. "6" -> 6)
+PAYMENT_REQUIREMENTS_DECODER = msgspec.json.Decoder(
+    CompactPaymentRequirements, strict=False
+)
+VERIFY_RESPONSE_DECODER = msgspec.json.Decoder(CompactVerifyResponse, strict=False)
+SETTLE_RESPONSE_DECODER = msgspec.json.Decoder(CompactSettleResponse, strict=False)
+SUPPORTED_SCHEMES_DECODER = msgspec.json.Decoder(
+    CompactSupportedSchemesResponse, strict=False
+)
+
+
+def _verify_from_builtins(data: Any) -> CompactVerifyResponse:
+    return msgspec.convert(data, CompactVerifyResponse, strict=False)
+
+
+COMPACT_TYPES = codec.ResponseTypes(
+    verify=CompactVerifyResponse,
+    settle=CompactSettleResponse,
+    supported=CompactSupportedSchemesResponse,
+    decode_verify=VERIFY_RESPONSE_DECODER.decode,
+    decode_settle=SETTLE_RESPONSE_DECODER.decode,
+    decode_supported=SUPPORTED_SCHEMES_DECODER.decode,
+    verify_from_builtins=_verify_from_builtins,
+)
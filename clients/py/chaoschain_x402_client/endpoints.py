@@ -0,0 +1,252 @@
+"""
+Facilitator endpoint pool for the ChaosChain x402 client.
+
+Spreads requests across several http-bridge replicas, preferring the
+fastest and least busy one, and temporarily ejects replicas that keep
+failing.
+"""
+
+import random
+import threading
+import time
+from typing import Iterable, List, Optional, Union
+
+from pydantic import BaseModel, Field
+
+
+class EndpointStats(BaseModel):
+    """Point-in-time statistics of one facilitator endpoint."""
+
+    url: str = Field(..., description="Facilitator base URL")
+    healthy: bool = Field(..., description="False while the endpoint is ejected")
+    ewma_latency_ms: Optional[float] = Field(
+        default=None, description="Exponentially weighted moving average latency"
+    )
+    outstanding: int = Field(..., description="Requests currently in flight")
+    requests: int = Field(..., description="Requests completed")
+    failures: int = Field(
+        ..., description="Requests that failed (transport error or 5xx)"
+    )
+    consecutive_failures: int = Field(
+        ..., description="Failures since the last success"
+    )
+    ejections: int = Field(..., description="Times the endpoint was ejected")
+
+
+class Endpoint:
+    """One facilitator replica and its load-balancing state."""
+
+    __slots__ = (
+        "url",
+        "ewma",
+        "outstanding",
+        "requests",
+        "failures",
+        "consecutive_failures",
+        "ejections",
+        "ejected_until",
+    )
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.ewma: Optional[float] = None
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+
+    def __repr__(self) -> str:
+        return f"Endpoint({self.url!r})"
+
+
+class EndpointPool:
+    """
+    Latency-aware pool of facilitator endpoints.
+
+    Selection uses power-of-two-choices: two random healthy endpoints are
+    compared and the better one wins. With the `ewma` strategy an
+    endpoint's cost is its latency EWMA times its in-flight requests + 1;
+    with `least_outstanding` it is the in-flight count alone. Endpoints that
+    have not answered yet cost nothing, so new replicas are tried at once.
+
+    An endpoint is ejected for `ejection_time` seconds after
+    `failure_threshold` consecutive failures, or when an active health
+    probe fails. If every endpoint is ejected the one due back first is
+    used anyway, so a pool never refuses to send.
+
+    Example:
+        ```python
+        from chaoschain_x402_client import X402Client, EndpointPool
+
+        client = X402Client(
+            facilitator_url=EndpointPool(
+                ['https://us.facilitator.example', 'https://eu.facilitator.example'],
+                strategy='least_outstanding',
+            )
+        )
+        for stats in client.endpoint_stats():
+            print(stats.url, stats.ewma_latency_ms, stats.requests)
+        ```
+    """
+
+    EWMA = "ewma"
+    LEAST_OUTSTANDING = "least_outstanding"
+
+    def __init__(
+        self,
+        urls: Union[str, Iterable[str]],
+        strategy: str = EWMA,
+        ewma_alpha: float = 0.3,
+        failure_threshold: int = 3,
+        ejection_time: float = 30.0,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            urls: One facilitator URL or a list of them
+            strategy: "ewma" or "least_outstanding" (default: "ewma")
+            ewma_alpha: Weight of the newest latency sample (default: 0.3)
+            failure_threshold: Consecutive failures before ejection (default: 3)
+            ejection_time: Seconds an ejected endpoint is skipped (default: 30)
+        """
+        if strategy not in (self.EWMA, self.LEAST_OUTSTANDING):
+            raise ValueError(f"Unknown load-balancing strategy: {strategy}")
+        if isinstance(urls, str):
+            urls = [urls]
+        self.endpoints = [Endpoint(url) for url in urls]
+        if not self.endpoints:
+            raise ValueError("At least one facilitator URL is required")
+        self.strategy = strategy
+        self.ewma_alpha = ewma_alpha
+        self.failure_threshold = failure_threshold
+        self.ejection_time = ejection_time
+        self._lock = threading.Lock()
+
+    @property
+    def primary(self) -> Endpoint:
+        """The first configured endpoint."""
+        return self.endpoints[0]
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def _cost(self, endpoint: Endpoint) -> float:
+        if self.strategy == self.LEAST_OUTSTANDING:
+            return endpoint.outstanding
+        return (endpoint.ewma or 0.0) * (endpoint.outstanding + 1)
+
+    def acquire(self, exclude: Optional[Endpoint] = None) -> Endpoint:
+        """
+        Pick an endpoint for one request and count it as in flight.
+
+        Every acquire must be paired with a `release`.
+
+        Args:
+            exclude: Endpoint to avoid if another one is available (e.g. the
+                one a hedged request is already waiting on)
+        """
+        with self._lock:
+            endpoint = self._pick(exclude)
+            endpoint.outstanding += 1
+            return endpoint
+
+    def pick(self, exclude: Optional[Endpoint] = None) -> Endpoint:
+        """
+        Pick an endpoint without counting a request against it, for
+        long-lived connections such as event streams.
+        """
+        with self._lock:
+            return self._pick(exclude)
+
+    def _pick(self, exclude: Optional[Endpoint]) -> Endpoint:
+        if len(self.endpoints) == 1:
+            return self.endpoints[0]
+        now = time.monotonic()
+        candidates = [
+            e for e in self.endpoints if e.ejected_until <= now and e is not exclude
+        ]
+        if not candidates:
+            candidates = [e for e in self.endpoints if e.ejected_until <= now]
+        if not candidates:
+            # Everything is ejected: fail open on the one due back first
+            candidates = [min(self.endpoints, key=lambda e: e.ejected_until)]
+
+        if len(candidates) == 1:
+            return candidates[0]
+        a, b = random.sample(candidates, 2)
+        return a if self._cost(a) <= self._cost(b) else b
+
+    def release(self, endpoint: Endpoint, latency: Optional[float], ok: bool) -> None:
+        """
+        Record the outcome of a request started with `acquire`.
+
+        Args:
+            endpoint: The endpoint returned by `acquire`
+            latency: Seconds the request took, or None if it never completed
+            ok: False for transport errors, timeouts and 5xx responses
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            endpoint.requests += 1
+            if ok:
+                endpoint.consecutive_failures = 0
+                self._observe(endpoint, latency)
+            else:
+                endpoint.failures += 1
+                endpoint.consecutive_failures += 1
+                # Fast failures (connection refused) must not look attractive
+                if endpoint.ewma is not None:
+                    endpoint.ewma *= 2
+                if endpoint.consecutive_failures >= self.failure_threshold:
+                    self._eject(endpoint)
+
+    def abandon(self, endpoint: Endpoint) -> None:
+        """Release an endpoint whose request was cancelled, without judging it."""
+        with self._lock:
+            endpoint.outstanding -= 1
+
+    def mark(
+        self, endpoint: Endpoint, healthy: bool, latency: Optional[float] = None
+    ) -> None:
+        """Record the result of an active health probe."""
+        with self._lock:
+            if healthy:
+                endpoint.consecutive_failures = 0
+                endpoint.ejected_until = 0.0
+                self._observe(endpoint, latency)
+            else:
+                self._eject(endpoint)
+
+    def _observe(self, endpoint: Endpoint, latency: Optional[float]) -> None:
+        if latency is None:
+            return
+        if endpoint.ewma is None:
+            endpoint.ewma = latency
+        else:
+            endpoint.ewma += self.ewma_alpha * (latency - endpoint.ewma)
+
+    def _eject(self, endpoint: Endpoint) -> None:
+        if endpoint.ejected_until <= time.monotonic():
+            endpoint.ejections += 1
+        endpoint.ejected_until = time.monotonic() + self.ejection_time
+
+    def stats(self) -> List[EndpointStats]:
+        """Per-endpoint statistics, in configuration order."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                EndpointStats(
+                    url=e.url,
+                    healthy=e.ejected_until <= now,
+                    ewma_latency_ms=e.ewma * 1000 if e.ewma is not None else None,
+                    outstanding=e.outstanding,
+                    requests=e.requests,
+                    failures=e.failures,
+                    consecutive_failures=e.consecutive_failures,
+                    ejections=e.ejections,
+                )
+                for e in self.endpoints
+            ]
@@ -0,0 +1,323 @@
+"""
+Fee and amount breakdowns computed locally, with the bridge's exact math.
+
+Mirrors `managed/fees.ts` (`calculateFee`) and `managed/amounts.ts`
+(`computeFeeBreakdown`) in the http-bridge: the fee is
+`amount * feeBps / 10000` in BigInt arithmetic (truncated toward zero),
+the net amount is what remains, and human-readable strings come from
+viem's `formatUnits`. Amounts are parsed the way `BigInt(string)` parses
+them and `FEE_BPS_DEFAULT` the way `parseInt` does, so every result matches
+the bridge's response byte for byte.
+
+Single payments use plain Python integers. The `*_column` functions take
+NumPy arrays of base units for bulk quoting and reconciliation; NumPy is
+only imported when they are called (`pip install "chaoschain-x402-client[numpy]"`).
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+DEFAULT_FEE_BPS = 100
+FEE_DENOMINATOR = 10_000
+USDC_DECIMALS = 6
+
+# ECMAScript WhiteSpace and LineTerminator, trimmed by BigInt() and parseInt()
+_JS_WHITESPACE = (
+    "\t\n\v\f\r \u00a0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006"
+    "\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000\ufeff"
+)
+# StringIntegerLiteral: signed decimal, or unsigned 0x / 0o / 0b
+_BIGINT = re.compile(r"[+-]?[0-9]+|0[xX][0-9a-fA-F]+|0[oO][0-7]+|0[bB][01]+")
+_RADIX = {"x": 16, "o": 8, "b": 2}
+_PARSE_INT = re.compile(r"([+-]?)(?:0[xX]([0-9a-fA-F]*)|([0-9]+))")
+
+# Largest decimals whose 10**decimals fits in int64 for the column path
+_MAX_COLUMN_DECIMALS = 18
+# "00".."99" back to back; read as uint16, one store writes two digits
+_DIGIT_PAIRS = b"".join(b"%02d" % pair for pair in range(100))
+
+
+def parse_base_units(value: Union[str, int]) -> int:
+    """
+    An amount in base units, parsed like JavaScript's `BigInt(value)`.
+
+    Surrounding whitespace is ignored, an empty string is 0, decimal
+    strings may carry a sign and `0x`/`0o`/`0b` prefixes select the radix.
+    Fractions, exponents and separators are rejected.
+
+    Raises:
+        ValueError: `value` is not an integer literal (BigInt's SyntaxError)
+    """
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if not isinstance(value, str):
+        raise ValueError(f"Cannot convert {value!r} to a BigInt")
+    text = value.strip(_JS_WHITESPACE)
+    if not text:
+        return 0
+    if not _BIGINT.fullmatch(text):
+        raise ValueError(f"Cannot convert {value!r} to a BigInt")
+    radix = _RADIX.get(text[1:2].lower()) if text[0] == "0" else None
+    return int(text[2:], radix) if radix else int(text, 10)
+
+
+def parse_fee_bps(value: Optional[str]) -> int:
+    """
+    Fee in basis points from a `FEE_BPS_DEFAULT`-style setting, parsed like
+    the bridge's `parseInt(value || '100')`: leading digits count, the rest
+    is ignored.
+
+    Raises:
+        ValueError: No leading integer (where the bridge's BigInt(NaN) throws)
+    """
+    if not value:
+        return DEFAULT_FEE_BPS
+    match = _PARSE_INT.match(value.lstrip(_JS_WHITESPACE))
+    if match is None or match.group(2) == "":
+        raise ValueError(f"Fee basis points {value!r} is not a number")
+    sign, hex_digits, digits = match.groups()
+    bps = int(hex_digits, 16) if hex_digits is not None else int(digits)
+    if bps > 2**53:
+        # parseInt returns a double; BigInt() takes its exact value
+        try:
+            bps = int(float(bps))
+        except OverflowError:
+            raise ValueError(f"Fee basis points {value!r} is not finite") from None
+    return -bps if sign == "-" else bps
+
+
+def calculate_fee(amount: int, fee_bps: int = DEFAULT_FEE_BPS) -> Tuple[int, int]:
+    """
+    (fee, net) in base units, as `calculateFee` computes them.
+
+    Args:
+        amount: Payment amount in base units
+        fee_bps: Facilitator fee in basis points (default: 100)
+    """
+    product = amount * fee_bps
+    # BigInt division truncates toward zero; Python's // floors
+    fee = product // FEE_DENOMINATOR if product >= 0 else -(-product // FEE_DENOMINATOR)
+    return fee, amount - fee
+
+
+@lru_cache(maxsize=1024)
+def format_units(value: int, decimals: int = USDC_DECIMALS) -> str:
+    """viem `formatUnits`: decimal string without trailing fractional zeros."""
+    sign = "-" if value < 0 else ""
+    whole, fraction = divmod(abs(value), 10**decimals)
+    fraction_str = str(fraction).rjust(decimals, "0").rstrip("0")
+    return f"{sign}{whole}.{fraction_str}" if fraction_str else f"{sign}{whole}"
+
+
+def compute_fee_breakdown(
+    max_amount_required: Union[str, int],
+    fee_bps: int = DEFAULT_FEE_BPS,
+    decimals: int = USDC_DECIMALS,
+    symbol: str = "USDC",
+) -> Dict[str, Any]:
+    """
+    amount/fee/net breakdown as the bridge's `computeFeeBreakdown` returns it.
+
+    The result has the shape of the `amount`, `fee` and `net` fields of
+    /verify and /settle responses, so it validates as AmountBreakdown,
+    FeeBreakdown and NetBreakdown.
+
+    Args:
+        max_amount_required: Amount in base units, as in PaymentRequirements
+        fee_bps: Facilitator fee in basis points (default: 100)
+        decimals: Token decimals (default: 6, USDC)
+        symbol: Token symbol (default: USDC)
+
+    Raises:
+        ValueError: `max_amount_required` is not an integer literal
+    """
+    amount = parse_base_units(max_amount_required)
+    fee, net = calculate_fee(amount, fee_bps)
+    return {
+        "amount": {
+            "human": format_units(amount, decimals),
+            "base": str(amount),
+            "symbol": symbol,
+            "decimals": decimals,
+        },
+        "fee": {"human": format_units(fee, decimals), "base": str(fee), "bps": fee_bps},
+        "net": {"human": format_units(net, decimals), "base": str(net)},
+    }
+
+
+# ----------------------------------------------------------------------
+# Columns
+# ----------------------------------------------------------------------
+
+
+def _numpy() -> Any:
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError(
+            "Fee columns require numpy. "
+            'Install it with: pip install "chaoschain-x402-client[numpy]"'
+        ) from None
+    return numpy
+
+
+def _fits_int64(np: Any, values: Any) -> bool:
+    """Integer column whose magnitudes fit int64 arithmetic (no INT64_MIN)."""
+    if values.dtype.kind == "u":
+        return True
+    return values.dtype.kind == "i" and (
+        values.size == 0 or int(values.min()) > np.iinfo(np.int64).min
+    )
+
+
+def amount_column(values: Iterable[Union[str, int]]) -> Any:
+    """
+    A column of base-unit amounts: int64 when every amount fits, else an
+    object array of Python integers.
+
+    Integer arrays are returned as they are; strings and other sequences
+    are parsed with `parse_base_units`.
+
+    Raises:
+        ValueError: An amount is not an integer literal
+    """
+    np = _numpy()
+    if isinstance(values, np.ndarray) and values.dtype.kind in "iu":
+        return values
+    amounts = [
+        parse_base_units(v if isinstance(v, (str, int)) else str(v)) for v in values
+    ]
+    try:
+        return np.array(amounts, dtype=np.int64)
+    except OverflowError:
+        return np.array(amounts, dtype=object)
+
+
+def calculate_fee_column(
+    amounts: Any, fee_bps: int = DEFAULT_FEE_BPS
+) -> Tuple[Any, Any]:
+    """
+    (fee, net) columns for a column of amounts, equal element-wise to
+    `calculate_fee`.
+
+    For int64/uint64 amounts and 0 <= fee_bps <= 10000 the product is
+    split as `(a // 10000) * bps + (a % 10000) * bps // 10000`, which is
+    exact and cannot overflow; other inputs fall back to Python integers.
+    """
+    np = _numpy()
+    amounts = amount_column(amounts)
+    if 0 <= fee_bps <= FEE_DENOMINATOR and _fits_int64(np, amounts):
+        magnitude = np.abs(amounts)
+        quotient, remainder = np.divmod(magnitude, FEE_DENOMINATOR)
+        fee = quotient * fee_bps + remainder * fee_bps // FEE_DENOMINATOR
+        if amounts.dtype.kind == "i":
+            np.negative(fee, out=fee, where=amounts < 0)
+        return fee, amounts - fee
+    fee = np.array([calculate_fee(int(a), fee_bps)[0] for a in amounts], dtype=object)
+    return fee, np.array([int(a) for a in amounts], dtype=object) - fee
+
+
+def _digit_matrix(np: Any, values: Any, count: int) -> Any:
+    """(N, count rounded up to even) uint8 matrix of zero-padded ASCII digits."""
+    pairs = np.frombuffer(_DIGIT_PAIRS, dtype=np.uint16)
+    width = (count + 1) // 2
+    out = np.empty((len(values), width), dtype=np.uint16)
+    rest = values
+    for column in range(width - 1, -1, -1):
+        rest, pair = np.divmod(rest, 100)
+        out[:, column] = pairs.take(pair)
+    return out.view(np.uint8)
+
+
+def format_units_column(values: Any, decimals: int = USDC_DECIMALS) -> Any:
+    """
+    `format_units` over a column, as an object array of strings.
+
+    int64/uint64 columns are formatted without a Python-level loop: every
+    row is laid out as `-`, zero-padded whole digits, `.`, fraction digits
+    and a newline in a byte matrix; a mask keeps the sign of negative rows
+    and drops leading zeros and trailing fractional zeros, and the kept
+    bytes are split into strings in one pass. Object columns and more than
+    18 decimals go element by element.
+    """
+    np = _numpy()
+    values = np.asarray(values)
+    if decimals > _MAX_COLUMN_DECIMALS or not _fits_int64(np, values):
+        return np.array([format_units(int(v), decimals) for v in values], dtype=object)
+    rows = len(values)
+    if not rows:
+        return np.array([], dtype=object)
+
+    whole, fraction = np.divmod(np.abs(values), 10**decimals)
+    whole_width = len(str(int(whole.max())))
+    parts = [
+        np.full((rows, 1), ord("-"), dtype=np.uint8),
+        _digit_matrix(np, whole, whole_width),
+    ]
+    digits = np.ones(rows, dtype=np.int64)
+    for power in range(1, whole_width):
+        digits += whole >= 10**power
+    # Keep columns [first, last) of each row, plus the sign and the newline
+    end_of_whole = parts[1].shape[1] + 1
+    first = end_of_whole - digits
+    last = np.full(rows, end_of_whole, dtype=np.int64)
+    if decimals:
+        parts.append(np.full((rows, 1), ord("."), dtype=np.uint8))
+        # An odd digit count gets a trailing zero, which the mask drops
+        parts.append(
+            _digit_matrix(
+                np, fraction * 10 if decimals % 2 else fraction, decimals + decimals % 2
+            )
+        )
+        kept = np.full(rows, decimals, dtype=np.int64)
+        for power in range(1, decimals):
+            kept -= fraction % 10**power == 0
+        last += np.where(fraction != 0, 1 + kept, 0)
+    parts.append(np.full((rows, 1), ord("\n"), dtype=np.uint8))
+
+    matrix = np.hstack(parts)
+    columns = np.arange(matrix.shape[1])
+    keep = (columns >= first[:, None]) & (columns < last[:, None])
+    keep[:, -1] = True
+    keep[:, 0] = values < 0 if values.dtype.kind == "i" else False
+    return np.array(
+        matrix[keep].tobytes().decode("ascii").split("\n")[:-1], dtype=object
+    )
+
+
+def fee_breakdown_columns(
+    amounts: Any,
+    fee_bps: int = DEFAULT_FEE_BPS,
+    decimals: int = USDC_DECIMALS,
+    human: bool = True,
+) -> Dict[str, Any]:
+    """
+    `compute_fee_breakdown` for a column of amounts.
+
+    Example:
+        ```python
+        columns = fee_breakdown_columns(np.array([1_000_000, 2_500_000]))
+        columns['fee_base']   # array([10000, 25000])
+        columns['net_human']  # array(['0.99', '2.475'], dtype=object)
+        ```
+
+    Args:
+        amounts: Base units as an integer array, or strings / integers
+        fee_bps: Facilitator fee in basis points (default: 100)
+        decimals: Token decimals (default: 6, USDC)
+        human: Also format the `*_human` columns (default: True)
+
+    Returns:
+        `amount_base`, `fee_base` and `net_base` columns, plus
+        `amount_human`, `fee_human` and `net_human` when `human` is set
+    """
+    amounts = amount_column(amounts)
+    fee, net = calculate_fee_column(amounts, fee_bps)
+    columns = {"amount_base": amounts, "fee_base": fee, "net_base": net}
+    if human:
+        for name in ("amount", "fee", "net"):
+            columns[f"{name}_human"] = format_units_column(
+                columns[f"{name}_base"], decimals
+            )
+    return columns
@@ -0,0 +1,135 @@
+"""
+X-PAYMENT header decoding for the ChaosChain x402 client.
+
+Mirrors `parsePaymentHeader` in the http-bridge so the client interprets
+a header the same way the facilitator does.
+"""
+
+import base64
+import binascii
+import json
+import re
+from typing import Any, Dict, Optional, Tuple, Union
+
+# Everything Node's base64 decoder skips: characters outside both alphabets
+_NOT_BASE64 = re.compile(r"[^A-Za-z0-9+/]")
+_URL_SAFE = str.maketrans("-_", "+/")
+
+
+def _b64decode(text: str) -> bytes:
+    """
+    Decode base64 as leniently as Node's `Buffer.from(text, 'base64')`.
+
+    URL-safe characters are accepted, padding is optional, decoding stops
+    at the first `=` and other characters (whitespace, ...) are skipped.
+    """
+    text = _NOT_BASE64.sub("", text.translate(_URL_SAFE).split("=", 1)[0])
+    if len(text) % 4 == 1:
+        text = text[:-1]  # Node drops a lone trailing character
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def decode_payment_header(header: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Decode an X-PAYMENT header into a normalized authorization dict.
+
+    Supports the same formats as the bridge:
+    1. ChaosChain SDK format: { payload: { authorization: {...} }, signature: "0x..." }
+    2. PayAI / x402 standard format: { from, to, value, validAfter, validBefore, nonce, v, r, s }
+    3. Simple format: { sender, nonce, validAfter, validBefore, signature }
+
+    Args:
+        header: Base64 encoded header string (standard or URL-safe,
+            padding optional), or an already-decoded dict
+
+    Returns:
+        Dict with keys from, to, value, validAfter, validBefore, nonce,
+        signature, v, r, s (missing fields are None), plus `network` and
+        `scheme` when the header envelope carries them
+
+    Raises:
+        ValueError: If the header cannot be decoded or has an unknown format
+    """
+    parsed = header
+    if isinstance(header, str):
+        try:
+            parsed = json.loads(_b64decode(header))
+        except (binascii.Error, ValueError) as e:
+            raise ValueError(f"Invalid payment header encoding: {e}") from e
+
+    if not isinstance(parsed, dict):
+        raise ValueError("Invalid payment header format")
+
+    payload = parsed.get("payload")
+    if isinstance(payload, dict) and isinstance(payload.get("authorization"), dict):
+        # ChaosChain SDK format (nested authorization)
+        auth = payload["authorization"]
+        signature = parsed.get("signature") or payload.get("signature")
+        source, sender = auth, auth.get("from")
+    elif parsed.get("from") and parsed.get("nonce"):
+        # PayAI / x402 standard format (EIP-3009)
+        source, sender, signature = parsed, parsed.get("from"), parsed.get("signature")
+    elif parsed.get("sender") and parsed.get("nonce"):
+        # Simple format
+        source, sender, signature = (
+            parsed,
+            parsed.get("sender"),
+            parsed.get("signature"),
+        )
+    else:
+        raise ValueError("Invalid payment header format")
+
+    return {
+        "from": sender,
+        "to": source.get("to"),
+        "value": source.get("value"),
+        "validAfter": source.get("validAfter"),
+        "validBefore": source.get("validBefore"),
+        "nonce": source.get("nonce"),
+        "signature": signature,
+        "v": parsed.get("v"),
+        "r": parsed.get("r"),
+        "s": parsed.get("s"),
+        "network": parsed.get("network"),
+        "scheme": parsed.get("scheme"),
+    }
+
+
+def header_valid_before(header: Union[str, Dict[str, Any]]) -> Optional[int]:
+    """
+    Return the `validBefore` unix timestamp of a header, or None.
+
+    Undecodable headers and headers without an expiry both return None.
+    """
+    try:
+        valid_before = decode_payment_header(header)["validBefore"]
+        return int(valid_before) if valid_before is not None else None
+    except (ValueError, TypeError):
+        return None
+
+
+def split_signature(auth: Dict[str, Any]) -> Tuple[int, int, int]:
+    """
+    (v, r, s) of a decoded authorization, from its pre-split fields or a
+    65-byte combined signature; `v` is normalized to 0/1.
+
+    Raises:
+        ValueError: If the signature is missing or malformed
+    """
+    if auth["v"] is not None and auth["r"] and auth["s"]:
+        v, r, s = int(auth["v"]), int(auth["r"], 16), int(auth["s"], 16)
+    else:
+        signature = auth["signature"]
+        if not signature:
+            raise ValueError("Missing signature")
+        raw = bytes.fromhex(
+            signature[2:] if signature.startswith(("0x", "0X")) else signature
+        )
+        if len(raw) != 65:
+            raise ValueError("Invalid signature length")
+        r, s, v = (
+            int.from_bytes(raw[:32], "big"),
+            int.from_bytes(raw[32:64], "big"),
+            raw[64],
+        )
+    return (v - 27 if v >= 27 else v), r, s
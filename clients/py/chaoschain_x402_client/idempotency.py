@@ -0,0 +1,232 @@
+"""
+Settlement idempotency for the ChaosChain x402 client.
+
+A settlement is identified by the signed EIP-3009 authorization it
+spends, so the client derives the `Idempotency-Key` from the decoded
+authorization instead of letting the bridge hash the whole request body.
+Every field of the authorization (validity window and signature
+included) and the recipient and amounts of the requirements are part of
+the key: the bridge caches every outcome under the key for 24h, failures
+included, so a request for the same nonce with anything else changed
+(e.g. an expired `validBefore` or a broken signature sent ahead by the
+payer) must not share it. The replay guard keys on the authorization
+alone (`authorization_key`), under per-request tokens from
+`new_reservation`. Concurrent settles of the same authorization within
+one client are merged into a single request.
+"""
+
+import asyncio
+import hashlib
+import itertools
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, TypeVar, Union
+
+from .headers import decode_payment_header, split_signature
+from .precheck import requirement_field
+
+T = TypeVar("T")
+
+# Reservation tokens; unique per process, and (pid, token) host-wide
+_RESERVATIONS = itertools.count(1)
+
+
+def new_reservation() -> int:
+    """
+    Token identifying one request to a replay guard.
+
+    Only the request holding the token a payment was reserved under may
+    renew or release the reservation, so concurrent requests in the same
+    process carrying the same X-PAYMENT are refused like those of other
+    processes.
+    """
+    return next(_RESERVATIONS) % 0xFFFFFFFF + 1
+
+
+def _authorization(
+    payment_header: Union[str, Dict[str, Any]], payment_requirements: Any
+) -> Dict[str, Any]:
+    auth = decode_payment_header(payment_header)
+    if not auth["from"] or not auth["nonce"]:
+        raise ValueError("Payment header is missing payer or nonce")
+    auth["network"] = (
+        requirement_field(payment_requirements, "network") or auth["network"] or ""
+    )
+    auth["asset"] = requirement_field(payment_requirements, "asset") or ""
+    return auth
+
+
+def _number(value: Any) -> str:
+    try:
+        if isinstance(value, str) and value.startswith(("0x", "0X")):
+            return str(int(value, 16))
+        return str(int(value))
+    except (TypeError, ValueError):
+        return str(value or "").lower()
+
+
+def _signature(auth: Dict[str, Any]) -> str:
+    try:
+        v, r, s = split_signature(auth)
+    except (TypeError, ValueError):
+        # Malformed signatures still key apart from each other
+        return "|".join(
+            str(auth[f] or "").lower() for f in ("signature", "v", "r", "s")
+        )
+    return f"{v}:{r:x}:{s:x}"
+
+
+def _digest(*fields: Any) -> str:
+    return hashlib.sha256("\0".join(str(f) for f in fields).encode()).hexdigest()
+
+
+def authorization_key(
+    payment_header: Union[str, Dict[str, Any]],
+    payment_requirements: Any,
+) -> str:
+    """
+    Key of the EIP-3009 authorization a payment spends, whatever it is
+    presented with: sha256 over (network, asset, payer, nonce). Used by
+    the replay guard, which must refuse an authorization however the
+    request around it differs.
+
+    Args:
+        payment_header: Base64 encoded X-PAYMENT header, or a decoded dict
+        payment_requirements: Requirements dict, PaymentRequirements or
+            PaymentRequirementsTemplate
+
+    Raises:
+        ValueError: If the header cannot be decoded or lacks payer/nonce
+    """
+    auth = _authorization(payment_header, payment_requirements)
+    return _digest(
+        "x402-authorization",
+        auth["network"],
+        str(auth["asset"]).lower(),
+        str(auth["from"]).lower(),
+        str(auth["nonce"]).lower(),
+    )
+
+
+def settlement_key(
+    payment_header: Union[str, Dict[str, Any]],
+    payment_requirements: Any,
+) -> str:
+    """
+    Deterministic idempotency key of a settlement.
+
+    sha256 over every field of the decoded authorization (network, asset,
+    payer, recipient, value, validAfter, validBefore, nonce, signature)
+    and the requirements' payTo and maxAmountRequired. Addresses and the
+    nonce are lower-cased, numbers compared by value and the signature
+    normalized to (v, r, s), so differently-encoded copies of the same
+    authorization map to the same key.
+
+    Args:
+        payment_header: Base64 encoded X-PAYMENT header, or a decoded dict
+        payment_requirements: Requirements dict, PaymentRequirements or
+            PaymentRequirementsTemplate
+
+    Raises:
+        ValueError: If the header cannot be decoded or lacks payer/nonce
+    """
+    auth = _authorization(payment_header, payment_requirements)
+    return _digest(
+        "x402-settle",
+        auth["network"],
+        str(auth["asset"]).lower(),
+        str(auth["from"]).lower(),
+        str(auth["to"] or "").lower(),
+        _number(auth["value"]),
+        _number(auth["validAfter"]),
+        _number(auth["validBefore"]),
+        str(auth["nonce"]).lower(),
+        _signature(auth),
+        str(requirement_field(payment_requirements, "payTo") or "").lower(),
+        _number(requirement_field(payment_requirements, "maxAmountRequired")),
+    )
+
+
+class SingleFlight:
+    """
+    Merge concurrent calls that share a key into one execution.
+
+    The first caller runs the function; callers arriving while it is in
+    flight block and receive the same result (or exception). Nothing is
+    cached once the call completes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        """Run `fn`, or wait for the in-flight call with the same key."""
+        with self._lock:
+            waiting = self._calls.get(key)
+            if waiting is None:
+                future: Future = Future()
+                self._calls[key] = future
+        if waiting is not None:
+            return waiting.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class AsyncSingleFlight:
+    """
+    Asyncio counterpart of SingleFlight.
+
+    If the leading call is cancelled, one of the waiting callers takes
+    over instead of all of them failing.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await `fn()`, or the in-flight call with the same key."""
+        while True:
+            future = self._calls.get(key)
+            if future is None:
+                break
+            try:
+                # Shielded so a cancelled follower does not cancel the leader
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The leader was cancelled; retry, possibly as the new leader
+
+        future = self._calls[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark it retrieved in case nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
@@ -0,0 +1,530 @@
+"""
+Metrics and tracing hooks for the ChaosChain x402 client.
+
+Both clients call an `Instrumentation` on every facilitator request: when
+it starts and finishes (with a phase breakdown of where the time went),
+on every retry, verify cache lookup and request/response serialization.
+Two implementations ship with the package:
+
+  * InProcessMetrics keeps per-route histograms and counters in memory
+    with no dependencies; read them with `snapshot()`.
+  * OpenTelemetryInstrumentation records the same data as OpenTelemetry
+    metrics and client spans through the `opentelemetry-api` package.
+
+Without an instrumentation (the default) the clients only pay for an
+`is None` check per hook; phase tracing, timers and the traced connection
+pool are only set up when one is configured. The traced urllib3 pool
+lives in `urllib3_tracing` and OpenTelemetry is imported on first use, so
+neither is loaded by the async client or an uninstrumented import.
+"""
+
+import bisect
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+# Phases of one request, in the order they happen
+PHASES = ("pool_wait", "dns", "connect", "tls", "server", "parse")
+
+
+class RequestTiming:
+    """
+    Timing of one HTTP request to the facilitator.
+
+    `pool_wait` is the wait for a pooled connection; `dns`, `connect` and
+    `tls` are only set when the request had to open a new connection;
+    `server` is the rest of the round-trip (sending the request, the
+    facilitator's processing and reading the response). Parsing the
+    response is reported separately through `Instrumentation.serialization`.
+
+    The async client learns about connections from httpcore's trace
+    events, which do not separate name resolution from the TCP connect,
+    so there `dns` stays None and `connect` includes it.
+    """
+
+    __slots__ = (
+        "method",
+        "route",
+        "status",
+        "error",
+        "elapsed",
+        "pool_wait",
+        "dns",
+        "connect",
+        "tls",
+        "_start",
+        "_mark",
+    )
+
+    def __init__(self, method: str, route: str):
+        self.method = method
+        self.route = route
+        self.status: Optional[int] = None
+        self.error: Optional[str] = None
+        self.elapsed = 0.0
+        self.pool_wait: Optional[float] = None
+        self.dns: Optional[float] = None
+        self.connect: Optional[float] = None
+        self.tls: Optional[float] = None
+        self._start = time.perf_counter()
+        self._mark = self._start
+
+    @property
+    def failed(self) -> bool:
+        """True for transport errors and 5xx responses."""
+        return self.error is not None or (
+            self.status is not None and self.status >= 500
+        )
+
+    @property
+    def server(self) -> float:
+        """Round-trip time not spent waiting for or opening a connection."""
+        setup = sum(
+            t
+            for t in (self.pool_wait, self.dns, self.connect, self.tls)
+            if t is not None
+        )
+        return max(0.0, self.elapsed - setup)
+
+    def phases(self) -> Dict[str, float]:
+        """Seconds per measured phase."""
+        phases = {
+            name: value
+            for name, value in (
+                ("pool_wait", self.pool_wait),
+                ("dns", self.dns),
+                ("connect", self.connect),
+                ("tls", self.tls),
+            )
+            if value is not None
+        }
+        phases["server"] = self.server
+        return phases
+
+    def finish(
+        self, status: Optional[int] = None, error: Optional[BaseException] = None
+    ) -> None:
+        self.elapsed = time.perf_counter() - self._start
+        self.status = status
+        if error is not None:
+            self.error = type(error).__name__
+
+    def activate(self) -> None:
+        """Let the traced connection pool of this thread report into this timing."""
+        _local.timing = self
+
+    @staticmethod
+    def deactivate() -> None:
+        _local.timing = None
+
+    async def atrace(self, event: str, info: dict) -> None:
+        """httpcore `trace` extension for the async client."""
+        now = time.perf_counter()
+        if self.pool_wait is None:
+            # The first event fires once the pool has handed out a connection
+            self.pool_wait = now - self._start
+        step, _, stage = event.rpartition(".")
+        if stage == "started":
+            self._mark = now
+        elif stage == "complete":
+            if step == "connection.connect_tcp":
+                self.connect = now - self._mark
+            elif step == "connection.start_tls":
+                self.tls = now - self._mark
+
+
+_local = threading.local()
+
+
+def active_timing() -> Optional[RequestTiming]:
+    """The RequestTiming activated on this thread, if any."""
+    return getattr(_local, "timing", None)
+
+
+class Instrumentation:
+    """
+    Hooks the clients call around facilitator requests.
+
+    Every hook is a no-op here; subclass and override the ones you need.
+    Hooks run on the calling thread (or event loop) and must not block.
+
+    Example:
+        ```python
+        class SlowRequestLog(Instrumentation):
+            def request_finished(self, timing):
+                if timing.elapsed > 0.5:
+                    log.warning('%s %s took %.0f ms: %s', timing.method,
+                                timing.route, timing.elapsed * 1000, timing.phases())
+
+        client = X402Client(facilitator_url=url, instrumentation=SlowRequestLog())
+        ```
+    """
+
+    def request_started(self, method: str, route: str) -> None:
+        """A request to `route` (e.g. "/verify") is about to be sent."""
+
+    def request_finished(self, timing: RequestTiming) -> None:
+        """A request finished with a response or a transport error."""
+
+    def retry(self, route: str, reason: str) -> None:
+        """A request is about to be retried; `reason` is the status code or error type."""
+
+    def cache_lookup(self, cache: str, hit: bool) -> None:
+        """A lookup in a client-side cache (currently only "verify")."""
+
+    def serialization(self, operation: str, route: str, seconds: float) -> None:
+        """Time spent encoding a request body or decoding ("parsing") a response."""
+
+
+class HistogramSummary(BaseModel):
+    """Summary of a latency histogram, in milliseconds."""
+
+    count: int = Field(..., description="Observations")
+    mean_ms: Optional[float] = Field(default=None, description="Mean")
+    min_ms: Optional[float] = Field(default=None, description="Smallest observation")
+    max_ms: Optional[float] = Field(default=None, description="Largest observation")
+    p50_ms: Optional[float] = Field(
+        default=None, description="Median (bucket upper bound)"
+    )
+    p90_ms: Optional[float] = Field(
+        default=None, description="90th percentile (bucket upper bound)"
+    )
+    p99_ms: Optional[float] = Field(
+        default=None, description="99th percentile (bucket upper bound)"
+    )
+
+
+class RouteMetrics(BaseModel):
+    """Metrics of one facilitator route."""
+
+    route: str = Field(..., description="Request path, e.g. /verify")
+    requests: int = Field(..., description="Requests completed")
+    errors: int = Field(
+        ..., description="Requests that failed (transport error or 5xx)"
+    )
+    in_flight: int = Field(..., description="Requests currently in flight")
+    retries: int = Field(..., description="Retries of this route")
+    latency: HistogramSummary = Field(..., description="Round-trip latency")
+    phases: Dict[str, HistogramSummary] = Field(
+        default_factory=dict,
+        description="Latency per phase (pool_wait, dns, connect, tls, server, parse)",
+    )
+    serialization: Dict[str, HistogramSummary] = Field(
+        default_factory=dict, description="Request encoding and response decoding time"
+    )
+
+
+class MetricsSnapshot(BaseModel):
+    """Point-in-time copy of an InProcessMetrics."""
+
+    routes: List[RouteMetrics] = Field(
+        default_factory=list, description="Per-route metrics"
+    )
+    cache_hits: int = Field(default=0, description="Verify cache hits")
+    cache_misses: int = Field(default=0, description="Verify cache misses")
+
+    def route(self, route: str) -> Optional[RouteMetrics]:
+        """Metrics of one route, if it has seen any requests."""
+        return next((r for r in self.routes if r.route == route), None)
+
+
+class _Histogram:
+    """Log-bucketed histogram: 4 buckets per power of two from 1 µs to ~67 s."""
+
+    BOUNDS = [1e-6 * 2 ** (i / 4) for i in range(4 * 26 + 1)]
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def _quantile(self, q: float) -> float:
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                bound = self.BOUNDS[index] if index < len(self.BOUNDS) else self.max
+                return min(max(bound, self.min), self.max)
+        return self.max
+
+    def summary(self) -> HistogramSummary:
+        if not self.count:
+            return HistogramSummary(count=0)
+        return HistogramSummary(
+            count=self.count,
+            mean_ms=self.total / self.count * 1000,
+            min_ms=self.min * 1000,
+            max_ms=self.max * 1000,
+            p50_ms=self._quantile(0.50) * 1000,
+            p90_ms=self._quantile(0.90) * 1000,
+            p99_ms=self._quantile(0.99) * 1000,
+        )
+
+
+class _RouteState:
+    __slots__ = (
+        "requests",
+        "errors",
+        "in_flight",
+        "retries",
+        "latency",
+        "phases",
+        "serialization",
+    )
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.retries = 0
+        self.latency = _Histogram()
+        self.phases: Dict[str, _Histogram] = {}
+        self.serialization: Dict[str, _Histogram] = {}
+
+
+class InProcessMetrics(Instrumentation):
+    """
+    Dependency-free, thread-safe in-memory metrics.
+
+    Example:
+        ```python
+        from chaoschain_x402_client import X402Client, InProcessMetrics
+
+        metrics = InProcessMetrics()
+        client = X402Client(facilitator_url=url, instrumentation=metrics)
+        ...
+        verify = metrics.snapshot().route('/verify')
+        print(verify.latency.p99_ms, verify.phases['server'].p50_ms, verify.in_flight)
+        ```
+    """
+
+    def __init__(self):
+        self._routes: Dict[str, _RouteState] = {}
+        self._cache: Dict[Tuple[str, bool], int] = {}
+        self._lock = threading.Lock()
+
+    def _route(self, route: str) -> _RouteState:
+        state = self._routes.get(route)
+        if state is None:
+            state = self._routes[route] = _RouteState()
+        return state
+
+    def request_started(self, method: str, route: str) -> None:
+        with self._lock:
+            self._route(route).in_flight += 1
+
+    def request_finished(self, timing: RequestTiming) -> None:
+        with self._lock:
+            state = self._route(timing.route)
+            state.in_flight -= 1
+            state.requests += 1
+            if timing.failed:
+                state.errors += 1
+            state.latency.record(timing.elapsed)
+            for phase, seconds in timing.phases().items():
+                histogram = state.phases.get(phase)
+                if histogram is None:
+                    histogram = state.phases[phase] = _Histogram()
+                histogram.record(seconds)
+
+    def retry(self, route: str, reason: str) -> None:
+        with self._lock:
+            self._route(route).retries += 1
+
+    def cache_lookup(self, cache: str, hit: bool) -> None:
+        with self._lock:
+            self._cache[cache, hit] = self._cache.get((cache, hit), 0) + 1
+
+    def serialization(self, operation: str, route: str, seconds: float) -> None:
+        with self._lock:
+            state = self._route(route)
+            histogram = state.serialization.get(operation)
+            if histogram is None:
+                histogram = state.serialization[operation] = _Histogram()
+                if operation == "decode":
+                    # Decoding the response is the request's parse phase
+                    state.phases["parse"] = histogram
+            histogram.record(seconds)
+
+    def snapshot(self) -> MetricsSnapshot:
+        """Copy of the current metrics."""
+        with self._lock:
+            return MetricsSnapshot(
+                routes=[
+                    RouteMetrics(
+                        route=route,
+                        requests=state.requests,
+                        errors=state.errors,
+                        in_flight=state.in_flight,
+                        retries=state.retries,
+                        latency=state.latency.summary(),
+                        phases={
+                            phase: state.phases[phase].summary()
+                            for phase in PHASES
+                            if phase in state.phases
+                        },
+                        serialization={
+                            op: h.summary() for op, h in state.serialization.items()
+                        },
+                    )
+                    for route, state in sorted(self._routes.items())
+                ],
+                cache_hits=self._cache.get(("verify", True), 0),
+                cache_misses=self._cache.get(("verify", False), 0),
+            )
+
+    def reset(self) -> None:
+        """Forget everything except requests still in flight."""
+        with self._lock:
+            for route, state in list(self._routes.items()):
+                in_flight = state.in_flight
+                self._routes[route] = _RouteState()
+                self._routes[route].in_flight = in_flight
+            self._cache.clear()
+
+
+class OpenTelemetryInstrumentation(Instrumentation):
+    """
+    Records client metrics and spans through the OpenTelemetry API.
+
+    Metrics (all durations in seconds):
+      x402.client.request.duration        histogram   http.route, http.request.method,
+                                                      http.response.status_code, error.type
+      x402.client.request.phase.duration  histogram   http.route, x402.phase
+      x402.client.requests.active         up/down     http.route, http.request.method
+      x402.client.retries                 counter     http.route, x402.retry.reason
+      x402.client.cache.lookups           counter     x402.cache, x402.cache.result
+      x402.client.serialization.duration  histogram   http.route, x402.serialization.operation
+
+    With `spans=True` every request also becomes a CLIENT span carrying
+    its phases as `x402.phase.*` attributes. Spans are recorded once the
+    request finishes, as children of the caller's current span.
+
+    Requires `opentelemetry-api` (`pip install "chaoschain-x402-client[otel]"`);
+    configure an SDK MeterProvider/TracerProvider to export the data.
+    """
+
+    def __init__(self, meter_provider=None, tracer_provider=None, spans: bool = True):
+        try:
+            from opentelemetry import metrics as otel_metrics  # type: ignore[import-not-found]
+            from opentelemetry import trace as otel_trace
+        except ImportError:
+            raise ImportError(
+                "OpenTelemetryInstrumentation requires opentelemetry-api. "
+                'Install it with: pip install "chaoschain-x402-client[otel]"'
+            ) from None
+        from . import __version__
+
+        self._otel_trace = otel_trace
+
+        meter = otel_metrics.get_meter(
+            __name__, __version__, meter_provider=meter_provider
+        )
+        self._tracer = (
+            otel_trace.get_tracer(
+                __name__, __version__, tracer_provider=tracer_provider
+            )
+            if spans
+            else None
+        )
+        self._duration = meter.create_histogram(
+            "x402.client.request.duration",
+            unit="s",
+            description="Facilitator request round-trip",
+        )
+        self._phase = meter.create_histogram(
+            "x402.client.request.phase.duration",
+            unit="s",
+            description="Time per request phase",
+        )
+        self._active = meter.create_up_down_counter(
+            "x402.client.requests.active",
+            unit="{request}",
+            description="Requests in flight",
+        )
+        self._retries = meter.create_counter(
+            "x402.client.retries",
+            unit="{retry}",
+            description="Retried facilitator requests",
+        )
+        self._cache = meter.create_counter(
+            "x402.client.cache.lookups",
+            unit="{lookup}",
+            description="Client-side cache lookups",
+        )
+        self._serialization = meter.create_histogram(
+            "x402.client.serialization.duration",
+            unit="s",
+            description="Body encoding and decoding",
+        )
+
+    def request_started(self, method: str, route: str) -> None:
+        self._active.add(1, {"http.route": route, "http.request.method": method})
+
+    def request_finished(self, timing: RequestTiming) -> None:
+        route = {"http.route": timing.route}
+        self._active.add(
+            -1, {"http.route": timing.route, "http.request.method": timing.method}
+        )
+
+        attributes: Dict[str, Any] = {
+            "http.route": timing.route,
+            "http.request.method": timing.method,
+        }
+        if timing.status is not None:
+            attributes["http.response.status_code"] = timing.status
+        if timing.failed:
+            attributes["error.type"] = timing.error or str(timing.status)
+        self._duration.record(timing.elapsed, attributes)
+
+        phases = timing.phases()
+        for phase, seconds in phases.items():
+            self._phase.record(seconds, {**route, "x402.phase": phase})
+
+        if self._tracer is not None:
+            end = time.time_ns()
+            span = self._tracer.start_span(
+                f"{timing.method} {timing.route}",
+                kind=self._otel_trace.SpanKind.CLIENT,
+                start_time=end - int(timing.elapsed * 1e9),
+                attributes=attributes,
+            )
+            for phase, seconds in phases.items():
+                span.set_attribute(f"x402.phase.{phase}", seconds)
+            if timing.failed:
+                trace = self._otel_trace
+                span.set_status(
+                    trace.Status(trace.StatusCode.ERROR, attributes["error.type"])
+                )
+            span.end(end_time=end)
+
+    def retry(self, route: str, reason: str) -> None:
+        self._retries.add(1, {"http.route": route, "x402.retry.reason": reason})
+
+    def cache_lookup(self, cache: str, hit: bool) -> None:
+        self._cache.add(
+            1, {"x402.cache": cache, "x402.cache.result": "hit" if hit else "miss"}
+        )
+
+    def serialization(self, operation: str, route: str, seconds: float) -> None:
+        self._serialization.record(
+            seconds, {"http.route": route, "x402.serialization.operation": operation}
+        )
+        if operation == "decode":
+            self._phase.record(seconds, {"http.route": route, "x402.phase": "parse"})
@@ -0,0 +1,574 @@
+"""
+Payment-gate middleware for the ChaosChain x402 client.
+
+Wraps an ASGI (Starlette, FastAPI, ...) or WSGI (Flask, Django, ...) app
+so that paid routes answer `402 Payment Required` until the request
+carries a valid `X-PAYMENT` header. The payment is verified before the
+handler runs and settled in the background once the response has been
+sent, so the handler never waits on settlement.
+
+Route requirements are compiled once into PaymentRequirementsTemplates
+and 402 bodies, so a request only pays for a dict lookup before verify.
+"""
+
+import asyncio
+import math
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from pydantic import BaseModel, Field
+
+from . import codec
+from .idempotency import new_reservation
+from .policies import CircuitOpenError
+from .ratelimit import RateLimitedError
+from .settlement import SettlementHandle
+from .settlement_queue import SettlementQueue
+from .templates import PaymentRequirementsTemplate
+from .types import PaymentRequirements, VerifyResponse
+
+# Key under which the VerifyResponse is exposed to the app
+# (ASGI: scope["state"]["x402"], i.e. Starlette's request.state.x402)
+STATE_KEY = "x402"
+
+_JSON_HEADERS = [(b"content-type", b"application/json")]
+
+# What verify_payment raises when the facilitator cannot answer: the
+# client's own errors (CircuitOpenError and RateLimitedError are
+# RuntimeErrors), timeouts, unwrapped transport errors (requests' are
+# OSErrors) and malformed responses (pydantic's ValidationError)
+FACILITATOR_ERRORS = (TimeoutError, RuntimeError, OSError, ValueError)
+
+
+class GatePolicy(BaseModel):
+    """
+    Backpressure and settlement behaviour of a payment gate.
+
+    When either limit is reached, paid requests are shed with
+    `503 Service Unavailable` and a `Retry-After` header instead of
+    queueing more work on the facilitator.
+    """
+
+    max_concurrent_verifications: int = Field(
+        default=256,
+        ge=1,
+        description="Verify calls in flight before new paid requests are shed",
+    )
+    max_pending_settlements: int = Field(
+        default=1024,
+        ge=1,
+        description="Settlements not yet final before new paid requests are shed",
+    )
+    retry_after: int = Field(
+        default=1, ge=0, description="Retry-After (s) sent with a 503"
+    )
+    settle: bool = Field(
+        default=True, description="Settle after a successful (< 400) response"
+    )
+
+
+class GateStats(BaseModel):
+    """Counters of a payment gate."""
+
+    verifying: int = Field(..., description="Verify calls in flight")
+    pending_settlements: int = Field(
+        ..., description="Settlements submitted and not yet final"
+    )
+    paid: int = Field(..., description="Requests let through with a valid payment")
+    challenged: int = Field(
+        ..., description="402 responses (missing or invalid payment)"
+    )
+    shed: int = Field(..., description="503 responses because of backpressure")
+    facilitator_errors: int = Field(
+        ...,
+        description="502/503 responses because verify failed or the circuit is open",
+    )
+    settled: int = Field(..., description="Settlements that reached a final status")
+    settle_failures: int = Field(..., description="Settlements that failed")
+
+
+class PaymentRoute:
+    """One paid route: its pre-encoded requirements and 402 challenge."""
+
+    __slots__ = ("method", "path", "template", "_challenge_prefix")
+
+    def __init__(
+        self, method: Optional[str], path: str, template: PaymentRequirementsTemplate
+    ):
+        self.method = method
+        self.path = path
+        self.template = template
+        self._challenge_prefix = (
+            b'{"x402Version":'
+            + str(template.x402_version).encode()
+            + b',"accepts":['
+            + codec.dumps(template.payload)
+            + b'],"error":'
+        )
+
+    def challenge(self, error: str) -> bytes:
+        """`402 Payment Required` body listing the accepted requirements."""
+        return self._challenge_prefix + codec.dumps(error) + b"}"
+
+    def __repr__(self) -> str:
+        return f"PaymentRoute({self.method or '*'} {self.path})"
+
+
+class PaymentGate:
+    """
+    Transport-independent core shared by the ASGI and WSGI middleware:
+    route lookup, admission control and settlement bookkeeping.
+
+    Routes are keyed by path (`/api/weather`) or method and path
+    (`GET /api/weather`). A requirements dict without `resource` gets the
+    route's path.
+    """
+
+    def __init__(
+        self,
+        routes: Mapping[
+            str, Union[dict, PaymentRequirements, PaymentRequirementsTemplate]
+        ],
+        x402_version: int = 1,
+        policy: Optional[GatePolicy] = None,
+        on_settlement: Optional[Callable[[SettlementHandle], None]] = None,
+    ):
+        self.policy = policy or GatePolicy()
+        self.on_settlement = on_settlement
+        self._routes: Dict[Tuple[Optional[str], str], PaymentRoute] = {}
+        for key, requirements in routes.items():
+            verb, _, path = key.strip().rpartition(" ")
+            method = verb.strip().upper() or None
+            if isinstance(requirements, dict) and "resource" not in requirements:
+                requirements = dict(requirements, resource=path)
+            if not isinstance(requirements, PaymentRequirementsTemplate):
+                requirements = PaymentRequirementsTemplate(requirements, x402_version)
+            self._routes[method, path] = PaymentRoute(method, path, requirements)
+
+        self._lock = threading.Lock()
+        self._verifying = 0
+        self._pending = 0
+        self._paid = 0
+        self._challenged = 0
+        self._shed = 0
+        self._facilitator_errors = 0
+        self._settled = 0
+        self._settle_failures = 0
+
+    @property
+    def routes(self) -> List[PaymentRoute]:
+        return list(self._routes.values())
+
+    def match(self, method: str, path: str) -> Optional[PaymentRoute]:
+        """The paid route for a request, or None if it is free."""
+        route = self._routes.get((method, path))
+        if route is None:
+            route = self._routes.get((None, path))
+        return route
+
+    def admit(self) -> Optional[str]:
+        """
+        Reserve a verify slot. Returns None if admitted (pair with
+        `release`), else the reason the request is shed.
+        """
+        with self._lock:
+            if self._pending >= self.policy.max_pending_settlements:
+                self._shed += 1
+                return "Too many settlements pending"
+            if self._verifying >= self.policy.max_concurrent_verifications:
+                self._shed += 1
+                return "Too many payment verifications in flight"
+            self._verifying += 1
+            return None
+
+    def release(self) -> None:
+        with self._lock:
+            self._verifying -= 1
+
+    def count(self, outcome: str) -> None:
+        """Count a `paid`, `challenged` or `facilitator_errors` response."""
+        with self._lock:
+            setattr(self, f"_{outcome}", getattr(self, f"_{outcome}") + 1)
+
+    def failure(self, error: BaseException, client: Any) -> Tuple[int, bytes, str]:
+        """
+        (status, body, Retry-After) for a verify that raised: 503 when the
+        client's rate limiter or circuit breaker refused the call, else 502.
+        """
+        retry_after = self.policy.retry_after
+        if isinstance(error, RateLimitedError):
+            status, code = 503, "FACILITATOR_BUSY"
+            self.count("shed")
+        elif isinstance(error, CircuitOpenError):
+            status, code = 503, "FACILITATOR_UNAVAILABLE"
+            breaker = getattr(client, "circuit_breaker", None)
+            if breaker is not None:
+                retry_after = max(retry_after, math.ceil(breaker.reset_timeout))
+            self.count("facilitator_errors")
+        else:
+            status, code = 502, "FACILITATOR_ERROR"
+            self.count("facilitator_errors")
+        return (
+            status,
+            _error_body(str(error) or type(error).__name__, code),
+            str(retry_after),
+        )
+
+    def track(self, handle: SettlementHandle) -> None:
+        """Count a background settlement as pending until it is final."""
+        with self._lock:
+            self._pending += 1
+        handle.add_done_callback(self._settled_callback)
+
+    def _settled_callback(self, handle: SettlementHandle) -> None:
+        with self._lock:
+            self._pending -= 1
+            if handle.status == "failed":
+                self._settle_failures += 1
+            else:
+                self._settled += 1
+        if self.on_settlement is not None:
+            self.on_settlement(handle)
+
+    def stats(self) -> GateStats:
+        with self._lock:
+            return GateStats(
+                verifying=self._verifying,
+                pending_settlements=self._pending,
+                paid=self._paid,
+                challenged=self._challenged,
+                shed=self._shed,
+                facilitator_errors=self._facilitator_errors,
+                settled=self._settled,
+                settle_failures=self._settle_failures,
+            )
+
+
+def _error_body(error: str, code: str) -> bytes:
+    return codec.dumps({"error": error, "code": code})
+
+
+class ASGIPaymentGate:
+    """
+    ASGI middleware that charges for the routes it is given.
+
+    Verifies with an AsyncX402Client before calling the app and submits
+    the settlement once the app has finished sending a response below
+    400. After an error response or an exception the payment's
+    `replay_guard` reservation is released instead. The VerifyResponse is available to handlers as
+    `scope["state"]["x402"]` (`request.state.x402` in Starlette/FastAPI).
+
+    Example:
+        ```python
+        from fastapi import FastAPI
+        from chaoschain_x402_client import AsyncX402Client, ASGIPaymentGate
+
+        app = FastAPI()
+        client = AsyncX402Client(facilitator_url='http://localhost:8402')
+        app.add_middleware(
+            ASGIPaymentGate,
+            client=client,
+            routes={
+                'GET /api/weather': {
+                    'scheme': 'exact',
+                    'network': 'base-sepolia',
+                    'maxAmountRequired': '1000000',
+                    'payTo': '0x...',
+                    'asset': '0x...',
+                },
+            },
+        )
+        ```
+    """
+
+    def __init__(
+        self,
+        app: Callable,
+        client: Any,
+        routes: Mapping[
+            str, Union[dict, PaymentRequirements, PaymentRequirementsTemplate]
+        ],
+        policy: Optional[GatePolicy] = None,
+        on_settlement: Optional[Callable[[SettlementHandle], None]] = None,
+        settlement_queue: Optional[SettlementQueue] = None,
+    ):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: The ASGI app to wrap
+            client: AsyncX402Client used to verify and settle
+            routes: Requirements per `"METHOD /path"` or `"/path"`
+            policy: Backpressure limits (default: GatePolicy())
+            on_settlement: Called with each SettlementHandle once it is final
+            settlement_queue: Journal settlements to this SettlementQueue
+                instead of submitting them to the client
+        """
+        self.app = app
+        self.client = client
+        self.settlement_queue = settlement_queue
+        self.gate = PaymentGate(routes, client.x402_version, policy, on_settlement)
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route = self.gate.match(scope["method"], scope["path"])
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        header = None
+        for name, value in scope["headers"]:
+            if name == b"x-payment":
+                header = value.decode("latin-1")
+                break
+        if not header:
+            self.gate.count("challenged")
+            await _asgi_respond(
+                send, 402, route.challenge("X-PAYMENT header is required")
+            )
+            return
+
+        shed = self.gate.admit()
+        if shed is not None:
+            await _asgi_respond(
+                send,
+                503,
+                _error_body(shed, "FACILITATOR_BUSY"),
+                [(b"retry-after", str(self.gate.policy.retry_after).encode())],
+            )
+            return
+        reservation = new_reservation()
+        try:
+            result = await self.client.verify_payment(
+                header, route.template, reservation
+            )
+        except FACILITATOR_ERRORS as e:
+            status, body, retry_after = self.gate.failure(e, self.client)
+            await _asgi_respond(
+                send, status, body, [(b"retry-after", retry_after.encode())]
+            )
+            return
+        finally:
+            self.gate.release()
+
+        if not result.isValid:
+            self.gate.count("challenged")
+            await _asgi_respond(
+                send, 402, route.challenge(result.invalidReason or "Invalid payment")
+            )
+            return
+
+        self.gate.count("paid")
+        scope.setdefault("state", {})[STATE_KEY] = result
+        status = 500
+
+        async def send_wrapper(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException:
+            self.client.release_payment(header, route.template, reservation)
+            raise
+        # The response has been sent in full by now
+        if status >= 400:
+            # Not charged, so the payer may retry with the same X-PAYMENT
+            self.client.release_payment(header, route.template, reservation)
+        elif self.gate.policy.settle:
+            if self.settlement_queue is not None:
+                # The journal fsync blocks, so keep it off the event loop
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self.settlement_queue.submit, header, route.template
+                )
+            else:
+                self.gate.track(self.client.submit_settlement(header, route.template))
+
+
+async def _asgi_respond(
+    send: Callable,
+    status: int,
+    body: bytes,
+    headers: Optional[List[Tuple[bytes, bytes]]] = None,
+) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": _JSON_HEADERS
+            + [(b"content-length", str(len(body)).encode())]
+            + (headers or []),
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+_REASONS = {
+    402: "402 Payment Required",
+    502: "502 Bad Gateway",
+    503: "503 Service Unavailable",
+}
+
+
+class WSGIPaymentGate:
+    """
+    WSGI middleware that charges for the routes it is given.
+
+    Verifies with an X402Client before calling the app and submits the
+    settlement when the server closes the response iterable, i.e. after
+    the body has been sent, or releases the payment's `replay_guard`
+    reservation if the response is an error. The VerifyResponse is available to handlers
+    as `environ["x402"]`.
+
+    Example:
+        ```python
+        from flask import Flask
+        from chaoschain_x402_client import X402Client, WSGIPaymentGate
+
+        app = Flask(__name__)
+        app.wsgi_app = WSGIPaymentGate(
+            app.wsgi_app,
+            client=X402Client(facilitator_url='http://localhost:8402'),
+            routes={'GET /api/weather': weather_requirements},
+        )
+        ```
+    """
+
+    def __init__(
+        self,
+        app: Callable,
+        client: Any,
+        routes: Mapping[
+            str, Union[dict, PaymentRequirements, PaymentRequirementsTemplate]
+        ],
+        policy: Optional[GatePolicy] = None,
+        on_settlement: Optional[Callable[[SettlementHandle], None]] = None,
+        settlement_queue: Optional[SettlementQueue] = None,
+    ):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: The WSGI app to wrap
+            client: X402Client used to verify and settle
+            routes: Requirements per `"METHOD /path"` or `"/path"`
+            policy: Backpressure limits (default: GatePolicy())
+            on_settlement: Called with each SettlementHandle once it is final
+            settlement_queue: Journal settlements to this SettlementQueue
+                instead of submitting them to the client
+        """
+        self.app = app
+        self.client = client
+        self.settlement_queue = settlement_queue
+        self.gate = PaymentGate(routes, client.x402_version, policy, on_settlement)
+
+    def __call__(self, environ: dict, start_response: Callable) -> Iterable[bytes]:
+        route = self.gate.match(
+            environ["REQUEST_METHOD"], environ.get("PATH_INFO") or "/"
+        )
+        if route is None:
+            return self.app(environ, start_response)
+
+        header = environ.get("HTTP_X_PAYMENT")
+        if not header:
+            self.gate.count("challenged")
+            return _wsgi_respond(
+                start_response, 402, route.challenge("X-PAYMENT header is required")
+            )
+
+        shed = self.gate.admit()
+        if shed is not None:
+            return _wsgi_respond(
+                start_response,
+                503,
+                _error_body(shed, "FACILITATOR_BUSY"),
+                [("Retry-After", str(self.gate.policy.retry_after))],
+            )
+        reservation = new_reservation()
+        try:
+            result = self.client.verify_payment(header, route.template, reservation)
+        except FACILITATOR_ERRORS as e:
+            status, body, retry_after = self.gate.failure(e, self.client)
+            return _wsgi_respond(
+                start_response, status, body, [("Retry-After", retry_after)]
+            )
+        finally:
+            self.gate.release()
+
+        if not result.isValid:
+            self.gate.count("challenged")
+            return _wsgi_respond(
+                start_response,
+                402,
+                route.challenge(result.invalidReason or "Invalid payment"),
+            )
+
+        self.gate.count("paid")
+        environ[STATE_KEY] = result
+        response_status = [500]
+
+        def start_wrapper(status_line: str, headers: list, exc_info=None):
+            response_status[0] = int(status_line[:3])
+            return start_response(status_line, headers, exc_info)
+
+        def settle() -> None:
+            if response_status[0] >= 400:
+                # Not charged, so the payer may retry with the same X-PAYMENT
+                self.client.release_payment(header, route.template, reservation)
+            elif self.gate.policy.settle:
+                if self.settlement_queue is not None:
+                    self.settlement_queue.submit(header, route.template)
+                else:
+                    self.gate.track(
+                        self.client.submit_settlement(header, route.template)
+                    )
+
+        try:
+            response = self.app(environ, start_wrapper)
+        except BaseException:
+            self.client.release_payment(header, route.template, reservation)
+            raise
+        return _ClosingIterator(response, settle)
+
+
+class _ClosingIterator:
+    """Response iterable that runs a callback when the server closes it."""
+
+    __slots__ = ("_iterable", "_iterator", "_callback")
+
+    def __init__(self, iterable: Iterable[bytes], callback: Callable[[], None]):
+        self._iterable = iterable
+        self._iterator = iter(iterable)
+        self._callback = callback
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> bytes:
+        return next(self._iterator)
+
+    def close(self) -> None:
+        try:
+            close = getattr(self._iterable, "close", None)
+            if close is not None:
+                close()
+        finally:
+            self._callback()
+
+
+def _wsgi_respond(
+    start_response: Callable,
+    status: int,
+    body: bytes,
+    headers: Optional[List[Tuple[str, str]]] = None,
+) -> List[bytes]:
+    start_response(
+        _REASONS[status],
+        [("Content-Type", "application/json"), ("Content-Length", str(len(body)))]
+        + (headers or []),
+    )
+    return [body]
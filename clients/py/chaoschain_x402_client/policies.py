@@ -0,0 +1,200 @@
+"""
+Resilience policies for the ChaosChain x402 client: retry with jittered
+exponential backoff, hedged requests and a circuit breaker.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from typing import Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the facilitator while the circuit is open."""
+
+
+class RetryPolicy(BaseModel):
+    """
+    Retry with full-jitter exponential backoff.
+
+    `/verify` is read-only and always safe to retry. `/settle` is retried
+    with the same `Idempotency-Key` on every attempt, so the bridge serves
+    the stored response instead of settling twice.
+    """
+
+    max_attempts: int = Field(
+        default=3, ge=1, description="Total attempts, including the first"
+    )
+    backoff_base: float = Field(
+        default=0.1, ge=0, description="Backoff before the 2nd attempt (s)"
+    )
+    backoff_max: float = Field(
+        default=2.0, ge=0, description="Upper bound on a single backoff (s)"
+    )
+    jitter: bool = Field(
+        default=True, description="Randomize each backoff in [0, backoff]"
+    )
+    retry_on_status: Tuple[int, ...] = Field(
+        default=(502, 503, 504), description="HTTP status codes treated as transient"
+    )
+
+    def backoff(self, attempt: int) -> float:
+        """Seconds to sleep after failed attempt number `attempt` (0-based)."""
+        delay = min(self.backoff_max, self.backoff_base * (2**attempt))
+        return random.uniform(0, delay) if self.jitter else delay
+
+
+class HedgePolicy(BaseModel):
+    """
+    Hedged `/verify` requests.
+
+    If the first request has not answered after `delay` seconds (or, when
+    `delay` is None, after the observed `percentile` latency), a second
+    identical request is sent and whichever answers first wins.
+    """
+
+    delay: Optional[float] = Field(
+        default=None,
+        ge=0,
+        description="Fixed hedge delay (s); None uses observed latency",
+    )
+    percentile: float = Field(
+        default=0.95, gt=0, lt=1, description="Latency percentile to hedge at"
+    )
+    min_samples: int = Field(
+        default=20, ge=1, description="Samples needed before hedging on percentile"
+    )
+    min_delay: float = Field(
+        default=0.005, ge=0, description="Never hedge sooner than this (s)"
+    )
+
+
+class LatencyTracker:
+    """Rolling window of request latencies with a cheap percentile lookup."""
+
+    def __init__(self, window: int = 512):
+        self._samples: "deque[float]" = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """The q-quantile of the window, or None if it is empty."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def hedge_delay(self, policy: HedgePolicy) -> Optional[float]:
+        """Seconds to wait before hedging, or None to not hedge yet."""
+        if policy.delay is not None:
+            return max(policy.delay, policy.min_delay)
+        if len(self) < policy.min_samples:
+            return None
+        observed = self.percentile(policy.percentile)
+        if observed is None:
+            return None
+        return max(observed, policy.min_delay)
+
+
+class CircuitBreaker:
+    """
+    Fail fast while the facilitator is unhealthy.
+
+    After `failure_threshold` consecutive transient failures the circuit
+    opens and calls raise CircuitOpenError immediately. Once
+    `reset_timeout` has passed a single trial call is let through
+    (half-open): success closes the circuit, failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = 0.0
+        self._state = self.CLOSED
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if (
+                self._state == self.OPEN
+                and time.monotonic() - self._opened_at >= self.reset_timeout
+            ):
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go out now."""
+        return self._admit() is not None
+
+    def _admit(self) -> Optional[bool]:
+        """None if blocked, else whether this call is the half-open trial."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return False
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return None
+            # Half-open: only one trial call at a time
+            if self._trial_in_flight:
+                return None
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = True
+            return True
+
+    def check(self) -> bool:
+        """
+        Raise CircuitOpenError if calls are currently blocked.
+
+        Returns:
+            True if this call is the half-open trial. The caller must end it
+            with record_success(), record_failure() or release_trial().
+        """
+        trial = self._admit()
+        if trial is None:
+            raise CircuitOpenError(
+                "Facilitator circuit is open after repeated failures; "
+                f"retrying in up to {self.reset_timeout}s"
+            )
+        return trial
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._state = self.CLOSED
+            self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """
+        End a half-open trial without an outcome (throttled, cancelled or
+        refused locally), so the next call may try again.
+        """
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if (
+                self._state == self.HALF_OPEN
+                or self._failures >= self.failure_threshold
+            ):
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
@@ -0,0 +1,120 @@
+"""
+Local pre-validation of X-PAYMENT headers for the ChaosChain x402 client.
+
+Rejects payments that are obviously invalid (undecodable, expired, not
+yet valid, wrong network, wrong recipient, underpaid) before they reach
+the facilitator, which would otherwise spend several RPC reads
+(`decimals`, `balanceOf`, `authorizationState`) only to reject them.
+Anything that passes still needs a facilitator verify: balance, nonce
+and signature are not checked here.
+"""
+
+import time
+from typing import Any, Dict, FrozenSet, Optional, Tuple, Union
+
+from .headers import decode_payment_header
+from .templates import PaymentRequirementsTemplate
+from .types import PaymentRequirements, VerifyResponse
+
+
+def requirement_field(
+    payment_requirements: Union[
+        Dict[str, Any], PaymentRequirements, PaymentRequirementsTemplate
+    ],
+    name: str,
+) -> Any:
+    """Read one requirements field from any accepted form without re-validating."""
+    if isinstance(payment_requirements, PaymentRequirementsTemplate):
+        payment_requirements = payment_requirements.requirements
+    if isinstance(payment_requirements, dict):
+        return payment_requirements.get(name)
+    # PaymentRequirements or CompactPaymentRequirements
+    return getattr(payment_requirements, name)
+
+
+def precheck_payment(
+    payment_header: Union[str, Dict[str, Any]],
+    payment_requirements: Union[
+        Dict[str, Any], PaymentRequirements, PaymentRequirementsTemplate
+    ],
+    now: Optional[int] = None,
+    supported: Optional[FrozenSet[Tuple[str, str]]] = None,
+) -> Optional[VerifyResponse]:
+    """
+    Check a payment locally and return a rejection, or None if it may be valid.
+
+    Args:
+        payment_header: Base64 encoded X-PAYMENT header (or decoded dict)
+        payment_requirements: Payment requirements from the resource server
+        now: Unix time in seconds to check against (default: current time)
+        supported: Known (scheme, network) pairs; skipped when None
+
+    Returns:
+        A VerifyResponse with isValid=False and the reason, or None when
+        the payment should go on to the facilitator
+
+    Example:
+        ```python
+        from chaoschain_x402_client.precheck import precheck_payment
+
+        rejection = precheck_payment(header, requirements)
+        if rejection is not None:
+            return payment_required(rejection.invalidReason)
+        ```
+    """
+    if now is None:
+        now = int(time.time())
+
+    def reject(reason: str) -> VerifyResponse:
+        return VerifyResponse(
+            isValid=False, invalidReason=reason, timestamp=int(time.time() * 1000)
+        )
+
+    scheme = requirement_field(payment_requirements, "scheme")
+    network = requirement_field(payment_requirements, "network")
+    max_amount = requirement_field(payment_requirements, "maxAmountRequired")
+    pay_to = requirement_field(payment_requirements, "payTo")
+
+    if supported is not None and (scheme, network) not in supported:
+        return reject(f"Unsupported network: {network}")
+
+    try:
+        auth = decode_payment_header(payment_header)
+    except ValueError as e:
+        return reject(str(e))
+
+    if auth["network"] is not None and auth["network"] != network:
+        return reject(
+            f"Network mismatch (header: {auth['network']}, required: {network})"
+        )
+    if auth["scheme"] is not None and auth["scheme"] != scheme:
+        return reject(f"Scheme mismatch (header: {auth['scheme']}, required: {scheme})")
+
+    try:
+        if auth["validAfter"]:
+            valid_after = int(auth["validAfter"])
+            if now < valid_after:
+                return reject(
+                    f"Authorization not yet valid (validAfter: {valid_after}, now: {now})"
+                )
+
+        if auth["validBefore"]:
+            valid_before = int(auth["validBefore"])
+            if now > valid_before:
+                return reject(
+                    f"Authorization expired (validBefore: {valid_before}, now: {now})"
+                )
+
+        if auth["value"] is not None and max_amount is not None:
+            if int(auth["value"]) < int(max_amount):
+                return reject(
+                    f"Authorized value too low (value: {auth['value']}, "
+                    f"maxAmountRequired: {max_amount})"
+                )
+    except (TypeError, ValueError):
+        return reject("Invalid payment header format")
+
+    if auth["to"] and pay_to and str(auth["to"]).lower() != pay_to.lower():
+        return reject(f"Payment recipient mismatch (to: {auth['to']}, payTo: {pay_to})")
+
+    return None
@@ -0,0 +1,512 @@
+"""
+Client-side rate limiting for the ChaosChain x402 client: a token bucket
+that keeps outbound requests under the bridge's per-IP limit, an AIMD
+concurrency limit, and pauses that honour the bridge's `retryAfter`.
+
+The bridge's `rateLimitMiddleware` allows 1000 requests per minute per IP
+on `/verify`, `/verify/batch`, `/settle` and `/settlements/*` and answers
+anything above that with 429 and `{"retryAfter": seconds}`. Spreading the
+budget evenly over the minute instead of spending it in a burst, and
+waiting out `retryAfter` instead of retrying straight away, keeps the
+throughput steady while throttled. Waiting calls are served by route
+priority, so settlements are not starved by a flood of verifications.
+"""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional
+
+from pydantic import BaseModel, Field
+
+from . import codec
+
+# Routes the bridge runs through rateLimitMiddleware
+RATE_LIMITED_ROUTES = frozenset(
+    {
+        "/verify",
+        "/verify/batch",
+        "/settle",
+        "/settlements/status",
+        "/settlements/stream",
+    }
+)
+
+# Release status of a permit whose request was cancelled; leaves the limits as they are
+_ABANDONED = 0
+
+
+class RateLimitedError(RuntimeError):
+    """Raised when a call cannot get a permit within `max_wait`, or the queue is full."""
+
+
+class RateLimitPolicy(BaseModel):
+    """
+    Token bucket and AIMD settings.
+
+    The bucket refills at the current rate, starting at
+    `requests_per_minute`. A 429 empties it, pauses every request for
+    `retryAfter` and multiplies the rate and the concurrency limit by
+    `decrease`; afterwards the rate recovers linearly and the limit grows
+    by `increase` per limit's worth of successful requests. A 503 or a
+    transport error only lowers the concurrency limit.
+    """
+
+    requests_per_minute: float = Field(
+        default=1000,
+        gt=0,
+        description="Highest request rate; the bridge allows 1000/min per IP",
+    )
+    burst: int = Field(
+        default=10, ge=1, description="Requests that may go out back-to-back"
+    )
+    initial_concurrency: int = Field(
+        default=16, ge=1, description="Requests in flight before any feedback"
+    )
+    min_concurrency: int = Field(
+        default=1, ge=1, description="Lower bound on the concurrency limit"
+    )
+    max_concurrency: int = Field(
+        default=256, ge=1, description="Upper bound on the concurrency limit"
+    )
+    increase: float = Field(
+        default=1.0, gt=0, description="Limit added per limit's worth of successes"
+    )
+    decrease: float = Field(
+        default=0.5,
+        gt=0,
+        lt=1,
+        description="Factor applied to rate and limit on throttling",
+    )
+    min_rate: float = Field(
+        default=0.05,
+        gt=0,
+        le=1,
+        description="Lowest rate, as a fraction of the ceiling",
+    )
+    recovery: float = Field(
+        default=0.02,
+        gt=0,
+        description="Fraction of the ceiling the rate regains per second",
+    )
+    default_retry_after: float = Field(
+        default=1.0, ge=0, description="Pause after a 429 without retryAfter (s)"
+    )
+    max_retry_after: float = Field(
+        default=60.0, ge=0, description="Longest pause honoured for one 429 (s)"
+    )
+    retry_throttled: int = Field(
+        default=3, ge=0, description="Times a 429 is resent after the pause"
+    )
+    max_wait: Optional[float] = Field(
+        default=30.0,
+        ge=0,
+        description="Longest a call waits for a permit (s); None waits indefinitely",
+    )
+    max_queue: int = Field(
+        default=10_000, ge=0, description="Calls allowed to wait; more are refused"
+    )
+    priorities: Dict[str, int] = Field(
+        default={"/settle": 0, "/verify": 1, "/verify/batch": 1},
+        description="Route -> priority; lower numbers are served first",
+    )
+    default_priority: int = Field(
+        default=2, description="Priority of routes not in `priorities`"
+    )
+    routes: FrozenSet[str] = Field(
+        default=RATE_LIMITED_ROUTES, description="Routes subject to the limit"
+    )
+
+    def priority(self, route: str) -> int:
+        return self.priorities.get(route, self.default_priority)
+
+
+class RateLimitStats(BaseModel):
+    """
+    Snapshot of a RateLimiter.
+    """
+
+    rate: float = Field(..., description="Current request rate (requests/s)")
+    concurrency_limit: int = Field(..., description="Current AIMD concurrency limit")
+    in_flight: int = Field(..., description="Permits held by requests")
+    queued: int = Field(..., description="Calls waiting for a permit")
+    paused_for: float = Field(
+        ..., description="Seconds left of the current retryAfter pause"
+    )
+    granted: int = Field(..., description="Permits handed out")
+    throttled: int = Field(..., description="Responses that were 429")
+    rejected: int = Field(..., description="Calls refused with RateLimitedError")
+
+
+def parse_retry_after(headers: Mapping[str, str], content: bytes) -> Optional[float]:
+    """
+    Seconds to wait from a 429: the `Retry-After` header if it is a
+    number, else the bridge's `retryAfter` body field, else None.
+    """
+    value: Any = headers.get("retry-after")
+    if value is None:
+        try:
+            value = codec.loads(content).get("retryAfter")
+        except (ValueError, AttributeError):
+            return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class _Limits:
+    """Bucket, AIMD and pause state shared by both limiters; callers serialize access."""
+
+    def __init__(self, policy: RateLimitPolicy):
+        self.policy = policy
+        self.ceiling = policy.requests_per_minute / 60
+        self.rate = self.ceiling
+        self.tokens = float(policy.burst)
+        self.limit = float(
+            min(
+                max(policy.initial_concurrency, policy.min_concurrency),
+                policy.max_concurrency,
+            )
+        )
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.stamp = time.monotonic()
+        # Permits carry the generation they were granted in; only the
+        # first bad response of a generation backs off, so a burst of
+        # 429s from requests sent together counts as one signal
+        self.generation = 0
+        self.granted = 0
+        self.throttled = 0
+        self.rejected = 0
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - max(self.stamp, self.paused_until)
+        self.stamp = now
+        if elapsed > 0:
+            self.rate = min(
+                self.ceiling, self.rate + self.ceiling * self.policy.recovery * elapsed
+            )
+            self.tokens = min(
+                float(self.policy.burst), self.tokens + self.rate * elapsed
+            )
+
+    def wait_time(self, now: float) -> Optional[float]:
+        """0 if a request may start now, seconds until it may, or None until a permit is released."""
+        if self.in_flight >= int(self.limit):
+            return None
+        if now < self.paused_until:
+            return self.paused_until - now
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self) -> int:
+        self.tokens -= 1
+        self.in_flight += 1
+        self.granted += 1
+        return self.generation
+
+    def release(
+        self,
+        now: float,
+        generation: int,
+        status: Optional[int],
+        retry_after: Optional[float],
+    ) -> None:
+        self.in_flight -= 1
+        policy = self.policy
+        if status == 429:
+            self.throttled += 1
+            self._refill(now)
+            pause = policy.default_retry_after if retry_after is None else retry_after
+            self.paused_until = max(
+                self.paused_until, now + min(pause, policy.max_retry_after)
+            )
+            self.tokens = 0.0
+            if generation == self.generation:
+                self.rate = max(
+                    self.ceiling * policy.min_rate, self.rate * policy.decrease
+                )
+                self._backoff()
+        elif status is None or status in (502, 503, 504):
+            if generation == self.generation:
+                self._backoff()
+        elif 200 <= status < 500:
+            self.limit = min(
+                float(policy.max_concurrency), self.limit + policy.increase / self.limit
+            )
+
+    def _backoff(self) -> None:
+        self.limit = max(
+            float(self.policy.min_concurrency), self.limit * self.policy.decrease
+        )
+        self.generation += 1
+
+    def stats(self, now: float, queued: int) -> RateLimitStats:
+        return RateLimitStats(
+            rate=self.rate,
+            concurrency_limit=int(self.limit),
+            in_flight=self.in_flight,
+            queued=queued,
+            paused_for=max(0.0, self.paused_until - now),
+            granted=self.granted,
+            throttled=self.throttled,
+            rejected=self.rejected,
+        )
+
+
+class RateLimiter:
+    """
+    Rate and concurrency limiter for X402Client.
+
+    `acquire` blocks until the call may go out and returns a permit that
+    must be passed back to `release` with the response status. One
+    limiter can be shared by every client in a process, since the bridge
+    counts requests per IP.
+
+    Example:
+        ```python
+        limiter = RateLimiter(RateLimitPolicy(requests_per_minute=900))
+        client = X402Client(facilitator_url=url, rate_limiter=limiter)
+        ```
+    """
+
+    def __init__(self, policy: Optional[RateLimitPolicy] = None):
+        """
+        Args:
+            policy: Bucket, AIMD and queueing settings (default: RateLimitPolicy())
+        """
+        self.policy = policy or RateLimitPolicy()
+        self._limits = _Limits(self.policy)
+        self._lock = threading.Lock()
+        # Heap of [priority, sequence, condition]; each waiter sleeps on
+        # its own condition and only the head is woken to take a permit
+        self._waiters: List[list] = []
+        self._sequence = itertools.count()
+
+    def acquire(self, route: str, timeout: Optional[float] = -1.0) -> Optional[int]:
+        """
+        Wait for a permit to call `route`.
+
+        Args:
+            route: Request path without query string
+            timeout: Longest wait in seconds; None waits indefinitely
+                (default: the policy's `max_wait`)
+
+        Returns:
+            The permit, or None if `route` is not rate limited
+
+        Raises:
+            RateLimitedError: No permit within `timeout`, or the queue is full
+        """
+        if route not in self.policy.routes:
+            return None
+        if timeout is not None and timeout < 0:
+            timeout = self.policy.max_wait
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._lock:
+            now = time.monotonic()
+            if not self._waiters and self._limits.wait_time(now) == 0:
+                return self._limits.take()
+            if len(self._waiters) >= self.policy.max_queue:
+                self._limits.rejected += 1
+                raise RateLimitedError(
+                    f"Rate limiter queue is full ({self.policy.max_queue} waiting)"
+                )
+
+            waiter: List[Any] = [
+                self.policy.priority(route),
+                next(self._sequence),
+                threading.Condition(self._lock),
+            ]
+            heapq.heappush(self._waiters, waiter)
+            try:
+                while True:
+                    delay = (
+                        self._limits.wait_time(now)
+                        if self._waiters[0] is waiter
+                        else None
+                    )
+                    if delay == 0:
+                        heapq.heappop(self._waiters)
+                        permit = self._limits.take()
+                        self._wake_head()
+                        return permit
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            self._limits.rejected += 1
+                            raise RateLimitedError(
+                                f"No rate limit permit for {route} within {timeout}s"
+                            )
+                        delay = remaining if delay is None else min(delay, remaining)
+                    waiter[2].wait(delay)
+                    now = time.monotonic()
+            except BaseException:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    heapq.heapify(self._waiters)
+                    self._wake_head()
+                raise
+
+    def release(
+        self,
+        permit: Optional[int],
+        status: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        """
+        Return a permit with the outcome of its request.
+
+        Args:
+            permit: What `acquire` returned; None is ignored
+            status: HTTP status, or None if the request failed in transport
+            retry_after: Pause requested by a 429, from `parse_retry_after`
+        """
+        if permit is None:
+            return
+        with self._lock:
+            self._limits.release(time.monotonic(), permit, status, retry_after)
+            self._wake_head()
+
+    def abandon(self, permit: Optional[int]) -> None:
+        """Return a permit whose request got no answer through no fault of the facilitator."""
+        self.release(permit, _ABANDONED)
+
+    def _wake_head(self) -> None:
+        if self._waiters:
+            self._waiters[0][2].notify()
+
+    def stats(self) -> RateLimitStats:
+        with self._lock:
+            return self._limits.stats(time.monotonic(), len(self._waiters))
+
+
+class AsyncRateLimiter:
+    """
+    Rate and concurrency limiter for AsyncX402Client.
+
+    The asyncio counterpart of RateLimiter: waiting calls hold a future
+    that is resolved in priority order from `release` or from a timer
+    set for when the bucket next has a token. Bound to one event loop.
+    """
+
+    def __init__(self, policy: Optional[RateLimitPolicy] = None):
+        """
+        Args:
+            policy: Bucket, AIMD and queueing settings (default: RateLimitPolicy())
+        """
+        self.policy = policy or RateLimitPolicy()
+        self._limits = _Limits(self.policy)
+        # Heap of [priority, sequence, future]
+        self._waiters: List[list] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def acquire(
+        self, route: str, timeout: Optional[float] = -1.0
+    ) -> Optional[int]:
+        """
+        Wait for a permit to call `route`.
+
+        Args:
+            route: Request path without query string
+            timeout: Longest wait in seconds; None waits indefinitely
+                (default: the policy's `max_wait`)
+
+        Returns:
+            The permit, or None if `route` is not rate limited
+
+        Raises:
+            RateLimitedError: No permit within `timeout`, or the queue is full
+        """
+        if route not in self.policy.routes:
+            return None
+        if timeout is not None and timeout < 0:
+            timeout = self.policy.max_wait
+        if not self._waiters and self._limits.wait_time(time.monotonic()) == 0:
+            return self._limits.take()
+        if len(self._waiters) >= self.policy.max_queue:
+            self._limits.rejected += 1
+            raise RateLimitedError(
+                f"Rate limiter queue is full ({self.policy.max_queue} waiting)"
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._waiters, [self.policy.priority(route), next(self._sequence), future]
+        )
+        self._dispatch()
+        try:
+            # asyncio.wait, unlike wait_for, never cancels the future, so
+            # a permit granted right at the deadline is not lost
+            await asyncio.wait((future,), timeout=timeout)
+        except asyncio.CancelledError:
+            self._abandon(future)
+            raise
+        if not future.done():
+            self._abandon(future)
+            self._limits.rejected += 1
+            raise RateLimitedError(
+                f"No rate limit permit for {route} within {timeout}s"
+            )
+        return future.result()
+
+    def _abandon(self, future: "asyncio.Future[int]") -> None:
+        if future.done() and not future.cancelled():
+            # Granted, but the caller is gone
+            self.abandon(future.result())
+        else:
+            future.cancel()
+            self._dispatch()
+
+    def release(
+        self,
+        permit: Optional[int],
+        status: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        """
+        Return a permit with the outcome of its request.
+
+        Args:
+            permit: What `acquire` returned; None is ignored
+            status: HTTP status, or None if the request failed in transport
+            retry_after: Pause requested by a 429, from `parse_retry_after`
+        """
+        if permit is None:
+            return
+        self._limits.release(time.monotonic(), permit, status, retry_after)
+        self._dispatch()
+
+    def abandon(self, permit: Optional[int]) -> None:
+        """Return a permit whose request got no answer through no fault of the facilitator."""
+        self.release(permit, _ABANDONED)
+
+    def _dispatch(self) -> None:
+        """Grant permits to waiters in priority order while the limits allow."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._waiters:
+            future = self._waiters[0][2]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            delay = self._limits.wait_time(time.monotonic())
+            if delay is None:
+                return
+            if delay > 0:
+                self._timer = future.get_loop().call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            future.set_result(self._limits.take())
+
+    def stats(self) -> RateLimitStats:
+        queued = sum(not waiter[2].done() for waiter in self._waiters)
+        return self._limits.stats(time.monotonic(), queued)
@@ -0,0 +1,917 @@
+"""
+Streaming reconciliation of facilitator settlement exports against a local ledger.
+
+Reads exports of the bridge's `transactions` table
+(`http-bridge/supabase/schema.sql`) and the resource server's own payment
+log as CSV or NDJSON files, optionally gzipped, and reports every
+settlement the two disagree on:
+
+- present on one side only (`missing_local`, `missing_export`)
+- a different status, nonce, amount, fee or net amount
+- a fee/net split in the export that does not match its `fee_bps`
+- a settlement with a fee but no fee transfer (`txHashFee`)
+
+Rows are matched on the transaction hash, and on the authorization nonce
+when only one side has a hash (or neither does). Ledger statuses are
+mapped onto the export's vocabulary first, and a settlement the ledger
+recorded as `pending` that the export shows `confirmed` has simply
+finished. The join is a partitioned hash join, so memory is bounded by
+the partition size rather than by the input:
+
+1. Every input file (shard) is read in chunks of `chunk_size` rows and
+   each row is spilled to one of `partitions` temporary files by a hash of
+   its key: the transaction hash, else the nonce. Shards are processed in
+   parallel.
+2. Each partition builds a hash index of its ledger rows and streams its
+   export rows through it. Rows left unmatched that carry a nonce are
+   spilled again by a hash of the nonce. Partitions are processed in
+   parallel.
+3. The nonce partitions are joined the same way.
+
+Each pass touches each row at most once, so the run time grows linearly
+with the number of rows. Standard library only.
+
+Run it from the command line:
+
+    python -m chaoschain_x402_client.reconciliation \\
+        --exports exports/transactions-*.csv.gz --ledger ledger/*.ndjson \\
+        --output mismatches.ndjson --processes 8
+
+or in-process:
+
+    ```python
+    from chaoschain_x402_client.reconciliation import reconcile
+
+    report = reconcile(glob.glob('exports/*.csv'), 'ledger.ndjson', output='mismatches.ndjson')
+    print(report.matched, report.mismatches)
+    ```
+"""
+
+import argparse
+import csv
+import gzip
+import marshal
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from pydantic import BaseModel, Field
+
+from . import codec
+from .fees import calculate_fee, parse_base_units
+
+# Mismatch kinds
+MISSING_LOCAL = "missing_local"
+MISSING_EXPORT = "missing_export"
+STATUS = "status"
+NONCE = "nonce"
+AMOUNT = "amount"
+FEE_SPLIT = "fee_split"
+FEE_TX = "fee_tx"
+DUPLICATE = "duplicate"
+UNKEYED = "unkeyed"
+
+# Values read from every row, in this order
+_FIELDS = (
+    "tx_hash",
+    "nonce",
+    "status",
+    "amount",
+    "fee",
+    "net",
+    "fee_bps",
+    "tx_hash_fee",
+)
+# A spilled row is (key, *values, shard, line)
+_KEY, _TX, _NONCE, _STATUS, _AMOUNT, _FEE, _NET, _BPS, _FEE_TX, _SHARD, _LINE = range(
+    11
+)
+_ROW_NAMES = (
+    "txHash",
+    "nonce",
+    "status",
+    "amount",
+    "fee",
+    "net",
+    "feeBps",
+    "txHashFee",
+)
+
+_EXPORT, _LEDGER = "export", "ledger"
+# Spill files are a sequence of length-prefixed marshal chunks
+_CHUNK_LENGTH = struct.Struct("<Q")
+
+# (side, shard, path, column names, partitions, work dir, chunk size)
+_ShardJob = Tuple[str, int, str, Tuple[Optional[str], ...], int, str, int]
+
+# Ledger status -> export status: SettleResponse reports `partial_settlement`
+# while the fee transfer is unconfirmed, a state the `transactions` table
+# records as `pending`
+LEDGER_STATUSES: Dict[str, str] = {"partial_settlement": "pending"}
+# (ledger, export) statuses that are a settlement progressing, not a mismatch
+_PROGRESS = frozenset({("pending", "confirmed")})
+
+PathsArg = Union[str, "os.PathLike[str]", Iterable[Union[str, "os.PathLike[str]"]]]
+
+
+class ReconcileColumns(BaseModel):
+    """
+    Where one side's rows keep the compared values.
+
+    Names are CSV header names or NDJSON keys; a dotted name such as
+    `amount.base` walks nested NDJSON objects. A column that is None, or
+    missing from a file, reads as empty. The defaults are the columns of
+    the `transactions` table; `nonce` and `tx_hash_fee` are not in the
+    schema but are used when an export carries them.
+    """
+
+    tx_hash: Optional[str] = Field(
+        default="tx_hash", description="Settlement transaction hash"
+    )
+    nonce: Optional[str] = Field(
+        default="nonce", description="EIP-3009 authorization nonce"
+    )
+    status: Optional[str] = Field(
+        default="status", description="pending, partial_settlement, confirmed or failed"
+    )
+    amount: Optional[str] = Field(
+        default="amount", description="Payment amount in base units"
+    )
+    fee: Optional[str] = Field(
+        default="fee_amount", description="Facilitator fee in base units"
+    )
+    net: Optional[str] = Field(
+        default="net_amount", description="Amount after fee in base units"
+    )
+    fee_bps: Optional[str] = Field(
+        default="fee_bps", description="Fee rate in basis points"
+    )
+    tx_hash_fee: Optional[str] = Field(
+        default="tx_hash_fee", description="Fee transfer transaction hash"
+    )
+
+    def names(self) -> Tuple[Optional[str], ...]:
+        return tuple(getattr(self, field) for field in _FIELDS)
+
+
+# A ledger of SettleResponse.model_dump() lines with the payment's nonce added
+LEDGER_COLUMNS = ReconcileColumns(
+    tx_hash="txHash",
+    nonce="nonce",
+    status="status",
+    amount="amount.base",
+    fee="fee.base",
+    net="net.base",
+    fee_bps="fee.bps",
+    tx_hash_fee="txHashFee",
+)
+
+
+class ReconcilePolicy(BaseModel):
+    """
+    Input layout, checks and sizing of a reconciliation run.
+    """
+
+    export_columns: ReconcileColumns = Field(
+        default_factory=ReconcileColumns,
+        description="Columns of the transactions export",
+    )
+    ledger_columns: ReconcileColumns = Field(
+        default_factory=lambda: LEDGER_COLUMNS.model_copy(),
+        description="Columns of the local ledger",
+    )
+    ledger_statuses: Dict[str, str] = Field(
+        default_factory=lambda: dict(LEDGER_STATUSES),
+        description="Ledger status -> export status, applied before statuses are compared",
+    )
+    check_fee_split: bool = Field(
+        default=True, description="Check the export's fee and net against its fee_bps"
+    )
+    require_fee_tx: bool = Field(
+        default=True,
+        description="Flag settlements that carry a fee but have no fee transfer hash on either side",
+    )
+    chunk_size: int = Field(
+        default=50_000, ge=1, description="Rows read from a shard between spills"
+    )
+    partitions: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Hash partitions; by default one per partition_bytes of input",
+    )
+    partition_bytes: int = Field(
+        default=64 << 20,
+        ge=1,
+        description="Input bytes per partition, which bounds the memory of the join",
+    )
+    samples: int = Field(default=20, ge=0, description="Mismatches kept in the report")
+
+
+class Mismatch(BaseModel):
+    """
+    One disagreement between the export and the ledger.
+
+    `export` and `local` are the rows involved (txHash, nonce, status,
+    amount, fee, net, feeBps, txHashFee, file, line), None for the side
+    the settlement is missing from.
+    """
+
+    kind: str = Field(
+        ..., description="missing_local, missing_export, status, nonce, amount, ..."
+    )
+    key: Optional[str] = Field(
+        default=None, description="Transaction hash, or nonce:<nonce>"
+    )
+    detail: str = Field(default="", description="What differs")
+    export: Optional[Dict[str, Any]] = Field(
+        default=None, description="Row of the export"
+    )
+    local: Optional[Dict[str, Any]] = Field(
+        default=None, description="Row of the local ledger"
+    )
+
+
+class ReconcileReport(BaseModel):
+    """
+    Outcome of a reconciliation run.
+    """
+
+    export_rows: int = Field(..., description="Rows read from the exports")
+    ledger_rows: int = Field(..., description="Rows read from the ledger")
+    matched: int = Field(..., description="Export rows found in the ledger")
+    unmatched_failed: int = Field(
+        default=0,
+        description="Failed settlements without a transaction hash found on one side only; "
+        "they moved no funds and are not reported as mismatches",
+    )
+    malformed: int = Field(
+        ..., description="Rows that could not be parsed and were skipped"
+    )
+    mismatches: Dict[str, int] = Field(
+        default_factory=dict, description="Mismatch count per kind"
+    )
+    samples: List[Mismatch] = Field(
+        default_factory=list, description="The first mismatches found"
+    )
+    partitions: int = Field(..., description="Hash partitions used")
+    processes: int = Field(..., description="Worker processes used")
+    elapsed: float = Field(..., description="Wall-clock seconds")
+
+    @property
+    def clean(self) -> bool:
+        """True if the two sides agree on every settlement."""
+        return not self.mismatches
+
+
+def _paths(value: PathsArg) -> List[str]:
+    if isinstance(value, (str, os.PathLike)):
+        return [os.fspath(value)]
+    return [os.fspath(path) for path in value]
+
+
+def _is_csv(path: str) -> bool:
+    stem = path[:-3] if path.endswith(".gz") else path
+    return os.path.splitext(stem)[1].lower() == ".csv"
+
+
+def _read_csv(
+    path: str, names: Sequence[Optional[str]]
+) -> Iterator[Tuple[int, Optional[Sequence]]]:
+    """Yield (line, values) per row; values is None for a row that is too short."""
+    if path.endswith(".gz"):
+        f = gzip.open(path, "rt", encoding="utf-8-sig", newline="")
+    else:
+        f = open(path, encoding="utf-8-sig", newline="")
+    with f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        position: Dict[Optional[str], int] = {
+            name.strip(): index for index, name in enumerate(header)
+        }
+        # Absent columns read the None appended to every row
+        get = itemgetter(*(position.get(name, -1) for name in names))
+        for row in reader:
+            row.append(None)  # type: ignore[arg-type]
+            try:
+                values = get(row)
+            except IndexError:
+                values = None
+            yield reader.line_num, values
+
+
+def _read_ndjson(
+    path: str, names: Sequence[Optional[str]]
+) -> Iterator[Tuple[int, Optional[Sequence]]]:
+    """Yield (line, values) per record; values is None for a line that does not parse."""
+    # (top-level key, nested keys); dict.get(None) reads an unset column as None
+    paths = [
+        (name.split(".")[0], name.split(".")[1:]) if name else (None, [])
+        for name in names
+    ]
+    f = gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")
+    with f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = codec.loads(line)
+            except ValueError:
+                yield line_number, None
+                continue
+            if not isinstance(record, dict):
+                yield line_number, None
+                continue
+            values = []
+            for head, rest in paths:
+                value = record.get(head)
+                for key in rest:
+                    value = value.get(key) if isinstance(value, dict) else None
+                values.append(value)
+            yield line_number, values
+
+
+def _partition_shard(job: _ShardJob) -> Tuple[str, int, int, List[int]]:
+    """
+    Read one input file and spill its rows to per-partition files.
+
+    Returns:
+        (side, rows, malformed rows, partitions written)
+    """
+    side, shard, path, names, partitions, work_dir, chunk_size = job
+    reader = _read_csv if _is_csv(path) else _read_ndjson
+    buffers: List[List[tuple]] = [[] for _ in range(partitions)]
+    written = set()
+    rows = malformed = pending = 0
+
+    def spill() -> None:
+        for partition, buffer in enumerate(buffers):
+            if buffer:
+                _spill(os.path.join(work_dir, f"{side}-{shard}-{partition}"), buffer)
+                written.add(partition)
+                buffer.clear()
+
+    for line, values in reader(path, names):
+        if values is None:
+            malformed += 1
+            continue
+        # Empty cells read as None; NDJSON numbers (amounts, fee_bps) as text
+        tx, nonce, status, amount, fee, net, fee_bps, fee_tx = [
+            (
+                None
+                if value is None
+                else (value if type(value) is str else str(value)).strip() or None
+            )
+            for value in values
+        ]
+        if tx is not None:
+            tx = tx.lower()
+        if nonce is not None:
+            nonce = nonce.lower()
+        if status is not None:
+            status = status.lower()
+        if fee_tx is not None:
+            fee_tx = fee_tx.lower()
+        key = (
+            tx if tx is not None else (f"nonce:{nonce}" if nonce is not None else None)
+        )
+        partition = zlib.crc32(key.encode()) % partitions if key is not None else 0
+        buffers[partition].append(
+            (key, tx, nonce, status, amount, fee, net, fee_bps, fee_tx, shard, line)
+        )
+        rows += 1
+        pending += 1
+        if pending >= chunk_size:
+            spill()
+            pending = 0
+    spill()
+    return side, rows, malformed, sorted(written)
+
+
+def _spill(path: str, rows: List[tuple]) -> None:
+    data = marshal.dumps(rows)
+    with open(path, "ab") as f:
+        f.write(_CHUNK_LENGTH.pack(len(data)) + data)
+
+
+def _spilled(files: Iterable[str]) -> Iterator[tuple]:
+    for path in files:
+        with open(path, "rb") as f:
+            # marshal.load() on a file reads it a few bytes at a time
+            while True:
+                header = f.read(_CHUNK_LENGTH.size)
+                if not header:
+                    break
+                yield from marshal.loads(f.read(_CHUNK_LENGTH.unpack(header)[0]))
+
+
+def _units(value: Optional[str]) -> Optional[int]:
+    if value is None:
+        return None
+    if value.isdigit() and value.isascii():
+        return int(value)
+    try:
+        return parse_base_units(value)
+    except ValueError:
+        return None
+
+
+def _same_units(a: str, b: str) -> bool:
+    if a == b:
+        return True
+    x = _units(a)
+    return x is not None and x == _units(b)
+
+
+def _fee_split_error(row: tuple) -> Optional[str]:
+    """Describe a fee/net that does not follow from amount and fee_bps."""
+    amount, fee, net = _units(row[_AMOUNT]), _units(row[_FEE]), _units(row[_NET])
+    if amount is None or fee is None or net is None or row[_BPS] is None:
+        return None
+    try:
+        fee_bps = int(row[_BPS])
+    except ValueError:
+        return None
+    want_fee, want_net = calculate_fee(amount, fee_bps)
+    if (fee, net) == (want_fee, want_net):
+        return None
+    return f"{fee_bps} bps of {amount} is fee {want_fee}, net {want_net}"
+
+
+class _Sink:
+    """Counts mismatches, keeps samples and writes them as NDJSON."""
+
+    def __init__(
+        self,
+        path: Optional[str],
+        export_paths: Sequence[str],
+        ledger_paths: Sequence[str],
+        samples: int,
+    ):
+        self.counts: Counter = Counter()
+        self.samples: List[Dict[str, Any]] = []
+        self.sample_limit = samples
+        self.export_paths = export_paths
+        self.ledger_paths = ledger_paths
+        self.file = open(path, "wb") if path is not None else None
+
+    @staticmethod
+    def _row(row: Optional[tuple], paths: Sequence[str]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        record = dict(zip(_ROW_NAMES, row[_TX:_SHARD]))
+        record["file"] = paths[row[_SHARD]]
+        record["line"] = row[_LINE]
+        return record
+
+    def emit(
+        self,
+        kind: str,
+        key: Optional[str],
+        detail: str,
+        export: Optional[tuple],
+        local: Optional[tuple],
+    ) -> None:
+        self.counts[kind] += 1
+        if self.file is None and len(self.samples) >= self.sample_limit:
+            return
+        record = {
+            "kind": kind,
+            "key": key,
+            "detail": detail,
+            "export": self._row(export, self.export_paths),
+            "local": self._row(local, self.ledger_paths),
+        }
+        if len(self.samples) < self.sample_limit:
+            self.samples.append(record)
+        if self.file is not None:
+            self.file.write(codec.dumps(record) + b"\n")
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+
+
+def _status_error(
+    export: tuple, local: tuple, policy: ReconcilePolicy
+) -> Optional[str]:
+    """Describe statuses that disagree once the ledger's is mapped to the export's vocabulary."""
+    if export[_STATUS] is None or local[_STATUS] is None:
+        return None
+    ledger_status = policy.ledger_statuses.get(local[_STATUS], local[_STATUS])
+    if (
+        export[_STATUS] == ledger_status
+        or (ledger_status, export[_STATUS]) in _PROGRESS
+    ):
+        return None
+    return f"{export[_STATUS]} != {local[_STATUS]}"
+
+
+def _failed_without_tx(row: tuple, policy: ReconcilePolicy, ledger: bool) -> bool:
+    """A settlement that failed before a transaction was sent, i.e. moved no funds."""
+    status = (
+        policy.ledger_statuses.get(row[_STATUS], row[_STATUS])
+        if ledger
+        else row[_STATUS]
+    )
+    return row[_TX] is None and status == "failed"
+
+
+def _compare(
+    export: tuple,
+    local: Optional[tuple],
+    policy: ReconcilePolicy,
+    emit: Callable[..., None],
+) -> None:
+    key = export[_KEY]
+    if local is not None:
+        status_error = _status_error(export, local, policy)
+        if status_error is not None:
+            emit(STATUS, key, status_error, export, local)
+        if (
+            export[_NONCE] is not None
+            and local[_NONCE] is not None
+            and export[_NONCE] != local[_NONCE]
+        ):
+            emit(NONCE, key, "authorization nonce differs", export, local)
+        differing = [
+            name
+            for name, index in (("amount", _AMOUNT), ("fee", _FEE), ("net", _NET))
+            if export[index] is not None
+            and local[index] is not None
+            and not _same_units(export[index], local[index])
+        ]
+        if differing:
+            emit(AMOUNT, key, ", ".join(differing) + " differ", export, local)
+
+    if policy.check_fee_split:
+        error = _fee_split_error(export)
+        if error is not None:
+            emit(FEE_SPLIT, key, error, export, local)
+
+    local_fee_tx = local[_FEE_TX] if local is not None else None
+    if export[_FEE_TX] is not None and local_fee_tx is not None:
+        if export[_FEE_TX] != local_fee_tx:
+            emit(FEE_TX, key, "fee transfer hash differs", export, local)
+    elif policy.require_fee_tx and export[_FEE_TX] is None and local_fee_tx is None:
+        status = export[_STATUS] or (local[_STATUS] if local is not None else None)
+        fee = export[_FEE] or (local[_FEE] if local is not None else None)
+        if status != "failed" and (_units(fee) or 0) > 0:
+            emit(FEE_TX, key, "no fee transfer", export, local)
+
+
+def _join_partition(
+    job: Tuple[Any, ...],
+) -> Tuple[int, int, Dict[str, int], List[Dict[str, Any]], Dict[str, List[int]]]:
+    """
+    Join one partition: index the ledger rows, stream the export rows.
+
+    `job` is (partition, ledger spill files, export spill files, export
+    paths, ledger paths, mismatch file or None, policy, nonce spill),
+    where nonce spill is (work dir, partitions) to spill unmatched rows
+    with a nonce for the nonce join, or None if this is the nonce join.
+
+    Returns:
+        (matched export rows, unmatched failed rows, mismatch count per
+        kind, samples, nonce partitions written per side)
+    """
+    (
+        partition,
+        ledger_files,
+        export_files,
+        export_paths,
+        ledger_paths,
+        output,
+        policy,
+        nonce_spill,
+    ) = job
+    sink = _Sink(output, export_paths, ledger_paths, policy.samples)
+    emit = sink.emit
+    matched = unmatched_failed = 0
+    buffers: Dict[str, Dict[int, List[tuple]]] = {_EXPORT: {}, _LEDGER: {}}
+
+    def unmatched(side: str, row: tuple) -> None:
+        nonlocal unmatched_failed
+        if nonce_spill is not None and row[_NONCE] is not None:
+            # Left for the nonce join: the other side may lack the hash
+            key = f"nonce:{row[_NONCE]}"
+            target = zlib.crc32(key.encode()) % nonce_spill[1]
+            buffers[side].setdefault(target, []).append((key,) + row[_TX:])
+        elif _failed_without_tx(row, policy, side == _LEDGER):
+            unmatched_failed += 1
+        elif side == _EXPORT:
+            if row[_KEY] is None:
+                emit(UNKEYED, None, "no transaction hash or nonce", row, None)
+            else:
+                emit(MISSING_LOCAL, row[_KEY], "not in the ledger", row, None)
+                _compare(row, None, policy, emit)
+        elif row[_KEY] is None:
+            emit(UNKEYED, None, "no transaction hash or nonce", None, row)
+        else:
+            emit(MISSING_EXPORT, row[_KEY], "not in the export", None, row)
+
+    try:
+        index: Dict[str, tuple] = {}
+        for row in _spilled(ledger_files):
+            key = row[_KEY]
+            if key is None:
+                unmatched(_LEDGER, row)
+            elif key in index:
+                emit(DUPLICATE, key, "repeated in the ledger", None, row)
+            else:
+                index[key] = row
+
+        seen = set()
+        for row in _spilled(export_files):
+            key = row[_KEY]
+            if key is None:
+                unmatched(_EXPORT, row)
+                continue
+            if key in seen:
+                emit(DUPLICATE, key, "repeated in the export", row, None)
+                continue
+            seen.add(key)
+            local = index.get(key)
+            # On the nonce join, two different transaction hashes are two settlements
+            if local is not None and (
+                nonce_spill is not None or row[_TX] is None or local[_TX] is None
+            ):
+                del index[key]
+                matched += 1
+                _compare(row, local, policy, emit)
+            else:
+                unmatched(_EXPORT, row)
+
+        for row in index.values():
+            unmatched(_LEDGER, row)
+    finally:
+        sink.close()
+
+    written: Dict[str, List[int]] = {_EXPORT: [], _LEDGER: []}
+    for side, targets in buffers.items():
+        for target, rows in targets.items():
+            _spill(
+                os.path.join(nonce_spill[0], f"nonce-{side}-{partition}-{target}"), rows
+            )
+            written[side].append(target)
+    return matched, unmatched_failed, dict(sink.counts), sink.samples, written
+
+
+def _map(
+    pool: Optional[ProcessPoolExecutor], fn: Callable[[Any], Any], jobs: List[Any]
+) -> List[Any]:
+    if pool is None:
+        return [fn(job) for job in jobs]
+    return list(pool.map(fn, jobs))
+
+
+def reconcile(
+    exports: PathsArg,
+    ledger: PathsArg,
+    output: Optional[str] = None,
+    processes: Optional[int] = None,
+    policy: Optional[ReconcilePolicy] = None,
+    work_dir: Optional[str] = None,
+) -> ReconcileReport:
+    """
+    Reconcile settlement exports against a local ledger.
+
+    Files ending in `.csv` (or `.csv.gz`) are read as CSV with a header
+    row, everything else as NDJSON. Each file is a shard; shards are read
+    in parallel, so split very large exports into several files.
+
+    Args:
+        exports: Export file(s) of the `transactions` table
+        ledger: Local payment log file(s)
+        output: Write every mismatch to this NDJSON file
+        processes: Worker processes (default: CPU count); 1 runs in-process
+        policy: Columns, checks and sizing (default: ReconcilePolicy())
+        work_dir: Directory for the temporary spill files (default: system temp)
+
+    Returns:
+        ReconcileReport with row counts, mismatch counts and samples
+    """
+    policy = policy or ReconcilePolicy()
+    export_paths, ledger_paths = _paths(exports), _paths(ledger)
+    processes = max(1, processes or os.cpu_count() or 1)
+    size = sum(os.path.getsize(path) for path in export_paths + ledger_paths)
+    partitions = policy.partitions or max(processes, -(-size // policy.partition_bytes))
+    start = time.perf_counter()
+
+    with tempfile.TemporaryDirectory(prefix="x402-reconcile-", dir=work_dir) as tmp:
+        pool = ProcessPoolExecutor(processes) if processes > 1 else None
+        try:
+            shards = [
+                (
+                    _EXPORT,
+                    shard,
+                    path,
+                    policy.export_columns.names(),
+                    partitions,
+                    tmp,
+                    policy.chunk_size,
+                )
+                for shard, path in enumerate(export_paths)
+            ] + [
+                (
+                    _LEDGER,
+                    shard,
+                    path,
+                    policy.ledger_columns.names(),
+                    partitions,
+                    tmp,
+                    policy.chunk_size,
+                )
+                for shard, path in enumerate(ledger_paths)
+            ]
+            # Largest first, so one big shard does not start last
+            shards.sort(key=lambda job: -os.path.getsize(job[2]))
+            rows: Counter = Counter()
+            malformed = 0
+            spills: Dict[str, Dict[int, List[str]]] = {_EXPORT: {}, _LEDGER: {}}
+            for (side, shard, _, _, _, _, _), (_, count, bad, written) in zip(
+                shards, _map(pool, _partition_shard, shards)
+            ):
+                rows[side] += count
+                malformed += bad
+                for partition in written:
+                    spills[side].setdefault(partition, []).append(
+                        os.path.join(tmp, f"{side}-{shard}-{partition}")
+                    )
+
+            # Join on the key, then join what is left over on the nonce
+            joins: List[Tuple[Any, ...]] = []
+            results = []
+            for prefix, nonce_spill in (("", (tmp, partitions)), ("nonce-", None)):
+                round_joins = [
+                    (
+                        partition,
+                        spills[_LEDGER].get(partition, []),
+                        spills[_EXPORT].get(partition, []),
+                        export_paths,
+                        ledger_paths,
+                        (
+                            os.path.join(tmp, f"mismatches-{prefix}{partition}")
+                            if output is not None
+                            else None
+                        ),
+                        policy,
+                        nonce_spill,
+                    )
+                    for partition in sorted(set(spills[_EXPORT]) | set(spills[_LEDGER]))
+                ]
+                round_results = _map(pool, _join_partition, round_joins)
+                joins.extend(round_joins)
+                results.extend(round_results)
+                spills = {_EXPORT: {}, _LEDGER: {}}
+                for job, (_, _, _, _, written) in zip(round_joins, round_results):
+                    for side, targets in written.items():
+                        for target in targets:
+                            spills[side].setdefault(target, []).append(
+                                os.path.join(tmp, f"nonce-{side}-{job[0]}-{target}")
+                            )
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        matched = unmatched_failed = 0
+        counts: Counter = Counter()
+        samples: List[Dict[str, Any]] = []
+        for (
+            partition_matched,
+            partition_failed,
+            partition_counts,
+            partition_samples,
+            _,
+        ) in results:
+            matched += partition_matched
+            unmatched_failed += partition_failed
+            counts.update(partition_counts)
+            samples.extend(partition_samples[: policy.samples - len(samples)])
+        if output is not None:
+            with open(output, "wb") as out:
+                for join in joins:
+                    with open(join[5], "rb") as f:
+                        shutil.copyfileobj(f, out)
+
+    return ReconcileReport(
+        export_rows=rows[_EXPORT],
+        ledger_rows=rows[_LEDGER],
+        matched=matched,
+        unmatched_failed=unmatched_failed,
+        malformed=malformed,
+        mismatches=dict(counts),
+        samples=[Mismatch(**sample) for sample in samples],
+        partitions=partitions,
+        processes=processes,
+        elapsed=time.perf_counter() - start,
+    )
+
+
+def _columns(
+    base: ReconcileColumns, overrides: Optional[List[str]]
+) -> ReconcileColumns:
+    """Apply FIELD=NAME overrides; an empty NAME disables the column."""
+    values = base.model_dump()
+    for override in overrides or ():
+        field, sep, name = override.partition("=")
+        if not sep or field not in values:
+            raise argparse.ArgumentTypeError(
+                f"expected FIELD=NAME with FIELD one of {', '.join(_FIELDS)}"
+            )
+        values[field] = name or None
+    return ReconcileColumns(**values)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Reconcile x402 settlement exports against a local ledger"
+    )
+    parser.add_argument(
+        "--exports",
+        nargs="+",
+        required=True,
+        help="CSV/NDJSON exports of the transactions table",
+    )
+    parser.add_argument(
+        "--ledger", nargs="+", required=True, help="CSV/NDJSON local payment logs"
+    )
+    parser.add_argument("--output", help="Write every mismatch to this NDJSON file")
+    parser.add_argument(
+        "--processes", type=int, help="Worker processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--partitions",
+        type=int,
+        help="Hash partitions (default: one per 64 MiB of input)",
+    )
+    parser.add_argument("--work-dir", help="Directory for temporary spill files")
+    parser.add_argument(
+        "--export-column",
+        action="append",
+        metavar="FIELD=NAME",
+        help="e.g. tx_hash_fee=fee_tx_hash",
+    )
+    parser.add_argument(
+        "--ledger-column",
+        action="append",
+        metavar="FIELD=NAME",
+        help="e.g. amount=amount_base",
+    )
+    parser.add_argument(
+        "--no-fee-split", action="store_true", help="Skip the fee_bps arithmetic check"
+    )
+    parser.add_argument(
+        "--no-fee-tx", action="store_true", help="Do not require a fee transfer hash"
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        policy = ReconcilePolicy(
+            export_columns=_columns(ReconcileColumns(), args.export_column),
+            ledger_columns=_columns(LEDGER_COLUMNS, args.ledger_column),
+            check_fee_split=not args.no_fee_split,
+            require_fee_tx=not args.no_fee_tx,
+            partitions=args.partitions,
+        )
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    report = reconcile(
+        args.exports, args.ledger, args.output, args.processes, policy, args.work_dir
+    )
+
+    print(
+        f"{report.export_rows} export rows, {report.ledger_rows} ledger rows, {report.matched} matched, "
+        f"{report.unmatched_failed} failed without a transaction on one side only, "
+        f"{report.malformed} malformed ({report.elapsed:.1f}s, {report.processes} processes, "
+        f"{report.partitions} partitions)"
+    )
+    for kind, count in sorted(report.mismatches.items()):
+        print(f"  {kind:<15} {count}")
+    if report.clean:
+        print("  no mismatches")
+    sys.exit(0 if report.clean else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+"""
+Non-blocking settlement for the ChaosChain x402 client.
+
+`submit_settlement` returns a SettlementHandle immediately. The /settle
+request runs in the background, and settlements the bridge reports as
+`pending` are tracked to finality by one polling loop per client that
+batches every outstanding transaction into `/settlements/status` calls.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .types import SettleResponse, SettlementStatusResponse
+
+# Statuses the bridge reports for a settlement that is not final yet
+PENDING_STATUSES = frozenset({"pending"})
+
+# Hashes per /settlements/status request (the bridge's limit)
+MAX_STATUS_BATCH = 100
+
+
+class SettlementHandle:
+    """
+    Handle to a settlement submitted with `submit_settlement`.
+
+    Resolves to the final SettleResponse: `status` is `confirmed`,
+    `partial_settlement` or `failed` once tracked to finality, or whatever
+    the bridge returned if it never reported `pending` (e.g. an invalid
+    payment, or decentralized mode without a status).
+
+    Example:
+        ```python
+        handle = client.submit_settlement(header, requirements)
+        serve_content()
+
+        final = handle.wait(timeout=120)          # sync
+        final = await handle.confirmed()          # asyncio
+        ```
+    """
+
+    def __init__(self):
+        self._future: Future = Future()
+        self._response: Optional[SettleResponse] = None
+        self.confirmations = 0
+
+    @property
+    def response(self) -> Optional[SettleResponse]:
+        """Latest SettleResponse (the /settle result until finality), or None."""
+        return self._response
+
+    @property
+    def tx_hash(self) -> Optional[str]:
+        """Settlement transaction hash, once /settle has returned."""
+        return self._response.txHash if self._response is not None else None
+
+    @property
+    def status(self) -> str:
+        """`submitting` until /settle returns, then the settlement status."""
+        if self._response is None:
+            return "failed" if self._future.done() else "submitting"
+        return self._response.status or (
+            "confirmed" if self._response.success else "failed"
+        )
+
+    def done(self) -> bool:
+        """Whether the settlement is final (or failed to submit)."""
+        return self._future.done()
+
+    def wait(self, timeout: Optional[float] = None) -> SettleResponse:
+        """
+        Block until the settlement is final.
+
+        Args:
+            timeout: Seconds to wait; None waits indefinitely
+
+        Returns:
+            Final SettleResponse
+
+        Raises:
+            TimeoutError: If the settlement is not final within `timeout`
+            RuntimeError: If submission failed or tracking gave up
+        """
+        try:
+            return self._future.result(timeout)
+        except FutureTimeoutError:
+            if self._future.done():
+                raise
+            raise TimeoutError(f"Settlement not final after {timeout}s") from None
+
+    async def confirmed(self, timeout: Optional[float] = None) -> SettleResponse:
+        """Asyncio counterpart of `wait`; usable from any event loop."""
+        future = asyncio.wrap_future(self._future)
+        if timeout is None:
+            return await future
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            if future.done():
+                raise
+            # Nobody awaits this copy any more; don't warn about its outcome
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            raise TimeoutError(f"Settlement not final after {timeout}s") from None
+
+    def add_done_callback(self, fn: Callable[["SettlementHandle"], None]) -> None:
+        """Call `fn(handle)` once the settlement is final (from any thread)."""
+        self._future.add_done_callback(lambda _: fn(self))
+
+    def _submitted(self, response: SettleResponse) -> bool:
+        """Record the /settle result; True if it still needs tracking."""
+        self._response = response
+        if (
+            response.status in PENDING_STATUSES
+            and response.txHash
+            and response.networkId
+        ):
+            return True
+        self._future.set_result(response)
+        return False
+
+    def _resolve(self, response: SettleResponse) -> None:
+        self._response = response
+        if not self._future.done():
+            self._future.set_result(response)
+
+    def _fail(self, error: BaseException) -> None:
+        if not self._future.done():
+            self._future.set_exception(error)
+
+    def __repr__(self) -> str:
+        return f"SettlementHandle(status={self.status!r}, tx_hash={self.tx_hash!r})"
+
+
+class _Tracked:
+    """Polling state of one pending settlement."""
+
+    __slots__ = (
+        "handle",
+        "response",
+        "network",
+        "hashes",
+        "interval",
+        "next_poll",
+        "deadline",
+    )
+
+    def __init__(
+        self,
+        handle: SettlementHandle,
+        response: SettleResponse,
+        interval: float,
+        deadline: float,
+    ):
+        if response.txHash is None or response.networkId is None:
+            raise ValueError(
+                "Only a settlement with a transaction hash and network can be tracked"
+            )
+        self.handle = handle
+        self.response = response
+        self.network: str = response.networkId
+        # The settlement transaction first, then the fee transfer if any
+        self.hashes: Tuple[str, ...] = (
+            (response.txHash, response.txHashFee)
+            if response.txHashFee
+            else (response.txHash,)
+        )
+        self.interval = interval
+        self.next_poll = time.monotonic() + interval
+        self.deadline = deadline
+
+
+class _PollSchedule:
+    """
+    Transport-independent core of the settlement trackers: which
+    settlements are due, how to batch them and how to apply results.
+    """
+
+    def __init__(
+        self,
+        poll_interval: float,
+        max_poll_interval: float,
+        backoff: float,
+        timeout: float,
+    ):
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.backoff = backoff
+        self.timeout = timeout
+        self.tracked: List[_Tracked] = []
+
+    def add(self, handle: SettlementHandle, response: SettleResponse) -> None:
+        deadline = time.monotonic() + self.timeout
+        self.tracked.append(_Tracked(handle, response, self.poll_interval, deadline))
+
+    def next_wakeup(self) -> Optional[float]:
+        """Seconds until the next settlement is due, or None if idle."""
+        if not self.tracked:
+            return None
+        return max(0.0, min(t.next_poll for t in self.tracked) - time.monotonic())
+
+    def due_batches(self) -> List[Tuple[str, List[_Tracked], List[str]]]:
+        """(network, settlements, tx hashes) batches of everything due now."""
+        now = time.monotonic()
+        by_network: Dict[str, List[_Tracked]] = {}
+        for tracked in self.tracked:
+            if tracked.next_poll <= now:
+                by_network.setdefault(tracked.network, []).append(tracked)
+
+        batches = []
+        for network, group in by_network.items():
+            chunk: List[_Tracked] = []
+            hashes: List[str] = []
+            for tracked in group:
+                if len(hashes) + len(tracked.hashes) > MAX_STATUS_BATCH:
+                    batches.append((network, chunk, hashes))
+                    chunk, hashes = [], []
+                chunk.append(tracked)
+                hashes.extend(tracked.hashes)
+            batches.append((network, chunk, hashes))
+        return batches
+
+    def apply(
+        self, batch: List[_Tracked], result: Optional[SettlementStatusResponse]
+    ) -> None:
+        """Resolve final settlements of a batch and back off the rest."""
+        statuses = {s.txHash.lower(): s for s in result.settlements} if result else {}
+        now = time.monotonic()
+        for tracked in batch:
+            response = tracked.response
+            main = statuses.get(tracked.hashes[0].lower())
+            fee = (
+                statuses.get(tracked.hashes[1].lower())
+                if len(tracked.hashes) > 1
+                else None
+            )
+            if main is not None:
+                tracked.handle.confirmations = main.confirmations
+
+            final = None
+            if main is not None and main.status == "failed":
+                final = response.model_copy(
+                    update={
+                        "status": "failed",
+                        "success": False,
+                        "error": "Settlement transaction reverted",
+                    }
+                )
+            elif main is not None and main.status == "confirmed":
+                if fee is None and response.txHashFee:
+                    final = None  # fee transfer not reported yet
+                elif fee is not None and fee.status == "failed":
+                    final = response.model_copy(update={"status": "partial_settlement"})
+                elif fee is None or fee.status == "confirmed":
+                    final = response.model_copy(update={"status": "confirmed"})
+
+            if final is not None:
+                tracked.handle._resolve(final)
+            elif now >= tracked.deadline:
+                tracked.handle._fail(
+                    TimeoutError(
+                        f"Settlement {response.txHash} not final after {self.timeout}s"
+                    )
+                )
+            else:
+                tracked.interval = min(
+                    self.max_poll_interval, tracked.interval * self.backoff
+                )
+                tracked.next_poll = now + tracked.interval
+
+        self.tracked = [t for t in self.tracked if not t.handle.done()]
+
+    def fail_all(self, error: BaseException) -> None:
+        for tracked in self.tracked:
+            tracked.handle._fail(error)
+        self.tracked = []
+
+
+class SettlementTracker:
+    """
+    Tracks pending settlements to finality on one background thread.
+
+    Every poll batches all due settlements of a network into a single
+    status request; each settlement backs off from `poll_interval` to
+    `max_poll_interval` while it stays pending.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str, List[str]], SettlementStatusResponse],
+        poll_interval: float = 2.0,
+        max_poll_interval: float = 30.0,
+        backoff: float = 1.5,
+        timeout: float = 600.0,
+    ):
+        """
+        Initialize the tracker.
+
+        Args:
+            fetch: Called with (network, tx_hashes) to look up their status
+            poll_interval: First poll delay after submission (default: 2)
+            max_poll_interval: Upper bound on the poll delay (default: 30)
+            backoff: Poll delay multiplier while pending (default: 1.5)
+            timeout: Seconds before a settlement that never finalizes fails
+                with TimeoutError (default: 600)
+        """
+        self._fetch = fetch
+        self._schedule = _PollSchedule(
+            poll_interval, max_poll_interval, backoff, timeout
+        )
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def __len__(self) -> int:
+        return len(self._schedule.tracked)
+
+    def track(self, handle: SettlementHandle, response: SettleResponse) -> None:
+        """Start polling a settlement the bridge reported as pending."""
+        with self._cond:
+            if self._stopped:
+                handle._fail(RuntimeError("Settlement tracker is closed"))
+                return
+            self._schedule.add(handle, response)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="x402-settlement-tracker", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    delay = self._schedule.next_wakeup()
+                    if delay == 0:
+                        break
+                    self._cond.wait(delay)
+                if self._stopped:
+                    return
+                batches = self._schedule.due_batches()
+
+            for network, batch, hashes in batches:
+                try:
+                    result = self._fetch(network, hashes)
+                except Exception:
+                    result = None  # back off and try again on the next poll
+                with self._cond:
+                    self._schedule.apply(batch, result)
+
+    def close(self) -> None:
+        """Stop polling; settlements still pending fail with RuntimeError."""
+        with self._cond:
+            self._stopped = True
+            self._schedule.fail_all(
+                RuntimeError("Settlement tracking stopped: client closed")
+            )
+            self._cond.notify()
+
+
+class AsyncSettlementTracker:
+    """Asyncio counterpart of SettlementTracker, polling from one task."""
+
+    def __init__(
+        self,
+        fetch: Callable[[str, List[str]], Awaitable[SettlementStatusResponse]],
+        poll_interval: float = 2.0,
+        max_poll_interval: float = 30.0,
+        backoff: float = 1.5,
+        timeout: float = 600.0,
+    ):
+        self._fetch = fetch
+        self._schedule = _PollSchedule(
+            poll_interval, max_poll_interval, backoff, timeout
+        )
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = False
+
+    def __len__(self) -> int:
+        return len(self._schedule.tracked)
+
+    def track(self, handle: SettlementHandle, response: SettleResponse) -> None:
+        """Start polling a settlement; must be called on the event loop."""
+        if self._stopped:
+            handle._fail(RuntimeError("Settlement tracker is closed"))
+            return
+        self._schedule.add(handle, response)
+        if self._task is None or self._task.done() or self._wakeup is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run(self._wakeup))
+        self._wakeup.set()
+
+    async def _run(self, wakeup: asyncio.Event) -> None:
+        while self._schedule.tracked:
+            delay = self._schedule.next_wakeup()
+            if delay:
+                wakeup.clear()
+                try:
+                    await asyncio.wait_for(wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            batches = self._schedule.due_batches()
+            results = await asyncio.gather(
+                *(self._fetch(network, hashes) for network, _, hashes in batches),
+                return_exceptions=True,
+            )
+            for (_, batch, _), result in zip(batches, results):
+                self._schedule.apply(
+                    batch, None if isinstance(result, BaseException) else result
+                )
+
+    def close(self) -> None:
+        """Stop polling; settlements still pending fail with RuntimeError."""
+        self._stopped = True
+        if self._task is not None:
+            self._task.cancel()
+        self._schedule.fail_all(
+            RuntimeError("Settlement tracking stopped: client closed")
+        )
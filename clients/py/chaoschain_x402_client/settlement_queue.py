@@ -0,0 +1,592 @@
+"""
+Durable, deferred settlement for the ChaosChain x402 client.
+
+`SettlementQueue.submit` appends a verified payment to a local
+append-only journal and returns as soon as the record is on disk; worker
+threads drain the queue to `/settle` with bounded concurrency and retry
+with backoff. Entries are only marked finished once the facilitator has
+answered, so a process that crashes (or is restarted) replays whatever
+was still open the next time the queue is created.
+
+Replaying is safe: an entry is keyed by the settlement's idempotency key
+(the authorization plus recipient and amounts), and the bridge answers a repeated
+`/settle` for the same key with the stored response instead of settling
+twice.
+"""
+
+import heapq
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Union
+
+from pydantic import BaseModel, Field
+
+from . import codec
+from .idempotency import settlement_key
+from .policies import RetryPolicy
+from .templates import PaymentRequirementsTemplate
+from .types import PaymentRequirements, SettleResponse
+
+# Prefixes of `success=False` errors that no retry can change: the
+# bridge's and the local precheck's refusals of the payment itself. A
+# refusal without an error is a transaction that failed on chain.
+FINAL_SETTLE_ERRORS = (
+    "Unsupported network",
+    "Network mismatch",
+    "Scheme mismatch",
+    "Token not available",
+    "Authorization expired",
+    "Authorization already used",
+    "Authorized value too low",
+    "Payment recipient mismatch",
+    "Invalid payment header",
+    "Insufficient",
+)
+
+
+class JournalEntry:
+    """An unfinished settlement as recorded in the journal."""
+
+    __slots__ = (
+        "id",
+        "payment_header",
+        "payment_requirements",
+        "enqueued_at",
+        "attempts",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        payment_header: str,
+        payment_requirements: Dict[str, Any],
+        enqueued_at: float,
+    ):
+        self.id = id
+        self.payment_header = payment_header
+        self.payment_requirements = payment_requirements
+        self.enqueued_at = enqueued_at
+        self.attempts = 0
+
+    def record(self) -> Dict[str, Any]:
+        return {
+            "op": "add",
+            "id": self.id,
+            "header": self.payment_header,
+            "requirements": self.payment_requirements,
+            "ts": self.enqueued_at,
+        }
+
+    def __repr__(self) -> str:
+        return f"JournalEntry({self.id[:12]}, attempts={self.attempts})"
+
+
+class SettlementJournal:
+    """
+    Append-only NDJSON journal of settlements.
+
+    Two record types are written: `add` when a payment is queued and `done`
+    when the facilitator has answered for it. Replaying the file yields the
+    entries that were added but never finished. A torn final line (the
+    process died mid-write) does not parse and is skipped.
+
+    Writes use group commit: `add(..., durable=True)` returns only after
+    an fsync covering the record, but callers that arrive while an fsync is
+    in progress are written and synced together by the next one, so the
+    number of fsyncs grows with time spent syncing rather than with the
+    number of records. `done` records are not waited for; losing one only
+    causes an idempotent replay.
+
+    Finished entries are dropped by rewriting the file (write a temporary
+    copy, fsync, rename) on open and after every `compact_after` finished
+    entries.
+    """
+
+    def __init__(
+        self, path: str, commit_delay: float = 0.0, compact_after: int = 10_000
+    ):
+        """
+        Open (or create) a journal and replay it.
+
+        Args:
+            path: Journal file; its directory must exist
+            commit_delay: Seconds a committing writer waits for more records
+                before syncing; trades enqueue latency for fewer fsyncs
+            compact_after: Rewrite the file after this many finished entries
+        """
+        self.path = path
+        self.commit_delay = commit_delay
+        self.compact_after = compact_after
+
+        self._lock = threading.Lock()
+        self._synced = threading.Condition(self._lock)
+        self._open: Dict[str, JournalEntry] = {}
+        self._buffer: List[bytes] = []
+        self._appended = 0  # records handed to _append()
+        self._durable = 0  # records known to be fsynced
+        self._committing = False
+        self._finished_since_compact = 0
+        self._fsyncs = 0
+        self._closed = False
+
+        self._replay()
+        self._fd = -1
+        self._rewrite()
+
+    def _replay(self) -> None:
+        try:
+            with open(self.path, "rb") as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return
+        for line in lines:
+            try:
+                record = codec.loads(line)
+                op, entry_id = record["op"], record["id"]
+                if op == "add":
+                    self._open.setdefault(
+                        entry_id,
+                        JournalEntry(
+                            entry_id,
+                            record["header"],
+                            record["requirements"],
+                            record["ts"],
+                        ),
+                    )
+                elif op == "done":
+                    self._open.pop(entry_id, None)
+            except (ValueError, KeyError, TypeError):
+                continue
+
+    def _rewrite(self) -> None:
+        """Replace the file with the open entries only. Caller excludes writers."""
+        tmp = self.path + ".tmp"
+        data = b"".join(
+            codec.dumps(entry.record()) + b"\n" for entry in self._open.values()
+        )
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            os.write(fd, data)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp, self.path)
+        _fsync_dir(self.path)
+
+        if self._fd >= 0:
+            os.close(self._fd)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+        self._finished_since_compact = 0
+
+    def entries(self) -> List[JournalEntry]:
+        """Unfinished entries, oldest first."""
+        with self._lock:
+            return list(self._open.values())
+
+    def __len__(self) -> int:
+        return len(self._open)
+
+    def __contains__(self, entry_id: str) -> bool:
+        return entry_id in self._open
+
+    @property
+    def fsyncs(self) -> int:
+        """Number of fsyncs issued for appends since the journal was opened."""
+        return self._fsyncs
+
+    def add(self, entry: JournalEntry, durable: bool = True) -> bool:
+        """
+        Record a new entry.
+
+        Returns:
+            False if an unfinished entry with the same id already exists
+        """
+        with self._lock:
+            if entry.id in self._open:
+                return False
+            self._open[entry.id] = entry
+        self._append(entry.record(), durable)
+        return True
+
+    def finish(self, entry_id: str, status: str, tx_hash: Optional[str] = None) -> None:
+        """Record that the facilitator has answered for an entry."""
+        with self._lock:
+            # After close the entry simply stays open and is replayed
+            if self._closed or self._open.pop(entry_id, None) is None:
+                return
+            self._finished_since_compact += 1
+        self._append(
+            {"op": "done", "id": entry_id, "status": status, "txHash": tx_hash}, False
+        )
+
+    def _append(self, record: Dict[str, Any], durable: bool) -> None:
+        line = codec.dumps(record) + b"\n"
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Settlement journal is closed")
+            self._buffer.append(line)
+            self._appended += 1
+            seq = self._appended
+            if not durable and len(self._buffer) < 64:
+                return
+            # Group commit: one writer syncs everything buffered so far,
+            # everyone else waits for a sync that covers their record
+            while self._durable < seq:
+                if not self._committing:
+                    self._commit()
+                else:
+                    self._synced.wait()
+
+    def _commit(self) -> None:
+        """Write and fsync the buffer. Called, and returns, with the lock held."""
+        self._committing = True
+        try:
+            if self.commit_delay:
+                self._lock.release()
+                try:
+                    time.sleep(self.commit_delay)
+                finally:
+                    self._lock.acquire()
+            data, self._buffer = b"".join(self._buffer), []
+            target = self._appended
+            compact = self._finished_since_compact >= self.compact_after
+            self._lock.release()
+            try:
+                if compact:
+                    # Open entries are a superset of what is buffered
+                    with self._lock:
+                        self._rewrite()
+                else:
+                    os.write(self._fd, data)
+                    os.fsync(self._fd)
+                self._fsyncs += 1
+            finally:
+                self._lock.acquire()
+            self._durable = max(self._durable, target)
+        finally:
+            self._committing = False
+            self._synced.notify_all()
+
+    def flush(self) -> None:
+        """Make every appended record durable."""
+        with self._lock:
+            seq = self._appended
+            while self._durable < seq:
+                if not self._committing:
+                    self._commit()
+                else:
+                    self._synced.wait()
+
+    def close(self) -> None:
+        """Flush, compact and close the file."""
+        self.flush()
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._rewrite()
+            os.close(self._fd)
+            self._fd = -1
+
+
+def _fsync_dir(path: str) -> None:
+    """Persist a rename by syncing the containing directory (POSIX only)."""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class QueuePolicy(BaseModel):
+    """
+    Drain behaviour of a SettlementQueue.
+    """
+
+    max_concurrency: int = Field(
+        default=4, ge=1, description="Concurrent /settle requests"
+    )
+    retry: RetryPolicy = Field(
+        default_factory=lambda: RetryPolicy(
+            max_attempts=8, backoff_base=1.0, backoff_max=60.0
+        ),
+        description="Backoff between attempts of one entry; after max_attempts it is parked",
+    )
+    commit_delay: float = Field(
+        default=0.0, ge=0, description="Extra seconds to gather records into one fsync"
+    )
+    compact_after: int = Field(
+        default=10_000,
+        ge=1,
+        description="Rewrite the journal after this many finished entries",
+    )
+    final_errors: Tuple[str, ...] = Field(
+        default=FINAL_SETTLE_ERRORS,
+        description="Prefixes of success=False errors that reject an entry; other refusals "
+        "(a settlement in progress elsewhere, RPC failures) are retried",
+    )
+
+
+class QueueStats(BaseModel):
+    """
+    Snapshot of a SettlementQueue.
+    """
+
+    queued: int = Field(
+        ..., description="Entries waiting for a worker, including backoffs"
+    )
+    in_flight: int = Field(
+        ..., description="Entries with a /settle request outstanding"
+    )
+    parked: int = Field(..., description="Entries that exhausted their attempts")
+    settled: int = Field(..., description="Entries the facilitator settled")
+    rejected: int = Field(..., description="Entries the facilitator refused")
+    retries: int = Field(..., description="Failed attempts that were rescheduled")
+    replayed: int = Field(
+        ..., description="Unfinished entries found in the journal at startup"
+    )
+    fsyncs: int = Field(..., description="Journal fsyncs for appends")
+
+
+class SettlementQueue:
+    """
+    Deferred settlement backed by a durable local journal.
+
+    Example:
+        ```python
+        client = X402Client(facilitator_url='http://localhost:8402')
+        queue = SettlementQueue(client, '/var/lib/myapp/settlements.journal')
+
+        result = client.verify_payment(header, requirements)
+        if result.isValid:
+            queue.submit(header, requirements)   # durable once it returns
+            serve_content()
+
+        queue.close()    # unfinished entries are replayed on next start
+        ```
+
+    A facilitator answer of `success=False` is final (the entry is recorded
+    as rejected) when its error starts with one of `policy.final_errors`;
+    other refusals, transport errors and timeouts are retried. An entry that
+    is still failing after `policy.retry.max_attempts` is parked: it stays
+    open in the journal and is retried by `retry_parked()` or on restart.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        path: str,
+        policy: Optional[QueuePolicy] = None,
+        on_result: Optional[Callable[[str, SettleResponse], None]] = None,
+    ):
+        """
+        Open the journal, replay unfinished entries and start the workers.
+
+        Args:
+            client: X402Client used to settle
+            path: Journal file; its directory must exist
+            policy: Concurrency, retry and journal settings (default: QueuePolicy())
+            on_result: Called from a worker thread with the entry id and the
+                facilitator's SettleResponse once an entry is finished
+        """
+        self.client = client
+        self.policy = policy or QueuePolicy()
+        self.on_result = on_result
+        self.journal = SettlementJournal(
+            path, self.policy.commit_delay, self.policy.compact_after
+        )
+
+        self._cond = threading.Condition()
+        self._ready: Deque[JournalEntry] = deque()
+        self._delayed: List[Tuple[float, int, JournalEntry]] = []
+        self._parked: Dict[str, JournalEntry] = {}
+        self._in_flight = 0
+        self._seq = 0
+        self._settled = 0
+        self._rejected = 0
+        self._retries = 0
+        self._closed = False
+
+        replayed = self.journal.entries()
+        self._replayed = len(replayed)
+        self._ready.extend(replayed)
+        self._workers = [
+            threading.Thread(
+                target=self._work, name=f"x402-settle-queue-{i}", daemon=True
+            )
+            for i in range(self.policy.max_concurrency)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(
+        self,
+        payment_header: str,
+        payment_requirements: Union[
+            dict, PaymentRequirements, PaymentRequirementsTemplate
+        ],
+    ) -> str:
+        """
+        Queue a verified payment for settlement.
+
+        Returns once the entry is fsynced to the journal. Submitting the
+        same authorization again while it is still open is a no-op.
+
+        Args:
+            payment_header: Base64 encoded X-PAYMENT header
+            payment_requirements: Requirements the payment was verified against
+
+        Returns:
+            The entry id (the settlement's idempotency key)
+
+        Raises:
+            ValueError: If the header cannot be decoded or lacks payer/nonce
+            RuntimeError: If the queue is closed
+        """
+        if self._closed:
+            raise RuntimeError("Settlement queue is closed")
+        if isinstance(payment_requirements, PaymentRequirementsTemplate):
+            payload = payment_requirements.payload
+        else:
+            payload = codec.requirements_payload(
+                codec.as_requirements(payment_requirements)
+            )
+        entry_id = settlement_key(payment_header, payload)
+        entry = JournalEntry(entry_id, payment_header, payload, time.time())
+        if self.journal.add(entry):
+            with self._cond:
+                self._ready.append(entry)
+                self._cond.notify()
+        return entry_id
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        return
+                    now = time.monotonic()
+                    while self._delayed and self._delayed[0][0] <= now:
+                        self._ready.append(heapq.heappop(self._delayed)[2])
+                    if self._ready:
+                        entry = self._ready.popleft()
+                        self._in_flight += 1
+                        break
+                    self._cond.wait(
+                        self._delayed[0][0] - now if self._delayed else None
+                    )
+            try:
+                self._settle(entry)
+            finally:
+                with self._cond:
+                    self._in_flight -= 1
+                    self._cond.notify_all()
+
+    def _settle(self, entry: JournalEntry) -> None:
+        entry.attempts += 1
+        try:
+            response = self.client.settle_payment(
+                entry.payment_header, entry.payment_requirements
+            )
+        except (TimeoutError, RuntimeError, ValueError):
+            self._reschedule(entry)
+            return
+        if not response.success and not self._final(response):
+            # e.g. another worker holds the settlement, or the bridge's RPC failed
+            self._reschedule(entry)
+            return
+
+        status = "settled" if response.success else "rejected"
+        self.journal.finish(entry.id, status, response.txHash)
+        with self._cond:
+            if response.success:
+                self._settled += 1
+            else:
+                self._rejected += 1
+        if self.on_result is not None:
+            self.on_result(entry.id, response)
+
+    def _final(self, response: SettleResponse) -> bool:
+        """Whether a refusal is final rather than worth another attempt."""
+        return response.error is None or response.error.startswith(
+            self.policy.final_errors
+        )
+
+    def _reschedule(self, entry: JournalEntry) -> None:
+        """Retry an entry after backoff, or park it once it is out of attempts."""
+        with self._cond:
+            if entry.attempts >= self.policy.retry.max_attempts:
+                self._parked[entry.id] = entry
+            else:
+                self._retries += 1
+                self._seq += 1
+                due = time.monotonic() + self.policy.retry.backoff(entry.attempts - 1)
+                heapq.heappush(self._delayed, (due, self._seq, entry))
+
+    def retry_parked(self) -> int:
+        """Requeue entries that exhausted their attempts. Returns how many."""
+        with self._cond:
+            parked = list(self._parked.values())
+            self._parked.clear()
+            for entry in parked:
+                entry.attempts = 0
+            self._ready.extend(parked)
+            self._cond.notify_all()
+        return len(parked)
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until nothing is queued or in flight (parked entries excluded).
+
+        Returns:
+            True if the queue drained, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._ready or self._delayed or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stats(self) -> QueueStats:
+        with self._cond:
+            return QueueStats(
+                queued=len(self._ready) + len(self._delayed),
+                in_flight=self._in_flight,
+                parked=len(self._parked),
+                settled=self._settled,
+                rejected=self._rejected,
+                retries=self._retries,
+                replayed=self._replayed,
+                fsyncs=self.journal.fsyncs,
+            )
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the workers and close the journal.
+
+        Requests already in flight are allowed to finish (up to `timeout`);
+        everything not yet settled stays in the journal for the next start.
+        Does not close the client.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for worker in self._workers:
+            worker.join(timeout)
+        self.journal.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,566 @@
+"""
+Cross-process verify cache and replay guard for the ChaosChain x402 client.
+
+Pre-fork servers (gunicorn, uvicorn --workers) run one client per worker,
+so an in-process VerifyCache is split across workers and nothing stops
+two workers from accepting the same X-PAYMENT. SharedPaymentCache keeps
+both kinds of state in one fixed-size table in shared memory (an mmap of
+a file, or of an unlinked temporary file inherited across fork):
+
+  * verify results, keyed like VerifyCache (header + requirements), so
+    every worker on the host shares hits;
+  * replay markers, keyed by the authorization key (network, asset,
+    payer, nonce): `reserved` once a request has accepted a valid payment,
+    owned by that request's reservation token (see `idempotency.new_reservation`)
+    until it is settled or released; `settling` while its /settle is in
+    flight; `settled` afterwards.
+
+The table is set-associative: a key hashes to a bucket of `ways` slots,
+and a full bucket evicts the entry that expires first (verify results
+before replay markers). Each bucket starts with a compact index of its
+slots' keys, so a lookup searches 16 bytes per way rather than every
+slot. Reads are lock-free, using a per-slot sequence counter that
+writers make odd while they write. Writers take one of
+`stripes` locks, each a thread lock plus an fcntl byte-range lock on the
+backing file, so inserts for different buckets rarely contend.
+
+POSIX only (fcntl).
+"""
+
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+try:
+    import fcntl
+    import mmap
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore[assignment]
+
+from . import codec
+from .cache import CacheStats, VerifyCache
+from .headers import header_valid_before
+from .types import VerifyResponse
+
+_MAGIC = b"X402SHM2"
+# magic, slot size, slot count, ways, stripes
+_HEADER = struct.Struct("<8sIIII")
+_HEADER_SIZE = 64
+
+# version, state, key, expires_at (unix time), owner pid, owner token, value length
+_SLOT = struct.Struct("<IB3x16sdIIH2x")
+_VERSION = struct.Struct("<I")
+_KEY_SIZE = 16
+
+_EMPTY = 0
+_VALID = 1
+_INVALID = 2
+_RESERVED = 3
+_SETTLING = 4
+_SETTLED = 5
+_MARKERS = (_RESERVED, _SETTLING, _SETTLED)
+
+# invalidReason / error returned for a payment another worker holds
+REPLAY_REASONS: Dict[int, str] = {
+    _RESERVED: "Authorization already accepted by another request",
+    _SETTLING: "Settlement of this authorization is already in progress",
+    _SETTLED: "Authorization already used",
+}
+
+# Retries of a read that raced a writer before it counts as a miss
+_READ_ATTEMPTS = 8
+
+
+class SharedPaymentCache:
+    """
+    Host-wide verify cache and (payer, nonce) replay guard in shared memory.
+
+    Pass it as `verify_cache=` to share verify results between workers and
+    as `replay_guard=` so that each authorization is accepted and settled
+    by one worker only, without asking the facilitator.
+
+    Example:
+        ```python
+        # gunicorn.conf.py: created in the master, inherited by every worker
+        shared = SharedPaymentCache(size_bytes=64 << 20)
+
+        def post_fork(server, worker):
+            global client
+            client = X402Client(
+                facilitator_url='http://localhost:8402',
+                verify_cache=shared,
+                replay_guard=shared,
+            )
+        ```
+
+    Workers that are not forked from a common parent (e.g. separately
+    started processes) pass the same `path` instead, e.g.
+    `/dev/shm/x402-cache`.
+
+    Hit/miss counters in `stats()` are per process; `size` covers the
+    whole table.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        size_bytes: int = 32 << 20,
+        slot_size: int = 1024,
+        ways: int = 8,
+        stripes: int = 64,
+        ttl: float = 60.0,
+        negative_ttl: float = 2.0,
+        claim_ttl: float = 600.0,
+        settled_ttl: float = 86_400.0,
+    ):
+        """
+        Create or attach to a shared table.
+
+        Args:
+            path: Backing file shared by unrelated processes; None uses an
+                unlinked temporary file, shared only with forked children
+            size_bytes: Memory budget for the table (default: 32 MiB)
+            slot_size: Bytes per entry; verify results whose JSON does not
+                fit are not cached (default: 1024)
+            ways: Slots per bucket (default: 8)
+            stripes: Writer locks (default: 64)
+            ttl: Lifetime of a valid verify result in seconds (default: 60)
+            negative_ttl: Lifetime of an invalid verify result (default: 2)
+            claim_ttl: Lifetime of a `reserved` or `settling` marker whose
+                settlement never finished (default: 600)
+            settled_ttl: Upper bound on the lifetime of a `settled` marker;
+                it also ends at the header's validBefore (default: 86400)
+
+        Raises:
+            ValueError: If `path` holds a table with a different geometry
+        """
+        if fcntl is None:
+            raise ImportError("SharedPaymentCache requires fcntl and mmap (POSIX)")
+        if slot_size <= _SLOT.size:
+            raise ValueError(f"slot_size must be larger than {_SLOT.size}")
+
+        self.slot_size = slot_size
+        self.ways = ways
+        self.buckets = max(
+            1, (size_bytes - _HEADER_SIZE) // ((_KEY_SIZE + slot_size) * ways)
+        )
+        self.slots = self.buckets * ways
+        self.stripes = min(stripes, self.buckets)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.claim_ttl = claim_ttl
+        self.settled_ttl = settled_ttl
+        self.path = path
+        self._max_value = slot_size - _SLOT.size
+        self._index_bytes = _KEY_SIZE * ways
+        self._bucket_bytes = self._index_bytes + slot_size * ways
+        self._size = _HEADER_SIZE + self.buckets * self._bucket_bytes
+
+        if path is None:
+            shm = "/dev/shm" if os.path.isdir("/dev/shm") else None
+            fd, name = tempfile.mkstemp(prefix="x402-cache-", dir=shm)
+            os.unlink(name)
+        else:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._fd = fd
+        try:
+            self._attach()
+        except BaseException:
+            os.close(fd)
+            raise
+
+        self._locks = [threading.Lock() for _ in range(self.stripes)]
+        self._counter_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def _attach(self) -> None:
+        # Byte 0 of the file guards initialisation; stripes lock bytes 1..n
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, 0)
+        try:
+            if os.fstat(self._fd).st_size == 0:
+                os.ftruncate(self._fd, self._size)
+                os.pwrite(self._fd, _HEADER.pack(_MAGIC, *self._geometry()), 0)
+            magic, *geometry = _HEADER.unpack(os.pread(self._fd, _HEADER.size, 0))
+            if magic != _MAGIC or tuple(geometry) != self._geometry():
+                raise ValueError(
+                    f"{self.path} holds a different table (slot size, slots, ways, stripes "
+                    f"{tuple(geometry)}; expected {self._geometry()})"
+                )
+            self._mm = mmap.mmap(self._fd, self._size)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, 0)
+
+    def _geometry(self) -> Tuple[int, int, int, int]:
+        # Every process must agree on these, stripes included: they pick the lock bytes
+        return self.slot_size, self.slots, self.ways, self.stripes
+
+    def _bucket(self, key: bytes) -> int:
+        return int.from_bytes(key[:8], "little") % self.buckets
+
+    def _slot(self, bucket: int, way: int) -> int:
+        """File offset of a slot."""
+        return (
+            _HEADER_SIZE
+            + bucket * self._bucket_bytes
+            + self._index_bytes
+            + way * self.slot_size
+        )
+
+    def _lookup(
+        self, key: bytes
+    ) -> Optional[Tuple[int, float, Tuple[int, int], bytes]]:
+        """Lock-free read of (state, expires_at, (pid, token), value) for a key."""
+        mm = self._mm
+        bucket = self._bucket(key)
+        start = _HEADER_SIZE + bucket * self._bucket_bytes
+        for _ in range(_READ_ATTEMPTS):
+            index = mm[start : start + self._index_bytes]
+            position = index.find(key)
+            while position >= 0 and position % _KEY_SIZE:
+                position = index.find(key, position + 1)
+            if position < 0:
+                return None
+            offset = self._slot(bucket, position // _KEY_SIZE)
+            version, state, slot_key, expires, pid, token, length = _SLOT.unpack_from(
+                mm, offset
+            )
+            value = mm[offset + _SLOT.size : offset + _SLOT.size + length]
+            if version & 1 or _VERSION.unpack_from(mm, offset)[0] != version:
+                continue  # raced a writer; read again
+            if slot_key != key or state == _EMPTY:
+                return None
+            return state, expires, (pid, token), value
+        return None
+
+    def _locked(self, key: bytes) -> "_StripeLock":
+        stripe = self._bucket(key) % self.stripes
+        return _StripeLock(self._locks[stripe], self._fd, stripe + 1)
+
+    def _find(
+        self, key: bytes
+    ) -> Tuple[int, Optional[Tuple[int, float, Tuple[int, int]]]]:
+        """
+        Slot for `key` and its current (state, expires_at, (pid, token)); caller holds the stripe.
+
+        Without a live match, returns the slot to overwrite: an empty or
+        expired one, else the first to expire, verify results before markers.
+        Call `_evicting` before writing a new key there.
+        """
+        mm = self._mm
+        bucket = self._bucket(key)
+        now = time.time()
+        victim, victim_rank = -1, None
+        for way in range(self.ways):
+            offset = self._slot(bucket, way)
+            _, state, slot_key, expires, pid, token, _ = _SLOT.unpack_from(mm, offset)
+            if state != _EMPTY and slot_key == key:
+                if expires > now:
+                    return offset, (state, expires, (pid, token))
+                return offset, None
+            if state == _EMPTY or expires <= now:
+                rank = (-1, 0.0)
+            else:
+                rank = (1 if state in _MARKERS else 0, expires)
+            if victim_rank is None or rank < victim_rank:
+                victim, victim_rank = offset, rank
+        return victim, None
+
+    def _evicting(self, offset: int) -> None:
+        """Count an eviction if the slot about to be overwritten is live."""
+        _, state, _, expires, _, _, _ = _SLOT.unpack_from(self._mm, offset)
+        if state != _EMPTY and expires > time.time():
+            with self._counter_lock:
+                self._evictions += 1
+
+    def _write(
+        self,
+        offset: int,
+        state: int,
+        key: bytes,
+        expires: float,
+        value: bytes = b"",
+        token: int = 0,
+    ) -> None:
+        """Seqlock write of one slot, owned by (this pid, `token`); caller holds the stripe."""
+        mm = self._mm
+        version = _VERSION.unpack_from(mm, offset)[0]
+        _VERSION.pack_into(mm, offset, version + 1)
+        _SLOT.pack_into(
+            mm, offset, version + 1, state, key, expires, os.getpid(), token, len(value)
+        )
+        mm[offset + _SLOT.size : offset + _SLOT.size + len(value)] = value
+        bucket, within = divmod(offset - _HEADER_SIZE, self._bucket_bytes)
+        index = _HEADER_SIZE + bucket * self._bucket_bytes
+        index += (within - self._index_bytes) // self.slot_size * _KEY_SIZE
+        mm[index : index + _KEY_SIZE] = key
+        _VERSION.pack_into(mm, offset, version + 2)
+
+    key = staticmethod(VerifyCache.key)
+
+    def get(self, key: str) -> Optional[VerifyResponse]:
+        """Return the cached verify result for `key`, or None on a miss."""
+        found = self._lookup(bytes.fromhex(key)[:16])
+        hit = None
+        if found is not None:
+            state, expires, _, value = found
+            if state in (_VALID, _INVALID):
+                if expires > time.time():
+                    hit = codec.VERIFY_RESPONSE_ADAPTER.validate_json(value)
+                else:
+                    with self._counter_lock:
+                        self._expirations += 1
+        with self._counter_lock:
+            if hit is not None:
+                self._hits += 1
+            else:
+                self._misses += 1
+        return hit
+
+    def put(self, key: str, payment_header: str, response: VerifyResponse) -> None:
+        """
+        Cache a verify result, bounded by the header's validBefore.
+
+        Results for expired headers, or whose JSON exceeds the slot, are
+        not stored.
+        """
+        lifetime = self.ttl if response.isValid else self.negative_ttl
+        valid_before = header_valid_before(payment_header)
+        now = time.time()
+        if valid_before is not None:
+            lifetime = min(lifetime, valid_before - now)
+        value = response.model_dump_json(exclude_none=True).encode()
+        if lifetime <= 0 or len(value) > self._max_value:
+            return
+
+        raw = bytes.fromhex(key)[:16]
+        with self._locked(raw):
+            offset, current = self._find(raw)
+            if current is None:
+                self._evicting(offset)
+            self._write(
+                offset,
+                _VALID if response.isValid else _INVALID,
+                raw,
+                now + lifetime,
+                value,
+            )
+
+    def invalidate(self, key: str) -> None:
+        """Drop a cached verify result."""
+        self._drop(bytes.fromhex(key)[:16], (_VALID, _INVALID))
+
+    def _drop(self, raw: bytes, states: Tuple[int, ...]) -> None:
+        with self._locked(raw):
+            offset, current = self._find(raw)
+            if current is not None and current[0] in states:
+                # Zero the key too, so lookups never stop at a dropped slot
+                self._write(offset, _EMPTY, bytes(16), 0.0)
+
+    def clear(self) -> None:
+        """Drop every entry, replay markers included (counters are kept)."""
+        for stripe in range(self.stripes):
+            with _StripeLock(self._locks[stripe], self._fd, stripe + 1):
+                for bucket in range(stripe, self.buckets, self.stripes):
+                    for way in range(self.ways):
+                        offset = self._slot(bucket, way)
+                        if self._mm[offset + 4] != _EMPTY:
+                            self._write(offset, _EMPTY, bytes(16), 0.0)
+
+    def stats(self) -> CacheStats:
+        """Per-process hit/miss/eviction counters and the live entries in the table."""
+        with self._counter_lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                size=len(self),
+            )
+
+    def __len__(self) -> int:
+        now = time.time()
+        mm = self._mm
+        live = 0
+        for offset in (
+            self._slot(b, w) for b in range(self.buckets) for w in range(self.ways)
+        ):
+            _, state, _, expires, _, _, _ = _SLOT.unpack_from(mm, offset)
+            if state != _EMPTY and expires > now:
+                live += 1
+        return live
+
+    def replay_reason(
+        self, settle_key: str, reservation: Optional[int] = None
+    ) -> Optional[str]:
+        """
+        Why a payment must be refused because another request holds it, or None.
+
+        A reservation held under `reservation` by this process (or left by
+        a dead process) is no reason: that request may verify the same
+        payment again.
+        """
+        found = self._lookup(bytes.fromhex(settle_key)[:16])
+        if found is None:
+            return None
+        state, expires, owner, _ = found
+        if (
+            state in _MARKERS
+            and expires > time.time()
+            and not _reclaimable(state, owner, reservation)
+        ):
+            return REPLAY_REASONS[state]
+        return None
+
+    def reserve(self, settle_key: str, reservation: int) -> Optional[str]:
+        """
+        Mark a verified payment as accepted by the request holding `reservation`.
+
+        Re-verifying under the same token renews the reservation; any
+        other request is refused until it is claimed, released or expires
+        (or its process dies).
+
+        Args:
+            settle_key: Authorization key of the payment
+            reservation: The request's token, from `new_reservation()`
+
+        Returns:
+            None if the reservation was taken, else the reason another
+            request holds the authorization
+        """
+        raw = bytes.fromhex(settle_key)[:16]
+        with self._locked(raw):
+            offset, current = self._find(raw)
+            if (
+                current is not None
+                and current[0] in _MARKERS
+                and not _reclaimable(current[0], current[2], reservation)
+            ):
+                return REPLAY_REASONS[current[0]]
+            if current is None:
+                self._evicting(offset)
+            self._write(
+                offset, _RESERVED, raw, time.time() + self.claim_ttl, token=reservation
+            )
+        return None
+
+    def claim(self, settle_key: str) -> Optional[str]:
+        """
+        Take the right to settle an authorization.
+
+        A `reserved` authorization can be claimed by any process (the
+        request that accepted it, or e.g. a SettlementQueue worker), as can
+        one left `settling` by a process that has died.
+
+        Returns:
+            None if this process may settle, else the reason it may not
+        """
+        raw = bytes.fromhex(settle_key)[:16]
+        with self._locked(raw):
+            offset, current = self._find(raw)
+            if current is not None:
+                state, _, (pid, _) = current
+                if state == _SETTLED or (state == _SETTLING and _alive(pid)):
+                    return REPLAY_REASONS[state]
+            else:
+                self._evicting(offset)
+            self._write(offset, _SETTLING, raw, time.time() + self.claim_ttl)
+        return None
+
+    def settled(self, settle_key: str, valid_before: Optional[float] = None) -> None:
+        """Mark an authorization as spent until its validBefore (at most `settled_ttl`)."""
+        now = time.time()
+        expires = now + self.settled_ttl
+        if valid_before is not None and valid_before > now:
+            expires = min(expires, valid_before)
+        raw = bytes.fromhex(settle_key)[:16]
+        with self._locked(raw):
+            offset, current = self._find(raw)
+            if current is None:
+                self._evicting(offset)
+            self._write(offset, _SETTLED, raw, expires)
+
+    def release(self, settle_key: str) -> None:
+        """Drop a reservation or claim, e.g. after a failed settlement."""
+        self._drop(bytes.fromhex(settle_key)[:16], (_RESERVED, _SETTLING))
+
+    def unreserve(self, settle_key: str, reservation: int) -> None:
+        """
+        Drop a reservation that will not be settled, e.g. after the handler
+        failed; only the request holding `reservation` can.
+        """
+        raw = bytes.fromhex(settle_key)[:16]
+        with self._locked(raw):
+            offset, current = self._find(raw)
+            if (
+                current is not None
+                and current[0] == _RESERVED
+                and current[2] == (os.getpid(), reservation)
+            ):
+                self._write(offset, _EMPTY, bytes(16), 0.0)
+
+    def close(self) -> None:
+        """Unmap the table; other processes keep their own mapping."""
+        self._mm.close()
+        os.close(self._fd)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _StripeLock:
+    """A thread lock plus an fcntl lock on one byte of the backing file."""
+
+    __slots__ = ("_lock", "_fd", "_byte")
+
+    def __init__(self, lock: threading.Lock, fd: int, byte: int):
+        self._lock = lock
+        self._fd = fd
+        self._byte = byte
+
+    def __enter__(self):
+        self._lock.acquire()
+        try:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, self._byte)
+        except BaseException:
+            self._lock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, self._byte)
+        finally:
+            self._lock.release()
+
+
+def _reclaimable(
+    state: int, owner: Tuple[int, int], reservation: Optional[int]
+) -> bool:
+    """Whether a reservation may be taken over: it is held under `reservation`, or its owner died."""
+    pid, token = owner
+    if state != _RESERVED:
+        return False
+    if pid == os.getpid():
+        return reservation is not None and token == reservation
+    return not _alive(pid)
+
+
+def _alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
@@ -0,0 +1,255 @@
+"""
+Offline EIP-712 / EIP-3009 signature checks for the ChaosChain x402 client.
+
+Rebuilds the `TransferWithAuthorization` digest that the token contract
+will check on settlement, recovers the signer and compares it with the
+authorization's `from`. Forged or mangled signatures are rejected locally
+instead of after a full round-trip through the bridge and CRE.
+
+Requires the optional signature dependencies
+(`pip install "chaoschain-x402-client[signatures]"`).
+"""
+
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple, Union
+
+try:
+    from eth_hash.auto import keccak
+    from eth_keys import keys
+    from eth_keys.exceptions import BadSignature
+except ImportError:  # pragma: no cover - optional dependency
+    keccak = None  # type: ignore[assignment]
+
+from .headers import decode_payment_header, split_signature
+from .precheck import requirement_field
+from .templates import PaymentRequirementsTemplate
+from .types import PaymentRequirements, VerifyResponse
+
+if TYPE_CHECKING:
+    from eth_keys.datatypes import PublicKey
+
+# Chain IDs for the networks the bridge settles on (managed/settlement.ts)
+CHAIN_IDS: Dict[str, int] = {
+    "base-sepolia": 84532,
+    "ethereum-sepolia": 11155111,
+    "base-mainnet": 8453,
+    "ethereum-mainnet": 1,
+    "skale-base-sepolia": 324705682,
+    "0g-mainnet": 16661,
+}
+
+# EIP-712 domain (name, version) of the EIP-3009 tokens the bridge settles.
+# `extra.name` / `extra.version` in the requirements take precedence.
+TOKEN_DOMAINS: Dict[Tuple[str, str], Tuple[str, str]] = {
+    ("base-sepolia", "0x036cbd53842c5426634e7929541ec2318f3dcf7e"): ("USDC", "2"),
+    ("ethereum-sepolia", "0x1c7d4b196cb0c7b01d743fbc6116a902379c7238"): ("USDC", "2"),
+    ("base-mainnet", "0x833589fcd6edb6e08f4c7c32d4f71b54bda02913"): ("USD Coin", "2"),
+    ("ethereum-mainnet", "0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48"): (
+        "USD Coin",
+        "2",
+    ),
+}
+
+_DOMAIN_TYPE = b"EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)"
+_TRANSFER_TYPE = (
+    b"TransferWithAuthorization(address from,address to,uint256 value,"
+    b"uint256 validAfter,uint256 validBefore,bytes32 nonce)"
+)
+# secp256k1 group order / 2: ecrecover in USDC rejects signatures with a higher s
+_HALF_CURVE_ORDER = 0x7FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF5D576E7357A4501DDFE92F46681B20A0
+
+
+def _uint256(value: Any) -> bytes:
+    if isinstance(value, str):
+        number = int(value, 16) if value.startswith(("0x", "0X")) else int(value)
+    else:
+        number = int(value)
+    if not 0 <= number < 2**256:
+        raise ValueError(f"Value out of uint256 range: {value}")
+    return number.to_bytes(32, "big")
+
+
+def _address(value: str) -> bytes:
+    raw = bytes.fromhex(value[2:] if value.startswith(("0x", "0X")) else value)
+    if len(raw) != 20:
+        raise ValueError(f"Invalid address: {value}")
+    return raw.rjust(32, b"\0")
+
+
+def _bytes32(value: str) -> bytes:
+    raw = bytes.fromhex(value[2:] if value.startswith(("0x", "0X")) else value)
+    if len(raw) != 32:
+        raise ValueError(f"Invalid bytes32: {value}")
+    return raw
+
+
+class SignatureVerifier:
+    """
+    Local EIP-3009 `TransferWithAuthorization` signature verifier.
+
+    Domain separators are computed once per (network, asset, name, version)
+    and cached, so each check costs two keccak hashes plus one secp256k1
+    recovery (well under a millisecond with `coincurve` installed).
+
+    Example:
+        ```python
+        from chaoschain_x402_client import X402Client, SignatureVerifier
+
+        client = X402Client(
+            facilitator_url='http://localhost:8402',
+            signature_verifier=SignatureVerifier(),
+        )
+        ```
+    """
+
+    def __init__(
+        self, token_domains: Optional[Dict[Tuple[str, str], Tuple[str, str]]] = None
+    ):
+        """
+        Initialize the verifier.
+
+        Args:
+            token_domains: Extra {(network, asset): (name, version)} EIP-712
+                domains, merged over the built-in USDC table
+        """
+        if keccak is None:
+            raise ImportError(
+                "SignatureVerifier requires eth-keys and eth-hash. "
+                'Install them with: pip install "chaoschain-x402-client[signatures]"'
+            )
+
+        self.token_domains = dict(TOKEN_DOMAINS)
+        for (network, asset), domain in (token_domains or {}).items():
+            self.token_domains[(network, asset.lower())] = domain
+        self._domain_type_hash = keccak(_DOMAIN_TYPE)
+        self._transfer_type_hash = keccak(_TRANSFER_TYPE)
+        self._separators: Dict[Tuple[str, str, str, str], bytes] = {}
+        self._lock = threading.Lock()
+
+    def domain_separator(
+        self, network: str, asset: str, name: str, version: str
+    ) -> bytes:
+        """EIP-712 domain separator of a token, cached per (network, asset, name, version)."""
+        key = (network, asset.lower(), name, version)
+        separator = self._separators.get(key)
+        if separator is None:
+            chain_id = CHAIN_IDS.get(network)
+            if chain_id is None:
+                raise ValueError(f"Unknown chain id for network: {network}")
+            separator = keccak(
+                self._domain_type_hash
+                + keccak(name.encode())
+                + keccak(version.encode())
+                + _uint256(chain_id)
+                + _address(asset)
+            )
+            with self._lock:
+                self._separators[key] = separator
+        return separator
+
+    def _domain(
+        self,
+        network: str,
+        asset: str,
+        extra: Optional[Dict[str, Any]],
+    ) -> Optional[Tuple[str, str]]:
+        if extra and extra.get("name") and extra.get("version"):
+            return str(extra["name"]), str(extra["version"])
+        return self.token_domains.get((network, asset.lower()))
+
+    def digest(self, auth: Dict[str, Any], domain_separator: bytes) -> bytes:
+        """EIP-712 digest of a normalized (decoded) authorization."""
+        struct_hash = keccak(
+            self._transfer_type_hash
+            + _address(auth["from"])
+            + _address(auth["to"])
+            + _uint256(auth["value"])
+            + _uint256(auth["validAfter"] or 0)
+            + _uint256(auth["validBefore"])
+            + _bytes32(auth["nonce"])
+        )
+        return keccak(b"\x19\x01" + domain_separator + struct_hash)
+
+    def recover(
+        self,
+        payment_header: Union[str, Dict[str, Any]],
+        network: str,
+        asset: str,
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> Optional[str]:
+        """
+        Recover the checksummed signer of a header, or None if the token's
+        EIP-712 domain is unknown.
+
+        Raises:
+            ValueError: If the header or signature is malformed
+        """
+        public_key = self._recover(
+            decode_payment_header(payment_header), network, asset, extra
+        )
+        return public_key.to_checksum_address() if public_key is not None else None
+
+    def _recover(
+        self,
+        auth: Dict[str, Any],
+        network: str,
+        asset: str,
+        extra: Optional[Dict[str, Any]],
+    ) -> Optional["PublicKey"]:
+        domain = self._domain(network, asset, extra)
+        if domain is None:
+            return None
+
+        if not (auth["to"] and auth["value"] is not None and auth["validBefore"]):
+            raise ValueError("Authorization is missing to/value/validBefore")
+
+        v, r, s = split_signature(auth)
+        if v not in (0, 1):
+            raise ValueError("Invalid signature 'v' value")
+        if s > _HALF_CURVE_ORDER:
+            raise ValueError("Invalid signature 's' value")
+
+        digest = self.digest(auth, self.domain_separator(network, asset, *domain))
+        try:
+            return keys.Signature(vrs=(v, r, s)).recover_public_key_from_msg_hash(
+                digest
+            )
+        except BadSignature as e:
+            raise ValueError(f"Invalid signature: {e}") from e
+
+    def verify(
+        self,
+        payment_header: Union[str, Dict[str, Any]],
+        payment_requirements: Union[
+            Dict[str, Any], PaymentRequirements, PaymentRequirementsTemplate
+        ],
+    ) -> Optional[VerifyResponse]:
+        """
+        Check a header's signature and return a rejection, or None.
+
+        None means the signature recovers to `from`, or that it could not
+        be checked locally (unknown token domain) and should be left to the
+        facilitator.
+        """
+        network = requirement_field(payment_requirements, "network")
+        asset = requirement_field(payment_requirements, "asset")
+        extra = requirement_field(payment_requirements, "extra")
+
+        try:
+            auth = decode_payment_header(payment_header)
+            public_key = self._recover(auth, network, asset, extra)
+            if public_key is None:
+                return None
+            payer = auth["from"]
+            # Compare raw addresses; checksumming costs an extra keccak
+            if public_key.to_canonical_address() == _address(payer)[12:]:
+                return None
+            signer = public_key.to_checksum_address()
+            reason = f"Invalid signature (signer: {signer}, from: {payer})"
+        except (ValueError, TypeError) as e:
+            reason = str(e)
+
+        return VerifyResponse(
+            isValid=False, invalidReason=reason, timestamp=int(time.time() * 1000)
+        )
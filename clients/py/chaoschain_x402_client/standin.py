@@ -0,0 +1,1172 @@
+"""
+Local stand-in for the ChaosChain x402 http-bridge.
+
+Serves the bridge's routes (`/`, `/supported`, `/verify`, `/verify/batch`,
+`/settle`, `/settlements/status` and the `/settlements/stream` server-sent
+events) with the contract of `docs/openapi.yaml`, backed by a simulated
+chain and a ledger of token balances and EIP-3009 authorization state.
+Per-route latency distributions stand in for CRE consensus, failure
+injection for a misbehaving facilitator and an optional per-IP request
+limit for the bridge's `rateLimitMiddleware`, so clients and resource servers
+can be exercised and load-tested without a chain, CRE or the Node bridge.
+Standard library only; uvloop is used when installed.
+
+Run it from the command line:
+
+    python -m chaoschain_x402_client.standin --port 8402 --block-time 1 \\
+        --verify-latency lognormal:0.05,0.5 --error-rate 0.01 --workers 4
+
+or in-process:
+
+    ```python
+    from chaoschain_x402_client.standin import Latency, StandinFacilitator
+
+    standin = StandinFacilitator(block_time=0.2, verify_latency=Latency.constant(0.02))
+    url = standin.serve_in_thread()
+    ...
+    standin.shutdown()
+    ```
+"""
+
+import argparse
+import asyncio
+import hashlib
+import math
+import multiprocessing
+import os
+import random
+import signal
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, FrozenSet, List, Optional, Set, Tuple
+from urllib.parse import parse_qs
+
+from pydantic import BaseModel, Field
+
+from . import codec
+from .batching import MAX_VERIFY_BATCH
+from .fees import compute_fee_breakdown, format_units, parse_base_units
+from .headers import decode_payment_header
+from .precheck import precheck_payment
+
+try:
+    import uvloop  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - optional dependency
+    uvloop = None
+
+SUPPORTED_NETWORKS = (
+    "base-sepolia",
+    "ethereum-sepolia",
+    "base-mainnet",
+    "ethereum-mainnet",
+    "0g-mainnet",
+    "skale-base-sepolia",
+)
+
+ROUTES = frozenset(
+    {
+        "/",
+        "/api/info",
+        "/health",
+        "/supported",
+        "/settlements/status",
+        "/verify",
+        "/verify/batch",
+        "/settle",
+    }
+)
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+# Routes the bridge runs through rateLimitMiddleware
+RATE_LIMITED_ROUTES = frozenset(
+    {
+        "/verify",
+        "/verify/batch",
+        "/settle",
+        "/settlements/status",
+        "/settlements/stream",
+    }
+)
+
+# Matches the bridge's keepalive cadence on /settlements/stream
+KEEPALIVE_INTERVAL = 15.0
+
+# Fastify's default bodyLimit
+MAX_BODY_BYTES = 1024 * 1024
+
+# Settle responses kept for Idempotency-Key replays
+IDEMPOTENCY_CAPACITY = 100_000
+
+# Simulated transaction hashes start with this tag, followed by the
+# submission time and a revert flag, so any worker can report their status
+_TX_TAG = b"x402".hex()
+
+
+class Latency:
+    """
+    Response delay distribution of a stand-in route, in seconds.
+
+    Example:
+        ```python
+        Latency.constant(0.02)
+        Latency.lognormal(median=0.05, sigma=0.5)   # CRE-like long tail
+        Latency.parse("uniform:0.01,0.03")
+        ```
+    """
+
+    KINDS = ("constant", "uniform", "normal", "lognormal", "exponential")
+
+    __slots__ = ("kind", "a", "b")
+
+    def __init__(self, kind: str = "constant", a: float = 0.0, b: float = 0.0):
+        if kind not in self.KINDS:
+            raise ValueError(
+                f"Unknown latency distribution {kind!r}; expected one of {self.KINDS}"
+            )
+        if a < 0 or b < 0:
+            raise ValueError("Latency parameters must not be negative")
+        self.kind = kind
+        self.a = a
+        self.b = b
+
+    @classmethod
+    def constant(cls, seconds: float) -> "Latency":
+        return cls("constant", seconds)
+
+    @classmethod
+    def uniform(cls, low: float, high: float) -> "Latency":
+        return cls("uniform", low, high)
+
+    @classmethod
+    def normal(cls, mean: float, stddev: float) -> "Latency":
+        """Normal distribution, clipped at zero."""
+        return cls("normal", mean, stddev)
+
+    @classmethod
+    def lognormal(cls, median: float, sigma: float) -> "Latency":
+        return cls("lognormal", median, sigma)
+
+    @classmethod
+    def exponential(cls, mean: float) -> "Latency":
+        return cls("exponential", mean)
+
+    @classmethod
+    def parse(cls, spec: str) -> "Latency":
+        """`seconds` or `kind:a[,b]`, e.g. `0.02`, `uniform:0.01,0.03`, `lognormal:0.05,0.5`."""
+        kind, sep, params = spec.partition(":")
+        if not sep:
+            return cls.constant(float(kind))
+        values = [float(v) for v in params.split(",") if v.strip()]
+        if not 1 <= len(values) <= 2:
+            raise ValueError(f"Invalid latency spec {spec!r}")
+        return cls(kind.strip(), *values)
+
+    def sample(self) -> float:
+        if self.kind == "constant":
+            return self.a
+        if self.kind == "uniform":
+            return random.uniform(self.a, self.b)
+        if self.kind == "normal":
+            return max(0.0, random.gauss(self.a, self.b))
+        if self.kind == "lognormal":
+            return self.a * math.exp(random.gauss(0.0, self.b))
+        return random.expovariate(1.0 / self.a) if self.a > 0 else 0.0
+
+    def __repr__(self) -> str:
+        return f"Latency({self.kind!r}, {self.a}, {self.b})"
+
+
+class FaultInjection(BaseModel):
+    """
+    Failure injection for the stand-in's POST routes.
+
+    Each request draws at most one fault; the rates are fractions of
+    requests and are applied after the route's latency.
+    """
+
+    error_rate: float = Field(
+        default=0.0, ge=0, le=1, description="Answer 500 INTERNAL_ERROR"
+    )
+    unavailable_rate: float = Field(
+        default=0.0, ge=0, le=1, description="Answer 503 SERVICE_UNAVAILABLE"
+    )
+    drop_rate: float = Field(
+        default=0.0, ge=0, le=1, description="Close the connection without answering"
+    )
+    stall_rate: float = Field(
+        default=0.0, ge=0, le=1, description="Hold the request, then drop it"
+    )
+    stall_time: float = Field(
+        default=30.0, ge=0, description="How long a stalled request is held (s)"
+    )
+    routes: FrozenSet[str] = Field(
+        default=frozenset({"/verify", "/verify/batch", "/settle"}),
+        description="Routes faults apply to",
+    )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(
+            self.error_rate
+            or self.unavailable_rate
+            or self.drop_rate
+            or self.stall_rate
+        )
+
+    def draw(self) -> Optional[str]:
+        """`error`, `unavailable`, `drop`, `stall` or None for this request."""
+        r = random.random()
+        for fault, rate in (
+            ("error", self.error_rate),
+            ("unavailable", self.unavailable_rate),
+            ("drop", self.drop_rate),
+            ("stall", self.stall_rate),
+        ):
+            if r < rate:
+                return fault
+            r -= rate
+        return None
+
+
+class Ledger:
+    """
+    Simulated token balances and EIP-3009 authorization state.
+
+    Unknown accounts start with `default_balance` base units so arbitrary
+    test payers can pay; `fund` sets a specific balance. A transfer moves
+    the amount from the payer to `payTo` (the fee to the facilitator) and
+    marks the payer's nonce used, so a replayed authorization is rejected
+    the way `authorizationState` rejects it on chain.
+    """
+
+    def __init__(
+        self, default_balance: int = 10**12, symbol: str = "USDC", decimals: int = 6
+    ):
+        """
+        Args:
+            default_balance: Base units held by accounts never funded (default: 1M USDC)
+            symbol: Token symbol used in rejection reasons (default: USDC)
+            decimals: Token decimals used in rejection reasons (default: 6)
+        """
+        self.default_balance = default_balance
+        self.symbol = symbol
+        self.decimals = decimals
+        self.fees: Dict[Tuple[str, str], int] = {}
+        self._balances: Dict[Tuple[str, str, str], int] = {}
+        self._used: Set[Tuple[str, str, str, str]] = set()
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Picklable for worker processes started with spawn/forkserver
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _account(network: str, asset: str, address: str) -> Tuple[str, str, str]:
+        return (network, str(asset).lower(), str(address).lower())
+
+    def balance(self, network: str, asset: str, address: str) -> int:
+        return self._balances.get(
+            self._account(network, asset, address), self.default_balance
+        )
+
+    def fund(self, network: str, asset: str, address: str, amount: int) -> None:
+        """Set an account's balance in base units."""
+        with self._lock:
+            self._balances[self._account(network, asset, address)] = amount
+
+    def authorization_used(
+        self, network: str, asset: str, payer: str, nonce: str
+    ) -> bool:
+        return (
+            network,
+            str(asset).lower(),
+            str(payer).lower(),
+            str(nonce).lower(),
+        ) in self._used
+
+    def check(
+        self, network: str, asset: str, payer: str, nonce: str, amount: int
+    ) -> Optional[str]:
+        """Rejection reason for spending the authorization, or None."""
+        if self.authorization_used(network, asset, payer, nonce):
+            return f"Authorization already used (nonce: {nonce})"
+        balance = self.balance(network, asset, payer)
+        if balance < amount:
+            return (
+                f"Insufficient {self.symbol} balance. "
+                f"Required: {format_units(amount, self.decimals)} {self.symbol}, "
+                f"Available: {format_units(balance, self.decimals)} {self.symbol}"
+            )
+        return None
+
+    def transfer(
+        self,
+        network: str,
+        asset: str,
+        payer: str,
+        nonce: str,
+        pay_to: str,
+        amount: int,
+        fee: int,
+    ) -> Optional[str]:
+        """Spend the authorization atomically; returns a rejection reason or None."""
+        with self._lock:
+            reason = self.check(network, asset, payer, nonce, amount)
+            if reason is not None:
+                return reason
+            source = self._account(network, asset, payer)
+            target = self._account(network, asset, pay_to)
+            self._balances[source] = (
+                self._balances.get(source, self.default_balance) - amount
+            )
+            self._balances[target] = (
+                self._balances.get(target, self.default_balance) + amount - fee
+            )
+            self.fees[source[:2]] = self.fees.get(source[:2], 0) + fee
+            self._used.add((network, source[1], source[2], str(nonce).lower()))
+            return None
+
+
+class SimulatedChain:
+    """
+    Stand-in chain: a submitted transaction gains one confirmation every
+    `block_time` seconds and is final after `confirmations` of them.
+
+    The submission time and revert outcome are encoded in the transaction
+    hash itself, so every worker process of a stand-in reports the same
+    status for it without shared state.
+    """
+
+    def __init__(
+        self, block_time: float = 1.0, confirmations: int = 2, revert_rate: float = 0.0
+    ):
+        """
+        Args:
+            block_time: Seconds per simulated block (default: 1)
+            confirmations: Confirmations until a transaction is final (default: 2)
+            revert_rate: Fraction of transactions that revert (default: 0)
+        """
+        self.block_time = block_time
+        self.confirmations = confirmations
+        self.revert_rate = revert_rate
+
+    def submit(self, network: str) -> str:
+        """Submit a transaction and return its hash."""
+        submitted_ms = int(time.time() * 1000)
+        reverts = random.random() < self.revert_rate
+        return f"0x{_TX_TAG}{submitted_ms:012x}{int(reverts):02x}{os.urandom(21).hex()}"
+
+    def status(self, tx_hash: str) -> Dict[str, Any]:
+        """Status in the `/settlements/status` shape; unknown hashes are pending."""
+        raw = tx_hash.lower()
+        if len(raw) != 66 or not raw.startswith("0x" + _TX_TAG):
+            return {"txHash": tx_hash, "status": "pending", "confirmations": 0}
+        try:
+            submitted_at = int(raw[10:22], 16) / 1000
+        except ValueError:
+            return {"txHash": tx_hash, "status": "pending", "confirmations": 0}
+
+        confirmations = max(0, int((time.time() - submitted_at) / self.block_time))
+        if raw[22:24] == "01" and confirmations >= 1:
+            status = "failed"
+        elif confirmations >= self.confirmations:
+            status = "confirmed"
+        else:
+            status = "pending"
+        return {"txHash": tx_hash, "status": status, "confirmations": confirmations}
+
+
+class _Connection(asyncio.Protocol):
+    """
+    One keep-alive HTTP/1.1 connection.
+
+    Requests without latency or faults are answered straight from
+    `data_received`; anything that has to wait goes through a
+    per-connection task, and later pipelined requests queue behind it so
+    responses stay in order.
+    """
+
+    transport: asyncio.Transport
+
+    def __init__(self, app: "StandinFacilitator"):
+        self.app = app
+        self.buffer = bytearray()
+        self.queue: Deque[Tuple[tuple, Optional[Tuple[float, Optional[str]]]]] = deque()
+        self.worker: Optional[asyncio.Task] = None
+        self.closed = False
+        self.peer = ""
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport  # type: ignore[assignment]
+        peername = transport.get_extra_info("peername")
+        self.peer = peername[0] if peername else ""
+        self.app._connections.add(self)
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self.closed = True
+        self.app._connections.discard(self)
+        if self.worker is not None:
+            self.worker.cancel()
+
+    def data_received(self, data: bytes) -> None:
+        self.buffer += data
+        while not self.closed:
+            request = self._parse()
+            if request is None:
+                return
+            plan = self.app._plan(request, self.peer)
+            if self.worker is None and plan is None:
+                self.app._respond(self, request)
+            else:
+                self.queue.append((request, plan))
+                if self.worker is None:
+                    self.worker = asyncio.ensure_future(self._work())
+
+    async def _work(self) -> None:
+        try:
+            while self.queue and not self.closed:
+                request, plan = self.queue.popleft()
+                await self.app._respond_later(self, request, plan)
+        finally:
+            self.worker = None
+
+    def _parse(self) -> Optional[tuple]:
+        end = self.buffer.find(b"\r\n\r\n")
+        if end < 0:
+            if len(self.buffer) > 64 * 1024:
+                self.close()
+            return None
+        try:
+            request_line, *header_lines = (
+                self.buffer[:end].decode("latin-1").split("\r\n")
+            )
+            method, target, _ = request_line.split(" ", 2)
+            headers = {}
+            for line in header_lines:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            self.close()
+            return None
+        if length > MAX_BODY_BYTES:
+            self.send(
+                413,
+                b'{"error":"Request body is too large","code":"PAYLOAD_TOO_LARGE"}',
+                close=True,
+            )
+            return None
+        if len(self.buffer) < end + 4 + length:
+            return None
+
+        body = bytes(self.buffer[end + 4 : end + 4 + length])
+        del self.buffer[: end + 4 + length]
+        path, _, query = target.partition("?")
+        return method, path, query, headers, body
+
+    def write(self, data: bytes) -> None:
+        if not self.closed:
+            self.transport.write(data)
+
+    def send(self, status: int, payload: bytes, close: bool = False) -> None:
+        self.write(
+            b"HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n%s\r\n"
+            % (
+                status,
+                _REASONS.get(status, "OK").encode(),
+                len(payload),
+                b"Connection: close\r\n" if close else b"",
+            )
+            + payload
+        )
+        if close:
+            self.close()
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self.transport.close()
+
+    def abort(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self.transport.abort()
+
+
+class StandinFacilitator:
+    """
+    Minimal HTTP/1.1 server speaking the bridge's API over asyncio.
+
+    Verification is the client's local pre-check (decodable header,
+    network, expiry, amount, recipient) followed by the ledger's balance
+    and authorization checks; settlement spends the authorization, submits
+    to a SimulatedChain and reports `pending` until it confirms.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        chain: Optional[SimulatedChain] = None,
+        block_time: float = 1.0,
+        confirmations: int = 2,
+        revert_rate: float = 0.0,
+        fee_bps: int = 100,
+        stream_interval: float = 0.25,
+        ledger: Optional[Ledger] = None,
+        verify_latency: Optional[Latency] = None,
+        settle_latency: Optional[Latency] = None,
+        faults: Optional[FaultInjection] = None,
+        rate_limit: Optional[int] = None,
+        rate_window: float = 60.0,
+        reuse_port: bool = False,
+    ):
+        """
+        Args:
+            host: Interface to bind (default: 127.0.0.1)
+            port: Port to bind; 0 picks a free one (default: 0)
+            chain: Simulated chain to settle on (default: a new SimulatedChain)
+            block_time: Block time of the default chain (default: 1)
+            confirmations: Confirmations until final on the default chain (default: 2)
+            revert_rate: Fraction of reverted settlements on the default chain (default: 0)
+            fee_bps: Facilitator fee in basis points (default: 100)
+            stream_interval: Seconds between status checks per stream (default: 0.25)
+            ledger: Balances and authorization state (default: a new Ledger)
+            verify_latency: Delay of /verify and of each /verify/batch (default: none)
+            settle_latency: Delay of /settle (default: none)
+            faults: Failure injection (default: None)
+            rate_limit: Requests per `rate_window` allowed per client IP on
+                the bridge's rate-limited routes; more are answered 429 with
+                `retryAfter`; each /verify/batch item counts as one
+                (default: None, unlimited; the bridge uses 1000)
+            rate_window: Length of the fixed rate-limit window in seconds
+                (default: 60)
+            reuse_port: Bind with SO_REUSEPORT so several processes can
+                share the port (default: False)
+        """
+        self.host = host
+        self.port = port
+        self.chain = chain or SimulatedChain(block_time, confirmations, revert_rate)
+        self.ledger = ledger or Ledger()
+        self.fee_bps = fee_bps
+        self.stream_interval = stream_interval
+        self.faults = faults if faults is not None and faults.enabled else None
+        self.reuse_port = reuse_port
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        # Client IP -> [window index, requests counted, window reset time]
+        self._windows: Dict[str, List[float]] = {}
+        self._latency: Dict[str, Latency] = {}
+        if verify_latency is not None:
+            self._latency["/verify"] = self._latency["/verify/batch"] = verify_latency
+        if settle_latency is not None:
+            self._latency["/settle"] = settle_latency
+        self._supported = frozenset(("exact", n) for n in SUPPORTED_NETWORKS)
+        self._idempotency: "OrderedDict[str, bytes]" = OrderedDict()
+        self._connections: Set[_Connection] = set()
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> str:
+        """Start serving on the running event loop and return the base URL."""
+        loop = asyncio.get_running_loop()
+        self._server = await loop.create_server(
+            lambda: _Connection(self),
+            self.host,
+            self.port,
+            reuse_port=self.reuse_port or None,
+            backlog=1024,
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.url
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for connection in list(self._connections):
+                connection.close()
+            await self._server.wait_closed()
+
+    def serve_in_thread(self) -> str:
+        """Run on a private event loop in a daemon thread; returns the base URL."""
+        ready = threading.Event()
+
+        def run() -> None:
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="x402-standin", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self.url
+
+    def shutdown(self) -> None:
+        """Stop a server started with `serve_in_thread`."""
+        if self._loop is None or self._thread is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    # ------------------------------------------------------------------
+    # HTTP plumbing
+    # ------------------------------------------------------------------
+
+    def _plan(self, request: tuple, peer: str) -> Optional[Tuple[float, Optional[str]]]:
+        """(delay, fault) for a request that cannot be answered right away."""
+        path = request[1]
+        limit = self.rate_limit
+        if (
+            limit is not None
+            and path in RATE_LIMITED_ROUTES
+            and (
+                self._over_limit(peer, limit)
+                or (
+                    path == "/verify/batch"
+                    and not self._charge_batch(peer, request[4], limit)
+                )
+            )
+        ):
+            return 0.0, "throttled"
+        if path == "/settlements/stream":
+            return 0.0, "stream"
+        fault = (
+            self.faults.draw()
+            if self.faults is not None and path in self.faults.routes
+            else None
+        )
+        latency = self._latency.get(path)
+        delay = latency.sample() if latency is not None else 0.0
+        if fault is None and delay <= 0:
+            return None
+        return delay, fault
+
+    def _over_limit(self, peer: str, limit: int) -> bool:
+        """
+        Count a request against `peer`'s window, like the bridge: a fixed
+        window per IP whose reset time is set by its first request.
+        """
+        now = time.monotonic()
+        window = now // self.rate_window
+        counter = self._windows.get(peer)
+        if counter is None or counter[0] != window:
+            if len(self._windows) > 4096:
+                self._windows = {ip: c for ip, c in self._windows.items() if c[2] > now}
+            counter = self._windows[peer] = [window, 0, now + self.rate_window]
+        counter[1] += 1
+        return counter[1] > limit
+
+    def _charge_batch(self, peer: str, body: bytes, limit: int) -> bool:
+        """
+        Charge the rest of a /verify/batch's items to `peer`'s window, like
+        the bridge; a batch over the remaining budget is refused uncharged.
+        """
+        try:
+            extra = len(codec.loads(body)["requests"]) - 1
+        except (ValueError, KeyError, TypeError):
+            return True  # Rejected as invalid by the route
+        counter = self._windows[peer]
+        if counter[1] + extra > limit:
+            return False
+        counter[1] += extra
+        return True
+
+    def _retry_after(self, peer: str) -> int:
+        counter = self._windows.get(peer)
+        return (
+            max(0, math.ceil(counter[2] - time.monotonic()))
+            if counter is not None
+            else 0
+        )
+
+    def _respond(self, connection: _Connection, request: tuple) -> None:
+        method, path, query, headers, body = request
+        status, payload = self._route(method, path, parse_qs(query), headers, body)
+        connection.send(
+            status, payload, close=headers.get("connection", "").lower() == "close"
+        )
+
+    async def _respond_later(
+        self,
+        connection: _Connection,
+        request: tuple,
+        plan: Optional[Tuple[float, Optional[str]]],
+    ) -> None:
+        if plan is None:
+            self._respond(connection, request)
+            return
+        delay, fault = plan
+        if fault == "throttled":
+            connection.send(
+                429,
+                codec.dumps(
+                    {
+                        "error": "Rate limit exceeded",
+                        "retryAfter": self._retry_after(connection.peer),
+                    }
+                ),
+            )
+            return
+        if fault == "stream":
+            await self._stream(connection, parse_qs(request[2]))
+            return
+        if fault == "stall" and self.faults is not None:
+            await asyncio.sleep(self.faults.stall_time)
+            connection.abort()
+            return
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if fault == "drop":
+            connection.abort()
+        elif fault == "error":
+            connection.send(
+                500, b'{"error":"Injected failure","code":"INTERNAL_ERROR"}'
+            )
+        elif fault == "unavailable":
+            connection.send(
+                503, b'{"error":"Service unavailable","code":"SERVICE_UNAVAILABLE"}'
+            )
+        else:
+            self._respond(connection, request)
+
+    def _route(
+        self,
+        method: str,
+        path: str,
+        query: Dict[str, List[str]],
+        headers: Dict[str, str],
+        body: bytes,
+    ) -> Tuple[int, bytes]:
+        if method == "GET" and path in ("/", "/api/info"):
+            return 200, codec.dumps(self._info())
+        if method == "GET" and path == "/health":
+            return 200, b'{"healthy":true}'
+        if method == "GET" and path == "/supported":
+            kinds = [
+                {"x402Version": 1, "scheme": "exact", "network": n}
+                for n in SUPPORTED_NETWORKS
+            ]
+            return 200, codec.dumps({"kinds": kinds})
+        if method == "GET" and path == "/settlements/status":
+            network, hashes, error = self._status_query(query)
+            if error:
+                return 400, error
+            settlements = [self.chain.status(h) for h in hashes]
+            return 200, codec.dumps({"network": network, "settlements": settlements})
+        if method == "POST" and path == "/verify/batch":
+            return self._verify_batch(body)
+        if method == "POST" and path in ("/verify", "/settle"):
+            try:
+                request = codec.loads(body)
+                header = request["paymentHeader"]
+                requirements = request["paymentRequirements"]
+            except (ValueError, KeyError, TypeError) as e:
+                return 400, codec.dumps(
+                    {"error": f"Invalid request: {e}", "code": "INVALID_REQUEST"}
+                )
+            if path == "/verify":
+                return 200, codec.dumps(self._verify(header, requirements))
+            return 200, self._settle(
+                header, requirements, headers.get("idempotency-key"), body
+            )
+        if path in ROUTES:
+            return 405, b'{"error":"Method not allowed","code":"METHOD_NOT_ALLOWED"}'
+        return 404, b'{"error":"Not found","code":"NOT_FOUND"}'
+
+    def _verify_batch(self, body: bytes) -> Tuple[int, bytes]:
+        try:
+            items = codec.loads(body)["requests"]
+            if not isinstance(items, list) or not 1 <= len(items) <= MAX_VERIFY_BATCH:
+                raise ValueError(f"requests must hold 1 to {MAX_VERIFY_BATCH} items")
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, codec.dumps(
+                {"error": f"Invalid request: {e}", "code": "INVALID_REQUEST"}
+            )
+
+        results = []
+        for item in items:
+            try:
+                results.append(
+                    self._verify(item["paymentHeader"], item["paymentRequirements"])
+                )
+            except (KeyError, TypeError) as e:
+                results.append(
+                    {"error": f"Invalid request: {e}", "code": "INVALID_REQUEST"}
+                )
+        return 200, codec.dumps({"results": results})
+
+    @staticmethod
+    def _status_query(
+        query: Dict[str, List[str]],
+    ) -> Tuple[str, List[str], Optional[bytes]]:
+        network = (query.get("network") or [""])[0]
+        hashes = [
+            h.strip().lower()
+            for h in (query.get("txHashes") or [""])[0].split(",")
+            if h.strip()
+        ]
+        if not network or not hashes:
+            return (
+                network,
+                hashes,
+                b'{"error":"network and txHashes are required","code":"INVALID_REQUEST"}',
+            )
+        if len(hashes) > 100:
+            return (
+                network,
+                hashes,
+                b'{"error":"At most 100 txHashes per request","code":"INVALID_REQUEST"}',
+            )
+        if network not in SUPPORTED_NETWORKS:
+            error = {
+                "error": f"Unsupported network: {network}",
+                "code": "INVALID_REQUEST",
+            }
+            return network, hashes, codec.dumps(error)
+        return network, hashes, None
+
+    # ------------------------------------------------------------------
+    # Facilitator behaviour
+    # ------------------------------------------------------------------
+
+    def _info(self) -> Dict[str, Any]:
+        return {
+            "service": "ChaosChain x402 Facilitator",
+            "version": "0.1.0",
+            "mode": "standin",
+            "endpoints": {
+                "verify": "POST /verify",
+                "verifyBatch": "POST /verify/batch",
+                "settle": "POST /settle",
+                "supported": "GET /supported",
+                "settlementStatus": "GET /settlements/status",
+                "settlementStream": "GET /settlements/stream",
+            },
+        }
+
+    @staticmethod
+    def _amount(requirements: Dict[str, Any]) -> int:
+        try:
+            return parse_base_units(requirements.get("maxAmountRequired", 0))
+        except ValueError:
+            return 0
+
+    def _check(
+        self, header: Any, requirements: Dict[str, Any]
+    ) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """(rejection reason, decoded authorization) of a payment."""
+        try:
+            auth = decode_payment_header(header)
+        except ValueError:
+            auth = None
+        # Undecodable headers go to the pre-check as-is so it reports them
+        # in its usual order of checks
+        rejection = precheck_payment(
+            auth if auth is not None else header,
+            requirements,
+            supported=self._supported,
+        )
+        if rejection is not None:
+            return rejection.invalidReason, auth
+        if auth is None or not auth["from"] or not auth["nonce"]:
+            return "Payment header is missing payer or nonce", auth
+        reason = self.ledger.check(
+            requirements.get("network", ""),
+            requirements.get("asset", ""),
+            auth["from"],
+            auth["nonce"],
+            self._amount(requirements),
+        )
+        return reason, auth
+
+    def _verify(self, header: Any, requirements: Dict[str, Any]) -> Dict[str, Any]:
+        now = int(time.time() * 1000)
+        reason, _ = self._check(header, requirements)
+        proof = (
+            "0x"
+            + hashlib.sha256(f"{requirements.get('payTo')}{now}".encode()).hexdigest()
+        )
+        return {
+            "isValid": reason is None,
+            "invalidReason": reason,
+            "consensusProof": proof,
+            "reportId": f"rep_{now}",
+            "timestamp": now,
+            **compute_fee_breakdown(self._amount(requirements), self.fee_bps),
+        }
+
+    def _settle(
+        self,
+        header: Any,
+        requirements: Dict[str, Any],
+        idempotency_key: Optional[str],
+        body: bytes,
+    ) -> bytes:
+        # Same fallback as middleware/idempotency.ts: hash of route + body
+        key = idempotency_key or hashlib.sha256(b"/settle|" + body).hexdigest()
+        cached = self._idempotency.get(key)
+        if cached is not None:
+            return cached
+
+        now = int(time.time() * 1000)
+        network = requirements.get("network", "")
+        amount = self._amount(requirements)
+        breakdown = compute_fee_breakdown(amount, self.fee_bps)
+        reason, auth = self._check(header, requirements)
+        if reason is None and auth is not None:
+            reason = self.ledger.transfer(
+                network,
+                requirements.get("asset", ""),
+                auth["from"],
+                auth["nonce"],
+                requirements.get("payTo", ""),
+                amount,
+                int(breakdown["fee"]["base"]),
+            )
+
+        response: Dict[str, Any] = {
+            "success": False,
+            "error": reason,
+            "txHash": None,
+            "networkId": network,
+            "consensusProof": "",
+            "timestamp": now,
+            **breakdown,
+        }
+        if reason is None:
+            tx_hash = self.chain.submit(network)
+            response.update(
+                success=True,
+                error=None,
+                txHash=tx_hash,
+                consensusProof="0x" + hashlib.sha256(tx_hash.encode()).hexdigest(),
+                status="pending",
+            )
+
+        payload = codec.dumps(response)
+        self._idempotency[key] = payload
+        if len(self._idempotency) > IDEMPOTENCY_CAPACITY:
+            self._idempotency.popitem(last=False)
+        return payload
+
+    async def _stream(
+        self, connection: _Connection, query: Dict[str, List[str]]
+    ) -> None:
+        """Serve /settlements/stream as chunked server-sent events."""
+        network, hashes, error = self._status_query(query)
+        if error:
+            connection.send(400, error, close=True)
+            return
+
+        connection.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+            b"Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n"
+        )
+
+        def send(text: str) -> None:
+            if connection.closed:
+                return  # The client went away mid-round
+            data = text.encode()
+            connection.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+        last: Dict[str, Tuple[str, int]] = {}
+        pending = set(hashes)
+        keepalive_at = time.monotonic() + KEEPALIVE_INTERVAL
+        while pending and not connection.closed:
+            for tx_hash in sorted(pending):
+                status = self.chain.status(tx_hash)
+                state = (status["status"], status["confirmations"])
+                if last.get(tx_hash) != state:
+                    last[tx_hash] = state
+                    send(f"event: status\ndata: {codec.dumps(status).decode()}\n\n")
+                if status["status"] != "pending":
+                    pending.discard(tx_hash)
+            if pending and time.monotonic() >= keepalive_at:
+                send(": keepalive\n\n")
+                keepalive_at = time.monotonic() + KEEPALIVE_INTERVAL
+            if pending:
+                await asyncio.sleep(self.stream_interval)
+
+        if connection.closed:
+            return
+        send("event: end\ndata: {}\n\n")
+        connection.write(b"0\r\n\r\n")
+        connection.close()
+
+
+def _run_worker(options: Dict[str, Any]) -> None:
+    loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    standin = StandinFacilitator(**options)
+    try:
+        loop.run_until_complete(standin.start())
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.run_until_complete(standin.close())
+        loop.close()
+
+
+def serve(workers: int = 1, **options: Any) -> None:
+    """
+    Serve the stand-in until interrupted.
+
+    With `workers` > 1, every worker process binds the same port with
+    SO_REUSEPORT and the kernel spreads connections across them. Chain
+    status is consistent across workers, but each keeps its own ledger and
+    idempotency store: a replay is only rejected when it reaches the
+    worker that settled the original.
+
+    Args:
+        workers: Worker processes (default: 1, serve in this process)
+        **options: StandinFacilitator arguments; `port` must be fixed
+            when `workers` > 1
+    """
+    if workers <= 1:
+        _run_worker(options)
+        return
+    if not options.get("port"):
+        raise ValueError("A fixed port is required with more than one worker")
+
+    def interrupt(signum: int, frame: Any) -> None:
+        raise KeyboardInterrupt
+
+    # Workers inherit this, so SIGTERM shuts every process down cleanly
+    signal.signal(signal.SIGTERM, interrupt)
+    options["reuse_port"] = True
+    processes = [
+        multiprocessing.Process(
+            target=_run_worker, args=(options,), name=f"x402-standin-{i}", daemon=True
+        )
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Local stand-in for the x402 http-bridge"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8402)
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Worker processes sharing the port"
+    )
+    parser.add_argument(
+        "--block-time", type=float, default=1.0, help="Seconds per simulated block"
+    )
+    parser.add_argument(
+        "--confirmations", type=int, default=2, help="Confirmations until final"
+    )
+    parser.add_argument(
+        "--revert-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of reverted settlements",
+    )
+    parser.add_argument("--fee-bps", type=int, default=100)
+    parser.add_argument(
+        "--default-balance",
+        type=int,
+        default=10**12,
+        help="Base units held by unfunded accounts",
+    )
+    parser.add_argument(
+        "--verify-latency",
+        type=Latency.parse,
+        help="e.g. 0.02, uniform:0.01,0.03, lognormal:0.05,0.5",
+    )
+    parser.add_argument(
+        "--settle-latency", type=Latency.parse, help="Same format as --verify-latency"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Fraction answered 500"
+    )
+    parser.add_argument(
+        "--unavailable-rate", type=float, default=0.0, help="Fraction answered 503"
+    )
+    parser.add_argument(
+        "--drop-rate", type=float, default=0.0, help="Fraction dropped without answer"
+    )
+    parser.add_argument(
+        "--stall-rate", type=float, default=0.0, help="Fraction held, then dropped"
+    )
+    parser.add_argument(
+        "--stall-time",
+        type=float,
+        default=30.0,
+        help="Seconds a stalled request is held",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=int,
+        help="Requests per window per client IP, then 429 (the bridge uses 1000)",
+    )
+    parser.add_argument(
+        "--rate-window", type=float, default=60.0, help="Rate-limit window in seconds"
+    )
+    args = parser.parse_args(argv)
+
+    print(
+        f"Stand-in facilitator listening on http://{args.host}:{args.port}"
+        + (f" ({args.workers} workers)" if args.workers > 1 else "")
+    )
+    serve(
+        workers=args.workers,
+        host=args.host,
+        port=args.port,
+        block_time=args.block_time,
+        confirmations=args.confirmations,
+        revert_rate=args.revert_rate,
+        fee_bps=args.fee_bps,
+        ledger=Ledger(default_balance=args.default_balance),
+        verify_latency=args.verify_latency,
+        settle_latency=args.settle_latency,
+        faults=FaultInjection(
+            error_rate=args.error_rate,
+            unavailable_rate=args.unavailable_rate,
+            drop_rate=args.drop_rate,
+            stall_rate=args.stall_rate,
+            stall_time=args.stall_time,
+        ),
+        rate_limit=args.rate_limit,
+        rate_window=args.rate_window,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Settlement status streaming for the ChaosChain x402 client.
+
+Parses the bridge's `/settlements/stream` server-sent events and keeps
+track of which watched transactions have changed or become final, so the
+clients' `watch_settlements` can switch from the stream to batched
+polling without repeating or losing transitions.
+"""
+
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .types import TransactionStatus
+
+# Transaction statuses after which nothing changes any more
+FINAL_STATUSES = frozenset({"confirmed", "failed"})
+
+# HTTP statuses meaning the facilitator has no stream endpoint (fall back to polling)
+STREAM_UNSUPPORTED = frozenset({404, 405, 501})
+
+
+class _SSEParser:
+    """Incremental text/event-stream parser (event and data fields only)."""
+
+    def __init__(self):
+        self.event = "message"
+        self.data: List[str] = []
+
+    def feed(self, line: str) -> Optional[Tuple[str, str]]:
+        """Feed one line; returns (event, data) when an event is complete."""
+        line = line.rstrip("\r\n")
+        if not line:
+            if not self.data:
+                self.event = "message"
+                return None
+            event = (self.event, "\n".join(self.data))
+            self.event, self.data = "message", []
+            return event
+        if line.startswith(":"):
+            return None  # comment / keepalive
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+        if field == "event":
+            self.event = value
+        elif field == "data":
+            self.data.append(value)
+        return None
+
+
+def iter_sse(lines: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """Yield (event, data) pairs from an iterable of text lines."""
+    parser = _SSEParser()
+    for line in lines:
+        event = parser.feed(line)
+        if event is not None:
+            yield event
+
+
+async def aiter_sse(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[str, str]]:
+    """Yield (event, data) pairs from an async iterable of text lines."""
+    parser = _SSEParser()
+    async for line in lines:
+        event = parser.feed(line)
+        if event is not None:
+            yield event
+
+
+class SettlementWatch:
+    """
+    Status of a set of watched transactions.
+
+    `update` reports whether a status is a transition (new, or a different
+    status / confirmation count than last seen), so each transition is
+    yielded once whether it arrived over the stream or from a poll.
+    """
+
+    def __init__(self, tx_hashes: Iterable[str]):
+        self.last: Dict[str, Optional[TransactionStatus]] = {
+            h.lower(): None for h in tx_hashes
+        }
+        if not self.last:
+            raise ValueError("At least one transaction hash is required")
+
+    def update(self, status: TransactionStatus) -> bool:
+        key = status.txHash.lower()
+        if key not in self.last:
+            return False
+        previous = self.last[key]
+        if previous is not None and (previous.status, previous.confirmations) == (
+            status.status,
+            status.confirmations,
+        ):
+            return False
+        if previous is not None and previous.status in FINAL_STATUSES:
+            return False
+        self.last[key] = status
+        return True
+
+    @property
+    def pending(self) -> List[str]:
+        """Transactions that are not final yet."""
+        return [
+            h
+            for h, s in self.last.items()
+            if s is None or s.status not in FINAL_STATUSES
+        ]
+
+    @property
+    def done(self) -> bool:
+        return not self.pending
@@ -0,0 +1,128 @@
+"""
+Pre-serialized PaymentRequirements templates for the ChaosChain x402 client.
+"""
+
+import json
+import re
+from typing import Any, Dict, NamedTuple, Tuple, Union
+
+from . import codec
+from .types import PaymentRequirements
+
+# Base64 (standard and URL-safe) never needs escaping inside a JSON string
+_JSON_SAFE_HEADER = re.compile(r"[A-Za-z0-9+/=_-]*")
+
+
+class PaymentRequirementsTemplate:
+    """
+    PaymentRequirements validated and encoded once, for reuse on every call.
+
+    Requirements are static per endpoint, so the template stores the
+    request body around the per-request `paymentHeader` as ready-made
+    bytes. Each verify/settle call then only splices the header in,
+    instead of re-validating and re-serializing the whole dict.
+
+    Example:
+        ```python
+        weather = client.requirements_template({
+            'scheme': 'exact',
+            'network': 'base-sepolia',
+            'maxAmountRequired': '1000000',
+            'payTo': '0x...',
+            'asset': '0x...',
+            'resource': '/api/weather'
+        })
+
+        result = client.verify_payment(header, weather)
+        ```
+    """
+
+    __slots__ = ("requirements", "payload", "canonical", "x402_version", "_prefix")
+
+    def __init__(
+        self,
+        payment_requirements: Union[Dict[str, Any], PaymentRequirements],
+        x402_version: int = 1,
+    ):
+        """
+        Validate and pre-encode payment requirements.
+
+        Args:
+            payment_requirements: Requirements as a dict or PaymentRequirements
+            x402_version: x402 protocol version baked into the body (default: 1)
+        """
+        self.requirements = codec.as_requirements(payment_requirements)
+        self.payload = codec.requirements_payload(self.requirements)
+        self.x402_version = x402_version
+        # Stable encoding used for cache keys (see VerifyCache.key)
+        self.canonical = json.dumps(
+            self.payload, sort_keys=True, separators=(",", ":")
+        ).encode()
+        self._prefix = (
+            b'{"x402Version":'
+            + str(x402_version).encode()
+            + b',"paymentRequirements":'
+            + codec.dumps(self.payload)
+            + b',"paymentHeader":'
+        )
+
+    def body(self, payment_header: str) -> bytes:
+        """Request body for `payment_header`, reusing the pre-encoded bytes."""
+        if _JSON_SAFE_HEADER.fullmatch(payment_header):
+            return self._prefix + b'"' + payment_header.encode("ascii") + b'"}'
+        return self._prefix + codec.dumps(payment_header) + b"}"
+
+    def __repr__(self) -> str:
+        return f"PaymentRequirementsTemplate({self.requirements!r})"
+
+
+# (payment_header, payment_requirements) pair accepted by the batch APIs
+Payment = Tuple[str, Union[dict, PaymentRequirements, PaymentRequirementsTemplate]]
+
+
+class PreparedRequest(NamedTuple):
+    """Encoded verify/settle body plus the requirements form used for cache keys."""
+
+    body: bytes
+    requirements_key: Union[Dict[str, Any], bytes]
+
+
+def prepare_request(
+    payment_header: str,
+    payment_requirements: Union[
+        Dict[str, Any], PaymentRequirements, PaymentRequirementsTemplate
+    ],
+    x402_version: int,
+) -> PreparedRequest:
+    """
+    Encode a verify/settle request body.
+
+    Templates take the splice-only path; dicts and PaymentRequirements are
+    validated (if needed) and serialized.
+
+    Raises:
+        ValueError: If a template was built for a different x402 version
+    """
+    if isinstance(payment_requirements, PaymentRequirementsTemplate):
+        if payment_requirements.x402_version != x402_version:
+            raise ValueError(
+                f"Template built for x402Version {payment_requirements.x402_version}, "
+                f"client uses {x402_version}"
+            )
+        return PreparedRequest(
+            payment_requirements.body(payment_header), payment_requirements.canonical
+        )
+
+    if isinstance(payment_requirements, (dict, PaymentRequirements)):
+        requirements_data = codec.requirements_payload(
+            codec.as_requirements(payment_requirements)
+        )
+    else:
+        # CompactPaymentRequirements were validated when they were decoded
+        requirements_data = payment_requirements.model_dump(exclude_none=True)
+    payload = {
+        "x402Version": x402_version,
+        "paymentHeader": payment_header,
+        "paymentRequirements": requirements_data,
+    }
+    return PreparedRequest(codec.dumps(payload), requirements_data)
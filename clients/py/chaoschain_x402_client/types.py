@@ -2,7 +2,7 @@
 Type definitions for the ChaosChain x402 client.
 """
 
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Union
 from pydantic import BaseModel, Field
 
 
@@ -14,21 +14,58 @@ class PaymentRequirements(BaseModel):
     scheme: str = Field(..., description="Payment scheme (e.g., 'exact')")
     network: str = Field(..., description="Blockchain network (e.g., 'base-sepolia')")
     maxAmountRequired: str = Field(
-        ..., description="Maximum amount in atomic units (string to handle large numbers)"
+        ...,
+        description="Maximum amount in atomic units (string to handle large numbers)",
     )
     resource: str = Field(..., description="Resource identifier/URL")
     payTo: str = Field(..., description="Payment recipient address")
     asset: str = Field(..., description="Payment asset contract address")
-    description: Optional[str] = Field(None, description="Human-readable description")
-    mimeType: Optional[str] = Field(None, description="MIME type of the resource")
+    description: Optional[str] = Field(
+        default=None, description="Human-readable description"
+    )
+    mimeType: Optional[str] = Field(
+        default=None, description="MIME type of the resource"
+    )
     maxTimeoutSeconds: Optional[int] = Field(
-        None, description="Maximum timeout for the operation"
+        default=None, description="Maximum timeout for the operation"
     )
     extra: Optional[Dict[str, Any]] = Field(
-        None, description="Additional scheme-specific data"
+        default=None, description="Additional scheme-specific data"
     )
 
 
+class AmountBreakdown(BaseModel):
+    """
+    Payment amount in human and base units (fee transparency).
+    """
+
+    human: str = Field(..., description="Human-readable amount (e.g., '1.00')")
+    base: str = Field(..., description="Amount in base units (e.g., '1000000')")
+    symbol: str = Field(..., description="Token symbol (e.g., 'USDC')")
+    decimals: Optional[int] = Field(
+        default=None, description="Token decimals (e.g., 6)"
+    )
+
+
+class FeeBreakdown(BaseModel):
+    """
+    Facilitator fee in human and base units.
+    """
+
+    human: str = Field(..., description="Human-readable fee (e.g., '0.01')")
+    base: str = Field(..., description="Fee in base units (e.g., '10000')")
+    bps: int = Field(..., description="Fee in basis points (e.g., 100 for 1%)")
+
+
+class NetBreakdown(BaseModel):
+    """
+    Amount the merchant receives after the fee.
+    """
+
+    human: str = Field(..., description="Human-readable net amount (e.g., '0.99')")
+    base: str = Field(..., description="Net amount in base units (e.g., '990000')")
+
+
 class VerifyResponse(BaseModel):
     """
     Response from the verify endpoint.
@@ -36,17 +73,22 @@ class VerifyResponse(BaseModel):
 
     isValid: bool = Field(..., description="Whether the payment is valid")
     invalidReason: Optional[str] = Field(
-        None, description="Reason if payment is invalid"
+        default=None, description="Reason if payment is invalid"
     )
     consensusProof: Optional[str] = Field(
-        None, description="CRE consensus proof (ChaosChain extension)"
+        default=None, description="CRE consensus proof (ChaosChain extension)"
     )
     reportId: Optional[str] = Field(
-        None, description="Report identifier (ChaosChain extension)"
+        default=None, description="Report identifier (ChaosChain extension)"
     )
     timestamp: Optional[int] = Field(
-        None, description="Unix timestamp (ChaosChain extension)"
+        default=None, description="Unix timestamp (ChaosChain extension)"
+    )
+    amount: Optional[AmountBreakdown] = Field(
+        default=None, description="Payment amount"
     )
+    fee: Optional[FeeBreakdown] = Field(default=None, description="Facilitator fee")
+    net: Optional[NetBreakdown] = Field(default=None, description="Amount after fee")
 
 
 class SettleResponse(BaseModel):
@@ -55,14 +97,56 @@ class SettleResponse(BaseModel):
     """
 
     success: bool = Field(..., description="Whether settlement succeeded")
-    error: Optional[str] = Field(None, description="Error message if failed")
-    txHash: Optional[str] = Field(None, description="Transaction hash")
-    networkId: Optional[str] = Field(None, description="Network identifier")
+    error: Optional[str] = Field(default=None, description="Error message if failed")
+    txHash: Optional[str] = Field(default=None, description="Transaction hash")
+    txHashFee: Optional[str] = Field(
+        default=None, description="Fee transfer transaction hash"
+    )
+    networkId: Optional[str] = Field(default=None, description="Network identifier")
     consensusProof: Optional[str] = Field(
-        None, description="CRE consensus proof (ChaosChain extension)"
+        default=None, description="CRE consensus proof (ChaosChain extension)"
     )
     timestamp: Optional[int] = Field(
-        None, description="Unix timestamp (ChaosChain extension)"
+        default=None, description="Unix timestamp (ChaosChain extension)"
+    )
+    status: Optional[str] = Field(
+        default=None,
+        description="Settlement status: pending, partial_settlement, confirmed or failed",
+    )
+    evidenceHash: Optional[str] = Field(
+        default=None,
+        description="Evidence hash for Proof-of-Agency (ChaosChain extension)",
+    )
+    proofOfAgency: Optional[str] = Field(
+        default=None, description="ValidationRegistry tx hash (ChaosChain extension)"
+    )
+    amount: Optional[AmountBreakdown] = Field(
+        default=None, description="Payment amount"
+    )
+    fee: Optional[FeeBreakdown] = Field(default=None, description="Facilitator fee")
+    net: Optional[NetBreakdown] = Field(default=None, description="Amount after fee")
+
+
+class TransactionStatus(BaseModel):
+    """
+    Finality of one settlement transaction.
+    """
+
+    txHash: str = Field(..., description="Transaction hash")
+    status: str = Field(..., description="pending, confirmed or failed")
+    confirmations: int = Field(
+        default=0, description="Blocks mined on top of the transaction"
+    )
+
+
+class SettlementStatusResponse(BaseModel):
+    """
+    Response from the /settlements/status endpoint.
+    """
+
+    network: str = Field(..., description="Network the transactions were sent on")
+    settlements: List[TransactionStatus] = Field(
+        ..., description="Status of each requested transaction"
     )
 
 
@@ -96,3 +180,24 @@ class ServiceInfo(BaseModel):
     endpoints: Optional[Dict[str, str]] = None
     docs: Optional[str] = None
 
+
+class BatchResult(BaseModel):
+    """
+    Outcome of one payment in a `verify_many` / `settle_many` batch.
+
+    Exactly one of `result` or `error` is set, so a single failing payment
+    never aborts the rest of the batch.
+    """
+
+    index: int = Field(..., description="Position of the payment in the input batch")
+    result: Optional[Union[VerifyResponse, SettleResponse]] = Field(
+        default=None, description="Facilitator response if the call completed"
+    )
+    error: Optional[str] = Field(
+        default=None, description="Error message if the call raised"
+    )
+
+    @property
+    def ok(self) -> bool:
+        """Whether the call completed (regardless of isValid/success)."""
+        return self.error is None
@@ -0,0 +1,112 @@
+"""
+Phase tracing for the requests/urllib3 transport of X402Client.
+
+TracedHTTPAdapter's connection pools report pool wait, DNS, connect and
+TLS times into the RequestTiming activated on the calling thread. Kept
+apart from `instrumentation` so that module does not import requests.
+"""
+
+import socket
+import time
+from typing import TYPE_CHECKING, Optional
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NewConnectionError
+
+from .instrumentation import active_timing
+
+if TYPE_CHECKING:
+    # Type the pool mixin against the pool it is mixed into
+    _PoolBase = HTTPConnectionPool
+else:
+    _PoolBase = object
+
+
+class _TracedConnectionMixin:
+    """Times name resolution and the TCP connect of new connections."""
+
+    def _new_conn(self):
+        timing = active_timing()
+        if timing is None:
+            return super()._new_conn()
+
+        start = time.perf_counter()
+        host = self._dns_host
+        try:
+            addresses = [
+                a[4][0]
+                for a in socket.getaddrinfo(host, self.port, 0, socket.SOCK_STREAM)
+            ]
+        except OSError:
+            addresses = [host]  # let urllib3 raise its own resolution error
+        resolved = time.perf_counter()
+        timing.dns = resolved - start
+
+        # Connect to the resolved addresses in order, like create_connection
+        error = None
+        try:
+            for address in dict.fromkeys(addresses):
+                self._dns_host = address
+                try:
+                    sock = super()._new_conn()
+                    break
+                except NewConnectionError as e:
+                    error = e
+            else:
+                raise error
+        finally:
+            self._dns_host = host
+            timing.connect = time.perf_counter() - resolved
+        return sock
+
+
+class _TracedHTTPConnection(_TracedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TracedHTTPSConnection(_TracedConnectionMixin, HTTPSConnection):
+    def connect(self) -> None:
+        timing = active_timing()
+        if timing is None:
+            return super().connect()
+        start = time.perf_counter()
+        super().connect()
+        opened = (timing.dns or 0.0) + (timing.connect or 0.0)
+        timing.tls = max(0.0, time.perf_counter() - start - opened)
+
+
+class _TracedPoolMixin(_PoolBase):
+    """Times the wait for a pooled connection."""
+
+    def _get_conn(self, timeout: Optional[float] = None):
+        timing = active_timing()
+        if timing is None:
+            return super()._get_conn(timeout)
+        start = time.perf_counter()
+        conn = super()._get_conn(timeout)
+        timing.pool_wait = time.perf_counter() - start
+        return conn
+
+
+class _TracedHTTPConnectionPool(_TracedPoolMixin, HTTPConnectionPool):
+    ConnectionCls = _TracedHTTPConnection
+
+
+class _TracedHTTPSConnectionPool(_TracedPoolMixin, HTTPSConnectionPool):
+    ConnectionCls = _TracedHTTPSConnection
+
+
+class TracedHTTPAdapter(HTTPAdapter):
+    """
+    requests adapter whose connection pools report pool wait, DNS,
+    connect and TLS times into the calling thread's active RequestTiming.
+    """
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TracedHTTPConnectionPool,
+            "https": _TracedHTTPSConnectionPool,
+        }
@@ -30,6 +30,32 @@ setup(
         "pydantic>=2.0.0",
     ],
     extras_require={
+        "async": [
+            "httpx>=0.25.0",
+        ],
+        "http2": [
+            "httpx[http2]>=0.25.0",
+        ],
+        "fast": [
+            "orjson>=3.9.0",
+        ],
+        "numpy": [
+            "numpy>=1.22.0",
+        ],
+        "compact": [
+            "msgspec>=0.18.0",
+        ],
+        "otel": [
+            "opentelemetry-api>=1.20.0",
+        ],
+        "standin": [
+            "uvloop>=0.17.0; sys_platform != 'win32'",
+        ],
+        "signatures": [
+            "eth-keys>=0.4.0",
+            "eth-hash[pycryptodome]>=0.5.0",
+            "coincurve>=18.0.0",
+        ],
         "dev": [
             "pytest>=7.4.0",
             "pytest-cov>=4.1.0",
@@ -39,4 +65,3 @@ setup(
         ],
     },
 )
-
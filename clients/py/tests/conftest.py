@@ -0,0 +1,63 @@
+import base64
+import json
+import os
+import time
+from typing import Any, Dict, Iterator
+
+import pytest
+
+from chaoschain_x402_client.standin import Latency, StandinFacilitator
+
+PAY_TO = "0x209693Bc6afc0C5328bA36FaF03C514EF312287C"
+ASSET = "0x036CbD53842c5426634e7929541eC2318f3dCF7e"
+
+REQUIREMENTS: Dict[str, Any] = {
+    "scheme": "exact",
+    "network": "base-sepolia",
+    "maxAmountRequired": "1000000",
+    "payTo": PAY_TO,
+    "asset": ASSET,
+    "resource": "/api/weather",
+}
+
+
+def make_header(
+    payer: str = "0x" + "11" * 20,
+    nonce: str = "",
+    valid_before: int = 0,
+    value: str = REQUIREMENTS["maxAmountRequired"],
+) -> str:
+    """Base64 X-PAYMENT header in the ChaosChain SDK format; a fresh nonce by default."""
+    payload = {
+        "x402Version": 1,
+        "scheme": "exact",
+        "network": REQUIREMENTS["network"],
+        "payload": {
+            "signature": "0x" + "11" * 65,
+            "authorization": {
+                "from": payer,
+                "to": PAY_TO,
+                "value": value,
+                "validAfter": "0",
+                "validBefore": str(valid_before or int(time.time()) + 3600),
+                "nonce": nonce or "0x" + os.urandom(32).hex(),
+            },
+        },
+    }
+    return base64.b64encode(json.dumps(payload).encode()).decode()
+
+
+@pytest.fixture
+def requirements() -> Dict[str, Any]:
+    return dict(REQUIREMENTS)
+
+
+@pytest.fixture
+def standin() -> Iterator[StandinFacilitator]:
+    """A stand-in facilitator whose verify takes long enough for calls to overlap."""
+    facilitator = StandinFacilitator(
+        block_time=0.05, verify_latency=Latency.constant(0.1)
+    )
+    facilitator.serve_in_thread()
+    yield facilitator
+    facilitator.shutdown()
@@ -0,0 +1,24 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+
+from bench_fees import differential, make_vectors, python_breakdown  # noqa: E402
+
+
+def test_breakdown_rejects_like_the_bridge():
+    # BigInt(amount) fails first, then BigInt(parseInt(FEE_BPS_DEFAULT))
+    assert python_breakdown("1.5", "abc", 6) == {"error": "SyntaxError"}
+    assert python_breakdown("1000000", "abc", 6) == {"error": "RangeError"}
+    breakdown = python_breakdown("1000000", "", 6)
+    assert breakdown["fee"] == {"human": "0.01", "base": "10000", "bps": 100}
+    assert breakdown["net"] == {"human": "0.99", "base": "990000"}
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+def test_breakdowns_match_the_bridge():
+    # Differential check against a Node port of managed/fees.ts and amounts.ts
+    assert differential(make_vectors(3000, seed=0)) == 0
@@ -0,0 +1,100 @@
+import base64
+import json
+
+import pytest
+
+from chaoschain_x402_client.idempotency import authorization_key, settlement_key
+
+REQUIREMENTS = {
+    "scheme": "exact",
+    "network": "base-sepolia",
+    "maxAmountRequired": "1000000",
+    "payTo": "0x2222222222222222222222222222222222222222",
+    "asset": "0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+    "resource": "/api/weather",
+}
+
+R = "11" * 32
+S = "22" * 32
+
+
+def header(**changes):
+    authorization = {
+        "from": "0x1111111111111111111111111111111111111111",
+        "to": "0x2222222222222222222222222222222222222222",
+        "value": "1000000",
+        "validAfter": "0",
+        "validBefore": "1900000000",
+        "nonce": "0x" + "ab" * 32,
+    }
+    signature = changes.pop("signature", "0x" + R + S + "1b")
+    authorization.update(changes)
+    envelope = {
+        "x402Version": 1,
+        "scheme": "exact",
+        "network": "base-sepolia",
+        "payload": {"authorization": authorization},
+        "signature": signature,
+    }
+    return base64.b64encode(json.dumps(envelope).encode()).decode()
+
+
+def test_settlement_key_is_deterministic():
+    assert settlement_key(header(), REQUIREMENTS) == settlement_key(
+        header(), dict(REQUIREMENTS)
+    )
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"validBefore": "1"},
+        {"validAfter": "1"},
+        {"value": "999999"},
+        {"to": "0x3333333333333333333333333333333333333333"},
+        {"signature": "0x" + R + "33" * 32 + "1b"},
+        {"signature": "0x" + R + S + "1c"},
+        {"signature": "0xdeadbeef"},
+    ],
+)
+def test_settlement_key_covers_every_authorization_field(changes):
+    assert settlement_key(header(**changes), REQUIREMENTS) != settlement_key(
+        header(), REQUIREMENTS
+    )
+    # The replay guard still sees the same authorization
+    assert authorization_key(header(**changes), REQUIREMENTS) == authorization_key(
+        header(), REQUIREMENTS
+    )
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"maxAmountRequired": "2000000"},
+        {"payTo": "0x3333333333333333333333333333333333333333"},
+    ],
+)
+def test_settlement_key_covers_requirements(changes):
+    assert settlement_key(header(), {**REQUIREMENTS, **changes}) != settlement_key(
+        header(), REQUIREMENTS
+    )
+
+
+def test_settlement_key_normalizes_encodings():
+    checksummed = header(
+        signature="0X" + R.upper() + S.upper() + "1B",
+        validBefore=hex(1900000000),
+        nonce="0x" + "AB" * 32,
+    )
+    assert settlement_key(checksummed, REQUIREMENTS) == settlement_key(
+        header(), REQUIREMENTS
+    )
+    # v/r/s split and v in {0, 1} is the same signature as a combined one
+    split = json.loads(base64.b64decode(header(signature=None)))
+    split.update({"v": 0, "r": "0x" + R, "s": "0x" + S})
+    assert settlement_key(split, REQUIREMENTS) == settlement_key(header(), REQUIREMENTS)
+
+
+def test_settlement_key_rejects_headers_without_payer_or_nonce():
+    with pytest.raises(ValueError):
+        settlement_key(header(nonce=None), REQUIREMENTS)
@@ -0,0 +1,238 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+import requests
+
+from chaoschain_x402_client import (
+    ASGIPaymentGate,
+    AsyncX402Client,
+    CircuitBreaker,
+    CircuitOpenError,
+    GatePolicy,
+    RateLimitedError,
+    WSGIPaymentGate,
+    X402Client,
+)
+from conftest import REQUIREMENTS, make_header
+
+DEAD_FACILITATOR = "http://127.0.0.1:9"
+ROUTES = {"GET /paid": REQUIREMENTS}
+
+
+class FailingClient:
+    """Stands in for X402Client when verify raises."""
+
+    x402_version = 1
+
+    def __init__(self, error: BaseException, circuit_breaker=None):
+        self.error = error
+        self.circuit_breaker = circuit_breaker
+
+    def verify_payment(self, payment_header, payment_requirements, reservation=None):
+        raise self.error
+
+
+class AsyncFailingClient(FailingClient):
+    async def verify_payment(
+        self, payment_header, payment_requirements, reservation=None
+    ):
+        raise self.error
+
+
+def wsgi_app(environ, start_response):
+    start_response("200 OK", [("Content-Type", "text/plain")])
+    return [b"paid content"]
+
+
+async def asgi_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"paid content"})
+
+
+def call_wsgi(gate, header=None, path="/paid"):
+    """(status, headers, body) of one GET through a WSGI gate."""
+    environ = {"REQUEST_METHOD": "GET", "PATH_INFO": path}
+    if header is not None:
+        environ["HTTP_X_PAYMENT"] = header
+    started = []
+    response = gate(
+        environ,
+        lambda status, headers, exc_info=None: started.append((status, headers)),
+    )
+    body = b"".join(response)
+    if hasattr(response, "close"):
+        response.close()
+    status, headers = started[0]
+    return int(status[:3]), {name.lower(): value for name, value in headers}, body
+
+
+async def call_asgi(gate, header=None, path="/paid"):
+    """(status, headers, body) of one GET through an ASGI gate."""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    headers = [(b"x-payment", header.encode())] if header is not None else []
+    scope = {"type": "http", "method": "GET", "path": path, "headers": headers}
+    await gate(scope, receive, send)
+    start = messages[0]
+    body = b"".join(message.get("body", b"") for message in messages[1:])
+    return (
+        start["status"],
+        {name.decode(): value.decode() for name, value in start["headers"]},
+        body,
+    )
+
+
+FAILURES = [
+    # The client's own refusals are backpressure: 503
+    (RateLimitedError("No rate limit permit"), 503, "FACILITATOR_BUSY", "1", "shed"),
+    (
+        CircuitOpenError("Facilitator circuit is open"),
+        503,
+        "FACILITATOR_UNAVAILABLE",
+        "8",
+        "facilitator_errors",
+    ),
+    # The facilitator failed to answer: 502
+    (
+        requests.exceptions.ConnectionError("refused"),
+        502,
+        "FACILITATOR_ERROR",
+        "1",
+        "facilitator_errors",
+    ),
+    (TimeoutError("timed out"), 502, "FACILITATOR_ERROR", "1", "facilitator_errors"),
+    (ValueError("malformed"), 502, "FACILITATOR_ERROR", "1", "facilitator_errors"),
+]
+
+
+@pytest.mark.parametrize("error, status, code, retry_after, counter", FAILURES)
+def test_wsgi_gate_maps_verify_failures(error, status, code, retry_after, counter):
+    client = FailingClient(error, CircuitBreaker(reset_timeout=7.5))
+    gate = WSGIPaymentGate(wsgi_app, client, ROUTES)
+
+    got_status, headers, body = call_wsgi(gate, make_header())
+    assert got_status == status
+    assert headers["retry-after"] == retry_after
+    assert json.loads(body) == {"error": str(error), "code": code}
+    assert getattr(gate.gate.stats(), counter) == 1
+    assert gate.gate.stats().verifying == 0
+
+
+@pytest.mark.parametrize("error, status, code, retry_after, counter", FAILURES)
+def test_asgi_gate_maps_verify_failures(error, status, code, retry_after, counter):
+    client = AsyncFailingClient(error, CircuitBreaker(reset_timeout=7.5))
+    gate = ASGIPaymentGate(asgi_app, client, ROUTES)
+
+    got_status, headers, body = asyncio.run(call_asgi(gate, make_header()))
+    assert got_status == status
+    assert headers["retry-after"] == retry_after
+    assert json.loads(body) == {"error": str(error), "code": code}
+    assert getattr(gate.gate.stats(), counter) == 1
+
+
+def test_wsgi_gate_challenges_missing_and_invalid_payments(standin):
+    client = X402Client(standin.url)
+    gate = WSGIPaymentGate(wsgi_app, client, ROUTES)
+
+    status, _, body = call_wsgi(gate)
+    challenge = json.loads(body)
+    assert status == 402
+    assert challenge["error"] == "X-PAYMENT header is required"
+    assert challenge["accepts"][0]["payTo"] == REQUIREMENTS["payTo"]
+    assert challenge["accepts"][0]["resource"] == REQUIREMENTS["resource"]
+
+    expired = make_header(valid_before=int(time.time()) - 60)
+    status, _, body = call_wsgi(gate, expired)
+    assert status == 402
+    assert json.loads(body)["error"].startswith("Authorization expired")
+
+    # Free routes are not gated
+    assert call_wsgi(gate, path="/free")[0] == 200
+    assert gate.gate.stats().challenged == 2
+    client.close()
+
+
+def test_wsgi_gate_serves_and_settles_a_valid_payment(standin):
+    client = X402Client(standin.url)
+    settled = threading.Event()
+    gate = WSGIPaymentGate(
+        wsgi_app, client, ROUTES, on_settlement=lambda handle: settled.set()
+    )
+
+    status, _, body = call_wsgi(gate, make_header())
+    assert (status, body) == (200, b"paid content")
+    assert settled.wait(10)
+    stats = gate.gate.stats()
+    assert (stats.paid, stats.settled, stats.pending_settlements) == (1, 1, 0)
+    client.close()
+
+
+def test_gate_answers_502_then_503_once_the_circuit_opens():
+    client = X402Client(
+        DEAD_FACILITATOR, circuit_breaker=CircuitBreaker(1, reset_timeout=30)
+    )
+    gate = WSGIPaymentGate(wsgi_app, client, ROUTES)
+
+    status, headers, body = call_wsgi(gate, make_header())
+    assert (status, json.loads(body)["code"]) == (502, "FACILITATOR_ERROR")
+    status, headers, body = call_wsgi(gate, make_header())
+    assert (status, json.loads(body)["code"]) == (503, "FACILITATOR_UNAVAILABLE")
+    assert headers["retry-after"] == "30"
+    assert gate.gate.stats().facilitator_errors == 2
+    client.close()
+
+
+def test_asgi_gate_answers_502_then_503_once_the_circuit_opens():
+    async def main():
+        client = AsyncX402Client(
+            DEAD_FACILITATOR, circuit_breaker=CircuitBreaker(1, reset_timeout=30)
+        )
+        gate = ASGIPaymentGate(asgi_app, client, ROUTES)
+        try:
+            return [await call_asgi(gate, make_header()) for _ in range(2)]
+        finally:
+            await client.close()
+
+    (first, _, _), (second, headers, _) = asyncio.run(main())
+    assert (first, second) == (502, 503)
+    assert headers["retry-after"] == "30"
+
+
+def test_gate_sheds_with_503_when_verifications_are_saturated():
+    release = threading.Event()
+    entered = threading.Event()
+
+    class SlowClient(FailingClient):
+        def verify_payment(
+            self, payment_header, payment_requirements, reservation=None
+        ):
+            entered.set()
+            release.wait(10)
+            raise TimeoutError("timed out")
+
+    gate = WSGIPaymentGate(
+        wsgi_app,
+        SlowClient(TimeoutError()),
+        ROUTES,
+        GatePolicy(max_concurrent_verifications=1, retry_after=3),
+    )
+    first = threading.Thread(target=call_wsgi, args=(gate, make_header()))
+    first.start()
+    assert entered.wait(10)
+
+    status, headers, body = call_wsgi(gate, make_header())
+    release.set()
+    first.join(10)
+    assert status == 503
+    assert headers["retry-after"] == "3"
+    assert json.loads(body)["code"] == "FACILITATOR_BUSY"
+    assert gate.gate.stats().shed == 1
@@ -0,0 +1,134 @@
+import csv
+import json
+
+import pytest
+
+from chaoschain_x402_client.reconciliation import reconcile
+
+EXPORT_HEADER = [
+    "tx_hash",
+    "nonce",
+    "status",
+    "amount",
+    "fee_amount",
+    "net_amount",
+    "fee_bps",
+    "tx_hash_fee",
+]
+
+
+def tx(n):
+    return "0x%064x" % n
+
+
+def nonce(n):
+    return "0x%064x" % (1 << 200 | n)
+
+
+def export_row(tx_hash=None, nonce=None, status="confirmed"):
+    return [
+        tx_hash or "",
+        nonce or "",
+        status,
+        "1000000",
+        "10000",
+        "990000",
+        "100",
+        tx(99),
+    ]
+
+
+def ledger_row(tx_hash=None, nonce=None, status="pending"):
+    return {
+        "success": status != "failed",
+        "txHash": tx_hash,
+        "txHashFee": tx(99),
+        "status": status,
+        "nonce": nonce,
+        "amount": {"human": "1", "base": "1000000", "symbol": "USDC"},
+        "fee": {"human": "0.01", "base": "10000", "bps": 100},
+        "net": {"human": "0.99", "base": "990000"},
+    }
+
+
+@pytest.fixture
+def run(tmp_path):
+    def run(exports, ledger, processes=1):
+        export_path = tmp_path / "transactions.csv"
+        with open(export_path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(EXPORT_HEADER)
+            writer.writerows(exports)
+        ledger_path = tmp_path / "ledger.ndjson"
+        ledger_path.write_text("".join(json.dumps(row) + "\n" for row in ledger))
+        return reconcile([export_path], ledger_path, processes=processes)
+
+    return run
+
+
+@pytest.mark.parametrize(
+    "ledger_status, export_status",
+    [
+        ("pending", "pending"),
+        ("pending", "confirmed"),
+        ("partial_settlement", "pending"),
+        ("partial_settlement", "confirmed"),
+        ("confirmed", "confirmed"),
+    ],
+)
+def test_settlement_progress_is_not_a_mismatch(run, ledger_status, export_status):
+    report = run(
+        [export_row(tx(1), status=export_status)],
+        [ledger_row(tx(1), nonce(1), status=ledger_status)],
+    )
+    assert report.matched == 1
+    assert report.clean, report.samples
+
+
+@pytest.mark.parametrize(
+    "ledger_status, export_status",
+    [("pending", "failed"), ("confirmed", "pending"), ("confirmed", "failed")],
+)
+def test_status_disagreement_is_reported(run, ledger_status, export_status):
+    report = run(
+        [export_row(tx(1), status=export_status)],
+        [ledger_row(tx(1), nonce(1), status=ledger_status)],
+    )
+    assert report.mismatches == {"status": 1}
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_rows_join_on_nonce_when_one_side_has_no_hash(run, processes):
+    report = run(
+        [export_row(tx(1), nonce(1)), export_row(None, nonce(2), status="failed")],
+        [ledger_row(None, nonce(1)), ledger_row(tx(2), nonce(2), status="failed")],
+        processes=processes,
+    )
+    assert report.matched == 2
+    assert report.clean, report.samples
+
+
+def test_failed_settlement_without_hash_is_reported_once_at_most(run):
+    # The schema export has no nonce, so a failed settlement cannot be joined
+    report = run(
+        [export_row(tx(1)), export_row(None, None, status="failed")],
+        [ledger_row(tx(1), nonce(1)), ledger_row(None, nonce(2), status="failed")],
+    )
+    assert report.matched == 1
+    assert report.unmatched_failed == 2
+    assert report.clean, report.samples
+
+
+def test_different_hashes_for_one_nonce_are_two_settlements(run):
+    report = run([export_row(tx(1), nonce(1))], [ledger_row(tx(2), nonce(1))])
+    assert report.matched == 0
+    assert report.mismatches == {"missing_local": 1, "missing_export": 1}
+
+
+def test_missing_rows_are_reported(run):
+    report = run(
+        [export_row(tx(1)), export_row(tx(2))],
+        [ledger_row(tx(1), nonce(1)), ledger_row(tx(3), nonce(3))],
+    )
+    assert report.mismatches == {"missing_local": 1, "missing_export": 1}
+    assert report.samples[0].key in (tx(2), tx(3))
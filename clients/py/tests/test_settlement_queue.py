@@ -0,0 +1,203 @@
+import json
+import os
+import threading
+
+import pytest
+
+from chaoschain_x402_client import QueuePolicy, RetryPolicy, SettlementQueue
+from chaoschain_x402_client.idempotency import settlement_key
+from chaoschain_x402_client.settlement_queue import JournalEntry, SettlementJournal
+from chaoschain_x402_client.types import SettleResponse
+from conftest import REQUIREMENTS, make_header
+
+IN_PROGRESS = "Settlement of this authorization is already in progress"
+
+FAST_RETRY = QueuePolicy(
+    max_concurrency=1,
+    retry=RetryPolicy(max_attempts=3, backoff_base=0.01, backoff_max=0.02),
+)
+
+
+class ScriptedClient:
+    """Answers /settle from a script; the last answer repeats."""
+
+    def __init__(self, *answers: SettleResponse):
+        self.answers = list(answers)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def settle_payment(self, payment_header, payment_requirements) -> SettleResponse:
+        with self._lock:
+            self.calls += 1
+            if len(self.answers) > 1:
+                return self.answers.pop(0)
+            return self.answers[0]
+
+
+def entry(n: int) -> JournalEntry:
+    return JournalEntry(f"entry-{n}", make_header(), dict(REQUIREMENTS), float(n))
+
+
+def lines(path):
+    with open(path, "rb") as f:
+        return f.read().splitlines()
+
+
+def test_replay_skips_a_torn_final_line(tmp_path):
+    path = str(tmp_path / "journal")
+    journal = SettlementJournal(path)
+    second = entry(2)
+    journal.add(entry(1))
+    journal.add(second)
+    journal.finish("entry-1", "settled", "0x1")
+    journal.flush()
+    # The process dies halfway through writing a third record
+    with open(path, "ab") as f:
+        f.write(json.dumps(entry(3).record()).encode()[:40])
+
+    replayed = SettlementJournal(path)
+    assert [e.id for e in replayed.entries()] == ["entry-2"]
+    assert replayed.entries()[0].record() == second.record()
+    # Opening compacts the journal down to the open entry
+    assert [json.loads(line)["id"] for line in lines(path)] == ["entry-2"]
+
+    replayed.add(entry(4))
+    replayed.close()
+    assert [e.id for e in SettlementJournal(path).entries()] == ["entry-2", "entry-4"]
+
+
+def test_compaction_during_group_commit_keeps_open_entries(tmp_path):
+    path = str(tmp_path / "journal")
+    journal = SettlementJournal(path, commit_delay=0.001, compact_after=5)
+    still_open = set()
+    lock = threading.Lock()
+
+    def writer(first: int) -> None:
+        for n in range(first, first + 50):
+            journal.add(entry(n))
+            if n % 3:
+                journal.finish(f"entry-{n}", "settled")
+            else:
+                with lock:
+                    still_open.add(f"entry-{n}")
+
+    threads = [threading.Thread(target=writer, args=(i * 50,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    journal.flush()
+
+    # Fewer syncs than records, and compaction dropped every finished entry
+    # except the few finished since the last rewrite
+    assert journal.fsyncs < 400
+    assert len(lines(path)) <= len(still_open) + 2 * (journal.compact_after - 1)
+    # Reopen without closing, as after a crash
+    assert {e.id for e in SettlementJournal(path).entries()} == still_open
+
+
+@pytest.mark.parametrize(
+    "answers, calls, settled, rejected, parked",
+    [
+        # Another worker holds the settlement: retried until it succeeds
+        (
+            [
+                SettleResponse(success=False, error=IN_PROGRESS),
+                SettleResponse(success=True, txHash="0x1"),
+            ],
+            2,
+            1,
+            0,
+            0,
+        ),
+        # The bridge's RPC keeps failing: retried, then parked
+        ([SettleResponse(success=False, error="HTTP request failed")], 3, 0, 0, 1),
+        # Refusals of the payment itself are final
+        (
+            [SettleResponse(success=False, error="Authorization already used")],
+            1,
+            0,
+            1,
+            0,
+        ),
+        (
+            [SettleResponse(success=False, error="Insufficient USDC balance")],
+            1,
+            0,
+            1,
+            0,
+        ),
+        # A transaction that failed on chain has no error and is final too
+        ([SettleResponse(success=False, status="failed")], 1, 0, 1, 0),
+    ],
+)
+def test_final_and_retried_refusals(
+    tmp_path, answers, calls, settled, rejected, parked
+):
+    client = ScriptedClient(*answers)
+    results = []
+    queue = SettlementQueue(
+        client,
+        str(tmp_path / "journal"),
+        FAST_RETRY,
+        on_result=lambda entry_id, response: results.append(response),
+    )
+    entry_id = queue.submit(make_header(), REQUIREMENTS)
+    assert queue.join(5)
+
+    stats = queue.stats()
+    assert client.calls == calls
+    assert (stats.settled, stats.rejected, stats.parked) == (settled, rejected, parked)
+    assert stats.retries == min(calls, FAST_RETRY.retry.max_attempts) - 1
+    # Only finished entries leave the journal
+    assert (entry_id in queue.journal) == bool(parked)
+    assert len(results) == settled + rejected
+    queue.close()
+
+
+def test_parked_entry_is_retried_on_demand_and_on_restart(tmp_path):
+    path = str(tmp_path / "journal")
+    failing = ScriptedClient(SettleResponse(success=False, error="HTTP request failed"))
+    header = make_header()
+    queue = SettlementQueue(failing, path, FAST_RETRY)
+    entry_id = queue.submit(header, REQUIREMENTS)
+    assert entry_id == settlement_key(header, REQUIREMENTS)
+    assert queue.join(5)
+    assert queue.stats().parked == 1
+
+    # retry_parked gives the entry a fresh set of attempts
+    assert queue.retry_parked() == 1
+    assert queue.join(5)
+    assert failing.calls == 2 * FAST_RETRY.retry.max_attempts
+    assert queue.stats().parked == 1
+    queue.close()
+
+    # A parked entry stays in the journal and is replayed on the next start
+    healthy = ScriptedClient(SettleResponse(success=True, txHash="0x1"))
+    with SettlementQueue(healthy, path, FAST_RETRY) as restarted:
+        assert restarted.join(5)
+        stats = restarted.stats()
+        assert (stats.replayed, stats.settled, stats.parked) == (1, 1, 0)
+        assert entry_id not in restarted.journal
+    assert healthy.calls == 1
+    assert SettlementJournal(path).entries() == []
+
+
+def test_resubmitting_an_open_entry_is_a_no_op(tmp_path):
+    gate = threading.Event()
+
+    class BlockedClient(ScriptedClient):
+        def settle_payment(self, payment_header, payment_requirements):
+            gate.wait(5)
+            return super().settle_payment(payment_header, payment_requirements)
+
+    client = BlockedClient(SettleResponse(success=True, txHash="0x1"))
+    header = make_header()
+    with SettlementQueue(client, str(tmp_path / "journal"), FAST_RETRY) as queue:
+        first = queue.submit(header, REQUIREMENTS)
+        assert queue.submit(header, REQUIREMENTS) == first
+        assert len(queue.journal) == 1
+        gate.set()
+        assert queue.join(5)
+    assert client.calls == 1
+    assert not os.path.getsize(str(tmp_path / "journal"))
@@ -0,0 +1,208 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+
+import pytest
+
+from chaoschain_x402_client import AsyncX402Client, SharedPaymentCache, X402Client
+from chaoschain_x402_client.idempotency import authorization_key, new_reservation
+from conftest import REQUIREMENTS, make_header
+
+ACCEPTED = "Authorization already accepted by another request"
+SETTLING = "Settlement of this authorization is already in progress"
+USED = "Authorization already used"
+
+fork = pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+
+
+@pytest.fixture
+def shared():
+    cache = SharedPaymentCache(size_bytes=1 << 20)
+    yield cache
+    cache.close()
+
+
+def test_reservation_belongs_to_its_token(shared):
+    key = authorization_key(make_header(), REQUIREMENTS)
+    first, second = new_reservation(), new_reservation()
+
+    assert shared.reserve(key, first) is None
+    # Another request in the same process is refused...
+    assert shared.replay_reason(key, second) == ACCEPTED
+    assert shared.replay_reason(key) == ACCEPTED
+    assert shared.reserve(key, second) == ACCEPTED
+    # ...and cannot release the first request's reservation
+    shared.unreserve(key, second)
+    assert shared.reserve(key, second) == ACCEPTED
+
+    # The holder may verify again, then let go
+    assert shared.replay_reason(key, first) is None
+    assert shared.reserve(key, first) is None
+    shared.unreserve(key, first)
+    assert shared.reserve(key, second) is None
+
+
+def test_claimed_reservation_is_refused_to_everyone(shared):
+    key = authorization_key(make_header(), REQUIREMENTS)
+    reservation = new_reservation()
+    assert shared.reserve(key, reservation) is None
+    assert shared.claim(key) is None
+    assert shared.replay_reason(key, reservation) == SETTLING
+    assert shared.claim(key) == SETTLING
+
+    shared.settled(key)
+    assert shared.reserve(key, new_reservation()) == USED
+    # A settled marker is never released
+    shared.unreserve(key, reservation)
+    shared.release(key)
+    assert shared.replay_reason(key, reservation) == USED
+
+
+def test_concurrent_verifies_in_one_process_accept_one(standin, shared):
+    client = X402Client(standin.url, replay_guard=shared)
+    header = make_header()
+    reservations = [new_reservation(), new_reservation()]
+    results = [None, None]
+
+    def verify(i):
+        results[i] = client.verify_payment(header, REQUIREMENTS, reservations[i])
+
+    threads = [threading.Thread(target=verify, args=(i,)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(r.isValid for r in results) == [False, True]
+    winner = [r.isValid for r in results].index(True)
+    loser = 1 - winner
+    assert results[loser].invalidReason == ACCEPTED
+
+    # The loser cannot free the payment; the payer's retry waits for the winner
+    client.release_payment(header, REQUIREMENTS, reservations[loser])
+    assert not client.verify_payment(header, REQUIREMENTS).isValid
+    client.release_payment(header, REQUIREMENTS, reservations[winner])
+    assert client.verify_payment(header, REQUIREMENTS).isValid
+    client.close()
+
+
+def test_concurrent_async_verifies_in_one_process_accept_one(standin, shared):
+    async def main():
+        client = AsyncX402Client(standin.url, replay_guard=shared)
+        header = make_header()
+        try:
+            results = await asyncio.gather(
+                client.verify_payment(header, REQUIREMENTS),
+                client.verify_payment(header, REQUIREMENTS),
+            )
+        finally:
+            await client.close()
+        return results
+
+    results = asyncio.run(main())
+    assert sorted(r.isValid for r in results) == [False, True]
+
+
+def in_child(action, *args):
+    """Run `action(*args)` in a forked child and return its result."""
+    context = multiprocessing.get_context("fork")
+    results = context.SimpleQueue()
+    child = context.Process(target=lambda: results.put(action(*args)))
+    child.start()
+    child.join(10)
+    assert child.exitcode == 0
+    return results.get()
+
+
+@fork
+def test_reservation_belongs_to_its_process(shared):
+    key = authorization_key(make_header(), REQUIREMENTS)
+    reservation = new_reservation()
+    assert shared.reserve(key, reservation) is None
+
+    def other_process():
+        # Even the same token is another request in another process
+        seen = [shared.replay_reason(key, reservation)]
+        seen.append(shared.reserve(key, reservation))
+        shared.unreserve(key, reservation)
+        seen.append(shared.reserve(key, new_reservation()))
+        return seen
+
+    assert in_child(other_process) == [ACCEPTED, ACCEPTED, ACCEPTED]
+    assert shared.replay_reason(key, reservation) is None
+
+
+@fork
+def test_reservation_of_a_dead_process_is_reclaimed(shared):
+    key = authorization_key(make_header(), REQUIREMENTS)
+    assert in_child(shared.reserve, key, new_reservation()) is None
+    # The child has exited, so nobody will settle its reservation
+    assert shared.replay_reason(key) is None
+    assert shared.reserve(key, new_reservation()) is None
+
+
+@fork
+def test_claim_and_settled_states_across_processes(shared):
+    key = authorization_key(make_header(), REQUIREMENTS)
+    context = multiprocessing.get_context("fork")
+    claimed, done = context.Event(), context.Event()
+
+    def settler():
+        # Any process may claim a reserved authorization, e.g. a queue worker
+        assert shared.claim(key) is None
+        claimed.set()
+        done.wait(10)
+        shared.settled(key)
+
+    assert shared.reserve(key, new_reservation()) is None
+    child = context.Process(target=settler)
+    child.start()
+    assert claimed.wait(10)
+    # While the claimant is alive, nobody else may verify or settle
+    assert shared.replay_reason(key) == SETTLING
+    assert shared.reserve(key, new_reservation()) == SETTLING
+    assert shared.claim(key) == SETTLING
+
+    done.set()
+    child.join(10)
+    assert child.exitcode == 0
+    assert shared.reserve(key, new_reservation()) == USED
+    assert shared.claim(key) == USED
+    assert in_child(shared.replay_reason, key) == USED
+
+
+@fork
+def test_claim_of_a_dead_process_is_reclaimed(shared):
+    key = authorization_key(make_header(), REQUIREMENTS)
+    assert in_child(shared.claim, key) is None
+    # A crashed settler leaves `settling` behind; its payment may be retried
+    assert shared.claim(key) is None
+    shared.release(key)
+    assert shared.reserve(key, new_reservation()) is None
+
+
+@fork
+def test_concurrent_reserves_across_processes_accept_one(shared):
+    key = authorization_key(make_header(), REQUIREMENTS)
+    context = multiprocessing.get_context("fork")
+    start, finished = context.Event(), context.Event()
+    results = context.SimpleQueue()
+
+    def reserve():
+        start.wait(10)
+        results.put(shared.reserve(key, new_reservation()))
+        # Stay alive until every child has tried, so the winner is not reclaimed
+        finished.wait(10)
+
+    children = [context.Process(target=reserve) for _ in range(8)]
+    for child in children:
+        child.start()
+    start.set()
+    outcomes = [results.get() for _ in children]
+    finished.set()
+    for child in children:
+        child.join(10)
+        assert child.exitcode == 0
+
+    assert sorted(outcomes, key=str) == [ACCEPTED] * 7 + [None]
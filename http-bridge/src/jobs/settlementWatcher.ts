@@ -0,0 +1,124 @@
+import { getSettlementStatus } from '../managed/settlement';
+
+/**
+ * Shared settlement watcher for GET /settlements/stream
+ *
+ * Every subscriber registers the transactions it cares about; a single
+ * loop checks each watched transaction once per tick (however many
+ * streams are waiting on it) and pushes status changes to subscribers.
+ */
+
+export type SettlementStatus = {
+  txHash: string;
+  status: 'pending' | 'confirmed' | 'failed';
+  confirmations: number;
+};
+
+type Listener = {
+  onStatus: (status: SettlementStatus) => void;
+  onError: (error: Error) => void;
+};
+
+type Watched = {
+  network: string;
+  last?: SettlementStatus;
+  failures: number;
+  listeners: Set<Listener>;
+};
+
+const POLL_INTERVAL_MS = 2000;
+
+// Consecutive failed lookups after which a transaction's subscribers get an error
+const MAX_TICK_FAILURES = 5;
+
+const watched = new Map<string, Watched>();
+let timer: NodeJS.Timeout | null = null;
+
+function watchKey(network: string, txHash: string): string {
+  return `${network}:${txHash.toLowerCase()}`;
+}
+
+async function tick() {
+  await Promise.all(
+    [...watched.entries()].map(async ([key, entry]) => {
+      let status: SettlementStatus;
+      try {
+        status = await getSettlementStatus(
+          key.slice(entry.network.length + 1) as `0x${string}`,
+          entry.network,
+          true
+        );
+      } catch (error) {
+        entry.failures += 1;
+        if (entry.failures >= MAX_TICK_FAILURES) {
+          const reason = error instanceof Error ? error : new Error(String(error));
+          watched.delete(key);
+          for (const listener of entry.listeners) listener.onError(reason);
+        }
+        return;
+      }
+      entry.failures = 0;
+
+      const changed =
+        !entry.last ||
+        entry.last.status !== status.status ||
+        entry.last.confirmations !== status.confirmations;
+      entry.last = status;
+      if (changed) {
+        for (const listener of entry.listeners) listener.onStatus(status);
+      }
+      if (status.status !== 'pending') {
+        watched.delete(key);
+      }
+    })
+  );
+
+  if (watched.size === 0 && timer) {
+    clearInterval(timer);
+    timer = null;
+  }
+}
+
+/**
+ * Subscribe to status changes of transactions on one network
+ * `onStatus` receives the current status first, then every change;
+ * `onError` is called once a transaction's status lookup has failed
+ * MAX_TICK_FAILURES times in a row, after which it is no longer watched
+ * Returns an unsubscribe function
+ */
+export function watchSettlements(
+  network: string,
+  txHashes: string[],
+  onStatus: (status: SettlementStatus) => void,
+  onError: (error: Error) => void
+): () => void {
+  const listener: Listener = { onStatus, onError };
+  const keys = txHashes.map((hash) => watchKey(network, hash));
+
+  for (const key of keys) {
+    let entry = watched.get(key);
+    if (!entry) {
+      entry = { network, failures: 0, listeners: new Set() };
+      watched.set(key, entry);
+    } else if (entry.last) {
+      onStatus(entry.last);
+    }
+    entry.listeners.add(listener);
+  }
+
+  if (!timer) {
+    timer = setInterval(() => {
+      tick().catch(console.error);
+    }, POLL_INTERVAL_MS);
+    tick().catch(console.error);
+  }
+
+  return () => {
+    for (const key of keys) {
+      const entry = watched.get(key);
+      if (!entry) continue;
+      entry.listeners.delete(listener);
+      if (entry.listeners.size === 0) watched.delete(key);
+    }
+  };
+}
@@ -1,4 +1,4 @@
-import { createPublicClient, createWalletClient, http, parseUnits, formatUnits, type Address, type Hash, keccak256, toHex, defineChain } from 'viem';
+import { createPublicClient, createWalletClient, http, parseUnits, formatUnits, type Address, type Hash, keccak256, toHex, defineChain, TransactionReceiptNotFoundError } from 'viem';
 import { base, baseSepolia, mainnet, sepolia } from 'viem/chains';
 import { privateKeyToAccount } from 'viem/accounts';
 import type { VerifyRequest, SettleRequest } from '../types';
@@ -632,3 +632,44 @@ export async function checkTransactionFinality(
     status: receipt.status,
   };
 }
+
+/**
+ * Whether settlement status can be looked up on this network
+ */
+export function isSettlementNetwork(network: string): boolean {
+  return network in CHAIN_CONFIG;
+}
+
+/**
+ * Settlement status of a transaction, for clients polling for finality
+ * Transactions without a receipt yet (or unknown to the RPC) are pending.
+ * Other RPC errors are reported as pending too, unless `strict` is set,
+ * in which case they are thrown.
+ */
+export async function getSettlementStatus(
+  txHash: Hash,
+  network: string,
+  strict = false
+): Promise<{ txHash: Hash; status: 'pending' | 'confirmed' | 'failed'; confirmations: number }> {
+  const chainConfig = CHAIN_CONFIG[network as keyof typeof CHAIN_CONFIG];
+  if (!chainConfig) {
+    throw new Error(`Unsupported network: ${network}`);
+  }
+
+  try {
+    const result = await checkTransactionFinality(txHash, network, chainConfig.confirmations);
+    if (result.status === 'reverted') {
+      return { txHash, status: 'failed', confirmations: result.confirmations };
+    }
+    return {
+      txHash,
+      status: result.confirmed ? 'confirmed' : 'pending',
+      confirmations: result.confirmations,
+    };
+  } catch (error) {
+    if (strict && !(error instanceof TransactionReceiptNotFoundError)) {
+      throw error;
+    }
+    return { txHash, status: 'pending', confirmations: 0 };
+  }
+}
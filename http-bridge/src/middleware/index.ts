@@ -1,3 +1,3 @@
 export { tryServeCachedResponse, storeResponseForIdempotency, getIdempotencyKey } from './idempotency';
-export { rateLimitMiddleware } from './rateLimit';
+export { rateLimitMiddleware, chargeRateLimit } from './rateLimit';
 
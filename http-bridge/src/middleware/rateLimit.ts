@@ -47,3 +47,34 @@ export async function rateLimitMiddleware(
   }
 }
 
+/**
+ * Charge `cost` more requests to the caller's window, for routes where one
+ * HTTP request carries several operations (e.g. /verify/batch, on top of
+ * the one rateLimitMiddleware already charged). If the remaining budget is
+ * smaller than `cost` nothing is charged, a 429 is sent and false returned.
+ */
+export function chargeRateLimit(
+  request: FastifyRequest,
+  reply: FastifyReply,
+  cost: number
+): boolean {
+  if (cost <= 0) {
+    return true;
+  }
+  const now = Date.now();
+  const windowKey = `${request.ip}:${Math.floor(now / 60000)}`;
+  const current = rateLimitCache.get(windowKey) || { count: 0, resetAt: now + 60000 };
+
+  if (current.count + cost > DEFAULT_RATE_LIMIT_RPM) {
+    reply.code(429).send({
+      error: 'Rate limit exceeded',
+      retryAfter: Math.ceil((current.resetAt - now) / 1000),
+      remaining: Math.max(0, DEFAULT_RATE_LIMIT_RPM - current.count),
+    });
+    return false;
+  }
+
+  current.count += cost;
+  rateLimitCache.set(windowKey, current);
+  return true;
+}
@@ -11,17 +11,21 @@ import {
   type SettleResponse,
   type ErrorResponse,
   type BridgeConfig,
+  type VerifyBatchResponse,
   VerifyRequestSchema,
+  VerifyBatchRequestSchema,
   SettleRequestSchema,
+  VERIFY_BATCH_CONCURRENCY,
 } from "./types";
-import { verifyPaymentManaged, settlePaymentManaged } from './managed/settlement';
+import { verifyPaymentManaged, settlePaymentManaged, getSettlementStatus, isSettlementNetwork } from './managed/settlement';
 import { calculateFee } from './managed/fees';
 import { computeFeeBreakdown } from './managed/amounts';
 import { tryServeCachedResponse, storeResponseForIdempotency } from './middleware/idempotency';
-import { rateLimitMiddleware } from './middleware/rateLimit';
+import { rateLimitMiddleware, chargeRateLimit } from './middleware/rateLimit';
 import { linkAgentIdentity } from './chaoschain/identity';
 import { checkHealth } from './monitoring/health';
 import { startConfirmer } from './jobs/confirmer';
+import { watchSettlements } from './jobs/settlementWatcher';
 
 // Load environment variables
 dotenvConfig();
@@ -77,6 +81,27 @@ const server = Fastify({
 // UTILITY FUNCTIONS
 // ============================================================================
 
+/**
+ * Map `items` through `fn` with at most `limit` calls in flight,
+ * keeping results in input order
+ */
+async function mapWithConcurrency<T, R>(
+  items: T[],
+  limit: number,
+  fn: (item: T) => Promise<R>
+): Promise<R[]> {
+  const results = new Array<R>(items.length);
+  let next = 0;
+  const workers = Array.from({ length: Math.min(limit, items.length) }, async () => {
+    while (next < items.length) {
+      const index = next++;
+      results[index] = await fn(items[index]);
+    }
+  });
+  await Promise.all(workers);
+  return results;
+}
+
 /**
  * Mock verification logic for simulate mode
  * Returns a consensus-verified response
@@ -176,6 +201,58 @@ async function forwardSettleToCRE(request: SettleRequest): Promise<SettleRespons
   throw new Error("Remote CRE mode not yet implemented");
 }
 
+/**
+ * Verify one validated request in the configured mode
+ * Shared by POST /verify and POST /verify/batch
+ */
+async function processVerify(validatedRequest: VerifyRequest): Promise<VerifyResponse> {
+  // Create stable timestamp for this request (for idempotency consistency)
+  const stableTimestamp = Date.now();
+  const requestId = `req_${stableTimestamp}_${Math.random().toString(36).slice(2, 9)}`;
+
+  // ALWAYS compute fee breakdown for transparency (even for invalid payments)
+  const feeBreakdown = await computeFeeBreakdown(
+    validatedRequest.paymentRequirements.maxAmountRequired
+  );
+
+  let response: VerifyResponse;
+
+  if (config.mode === 'managed') {
+    // MANAGED MODE: Real on-chain verification
+    const verification = await verifyPaymentManaged(validatedRequest);
+    
+    response = {
+      isValid: verification.isValid,
+      invalidReason: verification.invalidReason,
+      consensusProof: verification.isValid 
+        ? `0x${Buffer.from(requestId).toString('hex').padEnd(64, '0')}`
+        : null,
+      reportId: requestId,
+      timestamp: stableTimestamp,
+      // Fee transparency: always present, even for invalid payments
+      amount: feeBreakdown.amount,
+      fee: feeBreakdown.fee,
+      net: feeBreakdown.net,
+    };
+  } else {
+    // DECENTRALIZED MODE: Use CRE workflow
+    const baseResponse = config.creMode === "simulate"
+      ? simulateVerify(validatedRequest)
+      : await forwardVerifyToCRE(validatedRequest);
+    
+    // Add fee breakdown to CRE response
+    response = {
+      ...baseResponse,
+      timestamp: stableTimestamp,
+      amount: feeBreakdown.amount,
+      fee: feeBreakdown.fee,
+      net: feeBreakdown.net,
+    };
+  }
+
+  return response;
+}
+
 // ============================================================================
 // ROUTES
 // ============================================================================
@@ -191,8 +268,11 @@ server.get("/api/info", async () => {
     mode: config.mode,
     endpoints: {
       verify: "POST /verify",
+      verifyBatch: "POST /verify/batch",
       settle: "POST /settle",
       supported: "GET /supported",
+      settlementStatus: "GET /settlements/status",
+      settlementStream: "GET /settlements/stream",
       health: "GET /health",
     },
     docs: "https://github.com/ChaosChain/chaoschain-x402",
@@ -299,52 +379,10 @@ server.post<{ Body: VerifyRequest; Reply: VerifyResponse | ErrorResponse }>(
       // Validate request body
       const validatedRequest = VerifyRequestSchema.parse(request.body);
 
-      // Create stable timestamp for this request (for idempotency consistency)
-      const stableTimestamp = Date.now();
-      const requestId = `req_${stableTimestamp}_${Math.random().toString(36).slice(2, 9)}`;
-      
       server.log.info(`[VERIFY] Processing verification request`);
       server.log.info(`[VERIFY] Mode: ${config.mode}`);
 
-      // ALWAYS compute fee breakdown for transparency (even for invalid payments)
-      const feeBreakdown = await computeFeeBreakdown(
-        validatedRequest.paymentRequirements.maxAmountRequired
-      );
-
-      let response: VerifyResponse;
-
-      if (config.mode === 'managed') {
-        // MANAGED MODE: Real on-chain verification
-        const verification = await verifyPaymentManaged(validatedRequest);
-        
-        response = {
-          isValid: verification.isValid,
-          invalidReason: verification.invalidReason,
-          consensusProof: verification.isValid 
-            ? `0x${Buffer.from(requestId).toString('hex').padEnd(64, '0')}`
-            : null,
-          reportId: requestId,
-          timestamp: stableTimestamp,
-          // Fee transparency: always present, even for invalid payments
-          amount: feeBreakdown.amount,
-          fee: feeBreakdown.fee,
-          net: feeBreakdown.net,
-        };
-      } else {
-        // DECENTRALIZED MODE: Use CRE workflow
-        const baseResponse = config.creMode === "simulate"
-          ? simulateVerify(validatedRequest)
-          : await forwardVerifyToCRE(validatedRequest);
-        
-        // Add fee breakdown to CRE response
-        response = {
-          ...baseResponse,
-          timestamp: stableTimestamp,
-          amount: feeBreakdown.amount,
-          fee: feeBreakdown.fee,
-          net: feeBreakdown.net,
-        };
-      }
+      const response = await processVerify(validatedRequest);
 
       server.log.info(`[VERIFY] Result: ${response.isValid ? "VALID" : "INVALID"}`);
 
@@ -371,6 +409,66 @@ server.post<{ Body: VerifyRequest; Reply: VerifyResponse | ErrorResponse }>(
   }
 );
 
+/**
+ * POST /verify/batch
+ * Verify many payments in one request, so high-volume clients pay the
+ * routing, rate-limit and parsing overhead once per batch
+ *
+ * Request Body:
+ * {
+ *   requests: VerifyRequest[]   (1..256)
+ * }
+ *
+ * Response:
+ * {
+ *   results: (VerifyResponse | { error, code })[]   (same order as requests)
+ * }
+ */
+server.post<{ Body: { requests: unknown[] }; Reply: VerifyBatchResponse | ErrorResponse }>(
+  "/verify/batch",
+  {
+    preHandler: [rateLimitMiddleware],
+  },
+  async (request, reply) => {
+    const batch = VerifyBatchRequestSchema.safeParse(request.body);
+    if (!batch.success) {
+      return reply.status(400).send({
+        error: batch.error.message,
+        code: "INVALID_REQUEST",
+      });
+    }
+
+    // Each item counts against the per-IP limit like a single /verify;
+    // rateLimitMiddleware has charged the first one already
+    if (!chargeRateLimit(request, reply, batch.data.requests.length - 1)) {
+      return reply;
+    }
+
+    server.log.info(`[VERIFY] Processing batch of ${batch.data.requests.length}`);
+
+    const results = await mapWithConcurrency(
+      batch.data.requests,
+      VERIFY_BATCH_CONCURRENCY,
+      async (item): Promise<VerifyResponse | ErrorResponse> => {
+        const parsed = VerifyRequestSchema.safeParse(item);
+        if (!parsed.success) {
+          return { error: parsed.error.message, code: "INVALID_REQUEST" };
+        }
+        try {
+          return await processVerify(parsed.data);
+        } catch (error) {
+          return {
+            error: error instanceof Error ? error.message : "Internal server error",
+            code: "VERIFICATION_ERROR",
+          };
+        }
+      }
+    );
+
+    return reply.code(200).send({ results });
+  }
+);
+
 /**
  * POST /settle
  * Settle an x402 payment via managed facilitator or decentralized consensus
@@ -534,6 +632,150 @@ server.post<{ Body: SettleRequest; Reply: SettleResponse | ErrorResponse }>(
   }
 );
 
+/**
+ * GET /settlements/status
+ * Batched finality lookup for settlements that returned status `pending`,
+ * so clients can track many settlements with one request per poll
+ *
+ * Query:
+ *   network: Network the transactions were sent on
+ *   txHashes: Comma-separated transaction hashes (max 100)
+ *
+ * Response:
+ * {
+ *   network: string,
+ *   settlements: [{ txHash, status: 'pending' | 'confirmed' | 'failed', confirmations }]
+ * }
+ */
+const MAX_STATUS_BATCH = 100;
+
+server.get<{ Querystring: { network?: string; txHashes?: string } }>(
+  "/settlements/status",
+  {
+    preHandler: [rateLimitMiddleware],
+  },
+  async (request, reply) => {
+    const { network, txHashes } = request.query;
+    const hashes = (txHashes || '').split(',').map((h) => h.trim()).filter(Boolean);
+
+    if (!network || hashes.length === 0) {
+      return reply.status(400).send({
+        error: "network and txHashes are required",
+        code: "INVALID_REQUEST",
+      });
+    }
+    if (hashes.length > MAX_STATUS_BATCH) {
+      return reply.status(400).send({
+        error: `At most ${MAX_STATUS_BATCH} txHashes per request`,
+        code: "INVALID_REQUEST",
+      });
+    }
+
+    try {
+      const settlements = await Promise.all(
+        hashes.map((hash) => getSettlementStatus(hash as `0x${string}`, network))
+      );
+      return reply.code(200).send({ network, settlements });
+    } catch (error) {
+      return reply.status(400).send({
+        error: error instanceof Error ? error.message : "Status lookup failed",
+        code: "STATUS_ERROR",
+      });
+    }
+  }
+);
+
+/**
+ * GET /settlements/stream
+ * Server-sent events stream of settlement status changes, so a client can
+ * follow many settlements over one connection instead of polling
+ *
+ * Query: same as GET /settlements/status
+ *
+ * Events:
+ *   event: status  data: { txHash, status, confirmations }  (current status, then every change)
+ *   event: end     data: {}                                  (all transactions are final)
+ *   event: error   data: { error, code }                     (status lookups keep failing; stream ends)
+ * A `: keepalive` comment is sent every 15s while nothing changes.
+ */
+server.get<{ Querystring: { network?: string; txHashes?: string } }>(
+  "/settlements/stream",
+  {
+    preHandler: [rateLimitMiddleware],
+  },
+  async (request, reply) => {
+    const { network, txHashes } = request.query;
+    const hashes = (txHashes || '').split(',').map((h) => h.trim().toLowerCase()).filter(Boolean);
+
+    if (!network || hashes.length === 0) {
+      return reply.status(400).send({
+        error: "network and txHashes are required",
+        code: "INVALID_REQUEST",
+      });
+    }
+    if (hashes.length > MAX_STATUS_BATCH) {
+      return reply.status(400).send({
+        error: `At most ${MAX_STATUS_BATCH} txHashes per request`,
+        code: "INVALID_REQUEST",
+      });
+    }
+    if (!isSettlementNetwork(network)) {
+      return reply.status(400).send({
+        error: `Unsupported network: ${network}`,
+        code: "INVALID_REQUEST",
+      });
+    }
+
+    reply.hijack();
+    reply.raw.writeHead(200, {
+      'Content-Type': 'text/event-stream',
+      'Cache-Control': 'no-cache',
+      'Connection': 'keep-alive',
+    });
+
+    const pending = new Set(hashes);
+    const keepalive = setInterval(() => reply.raw.write(': keepalive\n\n'), 15000);
+
+    let closed = false;
+    const close = () => {
+      clearInterval(keepalive);
+      unsubscribe();
+      reply.raw.end();
+    };
+
+    const unsubscribe = watchSettlements(
+      network,
+      hashes,
+      (status) => {
+        if (closed) return;
+        reply.raw.write(`event: status\ndata: ${JSON.stringify(status)}\n\n`);
+        if (status.status !== 'pending') {
+          pending.delete(status.txHash.toLowerCase());
+          if (pending.size === 0) {
+            closed = true;
+            reply.raw.write('event: end\ndata: {}\n\n');
+            // Let the listener loop finish before tearing down the subscription
+            setImmediate(close);
+          }
+        }
+      },
+      (error) => {
+        if (closed) return;
+        closed = true;
+        reply.raw.write(
+          `event: error\ndata: ${JSON.stringify({ error: error.message, code: "STATUS_ERROR" })}\n\n`
+        );
+        setImmediate(close);
+      }
+    );
+
+    request.raw.on('close', () => {
+      clearInterval(keepalive);
+      unsubscribe();
+    });
+  }
+);
+
 // ============================================================================
 // SERVER START
 // ============================================================================
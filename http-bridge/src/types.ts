@@ -53,6 +53,22 @@ export const VerifyRequestSchema = z.object({
 
 export type VerifyRequest = z.infer<typeof VerifyRequestSchema>;
 
+/**
+ * Verify Batch Request Schema
+ * POST /verify/batch request body
+ * Items are validated one by one so a malformed item fails alone
+ */
+export const MAX_VERIFY_BATCH = 256;
+
+// Items of one batch verified at a time; each runs several RPC reads
+export const VERIFY_BATCH_CONCURRENCY = 8;
+
+export const VerifyBatchRequestSchema = z.object({
+  requests: z.array(z.unknown()).min(1).max(MAX_VERIFY_BATCH),
+});
+
+export type VerifyBatchRequest = z.infer<typeof VerifyBatchRequestSchema>;
+
 /**
  * Settle Request Schema
  * POST /settle request body
@@ -107,6 +123,14 @@ export interface VerifyResponse {
   net?: NetBreakdown;
 }
 
+/**
+ * Verify Batch Response
+ * Returned by POST /verify/batch, one result per request in order
+ */
+export interface VerifyBatchResponse {
+  results: Array<VerifyResponse | ErrorResponse>;
+}
+
 /**
  * Settlement Response
  * Returned by POST /settle